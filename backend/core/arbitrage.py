@@ -4,7 +4,6 @@ Ghana Betting Arbitrage Finder
 Runs all scrapers and finds guaranteed profit opportunities across 6 bookmakers
 """
 
-import json
 import os
 import re
 import sys
@@ -16,6 +15,7 @@ from typing import Dict, List, Optional, Tuple
 
 # Handle imports for both package and standalone usage
 try:
+    from backend.core import jsoncodec
     from backend.scrapers import (
         scrape_betway_ghana,
         scrape_sportybet_ghana,
@@ -27,6 +27,7 @@ try:
 except ImportError:
     # When running standalone, add parent to path
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core import jsoncodec
     from scrapers import (
         scrape_betway_ghana,
         scrape_sportybet_ghana,
@@ -598,17 +599,16 @@ class GhanaBettingArbitrage:
             opp_copy.pop('all_odds', None)
             opps_clean.append(opp_copy)
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'summary': {
-                    'total_matches': sum(len(m) for m in self.all_matches.values()),
-                    'matched_events': len(self.matched_events),
-                    'arbitrage_found': len(opportunities)
-                },
-                'opportunities': opps_clean,
-                'matched_events': matched_simple[:100],  # Save first 100 for inspection
-            }, f, indent=2)
+        jsoncodec.dump({
+            'timestamp': datetime.now().isoformat(),
+            'summary': {
+                'total_matches': sum(len(m) for m in self.all_matches.values()),
+                'matched_events': len(self.matched_events),
+                'arbitrage_found': len(opportunities)
+            },
+            'opportunities': opps_clean,
+            'matched_events': matched_simple[:100],  # Save first 100 for inspection
+        }, filename, pretty=True)
 
         print(f'\nResults saved to: {filename}')
 
@@ -0,0 +1,852 @@
+"""
+Schema and writer for odds_history.db.
+
+Version 2 keys everything on integer surrogates instead of repeating
+ISO run ids and slug match ids in every row:
+
+    runs        run_pk, run_id (unique), run_ts (epoch seconds), run stats
+    bookmakers  bookmaker_pk, name
+    leagues     league_pk, name
+    teams       team_pk, name
+    fixtures    fixture_pk, match_id (unique), start_time, league_pk, home_pk, away_pk
+    odds        (run_pk, fixture_pk, bookmaker_pk) -> prices, event ids  [WITHOUT ROWID]
+    best_lines  (run_pk, fixture_pk) -> best price, bookmaker and event ids per outcome
+    arbs        (run_pk, fixture_pk) -> implied_sum, arb_roi of best lines that arb
+    line_open_close  fixture_pk -> opening and closing run of its complete best lines
+
+The odds table is clustered on run_pk, so a run-time range is one range
+scan over idx_runs_ts plus contiguous odds pages; idx_fixtures_start
+covers kickoff-window filters and idx_odds_fixture walks one fixture's
+lines across runs. A fixture's league and teams are those of its latest
+run.
+
+best_lines and arbs are derived from a run's odds when it is written
+(materialize_run) with the same rules as tools/arb_lab.build_best_lines:
+one line per bookmaker, home/away flipped to agree with the match median,
+then the highest price per outcome, ties going to the lower overround and
+then the bookmaker name.
+runs.best_lines_version records which rules a run was materialized with;
+runs below BEST_LINES_VERSION are rebuilt by tools/backfill_best_lines.py.
+line_open_close points each fixture at its first run with a complete set of
+best lines and at its closing run: the last one at or before kickoff, or
+the last one when none is. Appending a newer run advances it in place;
+anything else recomputes the touched fixtures from best_lines.
+
+Runs marked compacted (tools/compact_history.py) only hold the lines that
+changed since the previous stored run plus each line's first and last
+observation; readers carry the other lines forward between a line's first
+and last observation (compacted_runs_query, fixture_lines_query).
+
+init_history_db() migrates a version 1 database (TEXT-keyed runs,
+matches, odds tables) in place the first time it is opened.
+"""
+
+import math
+import sqlite3
+import statistics
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+SCHEMA_VERSION = 2
+# Lines are priced until kickoff; allow this long for in-play prices after it
+LIVE_LINE_SECONDS = 6 * 3600
+# 2: price ties broken by bookmaker name instead of bookmaker_pk
+BEST_LINES_VERSION = 2
+_IN_CHUNK = 500  # stay under SQLITE_MAX_VARIABLE_NUMBER on old builds
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_pk INTEGER PRIMARY KEY,
+        run_id TEXT NOT NULL UNIQUE,
+        run_ts INTEGER NOT NULL,
+        last_updated TEXT,
+        total_scraped INTEGER,
+        matched_events INTEGER,
+        scrape_time_seconds REAL,
+        fast_mode INTEGER,
+        created_at TEXT,
+        compacted INTEGER NOT NULL DEFAULT 0,
+        best_lines_version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS bookmakers (bookmaker_pk INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS leagues (league_pk INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS teams (team_pk INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    """
+    CREATE TABLE IF NOT EXISTS fixtures (
+        fixture_pk INTEGER PRIMARY KEY,
+        match_id TEXT NOT NULL UNIQUE,
+        start_time INTEGER,
+        league_pk INTEGER,
+        home_pk INTEGER,
+        away_pk INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS odds (
+        run_pk INTEGER NOT NULL,
+        fixture_pk INTEGER NOT NULL,
+        bookmaker_pk INTEGER NOT NULL,
+        home_odds REAL,
+        draw_odds REAL,
+        away_odds REAL,
+        event_id TEXT,
+        event_league_id TEXT,
+        PRIMARY KEY (run_pk, fixture_pk, bookmaker_pk)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS best_lines (
+        run_pk INTEGER NOT NULL,
+        fixture_pk INTEGER NOT NULL,
+        bookie_count INTEGER NOT NULL,
+        home_odds REAL,
+        home_bookmaker_pk INTEGER,
+        home_event_id TEXT,
+        home_league_id TEXT,
+        draw_odds REAL,
+        draw_bookmaker_pk INTEGER,
+        draw_event_id TEXT,
+        draw_league_id TEXT,
+        away_odds REAL,
+        away_bookmaker_pk INTEGER,
+        away_event_id TEXT,
+        away_league_id TEXT,
+        PRIMARY KEY (run_pk, fixture_pk)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS arbs (
+        run_pk INTEGER NOT NULL,
+        fixture_pk INTEGER NOT NULL,
+        implied_sum REAL NOT NULL,
+        arb_roi REAL NOT NULL,
+        PRIMARY KEY (run_pk, fixture_pk)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS line_open_close (
+        fixture_pk INTEGER PRIMARY KEY,
+        open_run_pk INTEGER NOT NULL,
+        open_ts INTEGER NOT NULL,
+        close_run_pk INTEGER NOT NULL,
+        close_ts INTEGER NOT NULL,
+        last_ts INTEGER NOT NULL,
+        snapshot_count INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs(run_ts, run_pk, run_id, last_updated)",
+    "CREATE INDEX IF NOT EXISTS idx_fixtures_start ON fixtures(start_time, fixture_pk, league_pk, home_pk, away_pk, match_id)",
+    "CREATE INDEX IF NOT EXISTS idx_odds_fixture ON odds(fixture_pk, run_pk)",
+    "CREATE INDEX IF NOT EXISTS idx_best_lines_fixture ON best_lines(fixture_pk, run_pk)",
+    "CREATE INDEX IF NOT EXISTS idx_open_close_span ON line_open_close(last_ts, open_ts)",
+]
+
+SNAPSHOT_COLUMNS = """
+    r.run_id,
+    r.last_updated,
+    f.match_id,
+    l.name AS league,
+    f.start_time,
+    h.name AS home_team,
+    a.name AS away_team,
+    b.name AS bookmaker,
+    o.home_odds,
+    o.draw_odds,
+    o.away_odds,
+    o.event_id,
+    o.event_league_id
+"""
+
+# CROSS JOIN pins the driving table so plans don't depend on ANALYZE statistics
+_DRIVE_BY_RUN = """
+    FROM runs r
+    CROSS JOIN odds o ON o.run_pk = r.run_pk
+    JOIN fixtures f ON f.fixture_pk = o.fixture_pk
+"""
+_DRIVE_BY_KICKOFF = """
+    FROM fixtures f
+    CROSS JOIN odds o ON o.fixture_pk = f.fixture_pk
+    JOIN runs r ON r.run_pk = o.run_pk
+"""
+_DRIVE_BY_BOTH = """
+    FROM runs r
+    CROSS JOIN fixtures f
+    CROSS JOIN odds o ON o.run_pk = r.run_pk AND o.fixture_pk = f.fixture_pk
+"""
+_DIMENSIONS = """
+    JOIN bookmakers b ON b.bookmaker_pk = o.bookmaker_pk
+    LEFT JOIN leagues l ON l.league_pk = f.league_pk
+    LEFT JOIN teams h ON h.team_pk = f.home_pk
+    LEFT JOIN teams a ON a.team_pk = f.away_pk
+"""
+
+
+def iso_to_epoch(value: Optional[str]) -> int:
+    """Epoch seconds for an ISO timestamp; naive values are taken as UTC."""
+    if not value:
+        return 0
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _tables(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    tables = _tables(conn)
+    if "fixtures" in tables:
+        return SCHEMA_VERSION
+    if "matches" in tables or "runs" in tables:
+        return 1
+    return 0
+
+
+def init_history_db(conn: sqlite3.Connection) -> None:
+    if schema_version(conn) == 1:
+        migrate_v1(conn)
+    new_open_close = "line_open_close" not in _tables(conn)
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column in ("compacted", "best_lines_version"):
+        if column not in cols:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    if new_open_close:
+        rebuild_open_close(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def migrate_v1(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Rewrite version 1 runs/matches/odds tables into the version 2 schema."""
+    conn.create_function("iso_to_epoch", 1, iso_to_epoch, deterministic=True)
+    tables = _tables(conn)
+    if "matches" not in tables:
+        conn.execute("CREATE TABLE matches (run_id TEXT, match_id TEXT, league TEXT, start_time INTEGER,"
+                      " home_team TEXT, away_team TEXT)")
+    if "odds" not in tables:
+        conn.execute("CREATE TABLE odds (run_id TEXT, match_id TEXT, bookmaker TEXT,"
+                      " home_odds REAL, draw_odds REAL, away_odds REAL)")
+    odds_cols = {row[1] for row in conn.execute("PRAGMA table_info(odds)")}
+    event_id = "o.event_id" if "event_id" in odds_cols else "NULL"
+    event_league_id = "o.event_league_id" if "event_league_id" in odds_cols else "NULL"
+
+    conn.commit()
+    conn.execute("BEGIN")
+    try:
+        for table in ("runs", "matches", "odds"):
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+        for index in ("idx_matches_league", "idx_matches_start", "idx_odds_bookie", "idx_runs_updated"):
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.execute(
+            """
+            INSERT INTO runs (run_id, run_ts, last_updated, total_scraped, matched_events,
+                              scrape_time_seconds, fast_mode, created_at)
+            SELECT run_id, iso_to_epoch(COALESCE(last_updated, run_id)), last_updated, total_scraped,
+                   matched_events, scrape_time_seconds, fast_mode, created_at
+            FROM runs_v1 ORDER BY COALESCE(last_updated, run_id)
+            """
+        )
+        conn.execute("INSERT OR IGNORE INTO bookmakers (name) SELECT DISTINCT bookmaker FROM odds_v1 WHERE bookmaker IS NOT NULL")
+        conn.execute("INSERT OR IGNORE INTO leagues (name) SELECT DISTINCT league FROM matches_v1 WHERE league IS NOT NULL")
+        conn.execute(
+            "INSERT OR IGNORE INTO teams (name) SELECT home_team FROM matches_v1 WHERE home_team IS NOT NULL"
+            " UNION SELECT away_team FROM matches_v1 WHERE away_team IS NOT NULL"
+        )
+        # Oldest run first so the latest league/teams win
+        conn.execute(
+            """
+            INSERT INTO fixtures (match_id, start_time, league_pk, home_pk, away_pk)
+            SELECT m.match_id, m.start_time, l.league_pk, h.team_pk, a.team_pk
+            FROM matches_v1 m
+            JOIN runs r ON r.run_id = m.run_id
+            LEFT JOIN leagues l ON l.name = m.league
+            LEFT JOIN teams h ON h.name = m.home_team
+            LEFT JOIN teams a ON a.name = m.away_team
+            WHERE m.match_id IS NOT NULL
+            ORDER BY r.run_ts, r.run_pk
+            ON CONFLICT(match_id) DO UPDATE SET
+                start_time = excluded.start_time, league_pk = excluded.league_pk,
+                home_pk = excluded.home_pk, away_pk = excluded.away_pk
+            """
+        )
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO odds (run_pk, fixture_pk, bookmaker_pk, home_odds, draw_odds, away_odds,
+                                         event_id, event_league_id)
+            SELECT r.run_pk, f.fixture_pk, b.bookmaker_pk, o.home_odds, o.draw_odds, o.away_odds,
+                   {event_id}, {event_league_id}
+            FROM odds_v1 o
+            JOIN matches_v1 m ON m.run_id = o.run_id AND m.match_id = o.match_id
+            JOIN runs r ON r.run_id = o.run_id
+            JOIN fixtures f ON f.match_id = o.match_id
+            JOIN bookmakers b ON b.name = o.bookmaker
+            """
+        )
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("runs", "fixtures", "odds", "bookmakers", "leagues", "teams")
+        }
+        for table in ("runs_v1", "matches_v1", "odds_v1"):
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    conn.execute("ANALYZE")
+    conn.commit()
+    return counts
+
+
+def _intern(conn: sqlite3.Connection, table: str, key: str, names: Iterable[str]) -> Dict[str, int]:
+    """name -> surrogate key, inserting names not seen before."""
+    names = list({name for name in names if name is not None})
+    if not names:
+        return {}
+    conn.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", [(name,) for name in names])
+    ids = {}
+    for i in range(0, len(names), _IN_CHUNK):
+        chunk = names[i:i + _IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        ids.update(conn.execute(f"SELECT name, {key} FROM {table} WHERE name IN ({marks})", chunk).fetchall())
+    return ids
+
+
+def write_snapshot(
+    conn: sqlite3.Connection,
+    run_id: str,
+    payload: Mapping,
+    fixture_id: Callable[[Mapping], str],
+    fast_mode: int = 0,
+    created_at: Optional[str] = None,
+) -> int:
+    """Insert (or replace) one run's matched odds; returns odds rows written."""
+    stats = payload.get("stats", {}) or {}
+    last_updated = payload.get("last_updated")
+    conn.execute(
+        """
+        INSERT INTO runs (run_id, run_ts, last_updated, total_scraped, matched_events,
+                          scrape_time_seconds, fast_mode, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(run_id) DO UPDATE SET
+            run_ts = excluded.run_ts, last_updated = excluded.last_updated,
+            total_scraped = excluded.total_scraped, matched_events = excluded.matched_events,
+            scrape_time_seconds = excluded.scrape_time_seconds, fast_mode = excluded.fast_mode,
+            created_at = excluded.created_at
+        """,
+        (
+            run_id,
+            iso_to_epoch(last_updated or run_id),
+            last_updated,
+            stats.get("total_scraped"),
+            stats.get("matched_events"),
+            stats.get("scrape_time_seconds"),
+            fast_mode,
+            created_at or datetime.now(timezone.utc).isoformat(),
+        ),
+    )
+    run_pk = conn.execute("SELECT run_pk FROM runs WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+    matches: List[Tuple[str, Mapping]] = [(fixture_id(m), m) for m in payload.get("matches", []) or []]
+    leagues = _intern(conn, "leagues", "league_pk", (m.get("league", "") for _, m in matches))
+    teams = _intern(
+        conn, "teams", "team_pk",
+        [m.get("home_team", "") for _, m in matches] + [m.get("away_team", "") for _, m in matches],
+    )
+    bookmakers = _intern(
+        conn, "bookmakers", "bookmaker_pk",
+        (odds.get("bookmaker", "") for _, m in matches for odds in m.get("odds", []) or []),
+    )
+    conn.executemany(
+        """
+        INSERT INTO fixtures (match_id, start_time, league_pk, home_pk, away_pk) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(match_id) DO UPDATE SET
+            start_time = excluded.start_time, league_pk = excluded.league_pk,
+            home_pk = excluded.home_pk, away_pk = excluded.away_pk
+        """,
+        [
+            (
+                match_id,
+                int(m.get("start_time") or 0),
+                leagues.get(m.get("league", "")),
+                teams.get(m.get("home_team", "")),
+                teams.get(m.get("away_team", "")),
+            )
+            for match_id, m in matches
+        ],
+    )
+    match_ids = list({match_id for match_id, _ in matches})
+    fixtures = {}
+    for i in range(0, len(match_ids), _IN_CHUNK):
+        chunk = match_ids[i:i + _IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        fixtures.update(conn.execute(
+            f"SELECT match_id, fixture_pk FROM fixtures WHERE match_id IN ({marks})", chunk
+        ).fetchall())
+
+    odds_rows = [
+        (
+            run_pk,
+            fixtures[match_id],
+            bookmakers[odds.get("bookmaker", "")],
+            odds.get("home_odds"),
+            odds.get("draw_odds"),
+            odds.get("away_odds"),
+            odds.get("event_id"),
+            odds.get("event_league_id") or odds.get("league_id"),
+        )
+        for match_id, m in matches for odds in m.get("odds", []) or []
+    ]
+    if odds_rows:
+        conn.executemany(
+            "INSERT OR REPLACE INTO odds (run_pk, fixture_pk, bookmaker_pk, home_odds, draw_odds, away_odds,"
+            " event_id, event_league_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            odds_rows,
+        )
+    materialize_run(conn, run_pk)
+    return len(odds_rows)
+
+
+def _price(value) -> Optional[float]:
+    """Usable price or None (missing, unparsable, NaN or 0)."""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    if price != price or price == 0:
+        return None
+    return price
+
+
+def _log_distance(a: float, b: float, med_a: float, med_b: float) -> float:
+    return abs(math.log(a / med_a)) + abs(math.log(b / med_b))
+
+
+def best_lines_for_run(lines: Iterable[Tuple], bookmaker_names: Mapping[int, str]) -> List[Tuple]:
+    """
+    best_lines rows (without run_pk) from one run's stored odds rows
+    (fixture_pk, bookmaker_pk, home, draw, away, event_id, event_league_id).
+    A price tie goes to the lower-overround line, then the bookmaker name
+    first in order, as in arb_lab.build_best_lines.
+    """
+    by_fixture: Dict[int, List[list]] = {}
+    for fixture_pk, bookmaker_pk, home, draw, away, event_id, league_id in lines:
+        prices = [_price(home), _price(draw), _price(away)]
+        implied = None if None in prices else 1 / prices[0] + 1 / prices[1] + 1 / prices[2]
+        by_fixture.setdefault(fixture_pk, []).append([implied, bookmaker_pk, *prices, event_id, league_id])
+
+    best_rows = []
+    for fixture_pk, group in by_fixture.items():
+        homes = [line[2] for line in group if line[2] is not None]
+        aways = [line[4] for line in group if line[4] is not None]
+        med_home = statistics.median(homes) if homes else None
+        med_away = statistics.median(aways) if aways else None
+        if med_home and med_away and med_home > 0 and med_away > 0:
+            for line in group:
+                home, away = line[2], line[4]
+                if home is None or away is None or home <= 0 or away <= 0:
+                    continue
+                if _log_distance(away, home, med_home, med_away) + 1e-9 < _log_distance(home, away, med_home, med_away):
+                    line[2], line[4] = away, home
+        group.sort(key=lambda line: (line[0] is None, line[0] or 0.0, bookmaker_names.get(line[1], '')))
+        row = [fixture_pk, len(group)]
+        for col in (2, 3, 4):
+            best = None
+            for line in group:
+                if line[col] is not None and line[col] > 0 and (best is None or line[col] > best[col]):
+                    best = line
+            row.extend((best[col], best[1], best[5], best[6]) if best else (None, None, None, None))
+        best_rows.append(tuple(row))
+    return best_rows
+
+
+_COMPLETE = "bl.home_odds IS NOT NULL AND bl.draw_odds IS NOT NULL AND bl.away_odds IS NOT NULL"
+
+
+def _open_close_rows(lines: Iterable[Tuple]) -> List[Tuple]:
+    """line_open_close rows from (fixture_pk, run_pk, run_ts, start_time) sorted by fixture, run_ts."""
+    rows = []
+    current = None
+    for fixture_pk, run_pk, run_ts, start_time in lines:
+        if current is None or current[0] != fixture_pk:
+            if current is not None:
+                rows.append(tuple(current[:-1]))
+            # fixture, open run, open ts, close run, close ts, last ts, count, start_time
+            current = [fixture_pk, run_pk, run_ts, run_pk, run_ts, run_ts, 1, start_time]
+            continue
+        if run_ts <= start_time or current[4] > start_time:
+            current[3], current[4] = run_pk, run_ts
+        current[5] = run_ts
+        current[6] += 1
+    if current is not None:
+        rows.append(tuple(current[:-1]))
+    return rows
+
+
+def rebuild_open_close(conn: sqlite3.Connection, fixture_pks: Optional[Iterable[int]] = None) -> int:
+    """Recompute line_open_close for some fixtures (all with None) from best_lines."""
+    query = (
+        "SELECT bl.fixture_pk, r.run_pk, r.run_ts, f.start_time"
+        " FROM fixtures f CROSS JOIN best_lines bl ON bl.fixture_pk = f.fixture_pk"
+        " JOIN runs r ON r.run_pk = bl.run_pk"
+        f" WHERE {_COMPLETE}"
+    )
+    order = " ORDER BY bl.fixture_pk, r.run_ts, r.run_pk"
+    if fixture_pks is None:
+        conn.execute("DELETE FROM line_open_close")
+        rows = _open_close_rows(conn.execute(query + order))
+    else:
+        fixture_pks = list(set(fixture_pks))
+        rows = []
+        for i in range(0, len(fixture_pks), _IN_CHUNK):
+            chunk = fixture_pks[i:i + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            conn.execute(f"DELETE FROM line_open_close WHERE fixture_pk IN ({marks})", chunk)
+            rows.extend(_open_close_rows(conn.execute(f"{query} AND f.fixture_pk IN ({marks}){order}", chunk)))
+    conn.executemany("INSERT INTO line_open_close VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def _advance_open_close(conn: sqlite3.Connection, run_pk: int, complete: List[int]) -> None:
+    """Fold a newly materialized run into line_open_close."""
+    run_ts = conn.execute("SELECT run_ts FROM runs WHERE run_pk = ?", (run_pk,)).fetchone()[0]
+    recompute = []
+    updates = []
+    inserts = []
+    for i in range(0, len(complete), _IN_CHUNK):
+        chunk = complete[i:i + _IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        known = {
+            row[0]: row[1:]
+            for row in conn.execute(
+                "SELECT f.fixture_pk, f.start_time, oc.close_ts, oc.last_ts FROM fixtures f"
+                " LEFT JOIN line_open_close oc ON oc.fixture_pk = f.fixture_pk"
+                f" WHERE f.fixture_pk IN ({marks})",
+                chunk,
+            )
+        }
+        for fixture_pk in chunk:
+            start_time, close_ts, last_ts = known[fixture_pk]
+            if last_ts is None:
+                inserts.append((fixture_pk, run_pk, run_ts, run_pk, run_ts, run_ts, 1))
+            elif run_ts <= last_ts:
+                recompute.append(fixture_pk)  # an older run written late
+            elif run_ts <= start_time or close_ts > start_time:
+                updates.append((run_pk, run_ts, run_ts, fixture_pk))
+            else:
+                updates.append((None, None, run_ts, fixture_pk))
+    conn.executemany("INSERT INTO line_open_close VALUES (?, ?, ?, ?, ?, ?, ?)", inserts)
+    conn.executemany(
+        "UPDATE line_open_close SET close_run_pk = COALESCE(?, close_run_pk), close_ts = COALESCE(?, close_ts),"
+        " last_ts = ?, snapshot_count = snapshot_count + 1 WHERE fixture_pk = ?",
+        updates,
+    )
+    if recompute:
+        rebuild_open_close(conn, recompute)
+
+
+def materialize_run(conn: sqlite3.Connection, run_pk: int, open_close: bool = True) -> int:
+    """
+    Rebuild one run's best_lines and arbs rows from its odds and, unless
+    open_close is False, its fixtures' line_open_close; returns arbs written.
+    """
+    lines = conn.execute(
+        "SELECT fixture_pk, bookmaker_pk, home_odds, draw_odds, away_odds, event_id, event_league_id"
+        " FROM odds WHERE run_pk = ?",
+        (run_pk,),
+    ).fetchall()
+    best_rows = best_lines_for_run(lines, dict(conn.execute("SELECT bookmaker_pk, name FROM bookmakers")))
+    arb_rows = []
+    for row in best_rows:
+        home, draw, away = row[2], row[6], row[10]
+        if home is None or draw is None or away is None:
+            continue
+        implied = 1 / home + 1 / draw + 1 / away
+        if implied > 0 and 1 / implied - 1 >= 0:
+            arb_rows.append((run_pk, row[0], implied, 1 / implied - 1))
+
+    previous = [row[0] for row in conn.execute("SELECT fixture_pk FROM best_lines WHERE run_pk = ?", (run_pk,))]
+    conn.execute("DELETE FROM best_lines WHERE run_pk = ?", (run_pk,))
+    conn.execute("DELETE FROM arbs WHERE run_pk = ?", (run_pk,))
+    conn.executemany(
+        f"INSERT INTO best_lines VALUES ({','.join('?' * 15)})",
+        [(run_pk, *row) for row in best_rows],
+    )
+    conn.executemany("INSERT INTO arbs VALUES (?, ?, ?, ?)", arb_rows)
+    conn.execute("UPDATE runs SET best_lines_version = ? WHERE run_pk = ?", (BEST_LINES_VERSION, run_pk))
+    if open_close:
+        if previous:
+            rebuild_open_close(conn, previous + [row[0] for row in best_rows])
+        else:
+            complete = [row[0] for row in best_rows if None not in (row[2], row[6], row[10])]
+            _advance_open_close(conn, run_pk, complete)
+    return len(arb_rows)
+
+
+def materialize_stale_runs(
+    conn: sqlite3.Connection,
+    run_start_ts: Optional[int] = None,
+    run_end_ts: Optional[int] = None,
+    rebuild: bool = False,
+    commit_every: int = 100,
+) -> Dict[str, int]:
+    """
+    Materialize runs in a window that lack current best_lines (every run with
+    rebuild). Compacted runs no longer hold every line, so they are skipped.
+    """
+    if rebuild:
+        clauses, params = _run_window(run_start_ts, run_end_ts)
+        query = "SELECT run_pk FROM runs" + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY run_ts"
+    else:
+        query, params = stale_best_lines_query(run_start_ts, run_end_ts)
+    query = query.replace("SELECT run_pk", "SELECT run_pk, compacted", 1)
+    counts = {"runs": 0, "arbs": 0, "skipped_compacted": 0}
+    for run_pk, compacted in conn.execute(query, params).fetchall():
+        if compacted:
+            counts["skipped_compacted"] += 1
+            continue
+        counts["arbs"] += materialize_run(conn, run_pk, open_close=False)
+        counts["runs"] += 1
+        if counts["runs"] % commit_every == 0:
+            conn.commit()
+    if counts["runs"]:
+        rebuild_open_close(conn)
+    conn.commit()
+    return counts
+
+
+def _run_window(run_start_ts: Optional[int], run_end_ts: Optional[int]) -> Tuple[List[str], List]:
+    clauses, params = [], []
+    if run_start_ts is not None:
+        clauses.append("run_ts >= ?")
+        params.append(run_start_ts)
+    if run_end_ts is not None:
+        clauses.append("run_ts <= ?")
+        params.append(run_end_ts)
+    return clauses, params
+
+
+def stale_best_lines_query(run_start_ts: Optional[int] = None, run_end_ts: Optional[int] = None) -> Tuple[str, List]:
+    """SQL and params for the run_pks in a window not materialized with BEST_LINES_VERSION, oldest first."""
+    clauses, params = _run_window(run_start_ts, run_end_ts)
+    clauses.insert(0, "best_lines_version < ?")
+    params.insert(0, BEST_LINES_VERSION)
+    return "SELECT run_pk FROM runs WHERE " + " AND ".join(clauses) + " ORDER BY run_ts", params
+
+
+MATCH_INFO_COLUMNS = """
+    r.run_id,
+    f.match_id,
+    l.name AS league,
+    f.start_time,
+    h.name AS home_team,
+    a.name AS away_team,
+    r.last_updated
+"""
+
+BEST_LINES_COLUMNS = MATCH_INFO_COLUMNS + """,
+    bh.name AS best_home_bookie,
+    bl.home_odds AS best_home_odds,
+    bl.home_event_id AS best_home_event_id,
+    bl.home_league_id AS best_home_league_id,
+    bd.name AS best_draw_bookie,
+    bl.draw_odds AS best_draw_odds,
+    bl.draw_event_id AS best_draw_event_id,
+    bl.draw_league_id AS best_draw_league_id,
+    ba.name AS best_away_bookie,
+    bl.away_odds AS best_away_odds,
+    bl.away_event_id AS best_away_event_id,
+    bl.away_league_id AS best_away_league_id,
+    bl.bookie_count
+"""
+
+
+_BEST_LINES_DIMENSIONS = (
+    " LEFT JOIN leagues l ON l.league_pk = f.league_pk"
+    " LEFT JOIN teams h ON h.team_pk = f.home_pk"
+    " LEFT JOIN teams a ON a.team_pk = f.away_pk"
+    " LEFT JOIN bookmakers bh ON bh.bookmaker_pk = bl.home_bookmaker_pk"
+    " LEFT JOIN bookmakers bd ON bd.bookmaker_pk = bl.draw_bookmaker_pk"
+    " LEFT JOIN bookmakers ba ON ba.bookmaker_pk = bl.away_bookmaker_pk"
+)
+
+
+def open_close_query(
+    run_start_ts: Optional[int] = None,
+    run_end_ts: Optional[int] = None,
+    match_start_ts: Optional[int] = None,
+    match_end_ts: Optional[int] = None,
+) -> Tuple[str, List]:
+    """
+    SQL and params for the opening and closing best lines of fixtures
+    observed in a run window: BEST_LINES_COLUMNS plus is_open, is_close and
+    snapshot_count, one row per distinct run (two unless open is close).
+    """
+    clauses, params = [], []
+    if run_end_ts is not None:
+        clauses.append("oc.open_ts <= ?")
+        params.append(run_end_ts)
+    if run_start_ts is not None:
+        clauses.append("oc.last_ts >= ?")
+        params.append(run_start_ts)
+    if match_start_ts is not None:
+        clauses.append("f.start_time >= ?")
+        params.append(match_start_ts)
+    if match_end_ts is not None:
+        clauses.append("f.start_time <= ?")
+        params.append(match_end_ts)
+    query = (
+        "SELECT " + BEST_LINES_COLUMNS + ", bl.run_pk = oc.open_run_pk AS is_open,"
+        " bl.run_pk = oc.close_run_pk AS is_close, oc.snapshot_count"
+        " FROM line_open_close oc"
+        " CROSS JOIN best_lines bl ON bl.fixture_pk = oc.fixture_pk AND bl.run_pk IN (oc.open_run_pk, oc.close_run_pk)"
+        " JOIN runs r ON r.run_pk = bl.run_pk"
+        " JOIN fixtures f ON f.fixture_pk = oc.fixture_pk"
+        + _BEST_LINES_DIMENSIONS
+    )
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query, params
+
+
+def best_lines_query(
+    run_start_ts: Optional[int] = None,
+    run_end_ts: Optional[int] = None,
+    match_start_ts: Optional[int] = None,
+    match_end_ts: Optional[int] = None,
+    min_roi: Optional[float] = None,
+    columns: str = BEST_LINES_COLUMNS,
+) -> Tuple[str, List]:
+    """
+    SQL and params for materialized best lines, one row per (run, fixture).
+    With min_roi (>= 0) only lines in the arbs table with at least that ROI,
+    plus their implied_sum and arb_roi. MATCH_INFO_COLUMNS selects just the
+    fixtures.
+    """
+    clauses, params = _run_window(run_start_ts, run_end_ts)
+    clauses = ["r." + clause for clause in clauses]
+    if match_start_ts is not None:
+        clauses.append("f.start_time >= ?")
+        params.append(match_start_ts)
+    if match_end_ts is not None:
+        clauses.append("f.start_time <= ?")
+        params.append(match_end_ts)
+    by_run = run_start_ts is not None or run_end_ts is not None
+    if (match_start_ts is not None or match_end_ts is not None) and not by_run:
+        joins = (
+            " FROM fixtures f CROSS JOIN best_lines bl ON bl.fixture_pk = f.fixture_pk"
+            " JOIN runs r ON r.run_pk = bl.run_pk"
+        )
+    else:
+        joins = (
+            " FROM runs r CROSS JOIN best_lines bl ON bl.run_pk = r.run_pk"
+            " JOIN fixtures f ON f.fixture_pk = bl.fixture_pk"
+        )
+    if min_roi is not None:
+        columns += ", x.implied_sum, x.arb_roi"
+        joins += " JOIN arbs x ON x.run_pk = bl.run_pk AND x.fixture_pk = bl.fixture_pk"
+        clauses.append("x.arb_roi >= ?")
+        params.append(max(0.0, float(min_roi)))
+    query = "SELECT " + columns + joins + _BEST_LINES_DIMENSIONS
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query + " ORDER BY r.run_ts, f.match_id", params
+
+
+def run_ts_for(conn: sqlite3.Connection, run_id: str) -> int:
+    """run_ts of a stored run, or its run_id read as an ISO time when it isn't stored."""
+    row = conn.execute("SELECT run_ts FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    return row[0] if row else iso_to_epoch(run_id)
+
+
+def runs_query(run_start_ts: Optional[int] = None, run_end_ts: Optional[int] = None) -> Tuple[str, List]:
+    """SQL and params for every run in a run-time window, oldest first."""
+    clauses, params = _run_window(run_start_ts, run_end_ts)
+    query = "SELECT run_id, last_updated, run_ts, compacted FROM runs"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query + " ORDER BY run_ts", params
+
+
+def compacted_runs_query(run_start_ts: Optional[int] = None, run_end_ts: Optional[int] = None) -> Tuple[str, List]:
+    """SQL and params for the compacted runs in a run-time window, oldest first."""
+    clauses, params = _run_window(run_start_ts, run_end_ts)
+    query = "SELECT run_id, last_updated, run_ts FROM runs WHERE " + " AND ".join(["compacted = 1"] + clauses)
+    return query + " ORDER BY run_ts", params
+
+
+def fixture_lines_query(
+    first_ts: int,
+    last_ts: int,
+    match_start_ts: Optional[int] = None,
+    match_end_ts: Optional[int] = None,
+) -> Tuple[str, List]:
+    """
+    Every stored line (all runs, with r.run_ts) of the fixtures that can be
+    open between first_ts and last_ts: first seen by last_ts and kicking off
+    no earlier than LIVE_LINE_SECONDS before first_ts.
+    """
+    clauses = [
+        "f.start_time >= ?",
+        "EXISTS (SELECT 1 FROM odds o2 JOIN runs r2 ON r2.run_pk = o2.run_pk"
+        " WHERE o2.fixture_pk = f.fixture_pk AND r2.run_ts <= ?)",
+    ]
+    params: List = [max(first_ts - LIVE_LINE_SECONDS, match_start_ts or 0), last_ts]
+    if match_end_ts is not None:
+        clauses.append("f.start_time <= ?")
+        params.append(match_end_ts)
+    query = (
+        "SELECT " + SNAPSHOT_COLUMNS + ", r.run_ts" + _DRIVE_BY_KICKOFF + _DIMENSIONS
+        + " WHERE " + " AND ".join(clauses)
+    )
+    return query, params
+
+
+def snapshot_query(
+    run_start_ts: Optional[int] = None,
+    run_end_ts: Optional[int] = None,
+    match_start_ts: Optional[int] = None,
+    match_end_ts: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Tuple[str, List]:
+    """SQL and params for load_snapshot_rows: one row per (run, fixture, bookmaker)."""
+    clauses = []
+    params: List = []
+    if run_start_ts is not None:
+        clauses.append("r.run_ts >= ?")
+        params.append(run_start_ts)
+    if run_end_ts is not None:
+        clauses.append("r.run_ts <= ?")
+        params.append(run_end_ts)
+    if match_start_ts is not None:
+        clauses.append("f.start_time >= ?")
+        params.append(match_start_ts)
+    if match_end_ts is not None:
+        clauses.append("f.start_time <= ?")
+        params.append(match_end_ts)
+    by_run = run_start_ts is not None or run_end_ts is not None
+    by_kickoff = match_start_ts is not None or match_end_ts is not None
+    if by_run and by_kickoff:
+        joins = _DRIVE_BY_BOTH
+    elif by_kickoff:
+        joins = _DRIVE_BY_KICKOFF
+    else:
+        joins = _DRIVE_BY_RUN
+    query = "SELECT " + SNAPSHOT_COLUMNS + joins + _DIMENSIONS
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY r.run_ts DESC, f.start_time DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    return query, params
@@ -0,0 +1,100 @@
+"""
+JSON codec for snapshot and history files.
+
+Uses orjson when it is installed and falls back to the stdlib json module,
+so every reader and writer of odds_data.json, raw_scraped_data.json and
+the *.jsonl history goes through one place:
+ - output is compact UTF-8 by default; pretty=True (or JSON_PRETTY=1)
+   writes the 2-space indented form the files used to have
+ - JSONL is read and appended one record per line, never as a whole file
+ - non-string dict keys are written as strings, as json.dumps does
+ - documents orjson refuses (NaN/Infinity written by older runs, integers
+   past 64 bits) are retried with the stdlib codec
+
+JSONDecodeError is json.JSONDecodeError; orjson's error subclasses it.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+PRETTY = os.getenv("JSON_PRETTY", "").strip().lower() in ("1", "true", "yes", "on")
+
+JSONDecodeError = json.JSONDecodeError
+
+if orjson:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _PRETTY_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> bytes:
+    """Encode obj as UTF-8 JSON bytes."""
+    pretty = PRETTY if pretty is None else pretty
+    if orjson:
+        try:
+            return orjson.dumps(obj, default=default, option=_PRETTY_OPTIONS if pretty else _OPTIONS)
+        except TypeError:
+            pass  # fall through so unsupported values fail (or succeed) exactly as with json
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=default)
+    return text.encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def dump(obj: Any, path: str, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> int:
+    """Write obj to path; returns bytes written."""
+    payload = dumps(obj, pretty=pretty, default=default)
+    with open(path, "wb") as handle:
+        handle.write(payload)
+    return len(payload)
+
+
+def load(source: Union[str, Any]) -> Any:
+    """Decode a JSON document from a path or a binary/text file object."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            return loads(handle.read())
+    return loads(source.read())
+
+
+def iter_jsonl(path: str, skip_invalid: bool = False) -> Iterator[Dict]:
+    """Yield one record per non-blank line without reading the whole file."""
+    with open(path, "rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except JSONDecodeError:
+                if not skip_invalid:
+                    raise
+
+
+def append_jsonl(path: str, records: Union[Dict, Iterable[Dict]], default: Optional[Callable] = None) -> None:
+    """Append one record (a dict) or several as compact JSON lines."""
+    if isinstance(records, dict):
+        records = (records,)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as handle:
+        for record in records:
+            handle.write(dumps(record, pretty=False, default=default) + b"\n")
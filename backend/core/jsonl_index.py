@@ -0,0 +1,209 @@
+"""
+Byte-offset sidecar index for snapshot history JSONL files.
+
+odds_history.jsonl holds one (large) matched snapshot per line. Next to it,
+odds_history.jsonl.idx holds one small JSON line per snapshot:
+
+    {"run_id": ..., "last_updated": ..., "offset": <byte offset>, "length": <bytes>}
+
+so readers can pick runs by time from the index and seek straight to their
+lines instead of decoding the whole history. append_indexed() writes the
+snapshot and its index entry together. The index catches up by itself:
+lines appended without it (older writers, other machines) are indexed on
+the next read or append, and an index that no longer lines up with the
+file (truncated, rewritten) is rebuilt.
+
+Readers and writers do not lock each other out: a reader indexing the tail
+while a writer appends can record the same line twice, possibly after later
+entries. Entries are de-duplicated by offset whenever the index is read.
+"""
+
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from . import jsoncodec
+
+INDEX_SUFFIX = ".idx"
+_TAIL_BYTES = 4096
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def entry_for(record: Dict, offset: int, length: int) -> Dict:
+    """Index entry for record written at offset."""
+    entry = {
+        "run_id": record.get("run_id") or record.get("last_updated"),
+        "last_updated": record.get("last_updated"),
+        "offset": offset,
+        "length": length,
+    }
+    if record.get("compacted"):
+        entry["compacted"] = True
+        start_max = _start_max(record)
+        if start_max is not None:
+            entry["start_max"] = start_max
+    return entry
+
+
+def _start_max(record: Dict) -> Optional[int]:
+    starts = []
+    for match in record.get("matches", []) or []:
+        try:
+            starts.append(int(float(match.get("start_time") or 0)))
+        except (TypeError, ValueError):
+            continue
+    return max(starts) if starts else None
+
+
+def _scan(path: str, start: int = 0) -> List[Dict]:
+    """Index entries for every valid line from byte offset start."""
+    entries = []
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        offset = start
+        for line in handle:
+            if line.strip():
+                try:
+                    record = jsoncodec.loads(line)
+                except jsoncodec.JSONDecodeError:
+                    record = None
+                if isinstance(record, dict):
+                    entries.append(entry_for(record, offset, len(line)))
+            offset += len(line)
+    return entries
+
+
+def _unique_entries(entries: Iterable[Dict]) -> List[Dict]:
+    """Entries in file order, one per offset."""
+    by_offset: Dict[int, Dict] = {}
+    for entry in entries:
+        by_offset.setdefault(entry["offset"], entry)
+    return [by_offset[offset] for offset in sorted(by_offset)]
+
+
+def _read_index(path: str) -> Optional[List[Dict]]:
+    """Index entries, or None when the index is missing or damaged."""
+    idx = index_path(path)
+    if not os.path.exists(idx):
+        return None
+    try:
+        return _unique_entries(jsoncodec.iter_jsonl(idx))
+    except (jsoncodec.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def _ends_line(path: str, end: int) -> bool:
+    if end == 0:
+        return True
+    with open(path, "rb") as handle:
+        handle.seek(end - 1)
+        return handle.read(1) == b"\n"
+
+
+def _write_index(path: str, entries: List[Dict], append: bool) -> None:
+    idx = index_path(path)
+    try:
+        if not append and os.path.exists(idx):
+            os.remove(idx)
+        if entries or not append:
+            jsoncodec.append_jsonl(idx, entries)
+    except OSError:
+        pass  # read-only history: keep working from the in-memory index
+
+
+def write_index(path: str, entries: List[Dict]) -> None:
+    """Replace the index of a rewritten history file."""
+    _write_index(path, entries, append=False)
+
+
+def ensure_index(path: str) -> List[Dict]:
+    """Up-to-date index entries for path, indexing any unindexed tail."""
+    if not os.path.exists(path):
+        return []
+    size = os.path.getsize(path)
+    entries = _read_index(path)
+    covered = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+    if entries is None or covered > size or not _ends_line(path, covered):
+        entries = _scan(path)
+        _write_index(path, entries, append=False)
+        return entries
+    if covered < size:
+        tail = _scan(path, covered)
+        _write_index(path, tail, append=True)
+        entries.extend(tail)
+    return entries
+
+
+def _last_indexed_end(path: str) -> Optional[int]:
+    """End offset of the furthest indexed line, reading only the index tail."""
+    idx = index_path(path)
+    if not os.path.exists(idx):
+        return None
+    with open(idx, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        if size == 0:
+            return 0
+        start = max(0, size - _TAIL_BYTES)
+        handle.seek(start)
+        tail = handle.read()
+    if not tail.endswith(b"\n"):
+        return None
+    lines = tail.rstrip(b"\n").split(b"\n")
+    if start:
+        lines = lines[1:]  # the first line may be cut off
+    # A late duplicate can sit after the newest entry, so take the furthest end
+    try:
+        return max(
+            (entry["offset"] + entry["length"] for entry in map(jsoncodec.loads, lines)),
+            default=None,
+        )
+    except (jsoncodec.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def append_indexed(path: str, record: Dict, default: Optional[Callable] = None) -> Dict:
+    """Append record as a JSON line and index it; returns the index entry."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    complete = _ends_line(path, size)
+    if _last_indexed_end(path) != size or not complete:
+        ensure_index(path)
+    payload = jsoncodec.dumps(record, pretty=False, default=default) + b"\n"
+    with open(path, "ab") as handle:
+        if not complete:
+            handle.write(b"\n")  # a crashed writer left a partial line
+        offset = handle.tell()
+        handle.write(payload)
+    entry = entry_for(record, offset, len(payload))
+    _write_index(path, [entry], append=True)
+    return entry
+
+
+def select(entries: Iterable[Dict], start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+    """Entries whose last_updated lies in [start, end] (ISO strings; undated runs always match)."""
+    picked = []
+    for entry in entries:
+        last_updated = entry.get("last_updated")
+        if start and last_updated and last_updated < start:
+            continue
+        if end and last_updated and last_updated > end:
+            continue
+        picked.append(entry)
+    return picked
+
+
+def read_records(path: str, entries: Iterable[Dict]) -> Iterator[Dict]:
+    """Decode only the indexed lines, in file order."""
+    with open(path, "rb") as handle:
+        for entry in sorted(entries, key=lambda e: e["offset"]):
+            handle.seek(entry["offset"])
+            yield jsoncodec.loads(handle.read(entry["length"]))
+
+
+def iter_range(path: str, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict]:
+    return read_records(path, select(ensure_index(path), start, end))
@@ -0,0 +1,157 @@
+"""
+League membership index over normalized team names.
+
+Answers "which known leagues contain this team" in a single pass:
+ - exact hash lookup of the normalized name
+ - an Aho-Corasick automaton over every known team name, for known names
+   that appear inside the scraped name ("west ham" in "west ham women")
+ - one substring search over a joined blob of known names, for scraped
+   names that appear inside a known name ("heidenheim" in "1 heidenheim 1846")
+
+The index is built once from the league -> team-set reference data and
+results are memoized per raw team name (the most recent cache_size names),
+so lookup cost stays flat as the reference data grows to hundreds of leagues.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton mapping each pattern to a set of labels."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+        pending: List[Set[str]] = [set()]
+        for pattern, label in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    pending.append(set())
+                node = nxt
+            pending[node].add(label)
+
+        # Breadth-first fail links; outputs inherit from their fail node.
+        queue = deque()
+        for nxt in self._goto[0].values():
+            queue.append(nxt)
+        self._out[0] = frozenset(pending[0])
+        while queue:
+            node = queue.popleft()
+            self._out[node] = frozenset(pending[node] | self._out[self._fail[node]])
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                queue.append(nxt)
+
+    def search(self, text: str) -> Set[str]:
+        """Return the labels of every pattern occurring in text."""
+        found: Set[str] = set()
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class LeagueMembershipIndex:
+    """Team -> leagues lookup built once from league reference data."""
+
+    # A scrape cycle sees a few thousand distinct team names
+    cache_size = 8192
+
+    def __init__(
+        self,
+        league_teams: Dict[str, Set[str]],
+        normalizer: Optional[Callable[[str], str]] = None,
+    ):
+        self.normalizer = normalizer or (lambda name: (name or "").lower().strip())
+        self.league_order: Dict[str, int] = {league: i for i, league in enumerate(league_teams)}
+        self.all_leagues: FrozenSet[str] = frozenset(l for l, teams in league_teams.items() if teams)
+
+        exact: Dict[str, Set[str]] = {}
+        for league, teams in league_teams.items():
+            for team in teams:
+                if team:
+                    exact.setdefault(team, set()).add(league)
+        self.exact: Dict[str, FrozenSet[str]] = {team: frozenset(l) for team, l in exact.items()}
+
+        self.automaton = AhoCorasick(
+            (team, league) for team, leagues in self.exact.items() for league in leagues
+        )
+
+        # Known names joined with a separator that never survives normalization,
+        # plus start offsets for mapping a hit back to its team.
+        self._names = sorted(self.exact)
+        self._offsets: List[int] = []
+        pos = 0
+        for name in self._names:
+            self._offsets.append(pos)
+            pos += len(name) + 1
+        self._blob = "\n".join(self._names)
+        self._lookup = lru_cache(maxsize=self.cache_size)(self._leagues_for_raw)
+
+    def _leagues_containing(self, normalized: str) -> Set[str]:
+        """Leagues whose known team names contain normalized as a substring."""
+        found: Set[str] = set()
+        blob = self._blob
+        start = blob.find(normalized)
+        while start != -1:
+            idx = bisect_right(self._offsets, start) - 1
+            name = self._names[idx]
+            found.update(self.exact[name])
+            # Skip to the next known name; one hit per name is enough.
+            start = blob.find(normalized, self._offsets[idx] + len(name) + 1)
+        return found
+
+    def leagues_for_normalized(self, normalized: str) -> FrozenSet[str]:
+        if not normalized:
+            # An empty name is a substring of every known team.
+            return self.all_leagues
+        hit = self.exact.get(normalized)
+        leagues = set(hit) if hit else set()
+        if len(leagues) < len(self.all_leagues):
+            leagues |= self.automaton.search(normalized)
+        if len(leagues) < len(self.all_leagues) and "\n" not in normalized:
+            leagues |= self._leagues_containing(normalized)
+        return frozenset(leagues)
+
+    def _leagues_for_raw(self, team_name: str) -> FrozenSet[str]:
+        return self.leagues_for_normalized(self.normalizer(team_name))
+
+    def leagues_for_team(self, team_name: str) -> FrozenSet[str]:
+        """All leagues with a known team equal to, inside, or containing team_name."""
+        return self._lookup(team_name)
+
+    def exact_leagues(self, team_name: str) -> FrozenSet[str]:
+        return self.exact.get(self.normalizer(team_name), frozenset())
+
+    def contains(self, team_name: str, league: str) -> bool:
+        return league in self.leagues_for_team(team_name)
+
+    def infer_league(self, home_team: str, away_team: str) -> str:
+        """First league (in reference order) listing both teams exactly, else ''."""
+        shared = self.exact_leagues(home_team) & self.exact_leagues(away_team)
+        if not shared:
+            return ""
+        return min(shared, key=self.league_order.__getitem__)
@@ -0,0 +1,352 @@
+"""
+Compressed raw-scrape archive.
+
+SAVE_RAW_HISTORY used to append the whole all_matches dict to
+raw_scraped_history.jsonl every run: megabytes of mostly unchanged text.
+The archive stores the same data as one append-only segment per bookmaker
+per day:
+
+    <root>/<YYYY-MM-DD>/<bookmaker-slug>.seg   length-prefixed frames
+    <root>/<YYYY-MM-DD>/index.jsonl            run/frame offsets and sizes
+    <root>/dict-<id>.<codec>                   shared compression dictionaries
+
+Each frame holds one bookmaker's fixtures for one run, compressed on its own
+with a dictionary trained on earlier payloads (zstd when the zstandard
+package is installed, zlib's preset dictionary otherwise). Frames are
+deltas against the bookmaker's previous run: only new or changed fixtures
+are stored, plus the fixture order when it changed. Every KEYFRAME_EVERY
+runs, and at the start of each day, a full keyframe is written, so loading
+any run by id reads one keyframe and a bounded number of deltas.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from . import jsoncodec
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib with a preset dictionary is used instead
+    zstandard = None
+
+KEYFRAME_EVERY = int(os.getenv("RAW_ARCHIVE_KEYFRAME_EVERY", "30"))
+COMPRESSION_LEVEL = int(os.getenv("RAW_ARCHIVE_LEVEL", "9"))
+DICT_SIZE = 64 * 1024
+ZLIB_DICT_SIZE = 32 * 1024  # deflate only looks back 32 KiB
+INDEX_FILE = "index.jsonl"
+_FRAME_HEADER = struct.Struct("<I")
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard else "zlib"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "unknown"
+
+
+def run_day(run_id: str) -> str:
+    """Archive day for a run id (run ids are ISO timestamps)."""
+    try:
+        return datetime.fromisoformat(run_id.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        return datetime.now().strftime("%Y-%m-%d")
+
+
+def fixture_keys(fixtures: List[Mapping]) -> List[str]:
+    """Stable per-run keys: event id, else teams + kickoff; repeats get a suffix."""
+    keys = []
+    seen: Dict[str, int] = {}
+    for fixture in fixtures:
+        event_id = fixture.get("event_id")
+        if event_id not in (None, ""):
+            key = str(event_id)
+        else:
+            key = f"{fixture.get('home_team', '')}|{fixture.get('away_team', '')}|{fixture.get('start_time', '')}"
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(key if count == 0 else f"{key}#{count}")
+    return keys
+
+
+class Dictionary:
+    """A trained compression dictionary and its codec."""
+
+    def __init__(self, codec: str, data: bytes):
+        self.codec = codec
+        self.data = data
+        self.id = hashlib.sha1(data).hexdigest()[:10]
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("This archive was written with zstd; install the zstandard package to read it")
+            self._zdict = zstandard.ZstdCompressionDict(data)
+
+    @classmethod
+    def train(cls, samples: List[bytes], codec: Optional[str] = None) -> "Dictionary":
+        codec = codec or default_codec()
+        if codec == "zstd":
+            try:
+                trained = zstandard.train_dictionary(DICT_SIZE, samples)
+                return cls(codec, trained.as_bytes())
+            except zstandard.ZstdError:
+                pass  # too few samples to train; use the raw-content form below
+        # Preset dictionary: recurring fixture text, most common shapes last
+        # (deflate favours the closest matches)
+        budget = ZLIB_DICT_SIZE if codec == "zlib" else DICT_SIZE
+        step = max(1, len(samples) // 400)
+        picked = samples[::step]
+        data = b"".join(reversed(picked))[-budget:]
+        return cls(codec, data)
+
+    def compress(self, payload: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=min(COMPRESSION_LEVEL, 19), dict_data=self._zdict).compress(payload)
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 15, zdict=self.data)
+        return compressor.compress(payload) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdDecompressor(dict_data=self._zdict).decompress(blob)
+        decompressor = zlib.decompressobj(zdict=self.data)
+        return decompressor.decompress(blob) + decompressor.flush()
+
+
+class RawArchive:
+    """Append runs and read them back by run id."""
+
+    def __init__(self, root: str, keyframe_every: int = KEYFRAME_EVERY, codec: Optional[str] = None):
+        self.root = root
+        self.keyframe_every = max(1, keyframe_every)
+        self.codec = codec or default_codec()
+        self._lock = threading.Lock()
+        self._dicts: Dict[str, Dictionary] = {}
+        # bookmaker -> (day, run_id, frames since keyframe, {key: fixture}, key order)
+        self._last: Dict[str, Tuple[str, str, int, Dict[str, Dict], List[str]]] = {}
+
+    # -- dictionaries --------------------------------------------------------
+
+    def _dict_path(self, dict_id: str, codec: str) -> str:
+        return os.path.join(self.root, f"dict-{dict_id}.{codec}")
+
+    def _dictionary(self, dict_id: str, codec: str) -> Dictionary:
+        if dict_id not in self._dicts:
+            with open(self._dict_path(dict_id, codec), "rb") as handle:
+                self._dicts[dict_id] = Dictionary(codec, handle.read())
+        return self._dicts[dict_id]
+
+    def current_dictionary(self) -> Optional[Dictionary]:
+        """Newest dictionary for this archive's codec, if one was trained."""
+        if not os.path.isdir(self.root):
+            return None
+        suffix = f".{self.codec}"
+        candidates = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name.startswith("dict-") and name.endswith(suffix)
+        ]
+        if not candidates:
+            return None
+        newest = max(candidates, key=os.path.getmtime)
+        return self._dictionary(os.path.basename(newest)[5:-len(suffix)], self.codec)
+
+    def train_dictionary(self, all_matches: Mapping[str, List[Mapping]]) -> Dictionary:
+        """Train a dictionary from fixture payloads and make it the current one."""
+        samples = [
+            jsoncodec.dumps(dict(fixture), pretty=False)
+            for fixtures in all_matches.values() for fixture in fixtures
+        ]
+        dictionary = Dictionary.train(samples or [b"{}"], self.codec)
+        os.makedirs(self.root, exist_ok=True)
+        path = self._dict_path(dictionary.id, dictionary.codec)
+        if not os.path.exists(path):
+            with open(path, "wb") as handle:
+                handle.write(dictionary.data)
+        else:
+            os.utime(path)
+        self._dicts[dictionary.id] = dictionary
+        return dictionary
+
+    # -- writing -------------------------------------------------------------
+
+    def append_run(self, run_id: str, all_matches: Mapping[str, List[Mapping]], stats: Optional[Dict] = None) -> Dict:
+        """Archive one run; returns raw vs stored byte counts."""
+        day = run_day(run_id)
+        day_dir = os.path.join(self.root, day)
+        with self._lock:
+            dictionary = self.current_dictionary() or self.train_dictionary(all_matches)
+            os.makedirs(day_dir, exist_ok=True)
+            entries = [{"run_id": run_id, "type": "run", "stats": stats or {}, "bookmakers": list(all_matches)}]
+            raw_total = stored_total = 0
+            for bookmaker, fixtures in all_matches.items():
+                fixtures = [dict(f) for f in fixtures]
+                keys = fixture_keys(fixtures)
+                by_key = dict(zip(keys, fixtures))
+                last = self._previous(bookmaker, day)
+                if last and last[2] + 1 < self.keyframe_every:
+                    _, base_run, since_key, base_fixtures, base_keys = last
+                    frame = {"run_id": run_id, "base": base_run,
+                             "upserts": {k: f for k, f in by_key.items() if base_fixtures.get(k) != f}}
+                    if keys != base_keys:
+                        frame["keys"] = keys
+                    since_key += 1
+                else:
+                    frame = {"run_id": run_id, "fixtures": fixtures}
+                    since_key = 0
+
+                payload = jsoncodec.dumps(frame, pretty=False)
+                blob = dictionary.compress(payload)
+                segment = os.path.join(day_dir, f"{_slug(bookmaker)}.seg")
+                with open(segment, "ab") as handle:
+                    offset = handle.tell()
+                    handle.write(_FRAME_HEADER.pack(len(blob)) + blob)
+                raw_bytes = len(jsoncodec.dumps(fixtures, pretty=False))
+                stored = len(blob) + _FRAME_HEADER.size
+                raw_total += raw_bytes
+                stored_total += stored
+                entries.append({
+                    "run_id": run_id, "type": "frame", "bookmaker": bookmaker,
+                    "segment": os.path.basename(segment), "offset": offset, "length": stored,
+                    "keyframe": since_key == 0, "codec": dictionary.codec, "dict": dictionary.id,
+                    "fixtures": len(fixtures), "changed": len(frame.get("upserts", fixtures)),
+                    "raw_bytes": raw_bytes,
+                })
+                self._last[bookmaker] = (day, run_id, since_key, by_key, keys)
+            jsoncodec.append_jsonl(os.path.join(day_dir, INDEX_FILE), entries)
+        return {"run_id": run_id, "day": day, "raw_bytes": raw_total, "stored_bytes": stored_total}
+
+    def _previous(self, bookmaker: str, day: str):
+        """State of the bookmaker's last archived run today (cached, else rebuilt from disk)."""
+        last = self._last.get(bookmaker)
+        if last and last[0] == day:
+            return last
+        frames = [e for e in self._index(day) if e.get("type") == "frame" and e.get("bookmaker") == bookmaker]
+        if not frames:
+            return None
+        entry = frames[-1]
+        fixtures, keys = self._rebuild(day, frames, len(frames) - 1)
+        since_key = 0
+        for previous in reversed(frames):
+            if previous.get("keyframe"):
+                break
+            since_key += 1
+        return day, entry["run_id"], since_key, dict(zip(keys, fixtures)), keys
+
+    # -- reading -------------------------------------------------------------
+
+    def days(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isfile(os.path.join(self.root, name, INDEX_FILE)))
+
+    def _index(self, day: str) -> List[Dict]:
+        path = os.path.join(self.root, day, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        return list(jsoncodec.iter_jsonl(path, skip_invalid=True))
+
+    def runs(self, day: Optional[str] = None) -> List[str]:
+        days = [day] if day else self.days()
+        return [e["run_id"] for d in days for e in self._index(d) if e.get("type") == "run"]
+
+    def latest_run(self) -> Optional[str]:
+        for day in reversed(self.days()):
+            runs = self.runs(day)
+            if runs:
+                return runs[-1]
+        return None
+
+    def _read_frame(self, day: str, entry: Dict) -> Dict:
+        with open(os.path.join(self.root, day, entry["segment"]), "rb") as handle:
+            handle.seek(entry["offset"])
+            data = handle.read(entry["length"])
+        (size,) = _FRAME_HEADER.unpack_from(data)
+        blob = data[_FRAME_HEADER.size:_FRAME_HEADER.size + size]
+        return jsoncodec.loads(self._dictionary(entry["dict"], entry["codec"]).decompress(blob))
+
+    def _rebuild(self, day: str, frames: List[Dict], position: int) -> Tuple[List[Dict], List[str]]:
+        """Fixtures at frames[position]: nearest keyframe plus the deltas after it."""
+        start = position
+        while start > 0 and not frames[start].get("keyframe"):
+            start -= 1
+        fixtures: List[Dict] = []
+        keys: List[str] = []
+        for entry in frames[start:position + 1]:
+            frame = self._read_frame(day, entry)
+            if "fixtures" in frame:
+                fixtures = frame["fixtures"]
+                keys = fixture_keys(fixtures)
+                continue
+            by_key = dict(zip(keys, fixtures))
+            by_key.update(frame.get("upserts", {}))
+            keys = frame.get("keys", keys)
+            fixtures = [by_key[k] for k in keys]
+        return fixtures, keys
+
+    def load_run_record(self, run_id: str) -> Dict:
+        """{'run_id', 'stats', 'matches': {bookmaker: [fixtures]}} for one archived run."""
+        day = run_day(run_id)
+        entries = self._index(day)
+        if not any(e.get("type") == "run" and e.get("run_id") == run_id for e in entries):
+            for other in self.days():
+                entries = self._index(other)
+                if any(e.get("type") == "run" and e.get("run_id") == run_id for e in entries):
+                    day = other
+                    break
+            else:
+                raise KeyError(f"Run not in archive: {run_id}")
+        run = next(e for e in entries if e.get("type") == "run" and e.get("run_id") == run_id)
+        matches = {}
+        for bookmaker in run.get("bookmakers", []):
+            frames = [e for e in entries if e.get("type") == "frame" and e.get("bookmaker") == bookmaker]
+            position = next((i for i, e in enumerate(frames) if e["run_id"] == run_id), None)
+            if position is not None:
+                matches[bookmaker], _ = self._rebuild(day, frames, position)
+        return {"run_id": run_id, "stats": run.get("stats", {}), "matches": matches}
+
+    def load_run(self, run_id: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """all_matches for a run (latest when run_id is None), as --from-file expects."""
+        run_id = run_id or self.latest_run()
+        if not run_id:
+            raise KeyError(f"Archive is empty: {self.root}")
+        return self.load_run_record(run_id)["matches"]
+
+    # -- reporting -----------------------------------------------------------
+
+    def day_report(self) -> List[Dict]:
+        """Per day: runs, bytes the JSONL format would have used, bytes on disk."""
+        report = []
+        for day in self.days():
+            entries = self._index(day)
+            day_dir = os.path.join(self.root, day)
+            on_disk = sum(os.path.getsize(os.path.join(day_dir, name)) for name in os.listdir(day_dir))
+            # JSONL stored run_id + stats + the full matches dict every run
+            raw = sum(
+                len(jsoncodec.dumps({"run_id": e["run_id"], "stats": e.get("stats", {})}))
+                for e in entries if e.get("type") == "run"
+            ) + sum(e.get("raw_bytes", 0) for e in entries if e.get("type") == "frame")
+            report.append({
+                "day": day,
+                "runs": sum(1 for e in entries if e.get("type") == "run"),
+                "jsonl_bytes": raw,
+                "archive_bytes": on_disk,
+                "saved_pct": round(100.0 * (1 - on_disk / raw), 1) if raw else 0.0,
+            })
+        return report
+
+
+def import_jsonl(archive: RawArchive, jsonl_path: str) -> int:
+    """Move an existing raw_scraped_history.jsonl into the archive; returns runs imported."""
+    existing = set(archive.runs())
+    imported = 0
+    for record in jsoncodec.iter_jsonl(jsonl_path, skip_invalid=True):
+        run_id = record.get("run_id")
+        if not run_id or run_id in existing:
+            continue
+        archive.append_run(run_id, record.get("matches") or {}, record.get("stats"))
+        imported += 1
+    return imported
@@ -12,26 +12,102 @@ Setup required:
 
 The free (delayed) tier gives up to 20 req/sec with no charge.
 Exchange odds are back-prices (best available to back at).
+
+The SSOID is cached in BETFAIR_TOKEN_CACHE and extended with keepAlive, so
+runs only log in when the cached session has lapsed. Catalogue and price
+batches run concurrently over one pooled session held to BETFAIR_RPS.
+For offline testing, run tools/betfair_standin.py and point
+BETFAIR_IDENTITY_URL / BETFAIR_API_URL at it.
 """
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
-
-BETFAIR_LOGIN_URL = "https://identitysso.betfair.com/api/login"
-BETFAIR_API_URL = "https://api.betfair.com/exchange/betting/rest/v1.0"
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+try:
+    from .deadline import deadline_passed, mark_truncated
+    from .ratelimit import HostRateLimiter, mount_rate_limited
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from deadline import deadline_passed, mark_truncated
+    from ratelimit import HostRateLimiter, mount_rate_limited
+    from records import FixtureOdds
+
+# Endpoints are overridable so tools/betfair_standin.py can stand in offline
+BETFAIR_IDENTITY_URL = os.getenv("BETFAIR_IDENTITY_URL", "https://identitysso.betfair.com/api")
+BETFAIR_API_URL = os.getenv("BETFAIR_API_URL", "https://api.betfair.com/exchange/betting/rest/v1.0")
 SOCCER_EVENT_TYPE_ID = "1"
 MATCH_ODDS_MARKET = "MATCH_ODDS"
+BOOKMAKER = "Betfair Exchange"
 DEFAULT_MAX_MATCHES = 1200
 
+BETFAIR_RPS = float(os.getenv("BETFAIR_RPS", "20"))  # free tier allowance
+BETFAIR_BURST = float(os.getenv("BETFAIR_BURST", "4"))  # keeps any 1s window under ~BETFAIR_RPS + burst
+BETFAIR_WORKERS = int(os.getenv("BETFAIR_WORKERS", "8"))
+# SSOID cache; a cached token is refreshed with keepAlive instead of logging in again
+BETFAIR_TOKEN_CACHE = os.getenv(
+    "BETFAIR_TOKEN_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "oddswize", "betfair_session.json")
+)
+BETFAIR_TOKEN_TTL = int(os.getenv("BETFAIR_TOKEN_TTL", str(8 * 3600)))
+
+_LIMITER = HostRateLimiter(default_rate=BETFAIR_RPS, burst=BETFAIR_BURST)
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+class BetfairSessionError(Exception):
+    """The API rejected the session token (expired or invalidated)."""
+
+
+def _session() -> requests.Session:
+    """Pooled keep-alive session shared by all Betfair calls, held to BETFAIR_RPS."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = mount_rate_limited(
+                requests.Session(), pool_size=BETFAIR_WORKERS, limiter=_LIMITER, bookmaker=BOOKMAKER,
+            )
+        return _SESSION
+
+
+def _load_cached_token(username: str, app_key: str) -> Optional[str]:
+    try:
+        with open(BETFAIR_TOKEN_CACHE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except Exception:
+        return None
+    if cached.get("username") != username or cached.get("app_key") != app_key:
+        return None
+    if time.time() - cached.get("refreshed_at", 0) > BETFAIR_TOKEN_TTL:
+        return None
+    return cached.get("token")
+
+
+def _save_token(username: str, app_key: str, token: Optional[str]) -> None:
+    try:
+        if not token:
+            if os.path.exists(BETFAIR_TOKEN_CACHE):
+                os.remove(BETFAIR_TOKEN_CACHE)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(BETFAIR_TOKEN_CACHE)), exist_ok=True)
+        payload = {"username": username, "app_key": app_key, "token": token, "refreshed_at": time.time()}
+        fd = os.open(BETFAIR_TOKEN_CACHE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+    except Exception as e:
+        print(f"  [Betfair] Could not update token cache: {e}")
+
 
 def _login(username: str, password: str, app_key: str) -> Optional[str]:
     """Authenticate and return session token (SSOID)."""
     try:
-        import requests
-        resp = requests.post(
-            BETFAIR_LOGIN_URL,
+        resp = _session().post(
+            f"{BETFAIR_IDENTITY_URL}/login",
             data={"username": username, "password": password},
             headers={
                 "X-Application": app_key,
@@ -50,12 +126,46 @@ def _login(username: str, password: str, app_key: str) -> Optional[str]:
         return None
 
 
+def _keep_alive(app_key: str, session_token: str) -> Optional[str]:
+    """Extend a session; returns the token if it is still valid."""
+    try:
+        resp = _session().post(
+            f"{BETFAIR_IDENTITY_URL}/keepAlive",
+            headers={
+                "X-Application": app_key,
+                "X-Authentication": session_token,
+                "Accept": "application/json",
+            },
+            timeout=15,
+        )
+        data = resp.json()
+        if data.get("status") == "SUCCESS":
+            return data.get("token") or session_token
+        return None
+    except Exception:
+        return None
+
+
+def _get_session_token(username: str, password: str, app_key: str, refresh: bool = False) -> Optional[str]:
+    """Cached SSOID kept alive across runs, falling back to a fresh login."""
+    if not refresh:
+        cached = _load_cached_token(username, app_key)
+        if cached:
+            token = _keep_alive(app_key, cached)
+            if token:
+                _save_token(username, app_key, token)
+                print("  [Betfair] Reusing cached session")
+                return token
+    token = _login(username, password, app_key)
+    _save_token(username, app_key, token)
+    return token
+
+
 def _api_call(endpoint: str, params: dict, app_key: str, session_token: str) -> Optional[dict]:
     """Make an authenticated Betfair API call."""
     try:
-        import requests
         url = f"{BETFAIR_API_URL}/{endpoint}/"
-        resp = requests.post(
+        resp = _session().post(
             url,
             json={"filter": params.get("filter", {}), **{k: v for k, v in params.items() if k != "filter"}},
             headers={
@@ -67,17 +177,80 @@ def _api_call(endpoint: str, params: dict, app_key: str, session_token: str) ->
             timeout=25,
         )
         if resp.status_code != 200:
+            if "INVALID_SESSION" in resp.text or "NO_SESSION" in resp.text:
+                raise BetfairSessionError(resp.text[:200])
             print(f"  [Betfair] API {endpoint} error {resp.status_code}: {resp.text[:200]}")
             return None
         return resp.json()
+    except BetfairSessionError:
+        raise
     except Exception as e:
         print(f"  [Betfair] API error: {e}")
         return None
 
 
-def _get_soccer_competitions(app_key: str, session_token: str) -> List[Dict]:
+class _BetfairAuth:
+    """Session token shared by one scrape's calls; re-logs in at most once."""
+
+    def __init__(self, username: str, password: str, app_key: str, token: str):
+        self.username = username
+        self.password = password
+        self.app_key = app_key
+        self.token: Optional[str] = token
+        self.refreshed = False
+        self._lock = threading.Lock()
+
+    def refresh(self, rejected: str) -> Optional[str]:
+        """Replace a rejected token; batch workers racing here share one login."""
+        with self._lock:
+            if self.token != rejected:
+                return self.token
+            if self.refreshed:
+                self.token = None
+                return None
+            self.refreshed = True
+            print("  [Betfair] Session rejected, logging in again")
+            self.token = _get_session_token(self.username, self.password, self.app_key, refresh=True)
+            return self.token
+
+
+def _authed_call(auth: _BetfairAuth, endpoint: str, params: dict) -> Optional[dict]:
+    """_api_call with one re-login on a rejected session; None once the session is lost."""
+    token = auth.token
+    for _ in range(2):
+        if not token:
+            return None
+        try:
+            return _api_call(endpoint, params, auth.app_key, token)
+        except BetfairSessionError:
+            token = auth.refresh(token)
+    print(f"  [Betfair] Session still rejected, giving up on {endpoint}")
+    return None
+
+
+def _run_batches(label: str, items: List[str], batch_size: int, call: Callable[[List[str]], Optional[list]]) -> List[Dict]:
+    """Run batched API calls concurrently (rate limited by the session), keeping batch order."""
+    chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    results: Dict[int, list] = {}
+    with ThreadPoolExecutor(max_workers=BETFAIR_WORKERS) as executor:
+        futures = {executor.submit(call, chunk): index for index, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            data = future.result()
+            if data and isinstance(data, list):
+                results[futures[future]] = data
+            if deadline_passed(BOOKMAKER):
+                skipped = sum(1 for f in futures if f.cancel())
+                if skipped:
+                    mark_truncated(BOOKMAKER, f"{label}: {skipped}/{len(chunks)} batches skipped")
+    return [row for index in sorted(results) for row in results[index]]
+
+
+def _get_soccer_competitions(auth: _BetfairAuth) -> List[Dict]:
     """Get soccer competitions (leagues) with upcoming events."""
-    data = _api_call(
+    data = _authed_call(
+        auth,
         "listCompetitions",
         {
             "filter": {
@@ -88,13 +261,11 @@ def _get_soccer_competitions(app_key: str, session_token: str) -> List[Dict]:
                 },
             }
         },
-        app_key,
-        session_token,
     )
     return data if isinstance(data, list) else []
 
 
-def _get_events(app_key: str, session_token: str, competition_ids: List[str] = None) -> List[Dict]:
+def _get_events(auth: _BetfairAuth, competition_ids: List[str] = None) -> List[Dict]:
     """Get soccer events (matches)."""
     filter_params = {
         "eventTypeIds": [SOCCER_EVENT_TYPE_ID],
@@ -107,23 +278,15 @@ def _get_events(app_key: str, session_token: str, competition_ids: List[str] = N
     if competition_ids:
         filter_params["competitionIds"] = competition_ids
 
-    data = _api_call(
-        "listEvents",
-        {"filter": filter_params},
-        app_key,
-        session_token,
-    )
+    data = _authed_call(auth, "listEvents", {"filter": filter_params})
     return data if isinstance(data, list) else []
 
 
-def _get_market_catalogues(
-    app_key: str, session_token: str, event_ids: List[str], batch_size: int = 50
-) -> List[Dict]:
+def _get_market_catalogues(auth: _BetfairAuth, event_ids: List[str], batch_size: int = 50) -> List[Dict]:
     """Get Match Odds market catalogues for events (includes runner names)."""
-    all_catalogues = []
-    for i in range(0, len(event_ids), batch_size):
-        chunk = event_ids[i:i + batch_size]
-        data = _api_call(
+    def call(chunk):
+        return _authed_call(
+            auth,
             "listMarketCatalogue",
             {
                 "filter": {
@@ -134,35 +297,24 @@ def _get_market_catalogues(
                 "maxResults": str(batch_size),
                 "marketProjection": ["RUNNER_DESCRIPTION", "EVENT", "COMPETITION"],
             },
-            app_key,
-            session_token,
         )
-        if data and isinstance(data, list):
-            all_catalogues.extend(data)
-        time.sleep(0.1)
-    return all_catalogues
 
+    return _run_batches("catalogues", event_ids, batch_size, call)
 
-def _get_market_books(
-    app_key: str, session_token: str, market_ids: List[str], batch_size: int = 40
-) -> List[Dict]:
+
+def _get_market_books(auth: _BetfairAuth, market_ids: List[str], batch_size: int = 40) -> List[Dict]:
     """Get live exchange prices for markets."""
-    all_books = []
-    for i in range(0, len(market_ids), batch_size):
-        chunk = market_ids[i:i + batch_size]
-        data = _api_call(
+    def call(chunk):
+        return _authed_call(
+            auth,
             "listMarketBook",
             {
                 "marketIds": chunk,
                 "priceProjection": {"priceData": ["EX_BEST_OFFERS"]},
             },
-            app_key,
-            session_token,
         )
-        if data and isinstance(data, list):
-            all_books.extend(data)
-        time.sleep(0.1)
-    return all_books
+
+    return _run_batches("prices", market_ids, batch_size, call)
 
 
 def _parse_team_names(event_name: str):
@@ -175,7 +327,7 @@ def _parse_team_names(event_name: str):
     return None, None
 
 
-def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     """
     Scrape Betfair Exchange soccer odds using the official API (free tier).
     Requires BETFAIR_USERNAME, BETFAIR_PASSWORD, and BETFAIR_APP_KEY env vars.
@@ -191,14 +343,17 @@ def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict
 
     print("Scraping Betfair Exchange (official API)...")
 
-    # Step 1: Login
-    session_token = _login(username, password, app_key)
+    # Step 1: Login (or reuse the cached session)
+    session_token = _get_session_token(username, password, app_key)
     if not session_token:
         return []
     print("  [Betfair] Authenticated successfully")
+    # A rejected token (an expired cached session, or one invalidated
+    # mid-scrape) is replaced once, whichever step notices it first
+    auth = _BetfairAuth(username, password, app_key, session_token)
 
     # Step 2: Get events
-    events = _get_events(app_key, session_token)
+    events = _get_events(auth)
     if not events:
         print("  [Betfair] No soccer events found")
         return []
@@ -231,7 +386,7 @@ def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict
         event_ids.append(ev_id)
 
     # Step 3: Get market catalogues (runner names + competition)
-    catalogues = _get_market_catalogues(app_key, session_token, event_ids)
+    catalogues = _get_market_catalogues(auth, event_ids)
     if not catalogues:
         print("  [Betfair] No Match Odds markets found")
         return []
@@ -261,11 +416,13 @@ def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict
         market_ids.append(market_id)
 
     # Step 4: Get live prices
-    books = _get_market_books(app_key, session_token, market_ids)
+    books = _get_market_books(auth, market_ids)
     print(f"  [Betfair] Got prices for {len(books)} markets")
+    if auth.token is None:
+        mark_truncated(BOOKMAKER, "session lost and re-login failed")
 
     # Step 5: Assemble results
-    results: List[Dict] = []
+    results: List[FixtureOdds] = []
     for book in books:
         market_id = book.get("marketId")
         if not market_id or market_id not in market_event_map:
@@ -307,17 +464,17 @@ def scrape_betfair_exchange(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict
                     info["away_team"] = runner_name
 
         if "home" in odds and "away" in odds:
-            results.append({
-                "bookmaker": "Betfair Exchange",
-                "home_team": info["home_team"],
-                "away_team": info["away_team"],
-                "home_odds": odds["home"],
-                "draw_odds": odds.get("draw", 0.0),
-                "away_odds": odds["away"],
-                "start_time": info["start_time"],
-                "league": market_competition.get(market_id, "Soccer"),
-                "event_id": f"betfair_{ev_id}",
-            })
+            results.append(FixtureOdds(
+                bookmaker=BOOKMAKER,
+                home_team=info["home_team"],
+                away_team=info["away_team"],
+                home_odds=odds["home"],
+                draw_odds=odds.get("draw", 0.0),
+                away_odds=odds["away"],
+                start_time=info["start_time"],
+                league=market_competition.get(market_id, "Soccer"),
+                event_id=f"betfair_{ev_id}",
+            ))
 
     print(f"  [Betfair] Scraped {len(results)} matches with exchange odds")
     return results
@@ -331,6 +488,6 @@ if __name__ == "__main__":
         if matches:
             print(f"\n--- Betfair Exchange ({len(matches)} matches) ---")
             for m in matches[:5]:
-                print(json.dumps(m, indent=2))
+                print(json.dumps(dict(m), indent=2))
         else:
             print("\nNo matches returned from Betfair Exchange scraper.")
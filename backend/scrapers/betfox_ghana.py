@@ -10,6 +10,11 @@ from typing import Dict, List, Optional, Set, Tuple
 
 import cloudscraper
 
+try:
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from records import FixtureOdds
+
 API_URL = os.getenv(
     "BETFOX_API_URL",
     "https://www.betfox.com.gh/api/offer/v4/fixtures/home/upcoming",
@@ -116,7 +121,7 @@ def _extract_odds(markets: List[Dict]) -> Optional[Dict]:
     }
 
 
-def scrape_betfox_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def scrape_betfox_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     max_matches = int(os.getenv("BETFOX_MAX_MATCHES", max_matches))
 
     print("Scraping Betfox Ghana API...")
@@ -137,7 +142,7 @@ def scrape_betfox_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
         print(f"  Error: {e}")
         return []
 
-    matches: List[Dict] = []
+    matches: List[FixtureOdds] = []
     seen_ids: Set[str] = set()
 
     for fixture in fixtures:
@@ -166,16 +171,16 @@ def scrape_betfox_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
             else:
                 league = league_name or country_name
 
-            match = {
-                "bookmaker": "Betfox Ghana",
-                "event_id": event_id,
-                "home_team": home,
-                "away_team": away,
-                "teams": f"{home} vs {away}",
-                "league": league,
-                "start_time": _parse_start_time(fixture.get("startTime")),
+            match = FixtureOdds(
+                bookmaker="Betfox Ghana",
+                event_id=event_id,
+                home_team=home,
+                away_team=away,
+                teams=f"{home} vs {away}",
+                league=league,
+                start_time=_parse_start_time(fixture.get("startTime")),
                 **odds,
-            }
+            )
 
             seen_ids.add(event_id)
             matches.append(match)
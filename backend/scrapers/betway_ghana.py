@@ -7,8 +7,14 @@ Uses the Upcoming API endpoint with pagination.
 import json
 import os
 import subprocess
-import time
-from typing import Dict, List, Set
+from typing import List, Set
+
+try:
+    from .ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from records import FixtureOdds
 
 API_URL = "https://www.betway.com.gh/sportsapi/br/v1/BetBook/Upcoming/"
 DEFAULT_MAX_MATCHES = 1200
@@ -28,8 +34,9 @@ def _fetch_page(skip: int = 0, take: int = PAGE_SIZE) -> dict:
         f"&Take={take}"
     )
 
+    throttle(url)
     cmd = [
-        "curl", "-s", "--compressed",
+        "curl", "-s", "--compressed", *CURL_STATUS_ARGS,
         "-H", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
         "-H", "Accept: application/json",
         "-H", "Referer: https://www.betway.com.gh/sport/soccer/upcoming",
@@ -37,13 +44,15 @@ def _fetch_page(skip: int = 0, take: int = PAGE_SIZE) -> dict:
     ]
 
     result = subprocess.run(cmd, capture_output=True, timeout=60)
-    if result.returncode != 0 or not result.stdout:
+    body, status = split_curl_status(result.stdout)
+    record(url, status)
+    if result.returncode != 0 or not body or status >= 400:
         return {}
 
-    return json.loads(result.stdout.decode('utf-8', errors='ignore'))
+    return json.loads(body.decode('utf-8', errors='ignore'))
 
 
-def _parse_events(data: dict, seen_ids: Set[int]) -> List[Dict]:
+def _parse_events(data: dict, seen_ids: Set[int]) -> List[FixtureOdds]:
     """Parse events from API response into match format."""
     matches = []
 
@@ -112,18 +121,18 @@ def _parse_events(data: dict, seen_ids: Set[int]) -> List[Dict]:
                 continue
 
             seen_ids.add(event_id)
-            matches.append({
-                'bookmaker': 'Betway Ghana',
-                'event_id': event_id,
-                'home_team': home,
-                'away_team': away,
-                'teams': f"{home} vs {away}",
-                'home_odds': home_odds,
-                'draw_odds': draw_odds if draw_odds else 0.0,
-                'away_odds': away_odds,
-                'league': event.get('league', ''),
-                'start_time': event.get('expectedStartEpoch', 0),
-            })
+            matches.append(FixtureOdds(
+                bookmaker='Betway Ghana',
+                event_id=event_id,
+                home_team=home,
+                away_team=away,
+                teams=f"{home} vs {away}",
+                home_odds=home_odds,
+                draw_odds=draw_odds if draw_odds else 0.0,
+                away_odds=away_odds,
+                league=event.get('league', ''),
+                start_time=event.get('expectedStartEpoch', 0),
+            ))
 
         except Exception:
             continue
@@ -131,13 +140,13 @@ def _parse_events(data: dict, seen_ids: Set[int]) -> List[Dict]:
     return matches
 
 
-def scrape_betway_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def scrape_betway_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     """Scrape Betway Ghana via API with pagination."""
     max_matches = int(os.getenv("BETWAY_MAX_MATCHES", max_matches))
 
     print("Scraping Betway Ghana API...")
 
-    matches: List[Dict] = []
+    matches: List[FixtureOdds] = []
     seen_ids: Set[int] = set()
 
     skip = 0
@@ -162,7 +171,6 @@ def scrape_betway_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
                 break
 
             skip += PAGE_SIZE
-            time.sleep(0.05)
 
         except Exception as e:
             print(f"  Skip {skip}: Error - {e}")
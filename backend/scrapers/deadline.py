@@ -0,0 +1,88 @@
+"""
+Per-bookmaker scrape deadlines.
+
+The scrape cycle gives each bookmaker a wall-clock deadline. Paginating
+scrapers call deadline_passed(bookmaker) before each further request and
+stop early, keeping the pages they already parsed, and record that with
+mark_truncated() so the caller can report partial coverage.
+
+Deadlines are keyed by bookmaker name (not thread-local) because most
+scrapers fan their requests out to their own worker threads.
+
+A scraper stuck in a call that ignores its deadline cannot be interrupted,
+so the cycle runs each one through submit_daemon(): once the hard stop
+passes the cycle publishes without it, and the daemon thread is simply
+dropped at exit instead of being joined like a ThreadPoolExecutor worker.
+"""
+
+import contextlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+_lock = threading.Lock()
+_deadlines: Dict[str, float] = {}
+_truncated: Dict[str, str] = {}
+
+
+def set_deadline(bookmaker: str, deadline: float) -> None:
+    """Set an absolute time.time() deadline for a bookmaker."""
+    with _lock:
+        _deadlines[bookmaker] = deadline
+        _truncated.pop(bookmaker, None)
+
+
+def clear_deadline(bookmaker: str) -> None:
+    with _lock:
+        _deadlines.pop(bookmaker, None)
+
+
+def time_left(bookmaker: str) -> Optional[float]:
+    """Seconds until the bookmaker's deadline, or None when unbounded."""
+    deadline = _deadlines.get(bookmaker)
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def deadline_passed(bookmaker: str) -> bool:
+    left = time_left(bookmaker)
+    return left is not None and left <= 0
+
+
+def mark_truncated(bookmaker: str, reason: str) -> None:
+    """Record why a scraper stopped early (first reason wins)."""
+    with _lock:
+        _truncated.setdefault(bookmaker, reason)
+    print(f"  [{bookmaker}] deadline reached, keeping partial results ({reason})")
+
+
+def pop_truncation(bookmaker: str) -> Optional[str]:
+    with _lock:
+        return _truncated.pop(bookmaker, None)
+
+
+def submit_daemon(
+    fn: Callable, *args, slots: Optional[threading.Semaphore] = None, name: Optional[str] = None,
+) -> Future:
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+
+    slots bounds how many run at once; a future still waiting for a slot
+    can be cancelled.
+    """
+    future: Future = Future()
+
+    def run():
+        with slots if slots is not None else contextlib.nullcontext():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
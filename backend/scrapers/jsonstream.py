@@ -0,0 +1,177 @@
+"""
+Incremental JSON reading for large bookmaker payloads.
+
+Betway pages and the SoccaBet odds document run to several megabytes, and
+resp.json() materialises the whole tree before we throw most of it away.
+JsonStream walks a document from an iterable of byte chunks (e.g.
+resp.iter_content()) and lets the caller descend into the containers it
+cares about, decoding only the leaves it keeps:
+
+    stream = JsonStream(resp.iter_content(JSON_CHUNK_SIZE))
+    for key in stream.iter_object():
+        if key == 'events':
+            for _ in stream.iter_array():
+                keep(stream.value())
+        else:
+            stream.skip()
+
+Values are decoded with the stdlib C scanner (json.JSONDecoder.scan_once),
+so only the container walk runs in Python. Only a sliding window of the
+input is buffered; after every yielded key or index the caller must consume
+the value (value(), skip(), or a nested iter_*) before resuming.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Union
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITER = re.compile(r'[,\]} \t\n\r]')
+_COMPACT_AT = 256 * 1024
+
+
+class JsonStream:
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._scan_once = json.JSONDecoder().scan_once
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """Append the next non-empty chunk; False at end of input."""
+        if self._eof:
+            return False
+        if self._pos >= _COMPACT_AT:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                self.bytes_read += len(chunk)
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self._buf += chunk
+                return True
+        self._eof = True
+        tail = self._utf8.decode(b'', final=True)
+        self._buf += tail
+        return bool(tail)
+
+    def _grow(self) -> bool:
+        """Read until the unconsumed window doubles, so large values decode in O(n)."""
+        want = 2 * max(len(self._buf) - self._pos, 1)
+        grew = False
+        while len(self._buf) - self._pos < want and self._fill():
+            grew = True
+        return grew
+
+    def _peek(self) -> str:
+        if self._pos < len(self._buf):
+            char = self._buf[self._pos]
+            if char not in ' \t\n\r':
+                return char
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON stream')
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, got {self._buf[self._pos]!r}")
+        self._pos += 1
+
+    def kind(self) -> str:
+        """First character of the next value: '{', '[', '"', a digit, 't', 'f' or 'n'."""
+        return self._peek()
+
+    def value(self) -> Any:
+        """Decode the next value in full."""
+        if self._peek() not in '{["':
+            # A number or literal cut at the buffer edge must not be decoded early
+            while not _DELIMITER.search(self._buf, self._pos) and self._fill():
+                pass
+        while True:
+            try:
+                obj, end = self._scan_once(self._buf, self._pos)
+            except (StopIteration, json.JSONDecodeError):
+                if self._grow():
+                    continue
+                raise ValueError(f"Invalid JSON value at offset {self._pos}")
+            self._pos = end
+            return obj
+
+    def skip(self, depth: int = 3) -> None:
+        """Discard the next value, decoding at most one subtree depth levels down at a time."""
+        if depth > 0 and self._peek() in '{[':
+            for _ in self.iter_container():
+                self.skip(depth - 1)
+            return
+        self.value()
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of the object at the cursor."""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise ValueError(f"Expected object key at offset {self._pos}")
+            key = self.value()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or '}}' at offset {self._pos - 1}, got {char!r}")
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield the index of each element of the array at the cursor."""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {self._pos - 1}, got {char!r}")
+            index += 1
+
+    def iter_container(self) -> Iterator[Union[str, int]]:
+        """Keys of an object or indexes of an array, like iter_dict_or_list."""
+        kind = self._peek()
+        if kind == '{':
+            return self.iter_object()
+        if kind == '[':
+            return self.iter_array()
+        self.skip()
+        return iter(())
+
+
+def iter_sections(stream: JsonStream, array_keys) -> Iterator:
+    """
+    (key, value) pairs of a top-level object, like dict.items().
+
+    Values under array_keys are lazy iterators over their elements, so a
+    caller can filter each element as it is decoded; they must be exhausted
+    before the next pair is requested.
+    """
+    for key in stream.iter_object():
+        if key in array_keys and stream.kind() == '[':
+            yield key, (stream.value() for _ in stream.iter_array())
+        else:
+            yield key, stream.value()
@@ -8,9 +8,15 @@ Fetches events by championship to get 800+ matches.
 import json
 import os
 import subprocess
-import time
 from typing import Dict, List, Set
 
+try:
+    from .ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from records import FixtureOdds
+
 BASE_URL = os.getenv("ONEXBET_API_URL", "https://1xbet.com.gh/service-api/LineFeed")
 DEFAULT_MAX_MATCHES = 800
 
@@ -18,16 +24,19 @@ DEFAULT_MAX_MATCHES = 800
 def _curl_fetch(endpoint: str, params: str) -> dict:
     """Fetch from API using curl."""
     url = f"{BASE_URL}/{endpoint}?{params}"
+    throttle(url)
     cmd = [
-        "curl", "-s", "--compressed",
+        "curl", "-s", "--compressed", *CURL_STATUS_ARGS,
         "-H", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
         "-H", "Accept: application/json, text/plain, */*",
         url
     ]
     result = subprocess.run(cmd, capture_output=True, timeout=60)
-    if result.returncode != 0 or not result.stdout:
+    body, status = split_curl_status(result.stdout)
+    record(url, status)
+    if result.returncode != 0 or not body or status >= 400:
         return {}
-    return json.loads(result.stdout.decode('utf-8', errors='ignore'))
+    return json.loads(body.decode('utf-8', errors='ignore'))
 
 
 def _get_championships() -> List[Dict]:
@@ -52,7 +61,7 @@ def _get_games_with_odds(game_ids: List[int]) -> List[Dict]:
     return data.get("Value", []) if isinstance(data.get("Value"), list) else []
 
 
-def _parse_game(game: Dict, seen_ids: Set[int]) -> Dict:
+def _parse_game(game: Dict, seen_ids: Set[int]) -> FixtureOdds:
     """Parse a game with odds into our match format."""
     event_id = game.get("I")
     if not event_id or event_id in seen_ids:
@@ -95,21 +104,21 @@ def _parse_game(game: Dict, seen_ids: Set[int]) -> Dict:
         return None
 
     seen_ids.add(event_id)
-    return {
-        "bookmaker": "1xBet Ghana",
-        "event_id": event_id,
-        "home_team": home,
-        "away_team": away,
-        "teams": f"{home} vs {away}",
-        "home_odds": home_odds,
-        "draw_odds": draw_odds,
-        "away_odds": away_odds,
-        "league": game.get("L", ""),
-        "start_time": game.get("S", 0),
-    }
-
-
-def scrape_1xbet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+    return FixtureOdds(
+        bookmaker="1xBet Ghana",
+        event_id=event_id,
+        home_team=home,
+        away_team=away,
+        teams=f"{home} vs {away}",
+        home_odds=home_odds,
+        draw_odds=draw_odds,
+        away_odds=away_odds,
+        league=game.get("L", ""),
+        start_time=game.get("S", 0),
+    )
+
+
+def scrape_1xbet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     max_matches = int(os.getenv("ONEXBET_MAX_MATCHES", max_matches))
 
     print("Fetching championships...")
@@ -118,7 +127,7 @@ def scrape_1xbet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
     champs = sorted(champs, key=lambda x: x.get("GC", 0), reverse=True)
     print(f"Found {len(champs)} championships")
 
-    matches: List[Dict] = []
+    matches: List[FixtureOdds] = []
     seen_ids: Set[int] = set()
 
     # Patterns that indicate fake/alternative matches (not real games)
@@ -160,10 +169,7 @@ def scrape_1xbet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
                 if match:
                     matches.append(match)
 
-            time.sleep(0.02)  # Small delay between batches
-
         print(f"  {champ_name}: +{len([g for g in game_ids if g in seen_ids])} (total {len(matches)})")
-        time.sleep(0.01)
 
     matches = matches[:max_matches]
     print(f"Found {len(matches)} matches on 1xBet")
@@ -0,0 +1,114 @@
+"""
+Pagination planning for page/offset listing APIs.
+
+Scrapers used to fan out a fixed number of pages (SPORTYBET_PAGES,
+BETWAY_MAX_SKIP / page size) whether or not they existed, so most requests
+came back empty. The helpers here size the fan-out from the first response:
+ - pages_for_total: the API reports a total count
+ - probe_last_page: no total, so probe pages 1, 2, 4, 8... past the last
+   known page and bisect back to the last page with data
+
+Probed payloads are returned so callers reuse them instead of fetching the
+same pages again. A probe that fails twice raises ProbeFailed: the last page
+is then unknown, and callers fall back to fetching the whole range.
+record_pagination keeps the per-run request savings.
+"""
+
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_lock = threading.Lock()
+_report: Dict[str, Dict[str, int]] = {}
+
+
+class ProbeFailed(Exception):
+    """A probed page failed twice, so the last page cannot be located."""
+
+    def __init__(self, page: int):
+        super().__init__(f"probe of page {page} failed")
+        self.page = page
+
+
+def pages_for_total(total: int, page_size: int, max_pages: int) -> int:
+    """Number of pages needed for total items, capped at max_pages."""
+    if not total or page_size <= 0:
+        return 1
+    return max(1, min(max_pages, math.ceil(total / page_size)))
+
+
+def probe_last_page(
+    fetch: Callable[[int], Any],
+    has_data: Callable[[Any], bool],
+    first_page: int,
+    max_page: int,
+    is_final: Optional[Callable[[Any], bool]] = None,
+    cache: Optional[Dict[int, Any]] = None,
+    failed: Optional[Callable[[Any], bool]] = None,
+) -> Tuple[int, Dict[int, Any]]:
+    """
+    Find the last page with data, assuming first_page has data.
+
+    Probes exponentially then bisects, so it costs O(log n) requests. Returns
+    the last page number and every payload fetched on the way. A payload
+    for which failed() holds is fetched once more, and ProbeFailed is
+    raised if it fails again; failed payloads are not cached.
+    """
+    cache = {} if cache is None else cache
+
+    def page(number: int):
+        if number not in cache:
+            payload = fetch(number)
+            if failed and failed(payload):
+                payload = fetch(number)
+                if failed(payload):
+                    raise ProbeFailed(number)
+            cache[number] = payload
+        return cache[number]
+
+    last_good = first_page
+    if is_final and is_final(page(first_page)):
+        return last_good, cache
+
+    step = 1
+    first_bad = None
+    while first_bad is None:
+        probe = min(last_good + step, max_page)
+        if probe <= last_good:
+            return last_good, cache
+        payload = page(probe)
+        if not has_data(payload):
+            first_bad = probe
+            break
+        last_good = probe
+        if (is_final and is_final(payload)) or probe == max_page:
+            return last_good, cache
+        step *= 2
+
+    while first_bad - last_good > 1:
+        middle = (last_good + first_bad) // 2
+        payload = page(middle)
+        if has_data(payload):
+            last_good = middle
+            if is_final and is_final(payload):
+                break
+        else:
+            first_bad = middle
+    return last_good, cache
+
+
+def record_pagination(bookmaker: str, requests_made: int, blind_requests: int) -> None:
+    """Log and keep how many page requests a planned walk saved."""
+    saved = max(0, blind_requests - requests_made)
+    with _lock:
+        _report[bookmaker] = {
+            'requests': requests_made,
+            'blind_requests': blind_requests,
+            'saved': saved,
+        }
+    print(f"  [{bookmaker}] pagination: {requests_made} page requests ({saved} of {blind_requests} blind requests avoided)")
+
+
+def pagination_report() -> Dict[str, Dict[str, int]]:
+    with _lock:
+        return {name: dict(stats) for name, stats in _report.items()}
@@ -16,11 +16,21 @@ import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
+try:
+    from .deadline import deadline_passed, mark_truncated
+    from .ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from deadline import deadline_passed, mark_truncated
+    from ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from records import FixtureOdds
+
 PINNACLE_BASE = os.getenv(
     "PINNACLE_API_BASE",
     "https://guest.api.arcadia.pinnacle.com/0.1",
 )
 SPORT_ID = 29  # Soccer
+BOOKMAKER = "Pinnacle"
 DEFAULT_MAX_MATCHES = 12000
 
 HEADERS = {
@@ -53,13 +63,16 @@ def _curl_get(url: str, timeout: int = 20) -> Optional[list]:
         header_args += ["-H", f"{k}: {v}"]
     cmd = [
         "curl", "-s", "--max-time", str(timeout),
-        "--compressed",
+        "--compressed", *CURL_STATUS_ARGS,
     ] + header_args + [url]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 5)
-        if result.returncode != 0 or not result.stdout.strip():
+        throttle(url)
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout + 5)
+        body, status = split_curl_status(result.stdout)
+        record(url, status)
+        if result.returncode != 0 or not body.strip() or status >= 400:
             return None
-        return json.loads(result.stdout)
+        return json.loads(body)
     except Exception as e:
         print(f"  [Pinnacle] curl error: {e}")
         return None
@@ -69,7 +82,9 @@ def _requests_get(url: str, timeout: int = 20) -> Optional[list]:
     """Fallback using requests library."""
     try:
         import requests as req
+        throttle(url)
         resp = req.get(url, headers=HEADERS, timeout=timeout)
+        record(url, resp.status_code, resp.headers.get('Retry-After'))
         if resp.status_code == 204:
             return []  # No content = empty result
         if resp.status_code != 200:
@@ -82,7 +97,7 @@ def _requests_get(url: str, timeout: int = 20) -> Optional[list]:
 
 
 def _fetch_json(url: str, timeout: int = 20) -> Optional[list]:
-    """Try curl first, fall back to requests."""
+    """Try curl first, fall back to requests (each request throttled and its status recorded)."""
     data = _curl_get(url, timeout)
     if data is not None:
         return data
@@ -127,7 +142,7 @@ def _parse_start_time(start_time_str: str) -> int:
         return int(time.time()) + 3600
 
 
-def scrape_pinnacle(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def scrape_pinnacle(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     """
     Scrape Pinnacle soccer odds directly from their public guest API.
     No API key required.
@@ -147,7 +162,10 @@ def scrape_pinnacle(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
     matchup_info: Dict[int, Dict] = {}
     odds_map: Dict[int, Dict] = {}
 
-    for lg in leagues:
+    for index, lg in enumerate(leagues):
+        if deadline_passed(BOOKMAKER):
+            mark_truncated(BOOKMAKER, f"{index}/{len(leagues)} leagues")
+            break
         league_id = lg["id"]
         league_name = lg.get("name", "Soccer")
 
@@ -211,30 +229,28 @@ def scrape_pinnacle(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
             if home_ok and away_ok and draw_ok:
                 odds_map[matchup_id] = parsed
 
-        time.sleep(0.02)
-
         if len(matchup_info) >= max_matches:
             break
 
     print(f"  [Pinnacle] Found {len(matchup_info)} matchups, {len(odds_map)} with odds")
 
     # Step 4: Combine matchup info with odds
-    results: List[Dict] = []
+    results: List[FixtureOdds] = []
     for mu_id, info in matchup_info.items():
         odds = odds_map.get(mu_id)
         if not odds:
             continue
-        results.append({
-            "bookmaker": "Pinnacle",
-            "home_team": info["home_team"],
-            "away_team": info["away_team"],
-            "home_odds": odds.get("home", 0.0),
-            "draw_odds": odds.get("draw", 0.0),
-            "away_odds": odds.get("away", 0.0),
-            "start_time": info["start_time"],
-            "league": info["league"],
-            "event_id": f"pinnacle_{mu_id}",
-        })
+        results.append(FixtureOdds(
+            bookmaker=BOOKMAKER,
+            home_team=info["home_team"],
+            away_team=info["away_team"],
+            home_odds=odds.get("home", 0.0),
+            draw_odds=odds.get("draw", 0.0),
+            away_odds=odds.get("away", 0.0),
+            start_time=info["start_time"],
+            league=info["league"],
+            event_id=f"pinnacle_{mu_id}",
+        ))
 
     print(f"  [Pinnacle] Scraped {len(results)} matches with odds")
     return results
@@ -245,6 +261,6 @@ if __name__ == "__main__":
     if matches:
         print(f"\n--- Pinnacle Direct Scrape ({len(matches)} matches) ---")
         for m in matches[:5]:
-            print(json.dumps(m, indent=2))
+            print(json.dumps(dict(m), indent=2))
     else:
         print("\nNo matches returned from Pinnacle scraper.")
@@ -0,0 +1,261 @@
+"""
+Shared per-host rate limiting for scrapers.
+
+Every outgoing request takes a token from its host's bucket first, so all
+threads hitting the same bookmaker share one request rate. When a host
+answers 429 or 5xx the bucket slows down (halving its rate) and, if the
+response carries Retry-After, every thread holds off that host until it
+expires. Successful responses let the rate recover towards its base value.
+
+requests sessions get this by mounting RateLimitedAdapter (see
+mount_rate_limited). curl-based fetchers call throttle(url) before each
+request instead of sleeping a fixed interval, add CURL_STATUS_ARGS to the
+command line and feed the status split off by split_curl_status back with
+record(url, status).
+
+The adapter only retries idempotent methods (a retried login or POST could
+act twice), and when it is mounted for a bookmaker no backoff sleep runs
+past that bookmaker's scrape deadline.
+
+Rates are requests/second: SCRAPER_HOST_RATE is the default and
+SCRAPER_HOST_RATES overrides single hosts ("www.betway.com.gh=30,1xbet.com.gh=10").
+"""
+
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+try:
+    from .deadline import time_left
+except ImportError:  # run as a standalone script
+    from deadline import time_left
+
+DEFAULT_RATE = float(os.getenv("SCRAPER_HOST_RATE", "20"))
+HOST_RATES = os.getenv("SCRAPER_HOST_RATES", "")
+MIN_RATE = 0.5
+MAX_BACKOFF_SECONDS = float(os.getenv("SCRAPER_MAX_BACKOFF", "30"))
+BACKOFF_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_RETRIES = int(os.getenv("SCRAPER_THROTTLE_RETRIES", "2"))
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+# curl prints the status code on its own line after the body
+CURL_STATUS_ARGS = ["-w", "\n%{http_code}"]
+
+
+def parse_host_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(','):
+        host, _, value = item.partition('=')
+        host = host.strip().lower()
+        if not host:
+            continue
+        try:
+            rates[host] = float(value)
+        except ValueError:
+            continue
+    return rates
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds from now (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def host_of(url_or_host: str) -> str:
+    if '://' in url_or_host:
+        return (urlsplit(url_or_host).hostname or '').lower()
+    return url_or_host.lower()
+
+
+class HostBucket:
+    """Token bucket plus backoff state for one host."""
+
+    __slots__ = (
+        'base_rate', 'rate', 'burst', 'tokens', 'updated', 'blocked_until', 'failures',
+        'requests', 'throttled', 'server_errors', 'waited',
+    )
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.waited = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        burst = min(self.burst, max(1.0, self.rate))
+        self.tokens = min(burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+
+class HostRateLimiter:
+    def __init__(
+        self,
+        default_rate: float = DEFAULT_RATE,
+        host_rates: Optional[Dict[str, float]] = None,
+        burst: Optional[float] = None,
+    ):
+        self.default_rate = default_rate
+        self.host_rates = host_rates or {}
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, HostBucket] = {}
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(self.host_rates.get(host, self.default_rate), self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, host: str, max_wait: Optional[float] = None) -> float:
+        """Block until host may be called again (or max_wait runs out); returns seconds waited."""
+        with self._lock:
+            bucket = self._bucket(host)
+            wait = bucket.reserve(time.monotonic())
+            if max_wait is not None:
+                wait = min(wait, max(0.0, max_wait))
+            bucket.requests += 1
+            if wait > 0:
+                bucket.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, host: str, status: int, retry_after: Optional[str] = None) -> None:
+        """Feed a response status back; 429/5xx slow the host down for everyone."""
+        with self._lock:
+            bucket = self._bucket(host)
+            if status in BACKOFF_STATUSES:
+                if status == 429:
+                    bucket.throttled += 1
+                else:
+                    bucket.server_errors += 1
+                bucket.failures += 1
+                bucket.rate = max(MIN_RATE, bucket.rate / 2)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = 0.5 * 2 ** (bucket.failures - 1)
+                delay = min(delay, MAX_BACKOFF_SECONDS)
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+            elif status < 400:
+                bucket.failures = 0
+                if bucket.rate < bucket.base_rate:
+                    bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * 0.1)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host counters for logs and the heartbeat."""
+        with self._lock:
+            return {
+                host: {
+                    'requests': b.requests,
+                    'throttled': b.throttled,
+                    'server_errors': b.server_errors,
+                    'waited_seconds': round(b.waited, 2),
+                    'rate': round(b.rate, 2),
+                }
+                for host, b in sorted(self._buckets.items())
+            }
+
+
+LIMITER = HostRateLimiter(DEFAULT_RATE, parse_host_rates(HOST_RATES))
+
+
+def throttle(url_or_host: str) -> float:
+    """Wait for a request slot on the shared limiter (for non-requests clients)."""
+    return LIMITER.acquire(host_of(url_or_host))
+
+
+def record(url_or_host: str, status: int, retry_after: Optional[str] = None) -> None:
+    """Feed a non-requests response status back to the shared limiter.
+
+    Status 0 (curl's "000": no response at all) is ignored.
+    """
+    if status:
+        LIMITER.record(host_of(url_or_host), status, retry_after)
+
+
+def split_curl_status(output: bytes) -> Tuple[bytes, int]:
+    """Split curl stdout produced with CURL_STATUS_ARGS into (body, status)."""
+    body, _, status = output.rpartition(b"\n")
+    try:
+        return body, int(status)
+    except ValueError:
+        return output, 0
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that rate limits per host and retries idempotent 429/5xx after backing off."""
+
+    def __init__(
+        self,
+        limiter: Optional[HostRateLimiter] = None,
+        throttle_retries: int = THROTTLE_RETRIES,
+        bookmaker: Optional[str] = None,
+        **kwargs,
+    ):
+        self.limiter = limiter or LIMITER
+        self.throttle_retries = throttle_retries
+        self.bookmaker = bookmaker
+        super().__init__(**kwargs)
+
+    def _time_left(self) -> Optional[float]:
+        return time_left(self.bookmaker) if self.bookmaker else None
+
+    def send(self, request, **kwargs):
+        host = host_of(request.url)
+        retries = self.throttle_retries if request.method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            self.limiter.acquire(host, self._time_left())
+            response = super().send(request, **kwargs)
+            self.limiter.record(host, response.status_code, response.headers.get('Retry-After'))
+            if response.status_code not in BACKOFF_STATUSES or attempt >= retries:
+                return response
+            left = self._time_left()
+            if left is not None and left <= 0:
+                return response
+            attempt += 1
+            response.close()
+
+
+def mount_rate_limited(
+    session,
+    pool_size: int = 20,
+    limiter: Optional[HostRateLimiter] = None,
+    bookmaker: Optional[str] = None,
+):
+    """Route a session's http(s) traffic through the shared limiter.
+
+    With a bookmaker, backoff waits are capped at its scrape deadline.
+    """
+    adapter = RateLimitedAdapter(
+        limiter=limiter, bookmaker=bookmaker, pool_connections=pool_size, pool_maxsize=pool_size,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,147 @@
+"""
+Compact fixture record shared by all scrapers.
+
+A scraped fixture used to be a plain dict with ~10 string keys. FixtureOdds
+keeps the same read API (m['home_team'], m.get('league_id'), dict(m), **m)
+through the Mapping protocol, but stores values in __slots__ and interns the
+strings that repeat across thousands of fixtures (bookmaker, league). Keys
+a scraper did not set are absent, exactly as with the old dicts.
+
+Use fixture_json_default as json.dump(default=...) when writing records.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+_MISSING = object()
+
+# Key order used by iteration / to_dict()
+FIXTURE_FIELDS = (
+    'bookmaker',
+    'event_id',
+    'match_id',
+    'league_id',
+    'home_team',
+    'away_team',
+    'teams',
+    'home_odds',
+    'draw_odds',
+    'away_odds',
+    'league',
+    'start_time',
+)
+_FIELD_SET = frozenset(FIXTURE_FIELDS)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class FixtureOdds(Mapping):
+    """Read-only, dict-compatible 1X2 fixture record."""
+
+    __slots__ = FIXTURE_FIELDS + ('extra',)
+
+    def __init__(
+        self,
+        bookmaker: str,
+        home_team: str,
+        away_team: str,
+        home_odds: float,
+        draw_odds: float,
+        away_odds: float,
+        league: str = '',
+        start_time: Any = 0,
+        event_id: Any = _MISSING,
+        match_id: Any = _MISSING,
+        league_id: Any = _MISSING,
+        teams: Any = _MISSING,
+        **extra: Any,
+    ):
+        self.bookmaker = _intern(bookmaker)
+        self.event_id = event_id
+        self.match_id = match_id
+        self.league_id = _intern(league_id)
+        self.home_team = home_team
+        self.away_team = away_team
+        # "Home vs Away" is derivable; only keep a marker unless it differs
+        if teams is not _MISSING and teams == f"{home_team} vs {away_team}":
+            teams = True
+        self.teams = teams
+        self.home_odds = home_odds
+        self.draw_odds = draw_odds
+        self.away_odds = away_odds
+        self.league = _intern(league)
+        self.start_time = start_time
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'FixtureOdds':
+        if isinstance(data, cls):
+            return data
+        fields = dict(data)
+        return cls(
+            fields.pop('bookmaker', ''),
+            fields.pop('home_team', ''),
+            fields.pop('away_team', ''),
+            fields.pop('home_odds', 0.0),
+            fields.pop('draw_odds', 0.0),
+            fields.pop('away_odds', 0.0),
+            **fields,
+        )
+
+    def _value(self, key: str):
+        value = getattr(self, key)
+        if value is True and key == 'teams':
+            return f"{self.home_team} vs {self.away_team}"
+        return value
+
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            value = self._value(key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            value = self._value(key)
+            return default if value is _MISSING else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return bool(self.extra) and key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIXTURE_FIELDS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        count = sum(1 for key in FIXTURE_FIELDS if getattr(self, key) is not _MISSING)
+        return count + (len(self.extra) if self.extra else 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"FixtureOdds({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (self.__class__.from_dict, (self.to_dict(),))
+
+
+def fixture_json_default(obj):
+    """json.dump(default=...) hook that writes FixtureOdds as plain objects."""
+    if isinstance(obj, FixtureOdds):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
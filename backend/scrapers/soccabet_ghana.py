@@ -6,11 +6,17 @@ Fetches football odds from SoccaBet Ghana API via /bet/odds.js endpoint
 
 import json
 import requests
-import time
 from typing import Dict, List, Optional
 
+try:
+    from .ratelimit import mount_rate_limited
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from ratelimit import mount_rate_limited
+    from records import FixtureOdds
 
-def scrape_soccabet_ghana(max_matches: int = 800) -> List[Dict]:
+
+def scrape_soccabet_ghana(max_matches: int = 800) -> List[FixtureOdds]:
     """
     Scrape football matches and odds from SoccaBet Ghana.
     Uses the /bet/odds.js endpoint which contains all matches with odds.
@@ -24,12 +30,11 @@ def scrape_soccabet_ghana(max_matches: int = 800) -> List[Dict]:
         'Referer': 'https://www.soccabet.com/',
     }
 
-    session = requests.Session()
+    session = mount_rate_limited(requests.Session(), bookmaker='SoccaBet Ghana')
 
     try:
         # First establish session
         session.get('https://www.soccabet.com/', headers=headers, timeout=15)
-        time.sleep(0.05)
 
         # Get the full odds data
         resp = session.get(
@@ -99,7 +104,7 @@ def scrape_soccabet_ghana(max_matches: int = 800) -> List[Dict]:
         return []
 
 
-def _parse_match(match: Dict, match_id: str, league: str, market_1x2_id: str) -> Optional[Dict]:
+def _parse_match(match: Dict, match_id: str, league: str, market_1x2_id: str) -> Optional[FixtureOdds]:
     """Parse a single match from SoccaBet bet/odds.js data."""
 
     # Skip live matches
@@ -169,17 +174,17 @@ def _parse_match(match: Dict, match_id: str, league: str, market_1x2_id: str) ->
     if draw_odds > 0 and draw_odds < 2.0:
         return None
 
-    return {
-        'bookmaker': 'SoccaBet Ghana',
-        'match_id': str(match_id),
-        'home_team': home_team,
-        'away_team': away_team,
-        'league': league,
-        'home_odds': home_odds,
-        'draw_odds': draw_odds,
-        'away_odds': away_odds,
-        'start_time': start_ts,
-    }
+    return FixtureOdds(
+        bookmaker='SoccaBet Ghana',
+        match_id=str(match_id),
+        home_team=home_team,
+        away_team=away_team,
+        league=league,
+        home_odds=home_odds,
+        draw_odds=draw_odds,
+        away_odds=away_odds,
+        start_time=start_ts,
+    )
 
 
 if __name__ == '__main__':
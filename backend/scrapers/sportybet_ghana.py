@@ -7,9 +7,15 @@ Uses the pcUpcomingEvents API endpoint with pagination.
 import json
 import os
 import subprocess
-import time
 from typing import Dict, List, Optional, Set
 
+try:
+    from .ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from ratelimit import CURL_STATUS_ARGS, record, split_curl_status, throttle
+    from records import FixtureOdds
+
 API_URL = "https://www.sportybet.com/api/gh/factsCenter/pcUpcomingEvents"
 DEFAULT_MAX_MATCHES = 1200
 TOURNAMENT_LOOKUP_PAGES = int(os.getenv("SPORTYBET_TOURNAMENT_LOOKUP_PAGES", "10"))
@@ -46,8 +52,9 @@ def _fetch_page(page_num: int, page_size: int = 100, tournament_id: Optional[str
     if tournament_id:
         url += f"&tournamentId={tournament_id}"
 
+    throttle(url)
     cmd = [
-        "curl", "-s", "--compressed",
+        "curl", "-s", "--compressed", *CURL_STATUS_ARGS,
         "-H", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
         "-H", "Accept: application/json",
         "-H", "Referer: https://www.sportybet.com/gh/sport/football",
@@ -59,13 +66,15 @@ def _fetch_page(page_num: int, page_size: int = 100, tournament_id: Optional[str
     ]
 
     result = subprocess.run(cmd, capture_output=True, timeout=30)
-    if result.returncode != 0 or not result.stdout:
+    body, status = split_curl_status(result.stdout)
+    record(url, status)
+    if result.returncode != 0 or not body or status >= 400:
         return {}
 
-    return json.loads(result.stdout.decode('utf-8', errors='ignore'))
+    return json.loads(body.decode('utf-8', errors='ignore'))
 
 
-def _parse_events(tournaments: List[Dict], seen_ids: Set[str], major_ids: Set[str]) -> List[Dict]:
+def _parse_events(tournaments: List[Dict], seen_ids: Set[str], major_ids: Set[str]) -> List[FixtureOdds]:
     """Parse events from tournament data."""
     matches = []
 
@@ -121,18 +130,18 @@ def _parse_events(tournaments: List[Dict], seen_ids: Set[str], major_ids: Set[st
                 seen_ids.add(event_id)
                 if _is_major_league(league) or _is_major_league(tournament_name):
                     major_ids.add(str(event_id))
-                matches.append({
-                    'bookmaker': 'SportyBet Ghana',
-                    'event_id': event_id,
-                    'home_team': home,
-                    'away_team': away,
-                    'teams': f"{home} vs {away}",
-                    'home_odds': home_odds,
-                    'draw_odds': draw_odds if draw_odds else 0.0,
-                    'away_odds': away_odds,
-                    'league': league,
-                    'start_time': start_time,
-                })
+                matches.append(FixtureOdds(
+                    bookmaker='SportyBet Ghana',
+                    event_id=event_id,
+                    home_team=home,
+                    away_team=away,
+                    teams=f"{home} vs {away}",
+                    home_odds=home_odds,
+                    draw_odds=draw_odds if draw_odds else 0.0,
+                    away_odds=away_odds,
+                    league=league,
+                    start_time=start_time,
+                ))
 
             except Exception:
                 continue
@@ -170,13 +179,13 @@ def _find_tournament_ids() -> Dict[str, Set[str]]:
     return found
 
 
-def scrape_sportybet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def scrape_sportybet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     """Scrape SportyBet Ghana via API with pagination."""
     max_matches = int(os.getenv("SPORTYBET_MAX_MATCHES", max_matches))
 
     print("Scraping SportyBet Ghana API...")
 
-    matches: List[Dict] = []
+    matches: List[FixtureOdds] = []
     major_ids: Set[str] = set()
     seen_ids: Set[str] = set()
 
@@ -202,7 +211,6 @@ def scrape_sportybet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]
             print(f"  Page {page}: +{len(new_matches)} (total {len(matches)}/{total_available})")
 
             page += 1
-            time.sleep(0.05)
 
         except Exception as e:
             print(f"  Page {page}: Error - {e}")
@@ -5,15 +5,28 @@ Fetch prematch football events and odds from platform.22bet.com.gh.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import requests
 
+try:
+    from .deadline import deadline_passed, mark_truncated
+    from .ratelimit import mount_rate_limited
+    from .records import FixtureOdds
+except ImportError:  # run as a standalone script
+    from deadline import deadline_passed, mark_truncated
+    from ratelimit import mount_rate_limited
+    from records import FixtureOdds
+
 # API and scraping controls
 API_BASE = os.getenv("TWENTYTWOBET_API_URL", "https://platform.22bet.com.gh/api")
+BOOKMAKER = "22Bet Ghana"
 DEFAULT_MAX_MATCHES = 1200
 PAGE_SIZE = int(os.getenv("TWENTYTWOBET_PAGE_SIZE", "100"))  # max observed per request
+WORKERS = int(os.getenv("TWENTYTWOBET_WORKERS", "6"))
 
 MAJOR_LEAGUE_KEYWORDS = {
     "premier": ["premier league", "english premier league", "england premier league", "epl"],
@@ -32,7 +45,7 @@ MAJOR_LEAGUE_EXCLUSIONS = {
     "premier league u-21",
 }
 
-SESSION = requests.Session()
+SESSION = mount_rate_limited(requests.Session(), bookmaker=BOOKMAKER)
 SESSION.headers.update(
     {
         "User-Agent": (
@@ -194,7 +207,7 @@ def _fetch_league_page(league_id: int, page: int, limit: int) -> Dict:
     return resp.json().get("data", {})
 
 
-def _parse_events(data: Dict, seen_ids: Set[int]) -> List[Dict]:
+def _parse_events(data: Dict, seen_ids: Set[int]) -> List[FixtureOdds]:
     """Parse events block into our match format."""
     items = data.get("items", [])
     relations = data.get("relations", {})
@@ -202,7 +215,7 @@ def _parse_events(data: Dict, seen_ids: Set[int]) -> List[Dict]:
     leagues = {l["id"]: l.get("name", "") for l in relations.get("league", []) if "id" in l}
     odds_map = relations.get("odds", {}) or {}
 
-    parsed: List[Dict] = []
+    parsed: List[FixtureOdds] = []
     for event in items:
         event_id = event.get("id")
         if not event_id or event_id in seen_ids:
@@ -223,31 +236,100 @@ def _parse_events(data: Dict, seen_ids: Set[int]) -> List[Dict]:
             continue
 
         start_time = _parse_start_time(event.get("time"))
-        match = {
-            "bookmaker": "22Bet Ghana",
-            "event_id": event_id,
-            "league_id": event.get("leagueId"),
-            "home_team": home,
-            "away_team": away,
-            "teams": f"{home} vs {away}",
-            "league": leagues.get(event.get("leagueId"), ""),
-            "start_time": start_time,
+        match = FixtureOdds(
+            bookmaker=BOOKMAKER,
+            event_id=event_id,
+            league_id=event.get("leagueId"),
+            home_team=home,
+            away_team=away,
+            teams=f"{home} vs {away}",
+            league=leagues.get(event.get("leagueId"), ""),
+            start_time=start_time,
             **odds,
-        }
+        )
         seen_ids.add(event_id)
         parsed.append(match)
 
     return parsed
 
 
-def scrape_22bet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
+def _page_count(data: Dict, limit: int) -> Optional[int]:
+    """Pages implied by a response's totalCount, or None if it has none."""
+    total = data.get("totalCount")
+    limit = data.get("limit") or limit
+    if total and limit:
+        return (total + limit - 1) // limit
+    return None
+
+
+# Stands in for a page whose fetch failed twice (an empty page ends a listing)
+_FAILED_PAGE: Dict = {"failed": True}
+
+
+def _run_fetches(executor: ThreadPoolExecutor, jobs: Dict[Tuple, Callable[[], Dict]],
+                 retry: bool = True) -> Dict[Tuple, Dict]:
+    """
+    Run page fetches on the pool. A failed page is fetched once more, then
+    comes back as _FAILED_PAGE; pages skipped at the deadline are left out.
+    """
+    results: Dict[Tuple, Dict] = {}
+    failed: List[Tuple] = []
+    futures = {executor.submit(job): key for key, job in jobs.items()}
+    for future in as_completed(futures):
+        key = futures[future]
+        if future.cancelled():
+            continue
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            print(f"  [{BOOKMAKER}] page {key} failed: {e}")
+            results[key] = _FAILED_PAGE
+            failed.append(key)
+        if deadline_passed(BOOKMAKER):
+            skipped = sum(1 for f in futures if f.cancel())
+            if skipped:
+                mark_truncated(BOOKMAKER, f"{skipped} pages skipped")
+    if retry and failed and not deadline_passed(BOOKMAKER):
+        results.update(_run_fetches(executor, {key: jobs[key] for key in failed}, retry=False))
+    return results
+
+
+def _first_page(pages: Dict[Tuple, Dict], key: Tuple) -> Dict:
+    data = pages.get(key)
+    return {} if data is None or data is _FAILED_PAGE else data
+
+
+def _parse_pages(pages: Dict[Tuple, Dict], source, matches: List[FixtureOdds], seen_ids: Set[int],
+                 limit: float, page: int = 1) -> Optional[int]:
+    """
+    Parse a source's pages in order from page; returns the next page to
+    fetch, or None at an empty page. Failed pages are recorded and skipped.
+    """
+    while len(matches) < limit:
+        data = pages.get((source, page))
+        if data is None:
+            return page
+        if data is _FAILED_PAGE:
+            mark_truncated(BOOKMAKER, f"{source} page {page} failed")
+            page += 1
+            continue
+        if not data.get("items"):
+            return None
+        matches.extend(_parse_events(data, seen_ids))
+        page += 1
+    return page
+
+
+def scrape_22bet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[FixtureOdds]:
     max_matches = int(os.getenv("TWENTYTWOBET_MAX_MATCHES", max_matches))
-    matches: List[Dict] = []
+    matches: List[FixtureOdds] = []
     seen_ids: Set[int] = set()
 
     force_major = os.getenv("TWENTYTWOBET_FORCE_LEAGUES", "1").strip().lower() not in {"0", "false", "no"}
-    league_pages = int(os.getenv("TWENTYTWOBET_LEAGUE_PAGES", "6"))
+    league_pages = max(1, int(os.getenv("TWENTYTWOBET_LEAGUE_PAGES", "6")))
+    main_limit = min(PAGE_SIZE, max_matches)
 
+    league_ids: Set[int] = set()
     if force_major:
         try:
             leagues = _fetch_league_list()
@@ -255,45 +337,59 @@ def scrape_22bet_ghana(max_matches: int = DEFAULT_MAX_MATCHES) -> List[Dict]:
         except Exception:
             league_ids = set()
 
-        for league_id in sorted(league_ids):
-            page = 1
-            total_pages = None
-            while page <= max(1, league_pages):
-                data = _fetch_league_page(league_id, page, PAGE_SIZE)
-                items = data.get("items", [])
-                if not items:
-                    break
-
-                matches.extend(_parse_events(data, seen_ids))
-
-                total = data.get("totalCount")
-                limit = data.get("limit") or PAGE_SIZE
-                if total and limit:
-                    total_pages = max(total_pages or 0, (total + limit - 1) // limit)
-
-                page += 1
-                if total_pages and page > total_pages:
-                    break
-
-    page = 1
-    total_pages = None
-
-    while len(matches) < max_matches:
-        data = _fetch_page(page, min(PAGE_SIZE, max_matches))
-        items = data.get("items", [])
-        if not items:
-            break
-
-        matches.extend(_parse_events(data, seen_ids))
-
-        total = data.get("totalCount")
-        limit = data.get("limit") or PAGE_SIZE
-        if total and limit:
-            total_pages = max(total_pages or 0, (total + limit - 1) // limit)
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        # Round 1: first page of every major league and of the main listing
+        jobs = {(league_id, 1): partial(_fetch_league_page, league_id, 1, PAGE_SIZE) for league_id in league_ids}
+        jobs[("main", 1)] = partial(_fetch_page, 1, main_limit)
+        pages = _run_fetches(executor, jobs)
+
+        # Round 2: remaining pages, planned from each first page's totalCount
+        jobs = {}
+        for league_id in league_ids:
+            first = _first_page(pages, (league_id, 1))
+            if not first.get("items"):
+                continue
+            count = _page_count(first, PAGE_SIZE)
+            if count is None:
+                # No totalCount: a full first page may have more behind it
+                count = league_pages if len(first["items"]) >= PAGE_SIZE else 1
+            for page in range(2, min(count, league_pages) + 1):
+                jobs[(league_id, page)] = partial(_fetch_league_page, league_id, page, PAGE_SIZE)
+
+        main_pages = _page_count(_first_page(pages, ("main", 1)), main_limit)
+        if main_pages:
+            for page in range(2, min(main_pages, -(-max_matches // main_limit)) + 1):
+                jobs[("main", page)] = partial(_fetch_page, page, main_limit)
+
+        if jobs and deadline_passed(BOOKMAKER):
+            mark_truncated(BOOKMAKER, f"{len(jobs)} planned pages skipped")
+        elif jobs:
+            pages.update(_run_fetches(executor, jobs))
 
-        page += 1
-        if total_pages and page > total_pages:
-            break
+        for league_id in sorted(league_ids):
+            _parse_pages(pages, league_id, matches, seen_ids, float("inf"))
+        next_page = _parse_pages(pages, "main", matches, seen_ids, max_matches)
+
+        # League events also appear in the main listing; top up past the
+        # deduplicated ones (one page at a time when there is no totalCount).
+        while next_page and len(matches) < max_matches:
+            if main_pages is not None and next_page > main_pages:
+                break
+            if deadline_passed(BOOKMAKER):
+                mark_truncated(BOOKMAKER, f"main page {next_page}")
+                break
+            batch = 1
+            if main_pages is not None:
+                batch = min(main_pages - next_page + 1, -(-(max_matches - len(matches)) // main_limit))
+            jobs = {
+                ("main", page): partial(_fetch_page, page, main_limit)
+                for page in range(next_page, next_page + batch)
+            }
+            fetched = _run_fetches(executor, jobs)
+            pages.update(fetched)
+            next_page = _parse_pages(pages, "main", matches, seen_ids, max_matches, next_page)
+            if fetched and all(data is _FAILED_PAGE for data in fetched.values()):
+                break
 
     major_first = [m for m in matches if _is_major_league(m.get("league", ""))]
     other = [m for m in matches if not _is_major_league(m.get("league", ""))]
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""22Bet Ghana live odds board (Centrifugo websocket ingestion).
+
+Keeps one websocket subscription open and holds an in-memory board of 22Bet
+prematch football events, instead of paging the REST API every cycle:
+ - on (re)subscribe the board is seeded from a REST snapshot, unless
+   Centrifugo recovered every missed publication from its history
+ - each publication is a delta in the REST /event/list shape
+   ({"items", "relations"} plus optional "removed" event ids) and is applied
+   with the same parser as the REST scraper
+ - publication offsets are tracked; a gap (missed offset) triggers a REST
+   resync while new publications are buffered and replayed on top
+ - the board is flushed to TWENTYTWOBET_BOARD_FILE so scrape_odds_github can
+   read it instantly (load_board) and only falls back to REST when stale
+ - events that have kicked off leave the board (the prematch feed does not
+   always send their removal), and load_board skips them as well
+
+Run the ingester:  python -m backend.scrapers.twentytwobet_stream
+For offline testing, tools/centrifugo_standin.py serves the same protocol.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import websockets
+except ImportError:  # optional: only the streaming mode needs it
+    websockets = None
+
+try:
+    from . import twentytwobet_ghana as rest
+    from ..core import jsoncodec
+    from .records import FixtureOdds, fixture_json_default
+except ImportError:  # run as a standalone script
+    import twentytwobet_ghana as rest
+    from backend.core import jsoncodec
+    from records import FixtureOdds, fixture_json_default
+
+WS_URL = os.getenv("TWENTYTWOBET_WS_URL", "wss://centrifugo.22bet.com.gh/connection/websocket")
+WS_CHANNEL = os.getenv("TWENTYTWOBET_WS_CHANNEL", "sportsbook:prematch:football")
+BOARD_FILE = os.getenv("TWENTYTWOBET_BOARD_FILE", os.path.join("data", "22bet_board.json"))
+BOARD_MAX_AGE = int(os.getenv("TWENTYTWOBET_BOARD_MAX_AGE", "90"))
+BOARD_FLUSH_SECONDS = float(os.getenv("TWENTYTWOBET_BOARD_FLUSH", "2"))
+RECONNECT_MAX_DELAY = float(os.getenv("TWENTYTWOBET_RECONNECT_MAX_DELAY", "30"))
+RESYNC_MAX_MATCHES = int(os.getenv("TWENTYTWOBET_RESYNC_MAX_MATCHES", "5000"))
+
+
+class EventBoard:
+    """Thread-safe event_id -> FixtureOdds board with Centrifugo stream position."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: Dict[str, FixtureOdds] = {}
+        self.epoch: Optional[str] = None
+        self.offset: Optional[int] = None
+        self.updated_at = 0.0
+        self.version = 0
+        self.publications = 0
+        self.resyncs = 0
+
+    def reset(self, fixtures: List[FixtureOdds], epoch: Optional[str] = None, offset: Optional[int] = None) -> None:
+        with self._lock:
+            self._events = {str(f["event_id"]): f for f in fixtures}
+            self.epoch = epoch
+            self.offset = offset
+            self.updated_at = time.time()
+            self.version += 1
+            self.resyncs += 1
+
+    def apply(self, data: Dict, offset: Optional[int] = None) -> bool:
+        """Apply one delta publication; returns False on an offset gap (caller resyncs)."""
+        with self._lock:
+            if offset is not None and self.offset is not None:
+                if offset <= self.offset:
+                    return True  # already applied (recovery replay)
+                if offset != self.offset + 1:
+                    return False
+            fixtures = rest._parse_events(data, set())
+            live = {str(f["event_id"]) for f in fixtures}
+            for fixture in fixtures:
+                self._events[str(fixture["event_id"])] = fixture
+            # Events sent without a usable 1X2 market are suspended: drop them
+            for item in data.get("items") or []:
+                event_id = str(item.get("id"))
+                if event_id not in live:
+                    self._events.pop(event_id, None)
+            for event_id in data.get("removed") or []:
+                self._events.pop(str(event_id), None)
+            if offset is not None:
+                self.offset = offset
+            self.updated_at = time.time()
+            self.version += 1
+            self.publications += 1
+        return True
+
+    def touch(self) -> None:
+        """Mark the board current without a change (the feed is connected but quiet)."""
+        with self._lock:
+            self.updated_at = time.time()
+
+    def fixtures(self) -> List[FixtureOdds]:
+        """Current board without kicked-off events, major leagues first (same order as the REST scraper)."""
+        now = time.time()
+        with self._lock:
+            for event_id in [k for k, f in self._events.items() if _started(f, now)]:
+                del self._events[event_id]
+            events = list(self._events.values())
+        major = [m for m in events if rest._is_major_league(m.get("league", ""))]
+        other = [m for m in events if not rest._is_major_league(m.get("league", ""))]
+        return major + other
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def save(self, path: str) -> None:
+        """Atomically write the board for other processes (see load_board)."""
+        payload = {
+            "updated_at": self.updated_at,
+            "epoch": self.epoch,
+            "offset": self.offset,
+            "fixtures": self.fixtures(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        jsoncodec.dump(payload, tmp_path, default=fixture_json_default)
+        os.replace(tmp_path, path)
+
+
+def _started(fixture: FixtureOdds, now: float) -> bool:
+    """Kicked off by now (events without a start time are kept)."""
+    start_time = fixture.get("start_time")
+    return bool(start_time) and float(start_time) <= now
+
+
+def load_board(path: str = BOARD_FILE, max_age: float = BOARD_MAX_AGE) -> Optional[List[FixtureOdds]]:
+    """Upcoming fixtures from a board file written by a running ingester, or None if missing/stale/malformed."""
+    now = time.time()
+    try:
+        payload = jsoncodec.load(path)
+        if now - float(payload.get("updated_at") or 0) > max_age:
+            return None
+        fixtures = [FixtureOdds.from_dict(m) for m in payload.get("fixtures", [])]
+        return [f for f in fixtures if not _started(f, now)]
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return None
+
+
+def rest_snapshot() -> List[FixtureOdds]:
+    return rest.scrape_22bet_ghana(max_matches=RESYNC_MAX_MATCHES)
+
+
+class TwentyTwoBetStream:
+    """Long-lived Centrifugo subscription feeding an EventBoard."""
+
+    def __init__(
+        self,
+        url: str = WS_URL,
+        channel: str = WS_CHANNEL,
+        board: Optional[EventBoard] = None,
+        resync: Callable[[], List[FixtureOdds]] = rest_snapshot,
+        board_file: Optional[str] = None,
+    ):
+        self.url = url
+        self.channel = channel
+        self.board = board or EventBoard()
+        self.resync = resync
+        self.board_file = board_file
+        self.connects = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_id = 0
+        self._flushed_version = -1
+        self._flushed_at = 0.0
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> "TwentyTwoBetStream":
+        """Run the subscription on a background thread."""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    async def run(self) -> None:
+        if websockets is None:
+            raise RuntimeError("22Bet streaming needs the 'websockets' package (pip install websockets)")
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                await self._session()
+                delay = 1.0
+            except Exception as e:
+                print(f"  [22Bet stream] connection lost: {e}")
+            if self._stop.is_set():
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    # -- protocol ------------------------------------------------------------
+
+    def _command(self, **command) -> str:
+        self._next_id += 1
+        return json.dumps({"id": self._next_id, **command})
+
+    async def _reply(self, ws, key: str) -> Dict:
+        """Wait for the reply to the last command, answering server pings meanwhile."""
+        while True:
+            for msg in self._decode(await asyncio.wait_for(ws.recv(), timeout=15)):
+                if not msg:
+                    await ws.send("{}")
+                    continue
+                if msg.get("id") != self._next_id:
+                    continue
+                if "error" in msg:
+                    raise RuntimeError(f"{key} failed: {msg['error']}")
+                return msg.get(key) or msg.get("result") or {}
+
+    @staticmethod
+    def _decode(frame) -> List[Dict]:
+        # The JSON protocol may batch several newline-delimited messages per frame
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8")
+        return [json.loads(line) for line in frame.split("\n") if line.strip()]
+
+    async def _session(self) -> None:
+        async with websockets.connect(self.url, open_timeout=15, max_size=None) as ws:
+            await ws.send(self._command(connect={"name": "oddswize"}))
+            await self._reply(ws, "connect")
+            self.connects += 1
+
+            subscribe = {"channel": self.channel, "recover": self.board.offset is not None}
+            if subscribe["recover"]:
+                subscribe.update(epoch=self.board.epoch or "", offset=self.board.offset)
+            await ws.send(self._command(subscribe=subscribe))
+            reply = await self._reply(ws, "subscribe")
+
+            pending: List[Dict] = []
+            resync_task = None
+            recovered = subscribe["recover"] and reply.get("recovered") and reply.get("epoch") == self.board.epoch
+            if recovered:
+                for pub in reply.get("publications") or []:
+                    if not self.board.apply(pub.get("data") or {}, pub.get("offset")):
+                        recovered = False
+                        break
+            if not recovered:
+                pending.extend(reply.get("publications") or [])
+                resync_task = self._start_resync(reply.get("epoch"), reply.get("offset"))
+
+            while not self._stop.is_set():
+                if resync_task and resync_task.done():
+                    self._finish_resync(resync_task, pending)
+                    resync_task = None
+                    pending = []
+                self._maybe_flush()
+                try:
+                    frame = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                if not resync_task:
+                    self.board.touch()  # any frame, pings included, shows the feed is alive
+                for msg in self._decode(frame):
+                    if not msg:
+                        await ws.send("{}")  # server ping
+                        continue
+                    push = msg.get("push") or {}
+                    if "disconnect" in push:
+                        raise RuntimeError(f"server disconnect: {push['disconnect']}")
+                    if "unsubscribe" in push:
+                        raise RuntimeError("unsubscribed by server")
+                    pub = push.get("pub")
+                    if not pub or push.get("channel") != self.channel:
+                        continue
+                    if resync_task:
+                        pending.append(pub)
+                    elif not self.board.apply(pub.get("data") or {}, pub.get("offset")):
+                        print(f"  [22Bet stream] gap at offset {pub.get('offset')} (board at {self.board.offset}), resyncing")
+                        pending = [pub]
+                        resync_task = self._start_resync(self.board.epoch, pub.get("offset", 1) - 1)
+
+    def _start_resync(self, epoch: Optional[str], offset: Optional[int]):
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(None, self.resync)
+        task.position = (epoch, offset)
+        return task
+
+    def _finish_resync(self, task, pending: List[Dict]) -> None:
+        epoch, offset = task.position
+        try:
+            fixtures = task.result()
+        except Exception as e:
+            raise RuntimeError(f"REST resync failed: {e}")
+        self.board.reset(fixtures, epoch, offset)
+        # Publications that arrived during the snapshot are replayed on top; older ones
+        # (offset <= the snapshot position) would bring back prices it already replaced
+        for pub in sorted(pending, key=lambda p: p.get("offset") or 0):
+            if pub.get("offset") is not None and offset is not None and pub["offset"] <= offset:
+                continue
+            self.board.apply(pub.get("data") or {}, pub.get("offset"))
+        print(f"  [22Bet stream] board resynced: {len(self.board)} events at offset {self.board.offset}")
+        self._maybe_flush(force=True)
+
+    def _maybe_flush(self, force: bool = False) -> None:
+        if not self.board_file:
+            return
+        # A quiet feed still rewrites the board now and then, so readers don't take it as stale
+        quiet = self.board.updated_at - self._flushed_at >= BOARD_MAX_AGE / 3
+        if self.board.version == self._flushed_version and not quiet:
+            return
+        now = time.time()
+        if not force and now - self._flushed_at < BOARD_FLUSH_SECONDS:
+            return
+        self.board.save(self.board_file)
+        self._flushed_version = self.board.version
+        self._flushed_at = now
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Keep a live 22Bet odds board from the Centrifugo feed.")
+    parser.add_argument("--url", default=WS_URL)
+    parser.add_argument("--channel", default=WS_CHANNEL)
+    parser.add_argument("--board-file", default=BOARD_FILE)
+    parser.add_argument("--stats-seconds", type=int, default=60, help="Print board stats this often")
+    args = parser.parse_args()
+
+    stream = TwentyTwoBetStream(args.url, args.channel, board_file=args.board_file).start()
+    print(f"Streaming 22Bet from {args.url} ({args.channel}) into {args.board_file}")
+    try:
+        while True:
+            time.sleep(args.stats_seconds)
+            board = stream.board
+            print(
+                f"  [22Bet stream] {len(board)} events, offset {board.offset}, "
+                f"{board.publications} publications, {board.resyncs} resyncs, {stream.connects} connects"
+            )
+    except KeyboardInterrupt:
+        stream.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,13 +5,14 @@ Processes already-scraped odds data and pushes to Cloudflare.
 This allows testing filtering/normalization without re-scraping.
 """
 
-import json
 import os
 import re
 import requests
 from typing import Dict, List
 from difflib import SequenceMatcher
 
+from backend.core import jsoncodec
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -158,8 +159,7 @@ def normalize_league(league: str) -> str:
 def load_scraped_data(filename: str) -> Dict:
     """Load scraped data from JSON file."""
     print(f"Loading data from {filename}...")
-    with open(filename, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = jsoncodec.load(filename)
 
     total_matches = len(data.get('matches', []))
     print(f"  Loaded {total_matches} matches")
@@ -6,12 +6,13 @@ This script reads the scraped data and pushes it to the Cloudflare Worker
 for caching and serving to the frontend.
 """
 
-import json
 import os
 import requests
 from datetime import datetime
 from typing import Dict, List, Any
 
+from backend.core import jsoncodec
+
 # Configuration
 WORKER_URL = os.getenv('CLOUDFLARE_WORKER_URL', 'https://oddswize-api.YOUR_SUBDOMAIN.workers.dev')
 API_KEY = os.getenv('CLOUDFLARE_API_KEY', 'your-api-key-here')
@@ -21,12 +22,11 @@ DATA_FILE = 'ghana_arb_results.json'
 def load_scraped_data(filepath: str) -> Dict[str, Any]:
     """Load scraped data from JSON file"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return jsoncodec.load(filepath)
     except FileNotFoundError:
         print(f"Error: {filepath} not found")
         return {}
-    except json.JSONDecodeError as e:
+    except jsoncodec.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}")
         return {}
 
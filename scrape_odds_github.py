@@ -6,7 +6,6 @@ Optimized for maximum throughput within 4 minutes.
 Uses parallel requests, connection pooling, and aggressive batching.
 """
 
-import json
 import math
 import os
 import re
@@ -22,11 +21,21 @@ from collections import Counter
 from datetime import datetime
 from typing import Callable, Dict, Iterable, List, Optional, Set
 from difflib import SequenceMatcher
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed, wait
 
 # Free direct scrapers for sharp bookmakers (no OddsAPI key needed)
 from backend.scrapers.pinnacle import scrape_pinnacle
 from backend.scrapers.betfair_exchange import scrape_betfair_exchange
+from backend.core.league_index import LeagueMembershipIndex
+from backend.scrapers.deadline import clear_deadline, deadline_passed, mark_truncated, pop_truncation, set_deadline, submit_daemon, time_left
+from backend.scrapers.pagination import ProbeFailed, pages_for_total, pagination_report, probe_last_page, record_pagination
+from backend.scrapers.ratelimit import LIMITER as HOST_LIMITER, mount_rate_limited
+from backend.scrapers.records import FixtureOdds, fixture_json_default
+from backend.scrapers.jsonstream import JSON_CHUNK_SIZE, JsonStream, iter_sections
+from backend.core import jsoncodec, jsonl_index
+from backend.core.raw_archive import RawArchive
+from backend.core.history_db import init_history_db, write_snapshot
 
 # Optional Postgres ingestion for canonical leagues
 POSTGRES_DSN = os.getenv('POSTGRES_DSN')
@@ -295,25 +304,36 @@ MAX_CHAMPIONSHIPS = env_int("MAX_CHAMPIONSHIPS", 320)  # Broader championship co
 TIMEOUT = env_int("TIMEOUT", 10)
 BATCH_SIZE = env_int("BATCH_SIZE", 200)  # Trim batch size to reduce payload/latency
 PARALLEL_PAGES = env_int("PARALLEL_PAGES", 8)  # Balanced parallelism for I/O
-SPORTYBET_PAGES = env_int("SPORTYBET_PAGES", 45)
+SPORTYBET_PAGES = env_int("SPORTYBET_PAGES", 45)  # upper bound; the first page's totalNum sizes the walk
+SPORTYBET_PAGE_SIZE = 100
 SPORTYBET_TOURNAMENT_LOOKUP_PAGES = env_int("SPORTYBET_TOURNAMENT_LOOKUP_PAGES", 12)
 SPORTYBET_TOURNAMENT_MAX_PAGES = env_int("SPORTYBET_TOURNAMENT_MAX_PAGES", 6)
 SPORTYBET_TOURNAMENT_PAGE_SIZE = env_int("SPORTYBET_TOURNAMENT_PAGE_SIZE", 100)
 BETWAY_PAGE_SIZE = env_int("BETWAY_PAGE_SIZE", 1200)
-BETWAY_MAX_SKIP = env_int("BETWAY_MAX_SKIP", 20000)
+BETWAY_MAX_SKIP = env_int("BETWAY_MAX_SKIP", 20000)  # upper bound; pages past isFinalPage are never requested
 PINNACLE_MAX_MATCHES = env_int("PINNACLE_MAX_MATCHES", MAX_MATCHES)
+# Scrape cycle deadline: each bookmaker gets min(its budget, time left in the cycle)
+SCRAPE_DEADLINE_SECONDS = env_int("SCRAPE_DEADLINE_SECONDS", 200)
+SCRAPER_BUDGET_SECONDS = env_int("SCRAPER_BUDGET_SECONDS", 170)
+SCRAPE_DEADLINE_GRACE_SECONDS = env_int("SCRAPE_DEADLINE_GRACE_SECONDS", 15)
+SCRAPER_BUDGETS = os.getenv("SCRAPER_BUDGETS", "")  # e.g. "Betway Ghana=120,22Bet Ghana=150"
 HISTORY_DIR = os.getenv("HISTORY_DIR", "data")
 HISTORY_MATCHED_FILE = os.getenv("HISTORY_MATCHED_FILE", "odds_history.jsonl")
 HISTORY_RAW_FILE = os.getenv("HISTORY_RAW_FILE", "raw_scraped_history.jsonl")
 SAVE_RAW_HISTORY = env_bool("SAVE_RAW_HISTORY")
+RAW_HISTORY_FORMAT = os.getenv("RAW_HISTORY_FORMAT", "archive").strip().lower()  # "archive" or legacy "jsonl"
+RAW_ARCHIVE_DIR = os.getenv("RAW_ARCHIVE_DIR", "raw_archive")
 HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join(HISTORY_DIR, "odds_history.db"))
 SAVE_HISTORY_DB = os.getenv("SAVE_HISTORY_DB", "1").strip().lower() in ("1", "true", "yes", "on")
+# Parse large payloads (Betway pages, SoccaBet odds) from the response stream instead of resp.json()
+STREAM_JSON = os.getenv("STREAM_JSON", "1").strip().lower() in ("1", "true", "yes", "on")
 
 def apply_fast_mode() -> None:
     global FAST_MODE, MAX_MATCHES, MAX_CHAMPIONSHIPS, TIMEOUT, BATCH_SIZE, PARALLEL_PAGES
     global SPORTYBET_PAGES, SPORTYBET_TOURNAMENT_LOOKUP_PAGES
     global SPORTYBET_TOURNAMENT_MAX_PAGES, SPORTYBET_TOURNAMENT_PAGE_SIZE
     global BETWAY_PAGE_SIZE, BETWAY_MAX_SKIP, PINNACLE_MAX_MATCHES
+    global SCRAPE_DEADLINE_SECONDS, SCRAPER_BUDGET_SECONDS
     FAST_MODE = True
     MAX_MATCHES = env_int("MAX_MATCHES_FAST", 1100)
     MAX_CHAMPIONSHIPS = env_int("MAX_CHAMPIONSHIPS_FAST", 60)
@@ -327,11 +347,46 @@ def apply_fast_mode() -> None:
     BETWAY_PAGE_SIZE = env_int("BETWAY_PAGE_SIZE_FAST", 1200)
     BETWAY_MAX_SKIP = env_int("BETWAY_MAX_SKIP_FAST", 6000)
     PINNACLE_MAX_MATCHES = env_int("PINNACLE_MAX_MATCHES_FAST", MAX_MATCHES)
+    SCRAPE_DEADLINE_SECONDS = env_int("SCRAPE_DEADLINE_SECONDS_FAST", 90)
+    SCRAPER_BUDGET_SECONDS = env_int("SCRAPER_BUDGET_SECONDS_FAST", 75)
 
 
 if FAST_MODE:
     apply_fast_mode()
 
+def scraper_budget(name: str) -> int:
+    """Time budget for one bookmaker, with SCRAPER_BUDGETS overrides."""
+    for item in SCRAPER_BUDGETS.split(','):
+        key, _, value = item.partition('=')
+        if key.strip() == name:
+            try:
+                return int(value)
+            except ValueError:
+                break
+    return SCRAPER_BUDGET_SECONDS
+
+
+def cancel_pending(futures) -> int:
+    """Cancel futures that have not started; returns how many were dropped."""
+    return sum(1 for future in futures if future.cancel())
+
+
+def fetch_pages_parallel(bookmaker: str, fetch: Callable, pages: Iterable, max_workers: int, results: Dict) -> None:
+    """Fetch page keys missing from results concurrently, stopping at the bookmaker's deadline."""
+    todo = [page for page in pages if page not in results]
+    if not todo:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, page): page for page in todo}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            results[futures[future]] = future.result()
+            if deadline_passed(bookmaker):
+                skipped = cancel_pending(futures)
+                if skipped:
+                    mark_truncated(bookmaker, f"{skipped} pages skipped")
+
 def resolve_history_path(filename: str) -> str:
     if not filename:
         return ''
@@ -344,11 +399,7 @@ def resolve_history_path(filename: str) -> str:
 def append_jsonl(path: str, record: Dict) -> None:
     if not path:
         return
-    directory = os.path.dirname(path)
-    if directory:
-        os.makedirs(directory, exist_ok=True)
-    with open(path, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    jsoncodec.append_jsonl(path, record, default=fixture_json_default)
 
 def slugify_simple(value: str) -> str:
     value = (value or '').strip().lower()
@@ -423,7 +474,7 @@ def _fetch_oddsapi_odds(
         return []
 
 
-def scrape_oddsapi_benchmarks(allowed_keys: Optional[Set[str]] = None) -> List[Dict]:
+def scrape_oddsapi_benchmarks(allowed_keys: Optional[Set[str]] = None) -> List[FixtureOdds]:
     """
     Pull Pinnacle/Betfair Exchange soccer odds via The Odds API.
     Requires ODDSAPI_KEY.
@@ -432,7 +483,7 @@ def scrape_oddsapi_benchmarks(allowed_keys: Optional[Set[str]] = None) -> List[D
         print("  [INFO] ODDSAPI_KEY not set; skipping Pinnacle/Betfair benchmarks")
         return []
 
-    session = requests.Session()
+    session = mount_rate_limited(requests.Session())
     regions = ",".join([r.strip() for r in ODDSAPI_REGIONS.split(",") if r.strip()])
     markets = ",".join([m.strip() for m in ODDSAPI_MARKETS.split(",") if m.strip()])
     bookmakers = ",".join([b.strip() for b in ODDSAPI_BOOKMAKERS.split(",") if b.strip()])
@@ -488,26 +539,26 @@ def scrape_oddsapi_benchmarks(allowed_keys: Optional[Set[str]] = None) -> List[D
                         draw_odds = price
 
                 if home_odds and away_odds:
-                    results.append({
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "league": event.get("sport_title") or "Soccer",
-                        "start_time": start_time,
-                        "bookmaker": display_name,
-                        "home_odds": float(home_odds),
-                        "draw_odds": float(draw_odds) if draw_odds else 0.0,
-                        "away_odds": float(away_odds),
-                    })
+                    results.append(FixtureOdds(
+                        home_team=home_team,
+                        away_team=away_team,
+                        league=event.get("sport_title") or "Soccer",
+                        start_time=start_time,
+                        bookmaker=display_name,
+                        home_odds=float(home_odds),
+                        draw_odds=float(draw_odds) if draw_odds else 0.0,
+                        away_odds=float(away_odds),
+                    ))
 
     print(f"  [OddsAPI] Fetched {len(results)} Pinnacle/Betfair lines")
     return results
 
 
-def scrape_oddsapi_pinnacle() -> List[Dict]:
+def scrape_oddsapi_pinnacle() -> List[FixtureOdds]:
     return scrape_oddsapi_benchmarks(allowed_keys={"pinnacle"})
 
 
-def scrape_oddsapi_betfair_exchange() -> List[Dict]:
+def scrape_oddsapi_betfair_exchange() -> List[FixtureOdds]:
     return scrape_oddsapi_benchmarks(allowed_keys={"betfair_ex_eu", "betfair_ex_uk", "betfair_ex_au"})
 
 def build_fixture_id(match: Dict) -> str:
@@ -518,45 +569,6 @@ def build_fixture_id(match: Dict) -> str:
         return f"{home}-vs-{away}-{start}"
     return f"match-{start}"
 
-def init_history_db(conn: sqlite3.Connection) -> None:
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS runs (
-            run_id TEXT PRIMARY KEY,
-            last_updated TEXT,
-            total_scraped INTEGER,
-            matched_events INTEGER,
-            scrape_time_seconds REAL,
-            fast_mode INTEGER,
-            created_at TEXT
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS matches (
-            run_id TEXT,
-            match_id TEXT,
-            league TEXT,
-            start_time INTEGER,
-            home_team TEXT,
-            away_team TEXT,
-            PRIMARY KEY (run_id, match_id)
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS odds (
-            run_id TEXT,
-            match_id TEXT,
-            bookmaker TEXT,
-            home_odds REAL,
-            draw_odds REAL,
-            away_odds REAL,
-            PRIMARY KEY (run_id, match_id, bookmaker)
-        )
-    """)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_league ON matches(league)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_start ON matches(start_time)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_odds_bookie ON odds(bookmaker)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_updated ON runs(last_updated)")
-
 def save_history_sqlite(output: Dict) -> None:
     if not output:
         return
@@ -567,62 +579,16 @@ def save_history_sqlite(output: Dict) -> None:
     if directory:
         os.makedirs(directory, exist_ok=True)
     run_id = output.get('last_updated') or datetime.now().isoformat()
-    stats = output.get('stats', {}) or {}
 
     conn = sqlite3.connect(db_path)
     try:
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
         init_history_db(conn)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO runs (
-                run_id, last_updated, total_scraped, matched_events, scrape_time_seconds, fast_mode, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                run_id,
-                output.get('last_updated'),
-                stats.get('total_scraped'),
-                stats.get('matched_events'),
-                stats.get('scrape_time_seconds'),
-                1 if FAST_MODE else 0,
-                datetime.now().isoformat(),
-            )
+        write_snapshot(
+            conn, run_id, output, build_fixture_id,
+            fast_mode=1 if FAST_MODE else 0, created_at=datetime.now().isoformat(),
         )
-
-        match_rows = []
-        odds_rows = []
-        for match in output.get('matches', []) or []:
-            match_id = build_fixture_id(match)
-            match_rows.append((
-                run_id,
-                match_id,
-                match.get('league', ''),
-                int(match.get('start_time') or 0),
-                match.get('home_team', ''),
-                match.get('away_team', ''),
-            ))
-            for odds in match.get('odds', []) or []:
-                odds_rows.append((
-                    run_id,
-                    match_id,
-                    odds.get('bookmaker', ''),
-                    odds.get('home_odds'),
-                    odds.get('draw_odds'),
-                    odds.get('away_odds'),
-                ))
-
-        if match_rows:
-            conn.executemany(
-                "INSERT OR REPLACE INTO matches (run_id, match_id, league, start_time, home_team, away_team) VALUES (?, ?, ?, ?, ?, ?)",
-                match_rows
-            )
-        if odds_rows:
-            conn.executemany(
-                "INSERT OR REPLACE INTO odds (run_id, match_id, bookmaker, home_odds, draw_odds, away_odds) VALUES (?, ?, ?, ?, ?, ?)",
-                odds_rows
-            )
         conn.commit()
     finally:
         conn.close()
@@ -633,8 +599,9 @@ def save_history_snapshot(output: Dict, all_matches: Dict[str, List[Dict]]) -> N
     run_id = output.get('last_updated') or datetime.now().isoformat()
     matched_path = resolve_history_path(HISTORY_MATCHED_FILE)
     history_record = {**output, 'run_id': run_id}
-    append_jsonl(matched_path, history_record)
-    if SAVE_RAW_HISTORY:
+    if matched_path:
+        jsonl_index.append_indexed(matched_path, history_record, default=fixture_json_default)
+    if SAVE_RAW_HISTORY and RAW_HISTORY_FORMAT == 'jsonl':
         raw_path = resolve_history_path(HISTORY_RAW_FILE)
         raw_record = {
             'run_id': run_id,
@@ -642,6 +609,9 @@ def save_history_snapshot(output: Dict, all_matches: Dict[str, List[Dict]]) -> N
             'matches': all_matches,
         }
         append_jsonl(raw_path, raw_record)
+    elif SAVE_RAW_HISTORY:
+        archived = RawArchive(resolve_history_path(RAW_ARCHIVE_DIR)).append_run(run_id, all_matches, output.get('stats', {}))
+        print(f"[HISTORY] Raw archive: {archived['stored_bytes']:,} bytes stored for {archived['raw_bytes']:,} bytes of fixtures")
     if SAVE_HISTORY_DB:
         save_history_sqlite(output)
 
@@ -701,8 +671,8 @@ HEADERS = {
 
 SPORTYBET_API = "https://www.sportybet.com/api/gh/factsCenter/pcUpcomingEvents"
 
-def fetch_sportybet_page(session, headers, page, page_size=100, tournament_id: Optional[str] = None):
-    """Fetch a single page from SportyBet."""
+def fetch_sportybet_data(session, headers, page, page_size=100, tournament_id: Optional[str] = None) -> Dict:
+    """Fetch a single SportyBet listing page ({'totalNum', 'tournaments'}), {} on failure."""
     try:
         url = (
             f"{SPORTYBET_API}?sportId=sr%3Asport%3A1&marketId=1"
@@ -713,16 +683,37 @@ def fetch_sportybet_page(session, headers, page, page_size=100, tournament_id: O
         resp = session.get(url, headers=headers, timeout=TIMEOUT)
         data = resp.json()
         if data.get('bizCode') != 10000:
-            return []
-        return data.get('data', {}).get('tournaments', [])
+            return {}
+        return data.get('data') or {}
     except:
-        return []
+        return {}
+
+def sportybet_page_full(data: Dict, page_size: int) -> bool:
+    tournaments = data.get('tournaments') or []
+    events = sum(len(t.get('events') or []) for t in tournaments)
+    return len(tournaments) >= page_size or events >= page_size
+
+def find_sportybet_tournament_ids(
+    session,
+    headers,
+    pages: Optional[Dict[int, Dict]] = None,
+    last_page: Optional[int] = None,
+) -> Dict[str, Set[str]]:
+    """
+    Discover SportyBet tournament ids for major leagues.
 
-def find_sportybet_tournament_ids(session, headers) -> Dict[str, Set[str]]:
-    """Discover SportyBet tournament ids for major leagues."""
+    pages caches listing payloads by page number: pages the main pass already
+    fetched are reused and any new ones are added. Pages after last_page are
+    known to be empty and are not requested.
+    """
     found: Dict[str, Set[str]] = {key: set() for key in MAJOR_LEAGUE_TARGETS}
+    pages = {} if pages is None else pages
     for page in range(1, SPORTYBET_TOURNAMENT_LOOKUP_PAGES + 1):
-        tournaments = fetch_sportybet_page(session, headers, page, page_size=SPORTYBET_TOURNAMENT_PAGE_SIZE)
+        if last_page is not None and page > last_page:
+            break
+        if page not in pages:
+            pages[page] = fetch_sportybet_data(session, headers, page, page_size=SPORTYBET_TOURNAMENT_PAGE_SIZE)
+        tournaments = pages[page].get('tournaments', [])
         if not tournaments:
             break
         for tournament in tournaments:
@@ -781,33 +772,30 @@ def parse_sportybet_tournaments(tournaments, matches, seen_ids, major_ids):
                 start_time = start_time // 1000
 
             seen_ids.add(event_id)
-            match = {
-                'bookmaker': 'SportyBet Ghana',
-                'event_id': str(event_id),
-                'home_team': home,
-                'away_team': away,
-                'home_odds': home_odds,
-                'draw_odds': draw_odds or 0.0,
-                'away_odds': away_odds,
-                'league': league,
-                'start_time': start_time,
-            }
+            match = FixtureOdds(
+                bookmaker='SportyBet Ghana',
+                event_id=str(event_id),
+                home_team=home,
+                away_team=away,
+                home_odds=home_odds,
+                draw_odds=draw_odds or 0.0,
+                away_odds=away_odds,
+                league=league,
+                start_time=start_time,
+            )
             matches.append(match)
 
             if is_major_league_name(league) or is_major_league_name(tournament_name):
                 major_ids.add(str(event_id))
 
-def scrape_sportybet() -> List[Dict]:
+def scrape_sportybet() -> List[FixtureOdds]:
     """Scrape SportyBet Ghana via API with parallel page fetching."""
     print("Scraping SportyBet Ghana (TURBO)...")
     matches = []
     major_ids = set()
     seen_ids = set()
-    session = requests.Session()
-
-    # Adapter for connection pooling
-    adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20)
-    session.mount('https://', adapter)
+    # Pooled, per-host rate-limited session
+    session = mount_rate_limited(requests.Session(), bookmaker='SportyBet Ghana')
 
     # Get cookies first
     try:
@@ -826,35 +814,99 @@ def scrape_sportybet() -> List[Dict]:
         'Referer': 'https://www.sportybet.com/gh/',
     }
 
-    # Fetch pages in parallel - trimmed for speed
-    all_tournaments = []
-    with ThreadPoolExecutor(max_workers=PARALLEL_PAGES) as executor:
-        futures = {
-            executor.submit(fetch_sportybet_page, session, headers, p, 100): p
-            for p in range(1, SPORTYBET_PAGES + 1)
-        }
-        for future in as_completed(futures):
-            tournaments = future.result()
-            all_tournaments.extend(tournaments)
+    def fetch_page(page):
+        return fetch_sportybet_data(session, headers, page, SPORTYBET_PAGE_SIZE)
+
+    # Size the fan-out from page 1 instead of requesting every page blindly
+    pages = {1: fetch_page(1)}
+    requests_made = 0
+    last_page = 1
+    if not pages[1]:
+        # Page 1 failed outright, so there is nothing to plan from: fetch
+        # every page as before rather than losing SportyBet for this run
+        print("  [SportyBet] first page failed, fetching all listing pages")
+        del pages[1]
+        requests_made = 1
+        last_page = SPORTYBET_PAGES
+        fetch_pages_parallel('SportyBet Ghana', fetch_page, range(1, last_page + 1), PARALLEL_PAGES, pages)
+    elif pages[1].get('tournaments'):
+        total = pages[1].get('totalNum') or 0
+        if total:
+            last_page = pages_for_total(total, SPORTYBET_PAGE_SIZE, SPORTYBET_PAGES)
+        else:
+            last_page, _ = probe_last_page(
+                fetch_page, lambda data: bool(data.get('tournaments')), 1, SPORTYBET_PAGES, cache=pages
+            )
+        fetch_pages_parallel('SportyBet Ghana', fetch_page, range(2, last_page + 1), PARALLEL_PAGES, pages)
+        # totalNum is only a hint: keep walking while the last page came back full
+        while (
+            last_page < SPORTYBET_PAGES
+            and sportybet_page_full(pages.get(last_page, {}), SPORTYBET_PAGE_SIZE)
+            and not deadline_passed('SportyBet Ghana')
+        ):
+            last_page += 1
+            pages[last_page] = fetch_page(last_page)
+    requests_made += len(pages)
+    all_tournaments = [t for page in sorted(pages) for t in pages[page].get('tournaments', [])]
 
     # Parse all tournaments
     parse_sportybet_tournaments(all_tournaments, matches, seen_ids, major_ids)
 
     # Targeted league fetch (Premier League, La Liga, etc.)
-    tournament_ids = find_sportybet_tournament_ids(session, headers)
-    for league_key, ids in tournament_ids.items():
-        for tournament_id in ids:
-            for page in range(1, SPORTYBET_TOURNAMENT_MAX_PAGES + 1):
-                tournaments = fetch_sportybet_page(
-                    session,
-                    headers,
-                    page,
-                    page_size=SPORTYBET_TOURNAMENT_PAGE_SIZE,
-                    tournament_id=tournament_id,
-                )
-                if not tournaments:
-                    break
-                parse_sportybet_tournaments(tournaments, matches, seen_ids, major_ids)
+    tournament_ids = {}
+    if not deadline_passed('SportyBet Ghana'):
+        listed = len(pages)
+        if SPORTYBET_TOURNAMENT_PAGE_SIZE == SPORTYBET_PAGE_SIZE:
+            # Discovery reads the same listing pages; reuse them
+            tournament_ids = find_sportybet_tournament_ids(session, headers, pages=pages, last_page=last_page)
+            requests_made += len(pages) - listed
+        else:
+            discovery_pages: Dict[int, Dict] = {}
+            tournament_ids = find_sportybet_tournament_ids(session, headers, pages=discovery_pages)
+            requests_made += len(discovery_pages)
+    else:
+        mark_truncated('SportyBet Ghana', "major-league tournament discovery skipped")
+    record_pagination(
+        'SportyBet Ghana',
+        requests_made,
+        SPORTYBET_PAGES + SPORTYBET_TOURNAMENT_LOOKUP_PAGES,
+    )
+    # Targeted pages run concurrently: every tournament's first page, then the
+    # remaining pages its totalNum calls for. Parsing stays in tournament order.
+    targets = sorted({tid for ids in tournament_ids.values() for tid in ids})
+
+    def fetch_tournament_page(key):
+        tournament_id, page = key
+        return fetch_sportybet_data(
+            session, headers, page, page_size=SPORTYBET_TOURNAMENT_PAGE_SIZE, tournament_id=tournament_id
+        )
+
+    targeted: Dict = {}
+    fetch_pages_parallel(
+        'SportyBet Ghana', fetch_tournament_page, [(tid, 1) for tid in targets], PARALLEL_PAGES, targeted
+    )
+    more = []
+    for tournament_id in targets:
+        first = targeted.get((tournament_id, 1)) or {}
+        if not first.get('tournaments'):
+            continue
+        if first.get('totalNum'):
+            count = pages_for_total(first['totalNum'], SPORTYBET_TOURNAMENT_PAGE_SIZE, SPORTYBET_TOURNAMENT_MAX_PAGES)
+        elif sportybet_page_full(first, SPORTYBET_TOURNAMENT_PAGE_SIZE):
+            count = SPORTYBET_TOURNAMENT_MAX_PAGES
+        else:
+            count = 1
+        more.extend((tournament_id, page) for page in range(2, count + 1))
+    if more and deadline_passed('SportyBet Ghana'):
+        mark_truncated('SportyBet Ghana', f"{len(more)} major-league pages skipped")
+    elif more:
+        fetch_pages_parallel('SportyBet Ghana', fetch_tournament_page, more, PARALLEL_PAGES, targeted)
+    for tournament_id in targets:
+        for page in range(1, SPORTYBET_TOURNAMENT_MAX_PAGES + 1):
+            tournaments = (targeted.get((tournament_id, page)) or {}).get('tournaments')
+            if not tournaments:
+                break
+            parse_sportybet_tournaments(tournaments, matches, seen_ids, major_ids)
 
     print(f"  Total: {len(matches)} matches from SportyBet")
     major_first = [m for m in matches if m.get('event_id') in major_ids]
@@ -868,77 +920,93 @@ def scrape_sportybet() -> List[Dict]:
 
 ONEXBET_API = "https://1xbet.com.gh/service-api/LineFeed"
 
-def fetch_1xbet_games(session, champ_id, champ_name):
-    """Fetch games for a single championship."""
-    matches = []
+def fetch_1xbet_champ_game_ids(session, champ_id) -> List:
+    """Game ids listed under a championship (GetChampZip carries no odds)."""
     try:
         resp = session.get(f"{ONEXBET_API}/GetChampZip?champ={champ_id}&lng=en", headers=HEADERS, timeout=TIMEOUT)
         value = resp.json().get("Value", {})
         games = value.get("G", []) if isinstance(value, dict) else []
+        return [g.get("I") for g in games if g.get("I")]
+    except:
+        return []
 
-        game_ids = [g.get("I") for g in games if g.get("I")]
-        if not game_ids:
-            return []
 
-        # Fetch all games in one batch
-        ids_str = ",".join(str(i) for i in game_ids[:BATCH_SIZE])
-        resp = session.get(f"{ONEXBET_API}/GetGamesZip?ids={ids_str}&lng=en", headers=HEADERS, timeout=TIMEOUT)
-        games_data = resp.json().get("Value", [])
+def parse_1xbet_game(game, champ_id, champ_name) -> Optional[FixtureOdds]:
+    event_id = game.get("I")
+    if not event_id:
+        return None
 
-        for game in games_data:
-            event_id = game.get("I")
-            if not event_id:
-                continue
+    home = game.get("O1") or game.get("O1E")
+    away = game.get("O2") or game.get("O2E")
 
-            home = game.get("O1") or game.get("O1E")
-            away = game.get("O2") or game.get("O2E")
+    home_odds = draw_odds = away_odds = None
+    for o in game.get("E", []):
+        if o.get("G") != 1:
+            continue
+        ot = o.get("T")
+        if ot == 1:
+            home_odds = o.get("C")
+        elif ot == 2:
+            draw_odds = o.get("C")
+        elif ot == 3:
+            away_odds = o.get("C")
+
+    if not (home and away and home_odds and away_odds):
+        return None
 
-            home_odds = draw_odds = away_odds = None
-            for o in game.get("E", []):
-                if o.get("G") != 1:
-                    continue
-                ot = o.get("T")
-                if ot == 1:
-                    home_odds = o.get("C")
-                elif ot == 2:
-                    draw_odds = o.get("C")
-                elif ot == 3:
-                    away_odds = o.get("C")
-
-            if not (home and away and home_odds and away_odds):
-                continue
+    try:
+        home_odds = float(home_odds)
+        away_odds = float(away_odds)
+        draw_odds = float(draw_odds) if draw_odds else 0.0
+        if home_odds < 1.01 or home_odds > 100 or away_odds < 1.01 or away_odds > 100:
+            return None
+    except:
+        return None
+
+    return FixtureOdds(
+        bookmaker='1xBet Ghana',
+        event_id=str(event_id),
+        league_id=game.get("LI") or champ_id,
+        home_team=home,
+        away_team=away,
+        home_odds=home_odds,
+        draw_odds=draw_odds,
+        away_odds=away_odds,
+        league=game.get("L", champ_name),
+        start_time=game.get("S", 0),
+    )
 
-            try:
-                home_odds = float(home_odds)
-                away_odds = float(away_odds)
-                draw_odds = float(draw_odds) if draw_odds else 0.0
-                if home_odds < 1.01 or home_odds > 100 or away_odds < 1.01 or away_odds > 100:
-                    continue
-            except:
-                continue
 
-            matches.append({
-                'bookmaker': '1xBet Ghana',
-                'event_id': str(event_id),
-                'league_id': game.get("LI") or champ_id,
-                'home_team': home,
-                'away_team': away,
-                'home_odds': home_odds,
-                'draw_odds': draw_odds,
-                'away_odds': away_odds,
-                'league': game.get("L", champ_name),
-                'start_time': game.get("S", 0),
-            })
+def fetch_1xbet_games_batch(session, game_ids, champ_of) -> List[FixtureOdds]:
+    """Fetch odds for a chunk of game ids, possibly spanning several championships."""
+    matches = []
+    try:
+        ids_str = ",".join(str(i) for i in game_ids)
+        resp = session.get(f"{ONEXBET_API}/GetGamesZip?ids={ids_str}&lng=en", headers=HEADERS, timeout=TIMEOUT)
+        games_data = resp.json().get("Value", [])
+        for game in games_data:
+            champ_id, champ_name = champ_of.get(game.get("I"), (None, ""))
+            match = parse_1xbet_game(game, champ_id, champ_name)
+            if match:
+                matches.append(match)
     except:
         pass
     return matches
 
-def scrape_1xbet() -> List[Dict]:
+
+def split_balanced(items: List, max_size: int) -> List[List]:
+    """Split items into the fewest chunks of at most max_size, sized evenly."""
+    if not items:
+        return []
+    count = math.ceil(len(items) / max(1, max_size))
+    size = math.ceil(len(items) / count)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def scrape_1xbet() -> List[FixtureOdds]:
     """Scrape 1xBet Ghana with parallel championship fetching."""
     print("Scraping 1xBet Ghana (TURBO)...")
-    session = requests.Session()
-    adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20)
-    session.mount('https://', adapter)
+    session = mount_rate_limited(requests.Session(), bookmaker='1xBet Ghana')
 
     try:
         resp = session.get(f"{ONEXBET_API}/GetChampsZip?sport=1&lng=en", headers=HEADERS, timeout=TIMEOUT)
@@ -960,16 +1028,55 @@ def scrape_1xbet() -> List[Dict]:
         if len(top_champs) >= 10:
             valid_champs = top_champs
 
-    # Parallel championship fetching
+    # Championship listings feed one shared id queue; GetGamesZip is called
+    # per full BATCH_SIZE chunk, so small championships share a request.
     all_matches = []
+    champ_of = {}
+    queued = []
+    champ_futures = {}
+    batch_futures = set()
     with ThreadPoolExecutor(max_workers=PARALLEL_PAGES) as executor:
-        futures = {executor.submit(fetch_1xbet_games, session, cid, cname): cid
-                   for cid, cname in valid_champs}
-        for future in as_completed(futures):
-            matches = future.result()
-            all_matches.extend(matches)
+        for cid, cname in valid_champs:
+            champ_futures[executor.submit(fetch_1xbet_champ_game_ids, session, cid)] = (cid, cname)
+        pending = set(champ_futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                if future in champ_futures:
+                    cid, cname = champ_futures[future]
+                    for game_id in future.result():
+                        if game_id not in champ_of:
+                            champ_of[game_id] = (cid, cname)
+                            queued.append(game_id)
+                else:
+                    all_matches.extend(future.result())
+
+            chunks = []
+            while len(queued) >= BATCH_SIZE:
+                chunks.append(queued[:BATCH_SIZE])
+                queued = queued[BATCH_SIZE:]
+            if queued and not any(f in champ_futures for f in pending):
+                # Last listings are in: spread the remainder over even chunks
+                chunks.extend(split_balanced(queued, BATCH_SIZE))
+                queued = []
+
+            stop = None
             if len(all_matches) >= MAX_MATCHES:
+                stop = "cap"
+            elif deadline_passed('1xBet Ghana'):
+                stop = "deadline"
+            if stop:
+                skipped = cancel_pending(pending)
+                if stop == "deadline" and (skipped or chunks or queued):
+                    mark_truncated('1xBet Ghana', f"{skipped + len(chunks)} requests skipped")
                 break
+            for chunk in chunks:
+                future = executor.submit(fetch_1xbet_games_batch, session, chunk, champ_of)
+                batch_futures.add(future)
+                pending.add(future)
+    requests_made = sum(1 for f in list(champ_futures) + list(batch_futures) if not f.cancelled())
 
     # Dedupe
     seen = set()
@@ -980,7 +1087,7 @@ def scrape_1xbet() -> List[Dict]:
             seen.add(eid)
             unique.append(m)
 
-    print(f"  Total: {len(unique)} matches from 1xBet")
+    print(f"  Total: {len(unique)} matches from 1xBet ({len(champ_of)} games, {requests_made} requests)")
     return unique[:MAX_MATCHES]
 
 
@@ -988,6 +1095,16 @@ def scrape_1xbet() -> List[Dict]:
 # 22Bet Ghana Scraper - Platform API (fast, prematch with odds)
 # ============================================================================
 from backend.scrapers.twentytwobet_ghana import scrape_22bet_ghana  # uses platform.22bet.com.gh/api
+from backend.scrapers.twentytwobet_stream import BOARD_FILE as TWENTYTWOBET_BOARD_FILE, load_board
+
+
+def scrape_22bet() -> List[FixtureOdds]:
+    """22Bet from the live websocket board when an ingester keeps it fresh, else REST paging."""
+    board = load_board(TWENTYTWOBET_BOARD_FILE)
+    if board:
+        print(f"  [22Bet] Using live board: {len(board)} events from {TWENTYTWOBET_BOARD_FILE}")
+        return board[:MAX_MATCHES]
+    return scrape_22bet_ghana()
 
 
 # ============================================================================
@@ -995,6 +1112,63 @@ from backend.scrapers.twentytwobet_ghana import scrape_22bet_ghana  # uses platf
 # ============================================================================
 
 BETWAY_API = "https://www.betway.com.gh/sportsapi/br/v1/BetBook/Upcoming/"
+BETWAY_SECTIONS = ('events', 'markets', 'outcomes', 'prices')
+BETWAY_EVENT_FIELDS = ('eventId', 'homeTeam', 'awayTeam', 'league', 'competition', 'expectedStartEpoch')
+
+
+def join_betway_page(sections: Iterable) -> Dict:
+    """
+    Reduce a Betway page to its events and 1X2 lookups.
+
+    sections are (key, value) pairs in document order (dict.items() or
+    iter_sections over a stream). Only the 1X2 market of each event, its
+    (outcomeId, name) pairs and their prices are kept.
+    """
+    page = {'events': [], 'isFinalPage': False}
+    market_by_event = {}
+    outcomes_by_market = {}
+    price_by_outcome = {}
+    market_ids = outcome_ids = None  # known once that section has been read
+
+    for key, items in sections:
+        if key == 'isFinalPage':
+            page['isFinalPage'] = items
+        elif key == 'events':
+            for event in items or []:
+                page['events'].append({f: event[f] for f in BETWAY_EVENT_FIELDS if f in event})
+        elif key == 'markets':
+            for m in items or []:
+                if m.get('name') == '[Win/Draw/Win]' or m.get('displayName') == '1X2':
+                    market_by_event[m.get('eventId')] = m.get('marketId')
+            market_ids = set(market_by_event.values())
+        elif key == 'outcomes':
+            for o in items or []:
+                mid = o.get('marketId')
+                if market_ids is None or mid in market_ids:
+                    outcomes_by_market.setdefault(mid, []).append((o.get('outcomeId'), o.get('name', '')))
+            outcome_ids = {oid for pairs in outcomes_by_market.values() for oid, _ in pairs}
+        elif key == 'prices':
+            for p in items or []:
+                oid = p.get('outcomeId')
+                if outcome_ids is None or oid in outcome_ids:
+                    price_by_outcome[oid] = p.get('priceDecimal')
+
+    # Sections that arrived before the ones they are filtered by are pruned now
+    market_ids = set(market_by_event.values())
+    outcomes_by_market = {mid: pairs for mid, pairs in outcomes_by_market.items() if mid in market_ids}
+    outcome_ids = {oid for pairs in outcomes_by_market.values() for oid, _ in pairs}
+    page['market_by_event'] = market_by_event
+    page['outcomes_by_market'] = outcomes_by_market
+    page['price_by_outcome'] = {oid: price for oid, price in price_by_outcome.items() if oid in outcome_ids}
+    return page
+
+
+def read_betway_page(resp) -> Dict:
+    if STREAM_JSON:
+        with resp:
+            return join_betway_page(iter_sections(JsonStream(resp.iter_content(JSON_CHUNK_SIZE)), BETWAY_SECTIONS))
+    return join_betway_page(resp.json().items())
+
 
 def fetch_betway_page(session, headers, skip, page_size):
     """Fetch a single page from Betway."""
@@ -1010,8 +1184,8 @@ def fetch_betway_page(session, headers, skip, page_size):
                 f"{BETWAY_PROXY_URL.rstrip('/')}/api/proxy/betway"
                 f"?skip={skip}&take={page_size}"
             )
-            resp = session.get(proxy_url, headers=proxy_headers, timeout=20)
-            return resp.json()
+            resp = session.get(proxy_url, headers=proxy_headers, timeout=20, stream=STREAM_JSON)
+            return read_betway_page(resp)
         url = (
             f"{BETWAY_API}?countryCode=GH"
             f"&sportId=soccer"
@@ -1021,19 +1195,17 @@ def fetch_betway_page(session, headers, skip, page_size):
             f"&Skip={skip}"
             f"&Take={page_size}"
         )
-        resp = session.get(url, headers=headers, timeout=15)
-        return resp.json()
+        resp = session.get(url, headers=headers, timeout=15, stream=STREAM_JSON)
+        return read_betway_page(resp)
     except:
         return {}
 
-def scrape_betway() -> List[Dict]:
+def scrape_betway() -> List[FixtureOdds]:
     """Scrape Betway Ghana with parallel page fetching."""
     print("Scraping Betway Ghana (TURBO)...")
     matches = []
     seen_ids = set()
-    session = requests.Session()
-    adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20)
-    session.mount('https://', adapter)
+    session = mount_rate_limited(requests.Session(), bookmaker='Betway Ghana')
 
     headers = {
         **HEADERS,
@@ -1042,39 +1214,55 @@ def scrape_betway() -> List[Dict]:
 
     page_size = BETWAY_PAGE_SIZE  # Large page size reduces page count
 
-    # Fetch pages in parallel - trimmed range for speed
-    all_data = []
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(fetch_betway_page, session, headers, skip, page_size): skip
-                   for skip in range(0, BETWAY_MAX_SKIP, page_size)}
-        for future in as_completed(futures):
-            data = future.result()
-            if data:
-                all_data.append(data)
-
-    # Parse all data
+    requested = []  # one entry per request, retries included
+
+    def fetch_page(index):
+        requested.append(index)
+        return fetch_betway_page(session, headers, index * page_size, page_size)
+
+    # Find the last page (isFinalPage, else exponential probe) before fanning out
+    max_index = max(0, math.ceil(BETWAY_MAX_SKIP / page_size) - 1)
+    pages = {0: fetch_page(0)}
+    last_index = 0
+    if not pages[0]:
+        # The first page failed outright, so there is nothing to plan from:
+        # fetch the whole range as before rather than losing Betway this run
+        print("  [Betway] first page failed, fetching all pages")
+        del pages[0]
+        last_index = max_index
+        fetch_pages_parallel('Betway Ghana', fetch_page, range(0, max_index + 1), 8, pages)
+    elif pages[0].get('events'):
+        # fetch_betway_page returns {} on an error, while a page past the end
+        # still has its (empty) events: a failed probe leaves the end unknown
+        try:
+            last_index, _ = probe_last_page(
+                fetch_page,
+                lambda data: bool(data.get('events')),
+                0,
+                max_index,
+                is_final=lambda data: bool(data.get('isFinalPage')),
+                cache=pages,
+                failed=lambda data: not data,
+            )
+        except ProbeFailed as e:
+            print(f"  [Betway] {e}, fetching all pages")
+            last_index = max_index
+        fetch_pages_parallel('Betway Ghana', fetch_page, range(1, last_index + 1), 8, pages)
+    record_pagination('Betway Ghana', len(requested), max_index + 1)
+    lost = sum(1 for index, data in pages.items() if index <= last_index and not data)
+    if lost:
+        mark_truncated('Betway Ghana', f"{lost} pages failed")
+    all_data = [pages[index] for index in sorted(pages) if index <= last_index and pages[index]]
+
+    # Pages arrive already joined (see join_betway_page)
     for data in all_data:
         events = data.get('events', [])
         if not events:
             continue
 
-        markets = data.get('markets', [])
-        outcomes = data.get('outcomes', [])
-        prices = data.get('prices', [])
-
-        market_by_event = {}
-        for m in markets:
-            if m.get('name') == '[Win/Draw/Win]' or m.get('displayName') == '1X2':
-                market_by_event[m.get('eventId')] = m
-
-        outcomes_by_market = {}
-        for o in outcomes:
-            mid = o.get('marketId')
-            if mid not in outcomes_by_market:
-                outcomes_by_market[mid] = []
-            outcomes_by_market[mid].append(o)
-
-        price_by_outcome = {p.get('outcomeId'): p.get('priceDecimal') for p in prices}
+        market_by_event = data.get('market_by_event') or {}
+        outcomes_by_market = data.get('outcomes_by_market') or {}
+        price_by_outcome = data.get('price_by_outcome') or {}
 
         for event in events:
             if len(matches) >= MAX_MATCHES:
@@ -1095,20 +1283,16 @@ def scrape_betway() -> List[Dict]:
                any(team in away.lower() for team in ['newcastle', 'chelsea']):
                 print(f"  [BETWAY] Processing {home} vs {away}")
 
-            market = market_by_event.get(event_id)
-            if not market:
+            if event_id not in market_by_event:
                 if is_target_match and any(team in home.lower() for team in ['newcastle', 'chelsea']) and \
                    any(team in away.lower() for team in ['newcastle', 'chelsea']):
                     print(f"    -> No 1X2 market found, SKIPPING")
                 continue
 
-            market_id = market.get('marketId')
-            market_outcomes = outcomes_by_market.get(market_id, [])
+            market_outcomes = outcomes_by_market.get(market_by_event[event_id], [])
 
             home_odds = draw_odds = away_odds = None
-            for outcome in market_outcomes:
-                name = outcome.get('name', '')
-                oid = outcome.get('outcomeId')
+            for oid, name in market_outcomes:
                 price = price_by_outcome.get(oid)
                 if not price:
                     continue
@@ -1141,17 +1325,17 @@ def scrape_betway() -> List[Dict]:
             if any(team in home.lower() or team in away.lower() for team in ['newcastle', 'chelsea']):
                 print(f"  [BETWAY DEBUG] Scraped: {home} vs {away} ({league})")
 
-            matches.append({
-                'bookmaker': 'Betway Ghana',
-                'event_id': str(event_id),
-                'home_team': home,
-                'away_team': away,
-                'home_odds': home_odds,
-                'draw_odds': draw_odds or 0.0,
-                'away_odds': away_odds,
-                'league': league,
-                'start_time': start_time,
-            })
+            matches.append(FixtureOdds(
+                bookmaker='Betway Ghana',
+                event_id=str(event_id),
+                home_team=home,
+                away_team=away,
+                home_odds=home_odds,
+                draw_odds=draw_odds or 0.0,
+                away_odds=away_odds,
+                league=league,
+                start_time=start_time,
+            ))
 
     print(f"  Total: {len(matches)} matches from Betway")
     return matches[:MAX_MATCHES]
@@ -1170,7 +1354,90 @@ def iter_dict_or_list(data):
         return enumerate(data)
     return []
 
-def scrape_soccabet() -> List[Dict]:
+
+def _is_soccabet_soccer(sport) -> bool:
+    return isinstance(sport, dict) and (sport.get('id') == 77 or str(sport.get('name', '')).lower() == 'soccer')
+
+
+def iter_soccabet_tournaments(data: Dict):
+    """(category name, tournament key, tournament) for soccer in a decoded odds document."""
+    sports = data.get('sports', {})
+    soccer = sports.get('77', sports.get('soccer', {})) if isinstance(sports, dict) else {}
+
+    if not soccer and isinstance(sports, list):
+        soccer = next((sport for sport in sports if _is_soccabet_soccer(sport)), {})
+
+    categories = soccer.get('categories', soccer.get('regions', [])) if isinstance(soccer, dict) else []
+    for _, category in iter_dict_or_list(categories):
+        if not isinstance(category, dict):
+            continue
+        cat_name = category.get('name', 'Unknown')
+        tournaments = category.get('tournaments', category.get('competitions', []))
+        for tourn_id, tournament in iter_dict_or_list(tournaments):
+            if isinstance(tournament, dict):
+                yield cat_name, tourn_id, tournament
+
+
+def _stream_soccabet_category(stream: JsonStream):
+    if stream.kind() != '{':
+        stream.skip()
+        return
+    cat_name = None
+    held = []  # tournaments read before the category name
+    for key in stream.iter_object():
+        if key == 'name':
+            cat_name = stream.value()
+        elif key in ('tournaments', 'competitions'):
+            for tourn_id in stream.iter_container():
+                tournament = stream.value()
+                if not isinstance(tournament, dict):
+                    continue
+                if cat_name is None:
+                    held.append((tourn_id, tournament))
+                else:
+                    yield cat_name, tourn_id, tournament
+        else:
+            stream.skip()
+    for tourn_id, tournament in held:
+        yield cat_name or 'Unknown', tourn_id, tournament
+
+
+def stream_soccabet_tournaments(chunks: Iterable[bytes]):
+    """
+    Same as iter_soccabet_tournaments, read from the response stream.
+
+    Only one tournament is decoded at a time; other sports are skipped
+    without building their trees.
+    """
+    stream = JsonStream(chunks)
+    found = False
+    for key in stream.iter_object():
+        if key != 'sports' or found:
+            stream.skip()
+            continue
+        if stream.kind() == '[':
+            # The list form carries the sport id inside each entry
+            for _ in stream.iter_array():
+                sport = stream.value()
+                if not found and _is_soccabet_soccer(sport):
+                    found = True
+                    yield from iter_soccabet_tournaments({'sports': {'77': sport}})
+            continue
+        for sport_key in stream.iter_container():
+            if found or sport_key not in ('77', 'soccer') or stream.kind() != '{':
+                stream.skip()
+                continue
+            found = True
+            seen_categories = False
+            for sport_field in stream.iter_object():
+                if sport_field in ('categories', 'regions') and not seen_categories:
+                    seen_categories = True
+                    for _ in stream.iter_container():
+                        yield from _stream_soccabet_category(stream)
+                else:
+                    stream.skip()
+
+def scrape_soccabet() -> List[FixtureOdds]:
     """Scrape SoccaBet Ghana - already fast (single API call)."""
     print("Scraping SoccaBet Ghana...")
     matches = []
@@ -1180,137 +1447,119 @@ def scrape_soccabet() -> List[Dict]:
         'Referer': 'https://www.soccabet.com/',
     }
 
+    resp = None
     try:
-        session = requests.Session()
+        session = mount_rate_limited(requests.Session(), bookmaker='SoccaBet Ghana')
         session.get('https://www.soccabet.com/', headers=headers, timeout=TIMEOUT)
-        resp = session.get(SOCCABET_API, headers=headers, timeout=20)
+        resp = session.get(SOCCABET_API, headers=headers, timeout=20, stream=STREAM_JSON)
         if resp.status_code != 200:
             return []
 
-        data = resp.json()
-        sports = data.get('sports', {})
-        soccer = sports.get('77', sports.get('soccer', {}))
-
-        if not soccer and isinstance(sports, list):
-            for sport in sports:
-                if sport.get('id') == 77 or sport.get('name', '').lower() == 'soccer':
-                    soccer = sport
-                    break
-
-        if not soccer:
-            return []
-
-        categories = soccer.get('categories', soccer.get('regions', []))
+        if STREAM_JSON:
+            tournaments = stream_soccabet_tournaments(resp.iter_content(JSON_CHUNK_SIZE))
+        else:
+            tournaments = iter_soccabet_tournaments(resp.json())
         skip_patterns = ['esoccer', 'ebasketball', 'esports', '(thomas)', '(nathan)',
                          '(iron)', '(jason)', '(panther)', '(felix)', '(odin)', '(cleo)']
 
-        for cat_id, category in iter_dict_or_list(categories):
+        for cat_name, tourn_id, tournament in tournaments:
             if len(matches) >= MAX_MATCHES:
                 break
 
-            if not isinstance(category, dict):
-                continue
-
-            cat_name = category.get('name', 'Unknown')
-            tournaments = category.get('tournaments', category.get('competitions', []))
+            tourn_name = tournament.get('name', 'Unknown')
+            tournament_id = tournament.get('id', tourn_id)
+            league = f"{cat_name}. {tourn_name}"
+            raw_matches = tournament.get('matches', tournament.get('events', []))
 
-            for tourn_id, tournament in iter_dict_or_list(tournaments):
+            for match_id, match in iter_dict_or_list(raw_matches):
                 if len(matches) >= MAX_MATCHES:
                     break
 
-                if not isinstance(tournament, dict):
+                if not isinstance(match, dict) or match.get('live'):
                     continue
 
-                tourn_name = tournament.get('name', 'Unknown')
-                tournament_id = tournament.get('id', tourn_id)
-                league = f"{cat_name}. {tourn_name}"
-                raw_matches = tournament.get('matches', tournament.get('events', []))
-
-                for match_id, match in iter_dict_or_list(raw_matches):
-                    if len(matches) >= MAX_MATCHES:
-                        break
-
-                    if not isinstance(match, dict) or match.get('live'):
-                        continue
-
-                    name = match.get('name', '')
-                    if not name or ' v ' not in name:
-                        home = match.get('home', match.get('homeTeam', ''))
-                        away = match.get('away', match.get('awayTeam', ''))
-                        if home and away:
-                            name = f"{home} v {away}"
-                        else:
-                            continue
-
-                    if ' v ' in name:
-                        parts = name.split(' v ')
-                    elif ' vs ' in name:
-                        parts = name.split(' vs ')
+                name = match.get('name', '')
+                if not name or ' v ' not in name:
+                    home = match.get('home', match.get('homeTeam', ''))
+                    away = match.get('away', match.get('awayTeam', ''))
+                    if home and away:
+                        name = f"{home} v {away}"
                     else:
                         continue
 
-                    if len(parts) != 2:
-                        continue
+                if ' v ' in name:
+                    parts = name.split(' v ')
+                elif ' vs ' in name:
+                    parts = name.split(' vs ')
+                else:
+                    continue
 
-                    home_team = parts[0].strip()
-                    away_team = parts[1].strip()
+                if len(parts) != 2:
+                    continue
 
-                    full_name = f"{home_team} {away_team}".lower()
-                    if any(p in full_name for p in skip_patterns):
-                        continue
+                home_team = parts[0].strip()
+                away_team = parts[1].strip()
 
-                    start_ts = match.get('ts', match.get('startTime', 0))
-                    match_id_str = str(match.get('id', match_id))
+                full_name = f"{home_team} {away_team}".lower()
+                if any(p in full_name for p in skip_patterns):
+                    continue
 
-                    markets_data = match.get('markets', match.get('odds', []))
-                    home_odds = draw_odds = away_odds = 0
+                start_ts = match.get('ts', match.get('startTime', 0))
+                match_id_str = str(match.get('id', match_id))
 
-                    for mkt_id, mkt in iter_dict_or_list(markets_data):
-                        if not isinstance(mkt, dict):
-                            continue
+                markets_data = match.get('markets', match.get('odds', []))
+                home_odds = draw_odds = away_odds = 0
 
-                        type_id = str(mkt.get('typeid', mkt.get('typeId', mkt.get('marketType', ''))))
-                        mkt_name = mkt.get('name', '').lower()
+                for mkt_id, mkt in iter_dict_or_list(markets_data):
+                    if not isinstance(mkt, dict):
+                        continue
 
-                        if type_id in ['4102', '4720', '1'] or '1x2' in mkt_name or 'match result' in mkt_name:
-                            selections = mkt.get('selections', mkt.get('outcomes', []))
+                    type_id = str(mkt.get('typeid', mkt.get('typeId', mkt.get('marketType', ''))))
+                    mkt_name = mkt.get('name', '').lower()
 
-                            for sel_id, sel in iter_dict_or_list(selections):
-                                if not isinstance(sel, dict):
-                                    continue
+                    if type_id in ['4102', '4720', '1'] or '1x2' in mkt_name or 'match result' in mkt_name:
+                        selections = mkt.get('selections', mkt.get('outcomes', []))
 
-                                outcome = str(sel.get('n', sel.get('name', sel.get('outcome', ''))))
-                                odds_str = sel.get('o', sel.get('odds', sel.get('price', '0')))
+                        for sel_id, sel in iter_dict_or_list(selections):
+                            if not isinstance(sel, dict):
+                                continue
 
-                                try:
-                                    odds = float(odds_str)
-                                except:
-                                    continue
+                            outcome = str(sel.get('n', sel.get('name', sel.get('outcome', ''))))
+                            odds_str = sel.get('o', sel.get('odds', sel.get('price', '0')))
 
-                                if outcome in ['1', 'home', 'Home']:
-                                    home_odds = odds
-                                elif outcome in ['X', 'x', 'draw', 'Draw']:
-                                    draw_odds = odds
-                                elif outcome in ['2', 'away', 'Away']:
-                                    away_odds = odds
-                            break
+                            try:
+                                odds = float(odds_str)
+                            except:
+                                continue
 
-                    if home_odds > 1 and away_odds > 1:
-                        matches.append({
-                            'bookmaker': 'SoccaBet Ghana',
-                            'event_id': match_id_str,
-                            'league_id': str(tournament_id) if tournament_id is not None else None,
-                            'home_team': home_team,
-                            'away_team': away_team,
-                            'home_odds': home_odds,
-                            'draw_odds': draw_odds,
-                            'away_odds': away_odds,
-                            'league': league,
-                            'start_time': start_ts,
-                        })
+                            if outcome in ['1', 'home', 'Home']:
+                                home_odds = odds
+                            elif outcome in ['X', 'x', 'draw', 'Draw']:
+                                draw_odds = odds
+                            elif outcome in ['2', 'away', 'Away']:
+                                away_odds = odds
+                        break
 
+                if home_odds > 1 and away_odds > 1:
+                    matches.append(FixtureOdds(
+                        bookmaker='SoccaBet Ghana',
+                        event_id=match_id_str,
+                        league_id=str(tournament_id) if tournament_id is not None else None,
+                        home_team=home_team,
+                        away_team=away_team,
+                        home_odds=home_odds,
+                        draw_odds=draw_odds,
+                        away_odds=away_odds,
+                        league=league,
+                        start_time=start_ts,
+                    ))
     except Exception as e:
         print(f"  SoccaBet error: {e}")
+    finally:
+        # A streamed body left half-read (parse error, MAX_MATCHES) would
+        # otherwise hold its pooled connection
+        if resp is not None:
+            resp.close()
 
     print(f"  Total: {len(matches)} matches from SoccaBet")
     return matches[:MAX_MATCHES]
@@ -1320,7 +1569,7 @@ def scrape_soccabet() -> List[Dict]:
 # Betfox Ghana Scraper - Using V4 API (upcoming + live endpoints)
 # ============================================================================
 
-def scrape_betfox() -> List[Dict]:
+def scrape_betfox() -> List[FixtureOdds]:
     """Scrape Betfox Ghana via V4 competitions API."""
     print("Scraping Betfox Ghana (V4 API)...")
     matches = []
@@ -1371,7 +1620,7 @@ def scrape_betfox() -> List[Dict]:
             print(f"  Fixtures from competitions: {len(all_fixtures)}")
 
         # Also get live matches for additional coverage
-        if not FAST_MODE:
+        if not FAST_MODE and not deadline_passed('Betfox Ghana'):
             try:
                 resp_live = scraper.get(
                     'https://www.betfox.com.gh/api/offer/v4/fixtures/home/live?first=100&sport=Football',
@@ -1471,17 +1720,17 @@ def scrape_betfox() -> List[Dict]:
                     except:
                         pass
 
-                matches.append({
-                    'bookmaker': 'Betfox Ghana',
-                    'event_id': event_id,
-                    'home_team': home,
-                    'away_team': away,
-                    'home_odds': home_odds,
-                    'draw_odds': draw_odds or 0.0,
-                    'away_odds': away_odds,
-                    'league': league,
-                    'start_time': start_time,
-                })
+                matches.append(FixtureOdds(
+                    bookmaker='Betfox Ghana',
+                    event_id=event_id,
+                    home_team=home,
+                    away_team=away,
+                    home_odds=home_odds,
+                    draw_odds=draw_odds or 0.0,
+                    away_odds=away_odds,
+                    league=league,
+                    start_time=start_time,
+                ))
 
             except Exception as e:
                 continue
@@ -1653,38 +1902,26 @@ LEAGUE_TEAMS = {
     for league, teams in RAW_LEAGUE_TEAMS.items()
 }
 
+# Built once at import; every membership check in the pipeline goes through it.
+LEAGUE_INDEX = LeagueMembershipIndex(
+    LEAGUE_TEAMS,
+    normalizer=lambda name: normalize_name(name).lower(),
+)
+
 def is_team_in_league(team_name: str, league: str) -> bool:
     """Check if a team belongs to a specific league."""
     if league not in LEAGUE_TEAMS:
         return True  # No validation data for this league, allow it
 
-    known_teams = LEAGUE_TEAMS[league]
-    normalized = normalize_name(team_name).lower()
-
-    # Check if normalized name is in the known teams set
-    if normalized in known_teams:
-        return True
-
-    # Also check if any known team name is contained in the team name
-    for known_team in known_teams:
-        if known_team in normalized or normalized in known_team:
-            return True
-
-    return False
+    # Exact normalized name, or a known team name contained in / containing it
+    return LEAGUE_INDEX.contains(team_name, league)
 
 def infer_league_from_teams(home_team: str, away_team: str) -> str:
     """
     Infer league when scraped league is empty by checking if both teams belong
     to the same known league (e.g., Premier League).
     """
-    home = normalize_name(home_team).lower()
-    away = normalize_name(away_team).lower()
-
-    for league, teams in LEAGUE_TEAMS.items():
-        if home in teams and away in teams:
-            return league
-
-    return ''
+    return LEAGUE_INDEX.infer_league(home_team, away_team)
 
 def build_match_key(match: Dict) -> str:
     """Build a stable match key using normalized teams + start time bucket."""
@@ -1791,26 +2028,18 @@ def resolve_required_bookies(all_matches: Dict[str, List[Dict]]) -> List[str]:
     return [b for b in base if b in all_matches]
 
 def filter_top_league_full_coverage(
-    matched_events: List[List[Dict]],
+    matched_events: List,
     required_bookies: List[str]
-) -> List[List[Dict]]:
+) -> List['MatchedEvent']:
     """Drop top-league matches that lack full bookmaker coverage."""
     if not matched_events or not required_bookies:
         return matched_events
     required_set = set(required_bookies)
     kept = []
     dropped = 0
-    for group in matched_events:
-        if not group:
-            continue
-        league = pick_league_for_group(group)
-        is_top = league in LEAGUE_TEAMS or is_major_league_name(league)
-        if not is_top:
-            kept.append(group)
-            continue
-        group_bookies = {m.get('bookmaker') for m in group if m.get('bookmaker')}
-        if required_set.issubset(group_bookies):
-            kept.append(group)
+    for event in enrich_matched_events(matched_events):
+        if not event.is_top_league or event.covers(required_set):
+            kept.append(event)
         else:
             dropped += 1
     if dropped:
@@ -1861,46 +2090,52 @@ def normalize_league(league: str) -> str:
 
     return league
 
-def match_events(all_matches: Dict[str, List[Dict]]) -> List[List[Dict]]:
-    """Match events across bookmakers."""
-    print("\nMatching events...")
+# Debug: Track specific matches to see why they don't match
+DEBUG_MATCH_TEAMS = ['newcastle', 'chelsea']
 
-    groups = {}
+# Generic team names to filter out (these cause false matches)
+GENERIC_TEAM_NAMES = {'home', 'away', 'team 1', 'team 2', 'team1', 'team2', 'home team', 'away team'}
 
-    # Debug: Track specific matches to see why they don't match
-    debug_teams = ['newcastle', 'chelsea']
 
-    # Generic team names to filter out (these cause false matches)
-    generic_names = {'home', 'away', 'team 1', 'team 2', 'team1', 'team2', 'home team', 'away team'}
+class IncrementalEventMatcher:
+    """Group fixtures across bookmakers one bookmaker batch at a time.
 
-    # Debug: Count Newcastle/Chelsea matches per bookmaker before matching
-    newcastle_chelsea_count = {}
-    for bookie, matches in all_matches.items():
+    Feeding batches in the same order as the keys of all_matches gives exactly
+    the groups match_events(all_matches) returns, so main() can merge each
+    scraper's output as soon as its future completes.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, List[Dict]] = {}
+        self.bookmakers: List[str] = []
+        # Running counters for progress logs, updated from the groups a batch touches
+        self._multi: Set[str] = set()
+        self._arbs: Set[str] = set()
+
+    def add_bookmaker(self, bookie: str, matches: List[Dict]) -> None:
+        groups = self.groups
+        self.bookmakers.append(bookie)
+        touched: Set[str] = set()
+
+        # Debug: Count Newcastle/Chelsea matches for this bookmaker before matching
         count = sum(1 for m in matches if ('newcastle' in m['home_team'].lower() and 'chelsea' in m['away_team'].lower()) or
                                           ('chelsea' in m['home_team'].lower() and 'newcastle' in m['away_team'].lower()))
         if count > 0:
-            newcastle_chelsea_count[bookie] = count
-
-    if newcastle_chelsea_count:
-        print(f"\n  Newcastle vs Chelsea by bookmaker (before matching):")
-        for bookie, count in newcastle_chelsea_count.items():
-            print(f"    {bookie}: {count}")
-        print()
+            print(f"  Newcastle vs Chelsea before matching - {bookie}: {count}")
 
-    for bookie, matches in all_matches.items():
         for match in matches:
             home = normalize_name(match['home_team'])
             away = normalize_name(match['away_team'])
             league_norm = normalize_league(match.get('league', ''))
 
             # Debug logging for specific matches
-            if any(team in home.lower() or team in away.lower() for team in debug_teams):
-                if any(team in home.lower() for team in debug_teams) and any(team in away.lower() for team in debug_teams):
+            if any(team in home.lower() or team in away.lower() for team in DEBUG_MATCH_TEAMS):
+                if any(team in home.lower() for team in DEBUG_MATCH_TEAMS) and any(team in away.lower() for team in DEBUG_MATCH_TEAMS):
                     print(f"  [DEBUG] {bookie}: '{match['home_team']}' vs '{match['away_team']}' -> '{home}' vs '{away}'")
 
             # Skip matches with generic placeholder team names
             # Check for exact match or if name starts with/contains generic terms
-            if (home in generic_names or away in generic_names or
+            if (home in GENERIC_TEAM_NAMES or away in GENERIC_TEAM_NAMES or
                 not home or not away or
                 home.startswith('home') or away.startswith('away') or
                 home.startswith('team') or away.startswith('team') or
@@ -1911,10 +2146,12 @@ def match_events(all_matches: Dict[str, List[Dict]]) -> List[List[Dict]]:
             key = f"{home}|{away}|{league_norm}"
             if key in groups:
                 groups[key].append(match)
+                touched.add(key)
                 continue
             reverse_key = f"{away}|{home}|{league_norm}"
             if reverse_key in groups:
                 groups[reverse_key].append(match)
+                touched.add(reverse_key)
                 continue
 
             # Fuzzy matching
@@ -1943,20 +2180,71 @@ def match_events(all_matches: Dict[str, List[Dict]]) -> List[List[Dict]]:
                     or (home_tok_swap >= 0.55 and away_tok_swap >= 0.55)
                 ):
                     groups[existing_key].append(match)
+                    touched.add(existing_key)
                     matched = True
                     break
 
             if not matched:
                 groups[key] = [match]
 
-    # Only return events with 2+ bookmakers
-    matched = [g for g in groups.values() if len(g) >= 2]
-    matched.sort(key=lambda x: len(x), reverse=True)
+        for key in touched:
+            group = groups[key]
+            if len(group) >= 2:
+                self._multi.add(key)
+                if self._is_arbitrage(group):
+                    self._arbs.add(key)
+                else:
+                    self._arbs.discard(key)
+
+    def matched(self) -> List[List[Dict]]:
+        """Current groups with 2+ bookmakers, largest first."""
+        matched = [g for g in self.groups.values() if len(g) >= 2]
+        matched.sort(key=lambda x: len(x), reverse=True)
+        return matched
+
+    def matched_count(self) -> int:
+        """len(matched()) without building it."""
+        return len(self._multi)
+
+    def arbitrage_candidates(self) -> int:
+        """Groups whose best 1X2 prices currently sum to under 100% implied."""
+        return len(self._arbs)
+
+    @staticmethod
+    def _is_arbitrage(group: List[Dict]) -> bool:
+        try:
+            best_home = max(float(m.get('home_odds') or 0) for m in group)
+            best_draw = max(float(m.get('draw_odds') or 0) for m in group)
+            best_away = max(float(m.get('away_odds') or 0) for m in group)
+        except (TypeError, ValueError):
+            return False
+        if best_home > 1 and best_draw > 1 and best_away > 1:
+            return 1 / best_home + 1 / best_draw + 1 / best_away < 1
+        return False
+
+
+def match_events(
+    all_matches: Dict[str, List[Dict]],
+    matcher: Optional[IncrementalEventMatcher] = None
+) -> List[List[Dict]]:
+    """Match events across bookmakers.
+
+    Pass the matcher already fed during scraping to only merge the bookmakers
+    it has not seen yet.
+    """
+    print("\nMatching events...")
+
+    if matcher is None:
+        matcher = IncrementalEventMatcher()
+    for bookie, matches in all_matches.items():
+        if bookie not in matcher.bookmakers:
+            matcher.add_bookmaker(bookie, matches)
+
+    matched = matcher.matched()
 
     print(f"  Matched {len(matched)} events across bookmakers")
 
     # Show distribution of bookmaker counts
-    from collections import Counter
     bookmaker_counts = Counter(len(g) for g in matched)
     print("  Bookmaker coverage distribution:")
     for count in sorted(bookmaker_counts.keys(), reverse=True):
@@ -1975,15 +2263,74 @@ def match_events(all_matches: Dict[str, List[Dict]]) -> List[List[Dict]]:
     return matched
 
 
-def serialize_matched_events(matched: List[List[Dict]], limit: int = 2000) -> List[Dict]:
+# A run only has a few hundred distinct league labels; the bound keeps a
+# long-lived process from growing the cache without limit.
+@lru_cache(maxsize=4096)
+def is_top_league_label(league: str) -> bool:
+    return league in LEAGUE_TEAMS or is_major_league_name(league)
+
+
+class MatchedEvent:
+    """Matched group plus the derived fields every downstream stage reads.
+
+    Built once right after matching so league picking, id building and
+    coverage checks are not repeated per consumer. Iterates/indexes like the
+    underlying list of bookmaker fixtures.
+    """
+
+    __slots__ = ('group', 'league', 'match_id', 'bookmakers', 'is_top_league', 'teams_in_league')
+
+    def __init__(self, group: List[Dict]):
+        first = group[0]
+        league = pick_league_for_group(group)
+        self.group = group
+        self.league = league
+        self.match_id = f"{first['home_team']}-{first['away_team']}-{first.get('start_time', 0)}".replace(' ', '-').lower()
+        self.bookmakers = frozenset(m.get('bookmaker') for m in group if m.get('bookmaker'))
+        self.is_top_league = is_top_league_label(league)
+        # Either team known to the league (push_to_cloudflare drops the rest)
+        self.teams_in_league = (
+            league not in LEAGUE_TEAMS
+            or is_team_in_league(first.get('home_team', ''), league)
+            or is_team_in_league(first.get('away_team', ''), league)
+        )
+
+    @property
+    def first(self) -> Dict:
+        return self.group[0]
+
+    def covers(self, required_bookies: Iterable[str]) -> bool:
+        return self.bookmakers.issuperset(required_bookies)
+
+    def __iter__(self):
+        return iter(self.group)
+
+    def __len__(self) -> int:
+        return len(self.group)
+
+    def __getitem__(self, index):
+        return self.group[index]
+
+
+def as_matched_event(group) -> MatchedEvent:
+    return group if isinstance(group, MatchedEvent) else MatchedEvent(group)
+
+
+def enrich_matched_events(matched_events: Iterable) -> List[MatchedEvent]:
+    """Wrap matched groups as MatchedEvent (already-enriched ones pass through)."""
+    return [as_matched_event(group) for group in matched_events if group]
+
+
+def serialize_matched_events(matched: List, limit: int = 2000) -> List[Dict]:
     """Convert matched groups into API/output friendly structure."""
     serialized = []
-    for e in matched[:limit]:
+    for e in enrich_matched_events(matched[:limit]):
+        first = e.first
         serialized.append({
-            'home_team': e[0]['home_team'],
-            'away_team': e[0]['away_team'],
-            'league': pick_league_for_group(e),
-            'start_time': e[0].get('start_time', 0),
+            'home_team': first['home_team'],
+            'away_team': first['away_team'],
+            'league': e.league,
+            'start_time': first.get('start_time', 0),
             'odds': [
                 {
                     'bookmaker': m['bookmaker'],
@@ -2048,22 +2395,13 @@ def push_to_postgres(all_matches: Dict[str, List[Dict]]):
             pass
 
 
-def push_to_d1(matched_events: List[List[Dict]]):
-    """Push fixtures to Cloudflare Worker D1 canonical ingest."""
-    if not CLOUDFLARE_API_KEY:
-        return
-    api_url = D1_CANONICAL_INGEST or CLOUDFLARE_WORKER_URL
-    if not api_url:
-        return
-    api_url = api_url.rstrip('/')
-    if not api_url.endswith('/api/canonical/ingest'):
-        api_url += '/api/canonical/ingest'
-
+def build_d1_fixtures(matched_events: List) -> List[Dict]:
+    """Canonical ingest rows for the D1 worker."""
     fixtures = []
-    for e in matched_events:
-        first = e[0]
+    for e in enrich_matched_events(matched_events):
+        first = e.first
         fixtures.append({
-            'fixture_id': f"{first['home_team']}-{first['away_team']}-{first.get('start_time', 0)}".replace(' ', '-').lower(),
+            'fixture_id': e.match_id,
             'league_id': None,
             'provider': 'github-scraper',
             'provider_fixture_id': f"{first.get('start_time', 0)}-{first['home_team']}-{first['away_team']}",
@@ -2076,6 +2414,21 @@ def push_to_d1(matched_events: List[List[Dict]]):
             'raw_league_id': first.get('league', ''),
             'confidence': None
         })
+    return fixtures
+
+
+def push_to_d1(matched_events: List):
+    """Push fixtures to Cloudflare Worker D1 canonical ingest."""
+    if not CLOUDFLARE_API_KEY:
+        return
+    api_url = D1_CANONICAL_INGEST or CLOUDFLARE_WORKER_URL
+    if not api_url:
+        return
+    api_url = api_url.rstrip('/')
+    if not api_url.endswith('/api/canonical/ingest'):
+        api_url += '/api/canonical/ingest'
+
+    fixtures = build_d1_fixtures(matched_events)
 
     try:
         resp = requests.post(api_url, json=fixtures, headers={'X-API-Key': CLOUDFLARE_API_KEY, 'Content-Type': 'application/json'}, timeout=30)
@@ -2099,8 +2452,54 @@ def build_odds_endpoint(base_url: str, fast: bool) -> str:
     return f"{base}/api/odds/fast" if fast else f"{base}/api/odds/update"
 
 
+def build_cloudflare_payload(matched_events: List, limit: int = 1500) -> List[Dict]:
+    """Group matched events by league (Worker expects LeagueGroup[] format)."""
+    league_groups = {}
+    filtered_count = 0
+
+    for event in enrich_matched_events(matched_events[:limit]):
+        first = event.first
+        league = event.league
+
+        # Validate teams for leagues with reference data to prevent cross-contamination
+        if not event.teams_in_league:
+            print(f"  [FILTER] Skipping non-{league} match: {first.get('home_team', '')} vs {first.get('away_team', '')}")
+            filtered_count += 1
+            continue
+
+        # Initialize league group if not exists
+        if league not in league_groups:
+            league_groups[league] = {
+                'league': league,
+                'matches': []
+            }
+
+        league_groups[league]['matches'].append({
+            'id': event.match_id,
+            'home_team': first['home_team'],
+            'away_team': first['away_team'],
+            'league': league,
+            'start_time': first.get('start_time', 0),
+            'odds': [
+                {
+                    'bookmaker': m['bookmaker'],
+                    'home_odds': m['home_odds'],
+                    'draw_odds': m['draw_odds'],
+                    'away_odds': m['away_odds']
+                }
+                for m in event
+            ]
+        })
+
+    # Print filtering stats
+    if filtered_count > 0:
+        print(f"  [FILTER] Filtered out {filtered_count} mismatched matches from major leagues")
+
+    return list(league_groups.values())
+
+
 def push_to_cloudflare(
-    matched_events: List[List[Dict]],
+    matched_events: List,
     fast: bool = False,
     run_id: Optional[str] = None,
     last_updated: Optional[str] = None
@@ -2128,66 +2527,7 @@ def push_to_cloudflare(
     print(f"  Target URL: {api_url}")
     print(f"  Events to push: {len(matched_events)}")
 
-    # Group matches by league (Worker expects LeagueGroup[] format)
-    league_groups = {}
-    filtered_count = 0
-
-    for event_group in matched_events[:1500]:  # Limit to 1500 matches
-        if not event_group:
-            continue
-
-        first = event_group[0]
-        league = pick_league_for_group(event_group)
-
-        # Validate teams for specific leagues to prevent cross-contamination
-        # Check if this league has validation data (Premier League, La Liga, Serie A, etc.)
-        if league in LEAGUE_TEAMS:
-            home_team = first.get('home_team', '')
-            away_team = first.get('away_team', '')
-
-            # Check if either team belongs to this league
-            is_home_valid = is_team_in_league(home_team, league)
-            is_away_valid = is_team_in_league(away_team, league)
-
-            if not (is_home_valid or is_away_valid):
-                # This match doesn't belong to this league - skip it
-                print(f"  [FILTER] Skipping non-{league} match: {home_team} vs {away_team}")
-                filtered_count += 1
-                continue
-
-        # Initialize league group if not exists
-        if league not in league_groups:
-            league_groups[league] = {
-                'league': league,
-                'matches': []
-            }
-
-        # Build match data
-        match_data = {
-            'id': f"{first['home_team']}-{first['away_team']}-{first.get('start_time', 0)}".replace(' ', '-').lower(),
-            'home_team': first['home_team'],
-            'away_team': first['away_team'],
-            'league': league,
-            'start_time': first.get('start_time', 0),
-            'odds': []
-        }
-
-        for m in event_group:
-            match_data['odds'].append({
-                'bookmaker': m['bookmaker'],
-                'home_odds': m['home_odds'],
-                'draw_odds': m['draw_odds'],
-                'away_odds': m['away_odds']
-            })
-
-        league_groups[league]['matches'].append(match_data)
-
-    # Print filtering stats
-    if filtered_count > 0:
-        print(f"  [FILTER] Filtered out {filtered_count} mismatched matches from major leagues")
-
-    # Convert to array format expected by Worker
-    output = list(league_groups.values())
+    output = build_cloudflare_payload(matched_events)
 
     try:
         print(f"  Sending POST request with {len(output)} leagues...")
@@ -2226,10 +2566,13 @@ def push_to_cloudflare(
 
 def main():
     parser = argparse.ArgumentParser(description="Odds scraper / matcher")
-    parser.add_argument('--from-file', help='Load raw scraped data JSON instead of scraping')
+    parser.add_argument('--from-file', help='Load raw scraped data JSON (or a raw archive directory) instead of scraping')
+    parser.add_argument('--run-id', help='Run to replay when --from-file is a raw archive (default: latest)')
     parser.add_argument('--no-push', action='store_true', help='Skip pushing to Cloudflare/D1/Postgres')
     parser.add_argument('--skip-scrape', action='store_true', help='Skip scraping (use with --from-file)')
     parser.add_argument('--fast', action='store_true', help='Use faster, lower-coverage scraping settings')
+    parser.add_argument('--pretty-json', action='store_true', default=None,
+                        help='Indent odds_data.json / raw_scraped_data.json (compact by default, or JSON_PRETTY=1)')
     args = parser.parse_args()
 
     if args.fast and not FAST_MODE:
@@ -2246,69 +2589,115 @@ def main():
         print("FAST MODE: reduced coverage for speed")
 
     all_matches = {}
+    matcher = None
     elapsed = 0.0
+    scraper_status: Dict[str, Dict[str, object]] = {}
 
     if args.from_file:
         print(f"Loading raw data from {args.from_file} ...")
-        with open(args.from_file, 'r', encoding='utf-8') as f:
-            all_matches = json.load(f)
+        if os.path.isdir(args.from_file):
+            raw = RawArchive(args.from_file).load_run(args.run_id)
+        else:
+            raw = jsoncodec.load(args.from_file)
+        all_matches = {
+            bookie: [FixtureOdds.from_dict(m) for m in matches]
+            for bookie, matches in raw.items()
+        }
     elif not args.skip_scrape:
         scrapers = {
             'SportyBet Ghana': scrape_sportybet,
             '1xBet Ghana': scrape_1xbet,
             'Betway Ghana': scrape_betway,
             'SoccaBet Ghana': scrape_soccabet,
-            '22Bet Ghana': scrape_22bet_ghana,  # Updated platform API scraper
+            '22Bet Ghana': scrape_22bet,  # live websocket board, REST platform API fallback
             'Betfox Ghana': scrape_betfox,  # WORKING - Using V4 API (100+ fixtures from upcoming + live)
             'Pinnacle': lambda: scrape_pinnacle(max_matches=PINNACLE_MAX_MATCHES),
             'Betfair Exchange': scrape_betfair_exchange,
         }
 
+        # Every scraper shares one cycle deadline; each also gets its own
+        # budget so a slow bookmaker cannot starve the rest of the cycle.
+        cycle_deadline = start_time + SCRAPE_DEADLINE_SECONDS
+
         def timed_scraper(name, fn, max_retries=2, retry_delay=3):
             started = time.time()
+            budget = min(scraper_budget(name), cycle_deadline - started)
+            if budget <= 0:
+                print(f"  [{name}] skipped: no time left in the scrape cycle")
+                return [], 0.0, "skipped", "no time left in scrape cycle"
+            set_deadline(name, started + budget)
             last_error = None
-            for attempt in range(1, max_retries + 1):
-                try:
-                    matches = fn() or []
-                    if matches:
-                        duration = time.time() - started
-                        print(f"  [{name}] {len(matches)} matches in {duration:.1f}s")
-                        return matches, duration, "ok", None
-                    # Empty result on first attempt - retry in case of transient issue
-                    if attempt < max_retries:
-                        print(f"  [{name}] empty on attempt {attempt}, retrying in {retry_delay}s...")
-                        time.sleep(retry_delay)
-                except Exception as e:
-                    last_error = str(e)
-                    if attempt < max_retries:
-                        print(f"  [{name}] error on attempt {attempt}: {e}, retrying in {retry_delay}s...")
-                        time.sleep(retry_delay)
-                    else:
-                        print(f"  [{name}] failed after {max_retries} attempts: {e}")
+            try:
+                for attempt in range(1, max_retries + 1):
+                    try:
+                        matches = fn() or []
+                        if matches:
+                            duration = time.time() - started
+                            truncated = pop_truncation(name)
+                            print(f"  [{name}] {len(matches)} matches in {duration:.1f}s")
+                            if truncated:
+                                return matches, duration, "partial", truncated
+                            return matches, duration, "ok", None
+                    except Exception as e:
+                        last_error = str(e)
+                        print(f"  [{name}] error on attempt {attempt}: {e}")
+                    if attempt >= max_retries:
+                        break
+                    # Only retry a transient failure if the budget still allows it
+                    if (time_left(name) or 0) <= retry_delay:
+                        print(f"  [{name}] no budget left for a retry")
+                        break
+                    print(f"  [{name}] attempt {attempt} returned nothing, retrying in {retry_delay}s...")
+                    time.sleep(retry_delay)
+            finally:
+                clear_deadline(name)
             duration = time.time() - started
             return [], duration, "empty" if not last_error else "error", last_error
 
-        print("\nRunning ALL scrapers in parallel...")
-        scraper_status: Dict[str, Dict[str, Optional[str]]] = {
-            name: {"status": "pending", "error": None} for name in scrapers.keys()
+        print(f"\nRunning ALL scrapers in parallel (deadline {SCRAPE_DEADLINE_SECONDS}s)...")
+        scraper_status = {
+            name: {"status": "pending", "error": None, "budget_seconds": scraper_budget(name)}
+            for name in scrapers.keys()
         }
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            future_to_bookie = {
-                executor.submit(timed_scraper, bookie, scraper): bookie
-                for bookie, scraper in scrapers.items()
-            }
-            for future in as_completed(future_to_bookie):
+        # Merge each bookmaker into the match index as soon as its scraper
+        # finishes, so matching overlaps with the slower scrapers.
+        matcher = IncrementalEventMatcher()
+        # Daemon threads rather than an executor: a scraper that overruns the
+        # hard stop must not keep the process alive after we publish.
+        slots = threading.BoundedSemaphore(6)
+        future_to_bookie = {
+            submit_daemon(timed_scraper, bookie, scraper, slots=slots, name=f"scraper-{bookie}"): bookie
+            for bookie, scraper in scrapers.items()
+        }
+        hard_stop = cycle_deadline + SCRAPE_DEADLINE_GRACE_SECONDS
+        try:
+            for future in as_completed(future_to_bookie, timeout=max(0.0, hard_stop - time.time())):
                 bookie = future_to_bookie[future]
                 try:
                     matches, duration, status, detail = future.result()
                     scraper_status[bookie]["status"] = status
                     scraper_status[bookie]["error"] = detail
+                    scraper_status[bookie]["duration_seconds"] = round(duration, 1)
                     if matches:
                         all_matches[bookie] = matches
+                        matcher.add_bookmaker(bookie, matches)
+                        print(
+                            f"  [MATCH] merged {bookie} at {time.time() - start_time:.1f}s: "
+                            f"{matcher.matched_count()} groups, {matcher.arbitrage_candidates()} arb candidates"
+                        )
                 except Exception as e:
                     scraper_status[bookie]["status"] = "error"
                     scraper_status[bookie]["error"] = str(e)
                     print(f"  {bookie} failed: {e}")
+        except FuturesTimeout:
+            # Publish what we have; stragglers keep running on their daemon
+            # threads until exit but their results are dropped.
+            for future, bookie in future_to_bookie.items():
+                if not future.done():
+                    future.cancel()
+                    scraper_status[bookie]["status"] = "timeout"
+                    scraper_status[bookie]["error"] = f"no result within {SCRAPE_DEADLINE_SECONDS}s deadline"
+                    print(f"  [{bookie}] timed out, continuing without it")
 
         elapsed = time.time() - start_time
         total = sum(len(m) for m in all_matches.values())
@@ -2317,22 +2706,28 @@ def main():
         print(f"Total scraped: {total} matches from {len(all_matches)} bookmakers")
         for bookie, matches in all_matches.items():
             print(f"  - {bookie}: {len(matches)} matches")
+        for host, counters in HOST_LIMITER.stats().items():
+            if counters['throttled'] or counters['server_errors'] or counters['waited_seconds'] >= 1:
+                print(
+                    f"  [RATE] {host}: {counters['requests']} requests, {counters['throttled']} throttled, "
+                    f"{counters['server_errors']} 5xx, waited {counters['waited_seconds']}s"
+                )
         print(f"{'=' * 60}")
 
         missing_expected = [
             b for b in EXPECTED_BOOKMAKERS
-            if scraper_status.get(b, {}).get("status") in ("empty", "error", "skipped", "pending")
+            if scraper_status.get(b, {}).get("status") in ("empty", "error", "skipped", "pending", "timeout")
         ]
         missing_optional = [
             b for b in OPTIONAL_BOOKMAKERS
-            if scraper_status.get(b, {}).get("status") in ("empty", "error", "skipped", "pending")
+            if scraper_status.get(b, {}).get("status") in ("empty", "error", "skipped", "pending", "timeout")
         ]
         if missing_expected:
             print(f"  [WARN] Expected bookmakers missing or empty: {', '.join(missing_expected)}")
         if missing_optional:
             print(f"  [INFO] Optional bookmakers missing or empty: {', '.join(missing_optional)}")
         for bookie, status_info in scraper_status.items():
-            if status_info.get("status") in ("error", "skipped") and status_info.get("error"):
+            if status_info.get("status") in ("error", "skipped", "partial", "timeout") and status_info.get("error"):
                 print(f"  [INFO] {bookie} status: {status_info['status']} ({status_info['error']})")
 
         if not all_matches:
@@ -2342,8 +2737,7 @@ def main():
         raw_data_file = 'raw_scraped_data.json'
         print(f"\nSaving raw scraped data to {raw_data_file}...")
         try:
-            with open(raw_data_file, 'w', encoding='utf-8') as f:
-                json.dump(all_matches, f, indent=2, ensure_ascii=False)
+            jsoncodec.dump(all_matches, raw_data_file, pretty=args.pretty_json, default=fixture_json_default)
             print(f"  [OK] Saved {total} matches from {len(all_matches)} bookmakers")
         except Exception as e:
             print(f"  [WARNING] Failed to save raw data: {e}")
@@ -2351,7 +2745,7 @@ def main():
         print("No data source provided (use --from-file or run scrape). Exiting.")
         return
 
-    matched = match_events(all_matches)
+    matched = enrich_matched_events(match_events(all_matches, matcher=matcher))
     if REQUIRE_FULL_TOP_LEAGUE_COVERAGE:
         required_targets = EXPECTED_BOOKMAKERS if REQUIRE_ALL_EXPECTED_BOOKIES else REQUIRED_COVERAGE_BOOKMAKERS
         missing_required = [b for b in required_targets if b not in all_matches]
@@ -2364,7 +2758,7 @@ def main():
         matched = filter_top_league_full_coverage(matched, required_bookies)
 
     if ALLOW_SINGLE_BOOKIE_MAJORS and not REQUIRE_FULL_TOP_LEAGUE_COVERAGE:
-        matched = add_single_bookie_major_league_matches(all_matches, matched)
+        matched = enrich_matched_events(add_single_bookie_major_league_matches(all_matches, matched))
 
     if not matched:
         print("No matched events - exiting")
@@ -2382,8 +2776,7 @@ def main():
         'matches': serialize_matched_events(matched)
     }
 
-    with open('odds_data.json', 'w') as f:
-        json.dump(output, f, indent=2)
+    jsoncodec.dump(output, 'odds_data.json', pretty=args.pretty_json)
     print(f"\nSaved to odds_data.json")
     heartbeat = {
         "last_updated": output.get("last_updated"),
@@ -2393,9 +2786,16 @@ def main():
         "bookmakers": list(all_matches.keys()),
         "created_at": datetime.now().isoformat(),
     }
+    if scraper_status:
+        heartbeat["scrapers"] = scraper_status
+    host_stats = HOST_LIMITER.stats()
+    if host_stats:
+        heartbeat["hosts"] = host_stats
+    pagination = pagination_report()
+    if pagination:
+        heartbeat["pagination"] = pagination
     try:
-        with open("odds_heartbeat.json", "w", encoding="utf-8") as f:
-            json.dump(heartbeat, f, indent=2)
+        jsoncodec.dump(heartbeat, "odds_heartbeat.json", pretty=args.pretty_json)
         print("Saved to odds_heartbeat.json")
     except Exception as e:
         print(f"[WARN] Failed to write odds_heartbeat.json: {e}")
@@ -2403,7 +2803,8 @@ def main():
         save_history_snapshot(output, all_matches)
         print(f"[HISTORY] Appended snapshot to {resolve_history_path(HISTORY_MATCHED_FILE)}")
         if SAVE_RAW_HISTORY:
-            print(f"[HISTORY] Appended raw snapshot to {resolve_history_path(HISTORY_RAW_FILE)}")
+            raw_target = HISTORY_RAW_FILE if RAW_HISTORY_FORMAT == 'jsonl' else RAW_ARCHIVE_DIR
+            print(f"[HISTORY] Appended raw snapshot to {resolve_history_path(raw_target)}")
         if SAVE_HISTORY_DB:
             print(f"[HISTORY] Stored snapshot in {resolve_history_path(HISTORY_DB_PATH)}")
     except Exception as e:
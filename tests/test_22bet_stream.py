@@ -0,0 +1,196 @@
+import concurrent.futures
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import scrape_odds_github as scraper
+from backend.scrapers import twentytwobet_stream as stream
+from backend.scrapers.records import FixtureOdds
+from tools.centrifugo_standin import CentrifugoStandIn, event_delta
+
+
+def _wait_for(condition, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _fixture(event_id, home_odds=2.0):
+    return FixtureOdds("22Bet Ghana", f"Home {event_id}", f"Away {event_id}", home_odds, 3.3, 3.6,
+                       league="England. Premier League", event_id=event_id)
+
+
+class TestEventBoard(unittest.TestCase):
+    def test_deltas_upsert_suspend_and_remove(self):
+        board = stream.EventBoard()
+        board.reset([_fixture(1), _fixture(2)], epoch="e1", offset=4)
+
+        self.assertTrue(board.apply(event_delta(1, 2.5, 3.3, 3.0), offset=5))
+        suspended = event_delta(2, 2.0, 3.3, 3.6)
+        suspended["relations"]["odds"] = {}
+        self.assertTrue(board.apply(suspended, offset=6))
+        self.assertTrue(board.apply({"items": [], "removed": [1]}, offset=7))
+        self.assertEqual(len(board), 0)
+        self.assertEqual(board.offset, 7)
+
+    def test_old_offsets_are_ignored_and_gaps_reported(self):
+        board = stream.EventBoard()
+        board.reset([_fixture(1)], epoch="e1", offset=4)
+
+        self.assertTrue(board.apply(event_delta(1, 9.0, 3.3, 3.0), offset=4))
+        self.assertEqual(board.fixtures()[0]["home_odds"], 2.0)
+        self.assertFalse(board.apply(event_delta(1, 2.5, 3.3, 3.0), offset=7))
+        self.assertEqual(board.offset, 4)
+
+    def test_board_file_round_trip_and_staleness(self):
+        board = stream.EventBoard()
+        board.reset([_fixture(1), _fixture(2)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.json")
+            board.save(path)
+            loaded = stream.load_board(path, max_age=60)
+            self.assertEqual(sorted(m["event_id"] for m in loaded), [1, 2])
+            self.assertIsNone(stream.load_board(path, max_age=-1))
+            self.assertIsNone(stream.load_board(os.path.join(tmp, "missing.json")))
+
+    def test_kicked_off_events_leave_the_board(self):
+        board = stream.EventBoard()
+        started, upcoming = _fixture(1), _fixture(2)
+        started.start_time = int(time.time()) - 60
+        upcoming.start_time = int(time.time()) + 3600
+        board.reset([started, upcoming, _fixture(3)])
+        self.assertEqual(sorted(m["event_id"] for m in board.fixtures()), [2, 3])
+        self.assertEqual(len(board), 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.json")
+            board.save(path)
+            with mock.patch.object(stream.time, "time", return_value=upcoming.start_time + 1):
+                self.assertEqual([m["event_id"] for m in stream.load_board(path, max_age=1e9)], [3])
+
+    def test_malformed_board_files_are_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.json")
+            for text in ('[1, 2]', '{"updated_at": "soon"}', '{"updated_at": %f, "fixtures": [1]}' % time.time(),
+                         '{"updated_at": %f, "fixtures": {"a": 1}}' % time.time()):
+                with open(path, "w") as handle:
+                    handle.write(text)
+                self.assertIsNone(stream.load_board(path), text)
+            with mock.patch.object(scraper, "TWENTYTWOBET_BOARD_FILE", path), \
+                    mock.patch.object(scraper, "scrape_22bet_ghana", return_value=[]) as rest:
+                scraper.scrape_22bet()
+                rest.assert_called_once()
+
+
+class TestResyncReplay(unittest.TestCase):
+    def test_publications_older_than_snapshot_are_dropped(self):
+        client = stream.TwentyTwoBetStream(resync=lambda: [])
+        task = concurrent.futures.Future()
+        task.set_result([_fixture(1), _fixture(2)])
+        task.position = ("e1", 5)
+        pending = [
+            {"offset": 4, "data": event_delta(1, 9.0, 3.3, 3.0)},
+            {"offset": 5, "data": {"items": [], "removed": [2]}},
+            {"offset": 6, "data": event_delta(3, 1.9, 3.4, 4.1)},
+        ]
+        client._finish_resync(task, pending)
+        odds = {m["event_id"]: m["home_odds"] for m in client.board.fixtures()}
+        self.assertEqual(odds, {1: 2.0, 2: 2.0, 3: 1.9})
+        self.assertEqual(client.board.offset, 6)
+
+
+class TestStreamAgainstStandIn(unittest.TestCase):
+    def setUp(self):
+        self.standin = CentrifugoStandIn().start()
+        self.resyncs = 0
+        self.lock = threading.Lock()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.board_file = os.path.join(self.tmp.name, "board.json")
+
+    def tearDown(self):
+        self.client.stop()
+        self.standin.stop()
+        self.tmp.cleanup()
+
+    def _resync(self):
+        with self.lock:
+            self.resyncs += 1
+        return [_fixture(1), _fixture(2)]
+
+    def _home_odds(self, event_id):
+        for match in self.client.board.fixtures():
+            if match["event_id"] == event_id:
+                return match["home_odds"]
+        return None
+
+    def test_deltas_reconnect_recovery_and_gap_resync(self):
+        with mock.patch.object(stream, "BOARD_FLUSH_SECONDS", 0):
+            self.client = stream.TwentyTwoBetStream(self.standin.url, self.standin.channel,
+                                                    resync=self._resync, board_file=self.board_file).start()
+            self.assertTrue(_wait_for(lambda: len(self.client.board) == 2))
+            self.assertEqual(self.resyncs, 1)
+
+            self.standin.publish(event_delta(1, 2.5, 3.3, 3.0))
+            self.standin.publish(event_delta(3, 1.9, 3.4, 4.1))
+            self.assertTrue(_wait_for(lambda: self._home_odds(3) == 1.9))
+            self.assertEqual(self._home_odds(1), 2.5)
+
+            # Publications missed while disconnected come back from channel history
+            self.standin.drop_clients()
+            self.assertTrue(_wait_for(lambda: self.standin.counts["connections"] == 2))
+            self.standin.publish(event_delta(2, 1.7, 3.5, 4.5))
+            self.assertTrue(_wait_for(lambda: self._home_odds(2) == 1.7))
+            self.assertEqual(self.resyncs, 1)
+            self.assertEqual(self.standin.counts["recovered"], 1)
+
+            # A skipped offset forces a REST resync; the triggering delta is kept
+            self.standin.publish(event_delta(4, 3.1, 3.2, 2.2), skip=2)
+            self.assertTrue(_wait_for(lambda: self.resyncs == 2 and self._home_odds(4) == 3.1))
+            self.assertEqual(self._home_odds(2), 2.0)
+            self.assertEqual(self.client.board.offset, self.standin.offset)
+
+            self.assertTrue(_wait_for(lambda: len(stream.load_board(self.board_file) or []) == 3))
+
+    def test_quiet_feed_keeps_board_fresh(self):
+        self.standin.stop()
+        self.standin = CentrifugoStandIn(ping_seconds=0.1).start()
+        with mock.patch.object(stream, "BOARD_MAX_AGE", 0.6), mock.patch.object(stream, "BOARD_FLUSH_SECONDS", 0):
+            self.client = stream.TwentyTwoBetStream(self.standin.url, self.standin.channel,
+                                                    resync=self._resync, board_file=self.board_file).start()
+            self.assertTrue(_wait_for(lambda: len(self.client.board) == 2))
+            time.sleep(1.2)
+            self.assertIsNotNone(stream.load_board(self.board_file, max_age=0.6))
+        self.assertEqual(self.client.board.publications, 0)
+
+    def test_new_epoch_forces_resync(self):
+        self.client = stream.TwentyTwoBetStream(self.standin.url, self.standin.channel, resync=self._resync).start()
+        self.assertTrue(_wait_for(lambda: len(self.client.board) == 2))
+        self.standin.new_epoch()
+        self.standin.drop_clients()
+        self.assertTrue(_wait_for(lambda: self.resyncs == 2 and self.client.board.epoch == "e2"))
+
+
+class TestScrapeUsesBoard(unittest.TestCase):
+    def test_fresh_board_skips_rest(self):
+        board = stream.EventBoard()
+        board.reset([_fixture(1)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.json")
+            board.save(path)
+            with mock.patch.object(scraper, "TWENTYTWOBET_BOARD_FILE", path), \
+                    mock.patch.object(scraper, "scrape_22bet_ghana", side_effect=AssertionError("REST used")):
+                self.assertEqual([m["event_id"] for m in scraper.scrape_22bet()], [1])
+            with mock.patch.object(scraper, "TWENTYTWOBET_BOARD_FILE", os.path.join(tmp, "none.json")), \
+                    mock.patch.object(scraper, "scrape_22bet_ghana", return_value=[]) as rest:
+                scraper.scrape_22bet()
+                rest.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from tools import arb_backtest, arb_lab, bench_history_db, frame_cache
+
+BOOKIES = ["Betway Ghana", "SportyBet Ghana", "1xBet Ghana"]
+
+
+class TestArbBacktestGrid(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.cache_dir = os.path.join(self.tmp.name, "frame_cache")
+        # 12 runs six hours apart: three days, with naive stamps like the scraper writes
+        for payload in bench_history_db.synthetic_payloads(12, 30, interval_minutes=360):
+            arb_lab.append_snapshot_to_history_db(dict(payload, last_updated=payload["last_updated"][:-6]), self.db)
+        self.rows = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        self.grid = {
+            "strategy": "arb",
+            "bankroll": 100.0,
+            "thresholds": [-0.02, 0.0, 0.01],
+            "slippages": [0.0, 0.01],
+            "bookmaker_sets": [None, BOOKIES],
+            "league_sets": [None],
+        }
+
+    def run_main(self, *argv):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return arb_backtest.main(["--db", self.db, "--cache-dir", self.cache_dir, *argv])
+
+    def test_grid_points(self):
+        results = arb_backtest.evaluate_grid(self.rows, workers=1, **self.grid)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(set(results["bookmakers"]), {"all", ",".join(BOOKIES)})
+
+        arbs, _ = arb_lab.compute_arbitrage_opportunities(self.rows, bankroll=100.0, min_roi=-0.02)
+        adjusted = arb_lab.add_slippage_adjustment(arbs, 0.01)
+        expected = adjusted[adjusted["arb_roi_adj"] >= 0.0]
+        self.assertFalse(expected.empty)
+        point = results[
+            (results["bookmakers"] == "all") & (results["slippage"] == 0.01) & (results["threshold"] == 0.0)
+        ].iloc[0]
+        self.assertEqual(point["count"], len(expected))
+        self.assertEqual(point["matches"], expected["match_id"].nunique())
+        self.assertAlmostEqual(point["profit"], 100.0 * expected["arb_roi_adj"].sum())
+        daily, _ = arb_lab.simulate_daily_compounding(adjusted, 100.0, min_roi=0.0, **arb_backtest.COMPOUNDING)
+        self.assertAlmostEqual(point["compound_final_bankroll"], daily["bankroll_end"].iloc[-1])
+
+        pooled = arb_backtest.evaluate_grid(self.rows, workers=2, **self.grid)
+        pd.testing.assert_frame_equal(pooled, results)
+
+        edges = arb_backtest.evaluate_grid(self.rows, workers=1, **dict(self.grid, strategy="edge"))
+        self.assertEqual(len(edges), 12)
+        self.assertNotIn("compound_final_bankroll", edges.columns)
+        self.assertTrue((edges.groupby("threshold")["count"].max() > 0).all())
+
+    def test_walk_forward(self):
+        folds = arb_backtest.walk_forward(self.rows, train_days=1, test_days=1, workers=1, **self.grid)
+        self.assertEqual(folds["test_start"].tolist(), ["2026-01-02", "2026-01-03"])
+        self.assertEqual(folds["train_end"].tolist(), ["2026-01-01", "2026-01-02"])
+
+        last = folds.iloc[-1]
+        test_rows = self.rows[self.rows["run_time"] >= pd.Timestamp("2026-01-03", tz="UTC")]
+        expected = arb_backtest.evaluate_grid(test_rows, workers=1, **dict(
+            self.grid,
+            thresholds=[last["threshold"]],
+            slippages=[last["slippage"]],
+            bookmaker_sets=[arb_backtest._name_set(last["bookmakers"])],
+        )).iloc[0]
+        for col in ("count", "matches", "profit", "compound_final_bankroll"):
+            self.assertAlmostEqual(last[f"test_{col}"], expected[col])
+        self.assertTrue(arb_backtest.walk_forward(self.rows, train_days=5, **self.grid).empty)
+
+        naive = self.rows.assign(run_time=self.rows["run_time"].dt.tz_localize(None))
+        pd.testing.assert_frame_equal(
+            arb_backtest.walk_forward(naive, train_days=1, test_days=1, workers=1, **self.grid), folds
+        )
+
+    def test_cli(self):
+        output = os.path.join(self.tmp.name, "sweep.csv")
+        self.assertEqual(self.run_main(
+            "--sweep", "--thresholds", "0", "0.01", "--slippage", "0", "0.02",
+            "--bookmaker-sets", "all", ",".join(BOOKIES), "--workers", "1", "--output-csv", output,
+        ), 0)
+        ranked = pd.read_csv(output)
+        self.assertEqual(ranked["rank"].tolist(), list(range(1, 9)))
+        self.assertTrue(ranked["profit"].is_monotonic_decreasing)
+
+        output = os.path.join(self.tmp.name, "folds.json")
+        argv = ["--walk-forward", "--train-days", "1", "--workers", "1", "--output-json", output]
+        self.assertEqual(self.run_main(*argv), 0)
+        self.assertEqual(len(pd.read_json(output)), 2)
+        if frame_cache.available():
+            # one cached entry per run day, next to the sweep's
+            self.assertEqual(len(os.listdir(self.cache_dir)), 4)
+        self.assertEqual(self.run_main(*argv, "--strategy", "edge", "--rank-by", "compound_total_return"), 1)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            self.run_main(*argv, "--max-rows", "1000")
+
+
+if __name__ == "__main__":
+    unittest.main()
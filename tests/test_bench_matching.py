@@ -0,0 +1,38 @@
+import unittest
+
+from tools.bench_matching import score_groups
+
+
+def _fx(bookmaker, event_id):
+    return {"bookmaker": bookmaker, "event_id": event_id}
+
+
+class TestMatchingBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.labels = {
+            "A|1": {"group": "g1", "league": "Premier League"},
+            "B|1": {"group": "g1", "league": "Premier League"},
+            "C|1": {"group": "g1", "league": "Premier League"},
+            "B|9": {"group": None, "league": "Other"},
+        }
+
+    def test_perfect_grouping(self):
+        groups = [[_fx("A", "1"), _fx("B", "1"), _fx("C", "1")]]
+        stats = score_groups(groups, self.labels)
+        self.assertEqual(stats["precision"], 1.0)
+        self.assertEqual(stats["recall"], 1.0)
+        self.assertEqual(stats["exact_groups"], 1)
+        self.assertEqual(stats["cross_league_merges"], 0)
+
+    def test_trap_merge_counts_as_cross_league(self):
+        groups = [[_fx("A", "1"), _fx("B", "9")], [_fx("B", "1"), _fx("C", "1")]]
+        stats = score_groups(groups, self.labels)
+        self.assertEqual(stats["true_pairs"], 1)
+        self.assertEqual(stats["predicted_pairs"], 2)
+        self.assertAlmostEqual(stats["recall"], 1 / 3, places=3)
+        self.assertEqual(stats["cross_league_merges"], 1)
+        self.assertEqual(stats["trap_merges"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import scrape_odds_github as scraper
+from backend.core import history_db
+from tools import arb_lab, backfill_best_lines, bench_history_db, compact_history
+
+KEYS = ["run_id", "match_id"]
+
+
+def awkward_payloads(runs: int, fixtures: int):
+    """Synthetic snapshots with flipped home/away lines, tied prices and missing outcomes."""
+    for payload in bench_history_db.synthetic_payloads(runs, fixtures):
+        for i, match in enumerate(payload["matches"]):
+            odds = match["odds"]
+            if i % 7 == 0:
+                odds[0]["home_odds"], odds[0]["away_odds"] = odds[0]["away_odds"] + 1, odds[0]["home_odds"]
+            if i % 5 == 0 and len(odds) > 1:
+                odds[1]["draw_odds"] = odds[0]["draw_odds"]
+            if i % 11 == 0:
+                odds[-1]["away_odds"] = 0
+        yield payload
+
+
+def by_key(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_values(KEYS).reset_index(drop=True)
+
+
+class TestBestLines(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.payloads = list(awkward_payloads(12, 30))
+        for payload in self.payloads:
+            arb_lab.append_snapshot_to_history_db(payload, self.db)
+
+    def test_materialized_tables_match_recomputed(self):
+        window = {"run_start": self.payloads[3]["last_updated"], "run_end": self.payloads[9]["last_updated"]}
+        rows = arb_lab.load_snapshot_rows(self.db, **window)
+        expected = arb_lab.build_best_lines(rows)
+        lines = arb_lab.load_best_lines(self.db, **window)
+        self.assertEqual(list(lines.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(by_key(lines), by_key(expected), check_dtype=False)
+
+        for min_roi in (0.0, 0.02, -0.05):
+            arbs, matches = arb_lab.compute_arbitrage_opportunities(rows, bankroll=500, min_roi=min_roi)
+            read_arbs, read_matches = arb_lab.load_arbitrage_opportunities(self.db, bankroll=500, min_roi=min_roi,
+                                                                           **window)
+            pd.testing.assert_frame_equal(by_key(read_arbs), by_key(arbs), check_dtype=False)
+            pd.testing.assert_frame_equal(by_key(read_matches), by_key(matches), check_dtype=False)
+
+        league = rows["league"].iloc[0]
+        some = rows[rows["match_id"].isin(rows["match_id"].unique()[:5])]
+        narrowed = arb_lab.load_best_lines(self.db, include_leagues=[league], keys=some, **window)
+        expected = arb_lab.build_best_lines(some, include_leagues=[league])
+        pd.testing.assert_frame_equal(by_key(narrowed), by_key(expected), check_dtype=False)
+
+    def test_exact_ties_break_by_bookmaker_name(self):
+        path = os.path.join(self.tmp.name, "ties.db")
+        for n, payload in enumerate(bench_history_db.synthetic_payloads(2, 10)):
+            for match in payload["matches"]:
+                for line in match["odds"]:
+                    line.update(home_odds=2.5, draw_odds=3.2, away_odds=2.9)
+                if n:
+                    match["odds"].reverse()
+            arb_lab.append_snapshot_to_history_db(payload, path)
+        rows = arb_lab.load_snapshot_rows(path)
+        expected = arb_lab.build_best_lines(rows)
+        pd.testing.assert_frame_equal(by_key(arb_lab.load_best_lines(path)), by_key(expected), check_dtype=False)
+        first_name = rows.groupby(KEYS)["bookmaker"].min().rename("first").reset_index()
+        picked = expected.merge(first_name, on=KEYS)
+        for col in ("best_home_bookie", "best_draw_bookie", "best_away_bookie"):
+            self.assertEqual(picked[col].tolist(), picked["first"].tolist())
+
+    def test_backfill_after_migration(self):
+        v1_path = os.path.join(self.tmp.name, "v1.db")
+        bench_history_db.build_v1_db(v1_path, runs=6, fixtures=15)
+        self.assertIsNone(arb_lab.load_best_lines(v1_path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(backfill_best_lines.main(["--db", v1_path]), 0)
+        expected = arb_lab.build_best_lines(arb_lab.load_snapshot_rows(v1_path))
+        pd.testing.assert_frame_equal(by_key(arb_lab.load_best_lines(v1_path)), by_key(expected), check_dtype=False)
+
+    def test_compaction_keeps_materialized_lines(self):
+        before = arb_lab.load_best_lines(self.db)
+        conn = sqlite3.connect(self.db)
+        conn.execute("UPDATE runs SET best_lines_version = 0")
+        conn.commit()
+        conn.close()
+        now = history_db.iso_to_epoch(self.payloads[-1]["last_updated"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            compact_history.main(["--db", self.db, "--jsonl", "", "--tiers", "1h:changes",
+                                  "--now", pd.Timestamp(now, unit="s", tz="UTC").isoformat()])
+            self.assertIsNone(arb_lab.load_best_lines(self.db))  # runs too young to compact
+            backfill_best_lines.main(["--db", self.db])
+        pd.testing.assert_frame_equal(by_key(arb_lab.load_best_lines(self.db)), by_key(before))
+
+    def test_scraper_writes_tables(self):
+        path = os.path.join(self.tmp.name, "scraper.db")
+        with mock.patch.object(scraper, "HISTORY_DB_PATH", path):
+            scraper.save_history_sqlite(self.payloads[0])
+        conn = sqlite3.connect(path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM best_lines").fetchone()[0], 30)
+        self.assertEqual(conn.execute("SELECT best_lines_version FROM runs").fetchone()[0],
+                         history_db.BEST_LINES_VERSION)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.scrapers import betfair_exchange as betfair, deadline
+from tools.betfair_standin import API_PREFIX, start_standin
+
+
+class TestBetfairExchangeStandIn(unittest.TestCase):
+    def setUp(self):
+        self.server, self.state = start_standin(events=230, latency=0.05, max_rps=25)
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(betfair, "BETFAIR_IDENTITY_URL", f"{base}/api"),
+            mock.patch.object(betfair, "BETFAIR_API_URL", f"{base}{API_PREFIX.rstrip('/')}"),
+            mock.patch.object(betfair, "BETFAIR_TOKEN_CACHE", os.path.join(self.cache_dir.name, "session.json")),
+            mock.patch.dict(os.environ, {"BETFAIR_USERNAME": "demo", "BETFAIR_PASSWORD": "demo", "BETFAIR_APP_KEY": "key"}),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_dir.cleanup()
+
+    def _scrape(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return betfair.scrape_betfair_exchange(max_matches=1200)
+
+    def test_scrape_reuses_cached_session(self):
+        first = self._scrape()
+        second = self._scrape()
+        self.assertEqual(len(first), 230)
+        self.assertEqual(len(second), 230)
+        self.assertEqual(self.state.counts["login"], 1)
+        self.assertEqual(self.state.counts["keepAlive"], 1)
+        self.assertEqual(self.state.counts["throttled"], 0)
+        # Catalogue and book batches overlap instead of running one by one
+        self.assertGreater(self.state.peak_in_flight, 1)
+
+    def test_expired_cached_session_logs_in_again(self):
+        self._scrape()
+        self.state.tokens.clear()
+        results = self._scrape()
+        self.assertEqual(len(results), 230)
+        self.assertEqual(self.state.counts["login"], 2)
+
+    def _expire_before_books(self, password=None):
+        fetch_books = betfair._get_market_books
+
+        def expire_then_fetch(auth, market_ids):
+            self.state.tokens.clear()
+            if password:
+                auth.password = password
+            return fetch_books(auth, market_ids)
+
+        return mock.patch.object(betfair, "_get_market_books", expire_then_fetch)
+
+    def test_session_rejected_mid_scrape_logs_in_once(self):
+        with self._expire_before_books():
+            results = self._scrape()
+        self.assertEqual(len(results), 230)
+        self.assertEqual(self.state.counts["login"], 2)
+
+    def test_failed_relogin_keeps_scrape_alive(self):
+        with self._expire_before_books(password="wrong"):
+            results = self._scrape()
+        self.assertEqual(results, [])
+        self.assertEqual(self.state.counts["login"], 2)
+        self.assertEqual(deadline.pop_truncation(betfair.BOOKMAKER), "session lost and re-login failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from tools import arb_lab, bench_history_db, frame_cache
+
+KEYS = ["run_id", "match_id"]
+
+
+def plain(frame: pd.DataFrame, keys=KEYS) -> pd.DataFrame:
+    """Categories as strings, epochs as run times, rows in key order: comparable across modes."""
+    frame = frame.copy()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(str)
+    frame = frame.drop(columns=["last_updated", "run_time"], errors="ignore")
+    return frame.sort_values(keys).reset_index(drop=True)
+
+
+class TestCompactFrames(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.jsonl = os.path.join(self.tmp.name, "odds_history.jsonl")
+        self.payloads = list(bench_history_db.synthetic_payloads(10, 30))
+        for payload in self.payloads:
+            arb_lab.append_snapshot_to_history_db(payload, self.db)
+            arb_lab.append_snapshot_to_history_jsonl(payload, self.jsonl)
+        self.rows = arb_lab.load_snapshot_rows(self.db)
+        self.compact = arb_lab.load_snapshot_rows(self.db, compact=True)
+
+    def test_dtypes_and_memory(self):
+        for rows in (self.compact, arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, compact=True)):
+            for col in arb_lab.COMPACT_CATEGORIES:
+                self.assertIsInstance(rows[col].dtype, pd.CategoricalDtype, col)
+            for col in arb_lab.ODDS_COLUMNS:
+                self.assertEqual(rows[col].dtype, "float32")
+            self.assertEqual(rows["last_updated"].dtype, "int64")
+            self.assertEqual(rows["start_time"].dtype, "int64")
+        self.assertEqual(len(self.compact), len(self.rows))
+        self.assertLess(self.compact.memory_usage(deep=True).sum(), self.rows.memory_usage(deep=True).sum() / 2)
+        prepared = arb_lab.prepare_odds_frame(self.compact)
+        expected = arb_lab.prepare_odds_frame(self.rows)
+        self.assertTrue((prepared["run_time"].sort_values().to_numpy() == pd.to_datetime(
+            expected["run_time"], utc=True).sort_values().to_numpy()).all())
+
+    def test_results_match_regular_frames(self):
+        pd.testing.assert_frame_equal(
+            plain(arb_lab.build_best_lines(self.compact)),
+            plain(arb_lab.build_best_lines(self.rows)),
+            check_dtype=False,
+            check_exact=False,
+            rtol=1e-5,
+            atol=1e-5,
+        )
+        compact_arbs, _ = arb_lab.compute_arbitrage_opportunities(self.compact, bankroll=100.0, min_roi=-0.2)
+        arbs, _ = arb_lab.compute_arbitrage_opportunities(self.rows, bankroll=100.0, min_roi=-0.2)
+        self.assertFalse(arbs.empty)
+        self.assertEqual(compact_arbs["arb_roi"].dtype, "float64")
+        pd.testing.assert_frame_equal(
+            plain(compact_arbs), plain(arbs), check_dtype=False, check_exact=False, rtol=1e-5, atol=1e-5
+        )
+        pd.testing.assert_frame_equal(
+            plain(arb_lab.compute_consensus_edges(self.compact, min_edge=-1.0)),
+            plain(arb_lab.compute_consensus_edges(self.rows, min_edge=-1.0)),
+            check_dtype=False,
+            check_exact=False,
+            rtol=1e-5,
+            atol=1e-5,
+        )
+
+        adjusted = arb_lab.add_slippage_adjustment(compact_arbs, 0.0)
+        daily, picks = arb_lab.simulate_daily_compounding(adjusted, 200.0, min_roi=-0.2, per_event_cap_pct=0.2)
+        expected_daily, expected_picks = arb_lab.simulate_daily_compounding(
+            arb_lab.add_slippage_adjustment(arbs, 0.0), 200.0, min_roi=-0.2, per_event_cap_pct=0.2
+        )
+        self.assertEqual(len(picks), len(expected_picks))
+        self.assertAlmostEqual(daily["bankroll_end"].iloc[-1], expected_daily["bankroll_end"].iloc[-1], places=4)
+
+        matches = compact_arbs.head(5)
+        results = pd.DataFrame({
+            "event_id": [f"r{i}" for i in range(len(matches))],
+            "home_team_raw": matches["home_team"].astype(str).tolist(),
+            "away_team_raw": matches["away_team"].astype(str).tolist(),
+            "home_team_norm": matches["home_team"].astype(str).tolist(),
+            "away_team_norm": matches["away_team"].astype(str).tolist(),
+            "event_date": pd.to_datetime(matches["start_time"], unit="s").dt.date.astype(str).tolist(),
+            "start_time": matches["start_time"].tolist(),
+            "home_score": 1,
+            "away_score": 0,
+            "status": "final",
+            "completed": 1,
+        })
+        attached = arb_lab.attach_results(matches, results)
+        self.assertEqual(attached["result_event_id"].notna().sum(), len(matches))
+
+    def test_run_times_are_utc_in_both_modes(self):
+        db = os.path.join(self.tmp.name, "naive.db")
+        for payload in self.payloads[:3]:
+            # the scraper writes naive datetime.now() stamps
+            arb_lab.append_snapshot_to_history_db(dict(payload, last_updated=payload["last_updated"][:-6]), db)
+        for compact in (False, True):
+            prepared = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(db, compact=compact))
+            self.assertEqual(str(prepared["run_time"].dt.tz), "UTC")
+            arbs, _ = arb_lab.compute_arbitrage_opportunities(prepared, min_roi=-0.2)
+            self.assertEqual(str(arbs["run_time"].dt.tz), "UTC")
+            self.assertEqual(prepared["run_time"].min(), pd.Timestamp(self.payloads[0]["last_updated"]))
+
+    def test_concat_keeps_categories(self):
+        first, second = (arb_lab.compact_rows(self.rows[self.rows["run_id"] == run]) for run in self.rows["run_id"].unique()[:2])
+        joined = arb_lab.concat_rows([first, second])
+        self.assertEqual(len(joined), len(first) + len(second))
+        for col in arb_lab.COMPACT_CATEGORIES:
+            self.assertIsInstance(joined[col].dtype, pd.CategoricalDtype, col)
+
+        runs = self.payloads[-1]["last_updated"]
+        history = arb_lab.HistoryTail(self.compact[self.compact["run_id"] != runs])
+        history.result(arb_lab.build_best_lines)
+        history.refresh(lambda since: arb_lab.load_snapshot_rows(self.db, since=since, compact=True))
+        self.assertIsInstance(history.rows["bookmaker"].dtype, pd.CategoricalDtype)
+        self.assertEqual(history.last_run_id, runs)
+        self.assertEqual(len(history.result(arb_lab.build_best_lines)), len(arb_lab.build_best_lines(self.compact)))
+
+    @unittest.skipUnless(frame_cache.available(), "pyarrow not installed")
+    def test_frame_cache(self):
+        cache_dir = os.path.join(self.tmp.name, "frame_cache")
+        cached = frame_cache.load_prepared_rows(self.db, compact=True, cache_dir=cache_dir)
+        again = frame_cache.load_prepared_rows(self.db, compact=True, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(again, cached, check_dtype=False)  # Parquet keeps run times in ms
+        self.assertIsInstance(again["league"].dtype, pd.CategoricalDtype)
+        frame_cache.load_prepared_rows(self.db, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
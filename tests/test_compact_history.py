@@ -0,0 +1,173 @@
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from backend.core import history_db, jsonl_index
+from tools import arb_lab, bench_history_db, compact_history
+
+KEYS = ["run_id", "match_id", "bookmaker"]
+PRICES = ["home_odds", "draw_odds", "away_odds"]
+
+
+def sticky_payloads(runs: int, fixtures: int):
+    """Synthetic snapshots where each line only moves now and then."""
+    rng = random.Random(3)
+    last = {}
+    for payload in bench_history_db.synthetic_payloads(runs, fixtures):
+        for match in payload["matches"]:
+            for odds in match["odds"]:
+                key = (match["home_team"], match["start_time"], odds["bookmaker"])
+                if key in last and rng.random() < 0.85:
+                    odds.update(last[key])
+                last[key] = {col: odds[col] for col in PRICES}
+        yield payload
+
+
+def board(rows: pd.DataFrame) -> pd.DataFrame:
+    return rows[KEYS + PRICES].sort_values(KEYS).reset_index(drop=True)
+
+
+class TestCompactHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.jsonl = os.path.join(self.tmp.name, "odds_history.jsonl")
+        self.payloads = list(sticky_payloads(48, 40))
+        for payload in self.payloads:
+            arb_lab.append_snapshot_to_history_db(payload, self.db)
+            arb_lab.append_snapshot_to_history_jsonl(payload, self.jsonl)
+        # run 0 is 24h old, the last run 30 minutes old
+        self.now = history_db.iso_to_epoch(self.payloads[-1]["last_updated"]) + 1800
+
+    def compact(self, tiers: str) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(compact_history.main([
+                "--db", self.db, "--jsonl", self.jsonl, "--tiers", tiers,
+                "--now", str(pd.Timestamp(self.now, unit="s", tz="UTC").isoformat()),
+            ]), 0)
+
+    def test_parse_tiers(self):
+        tiers = compact_history.parse_tiers("14d:1h, 3d:changes,365d:drop")
+        self.assertEqual([t.mode for t in tiers], ["changes", "bucket", "drop"])
+        self.assertEqual(tiers[1].bucket, 3600)
+        with self.assertRaises(ValueError):
+            compact_history.parse_tiers("3d:drop,14d:1h")
+        with self.assertRaises(ValueError):
+            compact_history.parse_tiers("3 days:changes")
+
+    def test_change_tier_keeps_every_board(self):
+        window = {"run_start": self.payloads[10]["last_updated"], "run_end": self.payloads[30]["last_updated"]}
+        db_before = arb_lab.load_snapshot_rows(self.db, **window)
+        jsonl_before = arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, **window)
+        sizes = (os.path.getsize(self.db), os.path.getsize(self.jsonl))
+
+        self.compact("6h:changes")
+        self.assertLess(os.path.getsize(self.db), sizes[0])
+        self.assertLess(os.path.getsize(self.jsonl), sizes[1] * 0.6)
+        conn = sqlite3.connect(self.db)
+        stored = conn.execute("SELECT COUNT(*) FROM odds").fetchone()[0]
+        conn.close()
+        self.assertLess(stored, sum(len(m["odds"]) for p in self.payloads for m in p["matches"]) * 0.6)
+
+        db_after = arb_lab.load_snapshot_rows(self.db, **window)
+        jsonl_after = arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, **window)
+        pd.testing.assert_frame_equal(board(db_after), board(db_before))
+        pd.testing.assert_frame_equal(board(jsonl_after), board(jsonl_before))
+        pd.testing.assert_frame_equal(
+            arb_lab.build_best_lines(db_after).sort_values(["run_id", "match_id"]).reset_index(drop=True),
+            arb_lab.build_best_lines(db_before).sort_values(["run_id", "match_id"]).reset_index(drop=True),
+        )
+        chunks = list(arb_lab.iter_snapshot_frames_from_jsonl(self.jsonl, chunk_runs=7, **window))
+        pd.testing.assert_frame_equal(board(pd.concat(chunks)), board(jsonl_before))
+
+    def test_bucket_and_drop_tiers(self):
+        self.compact("2h:changes,6h:2h,20h:drop")
+        runs = arb_lab.load_snapshot_rows(self.db)["run_id"].unique()
+        self.assertEqual(len(runs), 48 - 8)  # runs more than 20h old are gone
+        entries = jsonl_index.ensure_index(self.jsonl)
+        self.assertEqual(len(entries), 48 - 8)
+        self.assertTrue(entries[0]["compacted"])
+        self.assertNotIn("compacted", entries[-1])
+
+        before = {p["last_updated"]: sum(len(m["odds"]) for m in p["matches"]) for p in self.payloads}
+        rows = arb_lab.load_snapshot_rows_from_jsonl(self.jsonl)
+        counts = rows.groupby("run_id").size().to_dict()
+        self.assertEqual(len(counts), 40)
+        self.assertEqual(counts, {run: n for run, n in before.items() if run in counts})
+
+    def test_dry_run_changes_nothing(self):
+        sizes = (os.path.getsize(self.db), os.path.getsize(self.jsonl))
+        with contextlib.redirect_stdout(io.StringIO()):
+            compact_history.main(["--db", self.db, "--jsonl", self.jsonl, "--tiers", "1h:changes", "--dry-run"])
+        self.assertEqual((os.path.getsize(self.db), os.path.getsize(self.jsonl)), sizes)
+        self.assertFalse(os.path.exists(self.jsonl + ".compacting"))
+
+    def test_dry_run_reports_the_real_run(self):
+        tiers = compact_history.parse_tiers("2h:changes,6h:2h,20h:drop")
+        for compact, path in ((compact_history.compact_db, self.db), (compact_history.compact_jsonl, self.jsonl)):
+            dry = compact(path, tiers, self.now, dry_run=True)
+            real = compact(path, tiers, self.now)
+            for key in ("rows_before", "rows_after", "runs_dropped"):
+                self.assertEqual(dry[key], real[key], (path, key))
+
+    def test_snapshots_appended_meanwhile_are_kept(self):
+        late = bench_history_db.synthetic_payloads(49, 40)
+        for _ in range(48):
+            next(late)
+        late = next(late)
+        keep_set = compact_history._jsonl_keep_set
+
+        def appending(*args):
+            # the scraper appends while the old records are being compacted
+            arb_lab.append_snapshot_to_history_jsonl(late, self.jsonl)
+            return keep_set(*args)
+
+        with mock.patch.object(compact_history, "_jsonl_keep_set", appending):
+            self.compact("6h:changes")
+        entries = jsonl_index.ensure_index(self.jsonl)
+        self.assertEqual(len(entries), 49)
+        self.assertEqual(entries[-1]["last_updated"], late["last_updated"])
+        with open(self.jsonl + ".idx", "rb") as handle:
+            self.assertEqual(len(handle.read().splitlines()), 49)
+        rows = arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, run_start=late["last_updated"])
+        self.assertEqual(len(rows), sum(len(m["odds"]) for m in late["matches"]))
+
+    def test_carry_forward_skips_finished_records(self):
+        # six days of runs: the slate of the first ones has kicked off by the last day
+        jsonl = os.path.join(self.tmp.name, "long.jsonl")
+        payloads = list(bench_history_db.synthetic_payloads(24, 20, interval_minutes=360))
+        for payload in payloads:
+            arb_lab.append_snapshot_to_history_jsonl(payload, jsonl)
+        window = {"run_start": payloads[20]["last_updated"], "run_end": payloads[23]["last_updated"]}
+        before = arb_lab.load_snapshot_rows_from_jsonl(jsonl, **window)
+        now = history_db.iso_to_epoch(payloads[-1]["last_updated"]) + 7200
+        with contextlib.redirect_stdout(io.StringIO()):
+            compact_history.main(["--db", "", "--jsonl", jsonl, "--tiers", "1h:changes",
+                                  "--now", pd.Timestamp(now, unit="s", tz="UTC").isoformat()])
+
+        decoded = []
+        read_records = jsonl_index.read_records
+
+        def counting(path, entries):
+            entries = list(entries)
+            decoded.extend(entries)
+            return read_records(path, entries)
+
+        with mock.patch.object(jsonl_index, "read_records", counting):
+            after = arb_lab.load_snapshot_rows_from_jsonl(jsonl, **window)
+        pd.testing.assert_frame_equal(board(after), board(before))
+        self.assertTrue(all(e.get("compacted") for e in decoded))
+        # the window's four runs, then the records with a fixture still open at its start
+        self.assertEqual(len(decoded), 4 + 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+import unittest
+from typing import Optional, Tuple
+from unittest import mock
+
+import pandas as pd
+
+from tools import arb_lab, bench_history_db
+
+CASES = [
+    {},
+    {"reserve_pct": 0.0, "per_event_cap_pct": 0.05},
+    {"per_event_cap": 7.5, "max_daily_exposure": 60.0, "max_arbs_per_day": 4},
+    {"per_event_cap_pct": 0.1, "max_daily_exposure_pct": 0.5, "min_roi": 0.01},
+    {"per_event_cap_pct": 0.05, "per_bookie_cap_pct": 0.08},
+    {"per_event_cap": 10.0, "per_bookie_cap": 6.0, "per_bookie_cap_pct": 0.1, "max_arbs_per_day": 6},
+    {"reserve_pct": 0.99, "per_event_cap": 0.0},
+]
+
+
+def reference_compounding(
+    arbs: pd.DataFrame,
+    initial_bankroll: float,
+    reserve_pct: float = 0.1,
+    max_daily_exposure: Optional[float] = None,
+    max_daily_exposure_pct: Optional[float] = None,
+    per_event_cap: Optional[float] = None,
+    per_event_cap_pct: Optional[float] = None,
+    per_bookie_cap: Optional[float] = None,
+    per_bookie_cap_pct: Optional[float] = None,
+    max_arbs_per_day: Optional[int] = None,
+    min_roi: float = 0.0,
+    selection: str = "roi",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    if arbs is None or arbs.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    df = arbs.copy()
+    df["run_date"] = pd.to_datetime(df["run_time"], errors="coerce").dt.date
+    df = df.dropna(subset=["run_date", "arb_roi_adj"])
+    df = df[df["arb_roi_adj"] >= float(min_roi or 0.0)]
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    sort_col = "arb_roi_adj" if selection == "roi" else "arb_roi_adj"
+    df = df.sort_values(["run_date", sort_col], ascending=[True, False])
+    df = df.drop_duplicates(subset=["run_date", "match_id"], keep="first")
+
+    bankroll = float(initial_bankroll)
+    daily_rows = []
+    pick_rows = []
+
+    for run_date, group in df.groupby("run_date"):
+        day_start = bankroll
+        reserve_pct = max(0.0, min(0.95, float(reserve_pct or 0.0)))
+        reserve = day_start * reserve_pct
+        available = max(day_start - reserve, 0.0)
+
+        day_cap = available
+        if max_daily_exposure is not None:
+            day_cap = min(day_cap, float(max_daily_exposure))
+        if max_daily_exposure_pct is not None:
+            day_cap = min(day_cap, day_start * float(max_daily_exposure_pct))
+
+        event_cap = float(per_event_cap) if per_event_cap is not None else None
+        if per_event_cap_pct is not None:
+            pct_cap = day_start * float(per_event_cap_pct)
+            event_cap = pct_cap if event_cap is None else min(event_cap, pct_cap)
+
+        bookie_cap = float(per_bookie_cap) if per_bookie_cap is not None else None
+        if per_bookie_cap_pct is not None:
+            pct_cap = day_start * float(per_bookie_cap_pct)
+            bookie_cap = pct_cap if bookie_cap is None else min(bookie_cap, pct_cap)
+
+        exposure_used = 0.0
+        profit_total = 0.0
+        picks_count = 0
+        bookie_exposure = {}
+
+        for _, row in group.iterrows():
+            if max_arbs_per_day and picks_count >= int(max_arbs_per_day):
+                break
+
+            remaining = day_cap - exposure_used
+            if remaining <= 0:
+                break
+
+            stake_total = remaining
+            if event_cap is not None:
+                stake_total = min(stake_total, event_cap)
+            if stake_total <= 0:
+                continue
+
+            stake_home = stake_total * row["w_home"]
+            stake_draw = stake_total * row["w_draw"]
+            stake_away = stake_total * row["w_away"]
+
+            if bookie_cap is not None:
+                factor = 1.0
+                for bookie, stake in (
+                    (row["best_home_bookie"], stake_home),
+                    (row["best_draw_bookie"], stake_draw),
+                    (row["best_away_bookie"], stake_away),
+                ):
+                    if not bookie:
+                        continue
+                    cap_left = bookie_cap - bookie_exposure.get(bookie, 0.0)
+                    if cap_left <= 0 or stake <= 0:
+                        factor = 0.0
+                        break
+                    factor = min(factor, cap_left / stake)
+
+                if factor <= 0:
+                    continue
+                if factor < 1.0:
+                    stake_total *= factor
+                    stake_home = stake_total * row["w_home"]
+                    stake_draw = stake_total * row["w_draw"]
+                    stake_away = stake_total * row["w_away"]
+
+            exposure_used += stake_total
+            profit = stake_total * row["arb_roi_adj"]
+            profit_total += profit
+            picks_count += 1
+
+            for bookie, stake in (
+                (row["best_home_bookie"], stake_home),
+                (row["best_draw_bookie"], stake_draw),
+                (row["best_away_bookie"], stake_away),
+            ):
+                if not bookie:
+                    continue
+                bookie_exposure[bookie] = bookie_exposure.get(bookie, 0.0) + stake
+
+            pick_rows.append({
+                "run_date": run_date,
+                "run_time": row.get("run_time"),
+                "league": row.get("league"),
+                "home_team": row.get("home_team"),
+                "away_team": row.get("away_team"),
+                "match_start": row.get("match_start"),
+                "snapshot_age_min": row.get("snapshot_age_min"),
+                "kickoff_minutes": row.get("kickoff_minutes"),
+                "best_home_bookie": row.get("best_home_bookie"),
+                "best_draw_bookie": row.get("best_draw_bookie"),
+                "best_away_bookie": row.get("best_away_bookie"),
+                "home_odds_adj": row.get("home_odds_adj"),
+                "draw_odds_adj": row.get("draw_odds_adj"),
+                "away_odds_adj": row.get("away_odds_adj"),
+                "arb_roi_adj": row.get("arb_roi_adj"),
+                "stake_total": stake_total,
+                "stake_home": stake_home,
+                "stake_draw": stake_draw,
+                "stake_away": stake_away,
+                "profit": profit,
+            })
+
+        day_end = day_start + profit_total
+        bankroll = day_end
+        daily_rows.append({
+            "run_date": run_date,
+            "bankroll_start": day_start,
+            "bankroll_end": day_end,
+            "profit": profit_total,
+            "exposure": exposure_used,
+            "roi_day": (profit_total / exposure_used) if exposure_used > 0 else 0.0,
+            "picks": picks_count,
+            "reserve": reserve,
+        })
+
+    return pd.DataFrame(daily_rows), pd.DataFrame(pick_rows)
+
+
+class TestCompounding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rows = pd.concat([
+            arb_lab.rows_from_odds_payload(payload)
+            for payload in bench_history_db.synthetic_payloads(20, 40, interval_minutes=360)
+        ], ignore_index=True)
+        arbs, _ = arb_lab.compute_arbitrage_opportunities(rows, bankroll=100.0, min_roi=-0.1)
+        cls.arbs = arb_lab.add_slippage_adjustment(arbs, 0.01)
+
+    def test_matches_reference(self):
+        self.assertGreater(self.arbs["run_time"].dt.date.nunique(), 3)
+        for case in CASES:
+            params = dict({"min_roi": -0.05}, **case)
+            with self.subTest(**params):
+                daily, picks = arb_lab.simulate_daily_compounding(self.arbs, 200.0, **params)
+                expected_daily, expected_picks = reference_compounding(self.arbs, 200.0, **params)
+                pd.testing.assert_frame_equal(daily, expected_daily)
+                pd.testing.assert_frame_equal(picks, expected_picks, check_dtype=False)
+
+    def test_empty(self):
+        for arbs in (pd.DataFrame(), self.arbs.iloc[:0]):
+            daily, picks = arb_lab.simulate_daily_compounding(arbs, 100.0)
+            self.assertTrue(daily.empty and picks.empty)
+        daily, picks = arb_lab.simulate_daily_compounding(self.arbs, 100.0, per_event_cap=0.0, min_roi=-0.05)
+        self.assertTrue((daily["picks"] == 0).all())
+        self.assertTrue(picks.empty)
+
+    def test_sweep(self):
+        grid = {"per_event_cap_pct": [0.05, 0.2], "per_bookie_cap_pct": [None, 0.1], "min_roi": [-0.05, 0.0]}
+        with mock.patch.object(arb_lab, "_compounding_candidates", wraps=arb_lab._compounding_candidates) as prepare:
+            results = arb_lab.sweep_daily_compounding(self.arbs, grid, 200.0, workers=1, reserve_pct=0.2)
+        prepare.assert_called_once()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(list(results.columns[:4]), ["reserve_pct", "per_event_cap_pct", "per_bookie_cap_pct", "min_roi"])
+        for point in results.to_dict("records"):
+            params = {key: point[key] for key in ("reserve_pct", "per_event_cap_pct", "per_bookie_cap_pct", "min_roi")}
+            params["per_bookie_cap_pct"] = None if pd.isna(params["per_bookie_cap_pct"]) else params["per_bookie_cap_pct"]
+            daily, picks = arb_lab.simulate_daily_compounding(self.arbs, 200.0, **params)
+            self.assertEqual(point["days"], len(daily))
+            self.assertEqual(point["picks"], len(picks))
+            self.assertAlmostEqual(point["final_bankroll"], daily["bankroll_end"].iloc[-1])
+            self.assertAlmostEqual(point["max_drawdown"], 0.0)
+
+        pooled = arb_lab.sweep_daily_compounding(self.arbs, grid, 200.0, workers=2, reserve_pct=0.2)
+        pd.testing.assert_frame_equal(pooled, results)
+        self.assertTrue(arb_lab.sweep_daily_compounding(None, grid, 200.0, workers=1)["picks"].eq(0).all())
+        with self.assertRaises(ValueError):
+            arb_lab.sweep_daily_compounding(self.arbs, {"bankroll": [1.0]}, 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import unittest
+
+from backend.scrapers.records import FixtureOdds, fixture_json_default
+
+
+class TestFixtureOdds(unittest.TestCase):
+    def setUp(self):
+        self.raw = {
+            "bookmaker": "22Bet Ghana",
+            "event_id": 9051048,
+            "league_id": 118587,
+            "home_team": "Galatasaray Istanbul",
+            "away_team": "Juventus Turin",
+            "teams": "Galatasaray Istanbul vs Juventus Turin",
+            "home_odds": 3.15,
+            "draw_odds": 3.35,
+            "away_odds": 2.2,
+            "league": "UEFA Champions League",
+            "start_time": 1771350300,
+        }
+
+    def test_reads_like_the_dict(self):
+        record = FixtureOdds.from_dict(self.raw)
+        self.assertEqual(dict(record), self.raw)
+        self.assertEqual(record, self.raw)
+        self.assertEqual(record["teams"], self.raw["teams"])
+        self.assertEqual(record.get("match_id", "n/a"), "n/a")
+        self.assertNotIn("match_id", record)
+        with self.assertRaises(KeyError):
+            record["match_id"]
+
+    def test_extra_keys_and_json(self):
+        record = FixtureOdds.from_dict({**self.raw, "country": "Turkey"})
+        self.assertEqual(record["country"], "Turkey")
+        payload = json.loads(json.dumps([record], default=fixture_json_default))
+        self.assertEqual(payload[0], {**self.raw, "country": "Turkey"})
+
+
+if __name__ == "__main__":
+    unittest.main()
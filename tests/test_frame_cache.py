@@ -0,0 +1,131 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools import arb_lab, bench_history_db, compact_history, frame_cache
+
+KEYS = ["run_id", "match_id", "bookmaker"]
+COLUMNS = KEYS + ["home_odds", "draw_odds", "away_odds", "implied_sum", "event_id"]
+
+
+def board(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame[COLUMNS].sort_values(KEYS).reset_index(drop=True)
+    return frame.astype({col: str for col in KEYS + ["event_id"]})
+
+
+@unittest.skipUnless(frame_cache.available(), "pyarrow not installed")
+class TestFrameCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.jsonl = os.path.join(self.tmp.name, "odds_history.jsonl")
+        self.cache_dir = os.path.join(self.tmp.name, "frame_cache")
+        self.payloads = list(bench_history_db.synthetic_payloads(14, 25))
+        for payload in self.payloads[:10]:
+            self.append(payload)
+
+    def append(self, payload):
+        arb_lab.append_snapshot_to_history_db(payload, self.db)
+        arb_lab.append_snapshot_to_history_jsonl(payload, self.jsonl)
+
+    def load(self, **kwargs):
+        kwargs.setdefault("path", self.db)
+        return frame_cache.load_prepared_rows(cache_dir=self.cache_dir, **kwargs)
+
+    def meta(self):
+        (entry,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, entry, frame_cache.META_FILE), encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def test_cached_and_extended(self):
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        pd.testing.assert_frame_equal(board(self.load()), board(expected))
+
+        with mock.patch.object(frame_cache, "prepare_odds_frame") as prepare:
+            pd.testing.assert_frame_equal(board(self.load()), board(expected))
+        prepare.assert_not_called()
+
+        for payload in self.payloads[10:]:
+            self.append(payload)
+        prepare = mock.Mock(side_effect=arb_lab.prepare_odds_frame)
+        with mock.patch.object(frame_cache, "prepare_odds_frame", prepare):
+            extended = self.load()
+        self.assertEqual(set(prepare.call_args[0][0]["run_id"]), {p["last_updated"] for p in self.payloads[10:]})
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        pd.testing.assert_frame_equal(board(extended), board(expected))
+        self.assertEqual(len(self.meta()["parts"]), 2)
+        pd.testing.assert_frame_equal(board(self.load()), board(expected))
+
+    def test_parts_removed_after_meta_is_read(self):
+        read_meta = frame_cache._read_meta
+
+        def folded_meanwhile(entry):
+            # another session folds the entry between the meta read and the part reads
+            meta = read_meta(entry)
+            for part in (meta or {}).get("parts", []):
+                os.remove(os.path.join(entry, part))
+            return meta
+
+        self.load()
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        with mock.patch.object(frame_cache, "_read_meta", folded_meanwhile):
+            pd.testing.assert_frame_equal(board(self.load()), board(expected))
+        for payload in self.payloads[10:]:
+            self.append(payload)
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        with mock.patch.object(frame_cache, "_read_meta", folded_meanwhile):
+            pd.testing.assert_frame_equal(board(self.load()), board(expected))
+        self.assertEqual(len(self.meta()["parts"]), 1)
+        pd.testing.assert_frame_equal(board(self.load()), board(expected))
+
+    def test_parts_fold_back(self):
+        self.load()
+        with mock.patch.object(frame_cache, "MAX_PARTS", 2):
+            for payload in self.payloads[10:13]:
+                self.append(payload)
+                self.load()
+        self.assertEqual(len(self.meta()["parts"]), 2)
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db))
+        pd.testing.assert_frame_equal(board(self.load()), board(expected))
+
+    def test_filters_and_sources_are_separate_entries(self):
+        window = {"run_start": self.payloads[2]["last_updated"], "run_end": self.payloads[6]["last_updated"]}
+        narrowed = self.load(**window)
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows(self.db, **window))
+        pd.testing.assert_frame_equal(board(narrowed), board(expected))
+        from_jsonl = self.load(path=self.jsonl, jsonl=True, **window)
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, **window))
+        pd.testing.assert_frame_equal(board(from_jsonl), board(expected))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_older_changes_rebuild(self):
+        self.load()
+        with contextlib.redirect_stdout(io.StringIO()):
+            compact_history.main(["--db", self.db, "--jsonl", "", "--tiers", "1h:drop",
+                                  "--frame-cache", self.cache_dir])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+        self.load(path=self.jsonl, jsonl=True)
+        backfilled = dict(self.payloads[12], last_updated="2025-12-31T12:00:00+00:00")
+        arb_lab.append_snapshot_to_history_jsonl(backfilled, self.jsonl)
+        rebuilt = self.load(path=self.jsonl, jsonl=True)
+        expected = arb_lab.prepare_odds_frame(arb_lab.load_snapshot_rows_from_jsonl(self.jsonl))
+        pd.testing.assert_frame_equal(board(rebuilt), board(expected))
+        self.assertEqual(len(self.meta()["parts"]), 1)
+
+    def test_without_pyarrow(self):
+        with mock.patch.object(frame_cache, "pyarrow", None):
+            frame = self.load()
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertIn("implied_sum", frame.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import scrape_odds_github as scraper
+from backend.core import history_db
+from tools import arb_lab, bench_history_db, migrate_history_db
+
+
+class TestHistoryDb(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.v1_path = os.path.join(self.tmp.name, "v1.db")
+        bench_history_db.build_v1_db(self.v1_path, runs=12, fixtures=20)
+
+    def test_migration_keeps_loader_rows(self):
+        conn = sqlite3.connect(self.v1_path)
+        query, params = bench_history_db.v1_query(None, None, None, None, None)
+        expected = conn.execute(query, params).fetchall()
+        conn.close()
+
+        v2_path = os.path.join(self.tmp.name, "v2.db")
+        with open(self.v1_path, "rb") as src, open(v2_path, "wb") as dst:
+            dst.write(src.read())
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(migrate_history_db.main(["--db", v2_path]), 0)
+        self.assertTrue(os.path.exists(v2_path + ".v1.bak"))
+
+        loaded = arb_lab.load_snapshot_rows(v2_path)
+        self.assertEqual(len(loaded), len(expected))
+        self.assertEqual(
+            sorted(tuple(row) for row in loaded.itertuples(index=False)),
+            sorted(expected),
+        )
+        conn = sqlite3.connect(v2_path)
+        self.assertEqual(history_db.schema_version(conn), 2)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 2)
+        self.assertNotIn("matches", history_db._tables(conn))
+        conn.close()
+
+    def test_loader_migrates_on_open_and_filters_by_time(self):
+        payloads = list(bench_history_db.synthetic_payloads(12, 20))
+        last = payloads[-1]["last_updated"]
+        kickoff = payloads[-1]["matches"][5]["start_time"]
+        rows = arb_lab.load_snapshot_rows(self.v1_path, run_start=payloads[-3]["last_updated"], run_end=last,
+                                          match_start=None, match_end=None)
+        self.assertEqual(set(rows["run_id"]), {p["last_updated"] for p in payloads[-3:]})
+        self.assertEqual(list(rows["run_id"])[0], last)
+
+        conn = sqlite3.connect(self.v1_path)
+        query, params = history_db.snapshot_query(match_start_ts=kickoff, match_end_ts=kickoff)
+        by_kickoff = conn.execute(query, params).fetchall()
+        query, params = history_db.snapshot_query(run_start_ts=history_db.iso_to_epoch(last), match_start_ts=kickoff,
+                                                  match_end_ts=kickoff)
+        both = conn.execute(query, params).fetchall()
+        conn.close()
+        self.assertTrue(by_kickoff)
+        self.assertTrue(all(row[4] == kickoff for row in by_kickoff))
+        self.assertEqual({row[0] for row in both}, {last})
+        self.assertEqual(len(arb_lab.load_snapshot_rows(self.v1_path, limit=7)), 7)
+
+    def test_writer_interns_dimensions_and_replaces_runs(self):
+        path = os.path.join(self.tmp.name, "fresh.db")
+        payload = next(bench_history_db.synthetic_payloads(1, 10))
+        payload["run_id"] = "run-1"
+        arb_lab.append_snapshot_to_history_db(payload, path)
+        payload["matches"][0]["odds"][0]["home_odds"] = 9.99
+        arb_lab.append_snapshot_to_history_db(payload, path)
+        payload["run_id"] = "run-2"
+        arb_lab.append_snapshot_to_history_db(payload, path)
+
+        conn = sqlite3.connect(path)
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("runs", "fixtures", "teams")}
+        conn.close()
+        self.assertEqual(counts, {"runs": 2, "fixtures": 10, "teams": 20})
+        self.assertTrue(arb_lab.history_run_exists(path, "run-1"))
+        rows = arb_lab.load_snapshot_rows(path)
+        first = rows[(rows["run_id"] == "run-1") & (rows["home_odds"] == 9.99)]
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(rows), 2 * sum(len(m["odds"]) for m in payload["matches"]))
+
+    def test_scraper_writes_v2_rows(self):
+        path = os.path.join(self.tmp.name, "scraper.db")
+        output = next(bench_history_db.synthetic_payloads(1, 5))
+        with mock.patch.object(scraper, "HISTORY_DB_PATH", path):
+            scraper.save_history_sqlite(output)
+        rows = arb_lab.load_snapshot_rows(path)
+        self.assertEqual(set(rows["match_id"]), {scraper.build_fixture_id(m) for m in output["matches"]})
+        self.assertEqual(set(rows["league"]), {m["league"] for m in output["matches"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools import arb_lab, bench_history_db, frame_cache
+
+KEYS = ["run_id", "match_id", "bookmaker"]
+
+
+def ordered(frame: pd.DataFrame, keys=("run_id", "match_id")) -> pd.DataFrame:
+    keys = [key for key in keys if key in frame.columns]
+    return frame.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+class TestHistoryTail(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = os.path.join(self.tmp.name, "odds_history.db")
+        self.jsonl = os.path.join(self.tmp.name, "odds_history.jsonl")
+        self.payloads = list(bench_history_db.synthetic_payloads(12, 25))
+        for payload in self.payloads[:8]:
+            self.append(payload)
+
+    def append(self, payload):
+        arb_lab.append_snapshot_to_history_db(payload, self.db)
+        arb_lab.append_snapshot_to_history_jsonl(payload, self.jsonl)
+
+    def latest_rows(self, rows, runs):
+        """Row count of the latest runs stored."""
+        latest = [p["last_updated"] for p in self.payloads[:8]][-runs:]
+        return int(rows["run_id"].isin(latest).sum())
+
+    def test_since(self):
+        since = self.payloads[5]["last_updated"]
+        later = {p["last_updated"] for p in self.payloads[6:8]}
+        rows = arb_lab.load_snapshot_rows(self.db, since=since)
+        self.assertEqual(set(rows["run_id"]), later)
+        rows = arb_lab.load_snapshot_rows_from_jsonl(self.jsonl, since=since)
+        self.assertEqual(set(rows["run_id"]), later)
+        self.assertTrue(arb_lab.load_snapshot_rows(self.db, since=self.payloads[7]["last_updated"]).empty)
+
+    def test_extend_matches_full_compute(self):
+        history = arb_lab.HistoryTail(arb_lab.load_snapshot_rows(self.db))
+        self.assertEqual(history.last_run_id, self.payloads[7]["last_updated"])
+        history.result(arb_lab.build_best_lines)
+        history.result(arb_lab.compute_arbitrage_opportunities, bankroll=100.0, min_roi=-0.2)
+        history.result(arb_lab.compute_consensus_edges, bankroll=100.0, min_edge=0.0)
+
+        for payload in self.payloads[8:]:
+            self.append(payload)
+        fetch = mock.Mock(side_effect=lambda since: arb_lab.load_snapshot_rows(self.db, since=since))
+        with mock.patch.object(arb_lab, "build_best_lines", wraps=arb_lab.build_best_lines):
+            self.assertEqual(history.refresh(fetch), 4)
+        fetch.assert_called_once_with(self.payloads[7]["last_updated"])
+        self.assertEqual(history.last_run_id, self.payloads[-1]["last_updated"])
+        self.assertEqual(history.refresh(fetch), 0)
+
+        full = arb_lab.load_snapshot_rows(self.db)
+        self.assertEqual(len(history.rows), len(full))
+        pd.testing.assert_frame_equal(
+            ordered(history.result(arb_lab.build_best_lines)), ordered(arb_lab.build_best_lines(full))
+        )
+        arbs, matches = history.result(arb_lab.compute_arbitrage_opportunities, bankroll=100.0, min_roi=-0.2)
+        expected_arbs, expected_matches = arb_lab.compute_arbitrage_opportunities(full, bankroll=100.0, min_roi=-0.2)
+        self.assertFalse(expected_arbs.empty)
+        self.assertEqual(list(arbs["arb_roi"]), list(expected_arbs["arb_roi"]))
+        pd.testing.assert_frame_equal(ordered(arbs), ordered(expected_arbs))
+        pd.testing.assert_frame_equal(ordered(matches), ordered(expected_matches))
+        edges = history.result(arb_lab.compute_consensus_edges, bankroll=100.0, min_edge=0.0)
+        expected = arb_lab.compute_consensus_edges(full, bankroll=100.0, min_edge=0.0)
+        pd.testing.assert_frame_equal(
+            ordered(edges, KEYS + ["pick"]), ordered(expected, KEYS + ["pick"]), check_like=True
+        )
+
+        with self.assertRaises(ValueError):
+            history.result(arb_lab.summarize_arbitrage)
+
+    def test_trim(self):
+        history = arb_lab.HistoryTail(arb_lab.load_snapshot_rows(self.db))
+        lines = history.result(arb_lab.build_best_lines)
+        self.assertEqual(history.trim(self.latest_rows(history.rows, 3)), 5)
+        runs = {p["last_updated"] for p in self.payloads[5:8]}
+        self.assertEqual(set(history.rows["run_id"]), runs)
+        self.assertEqual(set(history.result(arb_lab.build_best_lines)["run_id"]), runs)
+        self.assertLess(len(history.result(arb_lab.build_best_lines)), len(lines))
+        self.assertEqual(history.trim(1), 2)
+        self.assertEqual(set(history.rows["run_id"]), {self.payloads[7]["last_updated"]})
+
+    @unittest.skipUnless(frame_cache.available(), "pyarrow not installed")
+    def test_frame_cache_max_rows(self):
+        cache_dir = os.path.join(self.tmp.name, "frame_cache")
+        max_rows = self.latest_rows(arb_lab.load_snapshot_rows(self.db), 3)
+
+        def load():
+            return frame_cache.load_prepared_rows(self.db, max_rows=max_rows, cache_dir=cache_dir)
+
+        def runs(frame):
+            return set(frame["run_id"])
+
+        self.assertEqual(runs(load()), {p["last_updated"] for p in self.payloads[5:8]})
+        with mock.patch.object(frame_cache, "prepare_odds_frame") as prepare:
+            load()
+        prepare.assert_not_called()
+        for payload in self.payloads[8:10]:
+            self.append(payload)
+        # whole runs are dropped from the old end to stay under max_rows
+        frame = load()
+        self.assertLessEqual(len(frame), max_rows)
+        self.assertEqual(runs(frame), {p["last_updated"] for p in self.payloads[8:10]})
+        with mock.patch.object(frame_cache, "prepare_odds_frame") as prepare:
+            self.assertEqual(runs(load()), runs(frame))
+        prepare.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import scrape_odds_github as scraper
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "benchmarks", "golden_matching.json")
+
+
+def _ids(groups):
+    return [[(m["bookmaker"], str(m.get("event_id"))) for m in g] for g in groups]
+
+
+class TestIncrementalMatching(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_PATH, "r", encoding="utf-8") as handle:
+            cls.fixtures = json.load(handle)["fixtures"]
+
+    def test_incremental_equals_batch(self):
+        order = sorted(self.fixtures, reverse=True)
+        all_matches = {bookie: self.fixtures[bookie] for bookie in order}
+        with contextlib.redirect_stdout(io.StringIO()):
+            batch = scraper.match_events(all_matches)
+            matcher = scraper.IncrementalEventMatcher()
+            for bookie in order[:3]:
+                matcher.add_bookmaker(bookie, all_matches[bookie])
+            partial = matcher.matched()
+            incremental = scraper.match_events(all_matches, matcher=matcher)
+        self.assertTrue(partial)
+        self.assertEqual(_ids(incremental), _ids(batch))
+
+    def test_running_counters_match_a_full_pass(self):
+        matcher = scraper.IncrementalEventMatcher()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for bookie in sorted(self.fixtures):
+                matcher.add_bookmaker(bookie, self.fixtures[bookie])
+                matched = matcher.matched()
+                self.assertEqual(matcher.matched_count(), len(matched))
+                arbs = sum(1 for group in matched if scraper.IncrementalEventMatcher._is_arbitrage(group))
+                self.assertEqual(matcher.arbitrage_candidates(), arbs)
+
+
+if __name__ == "__main__":
+    unittest.main()
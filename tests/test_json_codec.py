@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.core import jsoncodec
+from backend.scrapers.records import FixtureOdds, fixture_json_default
+
+DOC = {"name": "Accra Hearts – Kotoko", "odds": [1.85, 3.4, 4.1], "ids": {7: "seven"}, "ok": True, "none": None}
+
+
+class CodecCases:
+    def test_compact_and_pretty_round_trip(self):
+        compact = jsoncodec.dumps(DOC, pretty=False)
+        pretty = jsoncodec.dumps(DOC, pretty=True)
+        self.assertNotIn(b"\n", compact)
+        self.assertIn("Accra Hearts – Kotoko".encode("utf-8"), compact)
+        self.assertEqual(pretty.decode("utf-8"), json.dumps(DOC, indent=2, ensure_ascii=False))
+        for payload in (compact, pretty, pretty.decode("utf-8")):
+            self.assertEqual(jsoncodec.loads(payload), json.loads(json.dumps(DOC)))
+
+    def test_default_hook_and_file_helpers(self):
+        fixture = FixtureOdds("Betway Ghana", "A", "B", 2.0, 3.1, 3.9, event_id="e1")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "raw.json")
+            jsoncodec.dump({"Betway Ghana": [fixture]}, path, default=fixture_json_default)
+            self.assertEqual(jsoncodec.load(path), {"Betway Ghana": [fixture.to_dict()]})
+            with open(path, "rb") as handle:
+                self.assertEqual(jsoncodec.load(handle)["Betway Ghana"][0]["event_id"], "e1")
+            with self.assertRaises(TypeError):
+                jsoncodec.dumps({"bad": object()})
+
+    def test_jsonl_append_and_iterate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nested", "history.jsonl")
+            jsoncodec.append_jsonl(path, {"run_id": "r1"})
+            jsoncodec.append_jsonl(path, [{"run_id": "r2"}, {"run_id": "r3"}])
+            with open(path, "ab") as handle:
+                handle.write(b"\n{broken\n{\"run_id\": \"r4\", \"edge\": NaN}\n")
+            with self.assertRaises(jsoncodec.JSONDecodeError):
+                list(jsoncodec.iter_jsonl(path))
+            records = list(jsoncodec.iter_jsonl(path, skip_invalid=True))
+        self.assertEqual([r["run_id"] for r in records], ["r1", "r2", "r3", "r4"])
+
+
+class TestFastBackend(CodecCases, unittest.TestCase):
+    def setUp(self):
+        if jsoncodec.orjson is None:
+            self.skipTest("orjson not installed")
+
+
+class TestStdlibFallback(CodecCases, unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(jsoncodec, "orjson", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import scrape_odds_github as scraper
+from backend.scrapers.jsonstream import JsonStream, iter_sections
+from tools.bench_json_stream import RecordedResponse, RecordedSession, synthetic_betway_page, synthetic_soccabet
+
+
+def _chunks(text, size):
+    raw = text.encode("utf-8")
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+def _rebuild(stream):
+    """Walk a stream back into plain objects using only the container API."""
+    kind = stream.kind()
+    if kind == "{":
+        return {key: _rebuild(stream) for key in stream.iter_object()}
+    if kind == "[":
+        return [_rebuild(stream) for _ in stream.iter_array()]
+    return stream.value()
+
+
+class TestJsonStream(unittest.TestCase):
+    DOC = {
+        "name": "Ümlaut é中 \"quoted\" \\ slash",
+        "n": [0, -12.5e3, 123456789, 1.25, True, False, None],
+        "empty": {"o": {}, "a": []},
+        "nested": [{"k": [1, [2, [3]]]}, "x"],
+    }
+
+    def test_every_chunk_size_rebuilds_the_document(self):
+        text = json.dumps(self.DOC, ensure_ascii=False, indent=1)
+        for size in range(1, 12):
+            self.assertEqual(_rebuild(JsonStream(_chunks(text, size))), self.DOC, size)
+
+    def test_skip_and_sections(self):
+        text = json.dumps({"skip": {"deep": [[{"a": 1}]] * 3}, "items": [1, 2, 3], "tail": 12345})
+        pairs = []
+        for key, value in iter_sections(JsonStream(_chunks(text, 3)), ("items",)):
+            pairs.append((key, list(value) if key == "items" else value))
+        self.assertEqual(pairs[1:], [("items", [1, 2, 3]), ("tail", 12345)])
+
+        stream = JsonStream(_chunks(text, 2))
+        seen = []
+        for key in stream.iter_object():
+            if key == "tail":
+                seen.append(stream.value())
+            else:
+                stream.skip()
+        self.assertEqual(seen, [12345])
+
+    def test_truncated_input_raises(self):
+        with self.assertRaises(ValueError):
+            _rebuild(JsonStream(_chunks('{"a": [1, 2', 4)))
+
+
+class TestBetwayStreaming(unittest.TestCase):
+    def test_stream_matches_whole_document_in_any_section_order(self):
+        page = synthetic_betway_page(events=30, markets_per_event=4)
+        reordered = {key: page[key] for key in ("prices", "outcomes", "isFinalPage", "markets", "events")}
+        for doc in (page, reordered):
+            expected = scraper.join_betway_page(doc.items())
+            streamed = scraper.join_betway_page(
+                iter_sections(JsonStream(_chunks(json.dumps(doc), 257)), scraper.BETWAY_SECTIONS))
+            self.assertEqual(streamed, expected)
+            self.assertEqual(len(expected["market_by_event"]), 30)
+            self.assertEqual(len(expected["price_by_outcome"]), 90)
+
+
+class TestSoccaBetStreaming(unittest.TestCase):
+    def _scrape(self, doc, streaming):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "odds.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(doc, handle)
+            with mock.patch.object(scraper, "STREAM_JSON", streaming), \
+                    mock.patch.object(scraper, "mount_rate_limited", lambda session, **kwargs: RecordedSession(path)), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                return [m.to_dict() for m in scraper.scrape_soccabet()]
+
+    def test_stream_matches_whole_document(self):
+        doc = synthetic_soccabet(categories=4, tournaments=2, matches=3, markets=3)
+        # Category name after its tournaments, and the list form of sports
+        first = doc["sports"]["77"]["categories"]["0"]
+        first["late"] = first.pop("name")
+        first["name"] = first.pop("late")
+        listed = {"sports": [doc["sports"]["12"], doc["sports"]["77"]]}
+        for payload in (doc, listed):
+            expected = self._scrape(payload, False)
+            self.assertEqual(len(expected), 24)
+            self.assertEqual(self._scrape(payload, True), expected)
+
+    def test_response_closed_when_stream_breaks(self):
+        closed = []
+
+        class ClosingResponse(RecordedResponse):
+            def close(self):
+                closed.append(self.path)
+
+        class ClosingSession(RecordedSession):
+            def get(self, url, **kwargs):
+                return ClosingResponse(self.path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "odds.json")
+            text = json.dumps(synthetic_soccabet(categories=2, tournaments=1, matches=2, markets=2))
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text[: len(text) // 2])
+            with mock.patch.object(scraper, "STREAM_JSON", True), \
+                    mock.patch.object(scraper, "mount_rate_limited", lambda session, **kwargs: ClosingSession(path)), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                scraper.scrape_soccabet()
+        # the odds response, not the cookie page the scraper never reads
+        self.assertEqual(len(closed), 1)
+
+    def test_recorded_response_reads_in_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(synthetic_betway_page(events=5, markets_per_event=2), handle)
+            with mock.patch.object(scraper, "STREAM_JSON", True):
+                page = scraper.read_betway_page(RecordedResponse(path))
+        self.assertEqual(len(page["events"]), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from backend.core import jsoncodec, jsonl_index
+from tools import arb_lab
+
+
+def snapshot(hour: int) -> dict:
+    stamp = f"2026-10-{1 + hour // 24:02d}T{hour % 24:02d}:00:00"
+    return {
+        "last_updated": stamp,
+        "matches": [{
+            "home_team": f"Home {hour}", "away_team": "Away", "league": "Ghana Premier League",
+            "start_time": 1_900_000_000 + hour,
+            "odds": [{"bookmaker": "Betway Ghana", "home_odds": 2.0, "draw_odds": 3.1, "away_odds": 3.9},
+                     {"bookmaker": "SportyBet Ghana", "home_odds": 2.1, "draw_odds": 3.0, "away_odds": 3.7}],
+        }],
+    }
+
+
+class TestJsonlIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "history", "odds_history.jsonl")
+
+    def test_append_indexes_and_range_reads_seek(self):
+        for hour in range(48):
+            arb_lab.append_snapshot_to_history_jsonl(snapshot(hour), self.path)
+        entries = jsonl_index.ensure_index(self.path)
+        self.assertEqual(len(entries), 48)
+        self.assertEqual(entries[-1]["offset"] + entries[-1]["length"], os.path.getsize(self.path))
+        self.assertEqual(list(jsoncodec.iter_jsonl(jsonl_index.index_path(self.path))), entries)
+
+        records = list(jsonl_index.iter_range(self.path, "2026-10-02T20:00:00", "2026-10-02T21:00:00"))
+        self.assertEqual([r["last_updated"] for r in records], ["2026-10-02T20:00:00", "2026-10-02T21:00:00"])
+        self.assertEqual(arb_lab.last_jsonl_run_id(self.path), "2026-10-02T23:00:00")
+
+    def test_catches_up_on_unindexed_and_rewritten_files(self):
+        jsoncodec.append_jsonl(self.path, [snapshot(0), snapshot(1)])
+        self.assertEqual(arb_lab.last_jsonl_run_id(self.path), "2026-10-01T01:00:00")
+        jsoncodec.append_jsonl(self.path, snapshot(2))  # older writer, no index entry
+        jsonl_index.append_indexed(self.path, snapshot(3))
+        self.assertEqual([e["run_id"] for e in jsonl_index.ensure_index(self.path)],
+                         [snapshot(h)["last_updated"] for h in range(4)])
+
+        with open(self.path, "ab") as handle:
+            handle.write(b'{"last_updated": "2026-10-01T04')  # crashed mid-write
+        jsonl_index.append_indexed(self.path, snapshot(5))
+        self.assertEqual([r["last_updated"] for r in jsonl_index.iter_range(self.path, "2026-10-01T03:00:00")],
+                         ["2026-10-01T03:00:00", "2026-10-01T05:00:00"])
+
+        os.remove(self.path)
+        jsoncodec.append_jsonl(self.path, snapshot(9))
+        self.assertEqual([e["run_id"] for e in jsonl_index.ensure_index(self.path)], ["2026-10-01T09:00:00"])
+
+    def test_reader_racing_writer_leaves_no_duplicates(self):
+        jsonl_index.append_indexed(self.path, snapshot(0))
+        jsoncodec.append_jsonl(self.path, snapshot(1))  # not indexed yet
+        # A reader scans the unindexed tail, then a writer appends (indexing
+        # the same tail itself) before the reader writes its entries
+        stale_tail = jsonl_index._scan(self.path, jsonl_index.ensure_index(self.path)[0]["length"])
+        jsonl_index.append_indexed(self.path, snapshot(2))
+        jsonl_index._write_index(self.path, stale_tail, append=True)
+
+        expected = [snapshot(h)["last_updated"] for h in range(3)]
+        entries = jsonl_index.ensure_index(self.path)
+        self.assertEqual([e["run_id"] for e in entries], expected)
+        self.assertEqual(jsonl_index._last_indexed_end(self.path), os.path.getsize(self.path))
+        self.assertEqual([r["last_updated"] for r in jsonl_index.iter_range(self.path)], expected)
+        self.assertEqual(arb_lab.load_snapshot_rows_from_jsonl(self.path)["run_id"].nunique(), 3)
+        self.assertEqual(len(arb_lab.load_snapshot_rows_from_jsonl(self.path)), 3 * 2)
+
+    def test_loader_matches_full_scan_and_chunks(self):
+        for hour in range(30):
+            arb_lab.append_snapshot_to_history_jsonl(snapshot(hour), self.path)
+        rows = arb_lab.load_snapshot_rows_from_jsonl(self.path, run_start="2026-10-02", run_end="2026-10-02")
+        self.assertEqual(len(rows), 6 * 2)
+        self.assertEqual(rows["run_id"].iloc[0], "2026-10-02T00:00:00")
+        self.assertEqual(list(rows.columns), list(arb_lab.JSONL_ROW_COLUMNS))
+
+        everything = arb_lab.load_snapshot_rows_from_jsonl(self.path)
+        chunks = list(arb_lab.iter_snapshot_frames_from_jsonl(self.path, chunk_runs=8))
+        self.assertEqual([len(c) for c in chunks], [16, 16, 16, 12])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), everything)
+        self.assertTrue(arb_lab.load_snapshot_rows_from_jsonl(self.path, run_start="2026-11-01").empty)
+        with self.assertRaises(FileNotFoundError):
+            arb_lab.load_snapshot_rows_from_jsonl(os.path.join(self.tmp.name, "missing.jsonl"))
+
+
+if __name__ == "__main__":
+    unittest.main()
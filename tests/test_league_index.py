@@ -0,0 +1,38 @@
+import unittest
+
+from backend.core.league_index import AhoCorasick, LeagueMembershipIndex
+
+
+class TestLeagueIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LeagueMembershipIndex({
+            "Premier League": {"arsenal", "west ham", "leeds"},
+            "Championship": {"leeds", "hull"},
+            "Bundesliga": {"1 heidenheim 1846"},
+        })
+
+    def test_automaton_finds_all_patterns(self):
+        automaton = AhoCorasick([("he", "A"), ("she", "B"), ("hers", "C"), ("x", "D")])
+        self.assertEqual(automaton.search("ushers"), {"A", "B", "C"})
+
+    def test_membership_exact_and_substring(self):
+        self.assertTrue(self.index.contains("leeds", "Championship"))
+        self.assertTrue(self.index.contains("west ham women", "Premier League"))
+        self.assertTrue(self.index.contains("heidenheim", "Bundesliga"))
+        self.assertFalse(self.index.contains("hull", "Premier League"))
+        self.assertEqual(self.index.leagues_for_team(""), self.index.all_leagues)
+
+    def test_memo_is_bounded(self):
+        for i in range(LeagueMembershipIndex.cache_size + 100):
+            self.index.leagues_for_team(f"team {i}")
+        self.assertEqual(self.index._lookup.cache_info().currsize, LeagueMembershipIndex.cache_size)
+        self.assertEqual(self.index.leagues_for_team("west ham women"), {"Premier League"})
+
+    def test_infer_league_uses_reference_order(self):
+        self.assertEqual(self.index.infer_league("leeds", "arsenal"), "Premier League")
+        self.assertEqual(self.index.infer_league("leeds", "hull"), "Championship")
+        self.assertEqual(self.index.infer_league("leeds", "unknown"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import threading
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import scrape_odds_github as scraper
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeOneXBet:
+    """Championship c has game ids c*1000+1 .. c*1000+size."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.games_calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        query = parse_qs(urlsplit(url).query)
+        if "GetChampsZip" in url:
+            return _Response({"Value": [{"LI": c, "L": f"League {c}", "GC": n} for c, n in self.sizes.items()]})
+        if "GetChampZip" in url:
+            champ = int(query["champ"][0])
+            return _Response({"Value": {"G": [{"I": champ * 1000 + i} for i in range(1, self.sizes[champ] + 1)]}})
+        ids = [int(i) for i in query["ids"][0].split(",")]
+        with self.lock:
+            self.games_calls.append(ids)
+        return _Response({"Value": [
+            {"I": i, "O1": f"Home {i}", "O2": f"Away {i}", "L": f"League {i // 1000}",
+             "E": [{"G": 1, "T": 1, "C": 2.0}, {"G": 1, "T": 2, "C": 3.0}, {"G": 1, "T": 3, "C": 4.0}]}
+            for i in ids
+        ]})
+
+
+class TestOneXBetBatching(unittest.TestCase):
+    def _run(self, fake, max_matches=12000, batch_size=200):
+        with mock.patch.object(scraper, "mount_rate_limited", lambda session, **kwargs: fake), \
+                mock.patch.object(scraper, "BATCH_SIZE", batch_size), \
+                mock.patch.object(scraper, "MAX_MATCHES", max_matches), \
+                mock.patch.object(scraper, "PARALLEL_PAGES", 4), \
+                mock.patch.object(scraper, "FAST_MODE", False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return scraper.scrape_1xbet()
+
+    def test_large_championship_is_not_truncated(self):
+        fake = FakeOneXBet({1: 450})
+        matches = self._run(fake)
+        self.assertEqual(len(matches), 450)
+        self.assertTrue(all(len(ids) <= 200 for ids in fake.games_calls))
+        self.assertEqual(len(fake.games_calls), 3)
+
+    def test_small_championships_share_requests(self):
+        fake = FakeOneXBet({c: 15 for c in range(1, 41)})  # 600 games over 40 championships
+        matches = self._run(fake)
+        self.assertEqual(len(matches), 600)
+        self.assertEqual(len(fake.games_calls), 3)
+        self.assertEqual({m["league"] for m in matches}, {f"League {c}" for c in range(1, 41)})
+
+    def test_cap_stops_further_batches(self):
+        fake = FakeOneXBet({c: 100 for c in range(1, 61)})
+        matches = self._run(fake, max_matches=300, batch_size=100)
+        self.assertEqual(len(matches), 300)
+        self.assertLess(len(fake.games_calls), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
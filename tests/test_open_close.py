@@ -0,0 +1,91 @@
+import copy
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from backend.core import history_db
+from tools import arb_lab, bench_history_db
+
+TABLE = "SELECT * FROM line_open_close ORDER BY fixture_pk"
+
+
+def expected_open_close(lines: pd.DataFrame) -> pd.DataFrame:
+    """Open is the first snapshot, close the last one before kickoff (else the last)."""
+    lines = lines.sort_values("run_time")
+    open_df = lines.groupby("match_id", as_index=False).first()
+    pre = lines[lines["run_time"].dt.tz_localize(None) <= lines["match_start"]]
+    last = lines.groupby("match_id").tail(1)
+    close_df = pd.concat([pre.groupby("match_id").tail(1), last[~last["match_id"].isin(pre["match_id"])]])
+    merged = open_df.merge(close_df, on="match_id", suffixes=("_open", "_close"))
+    counts = lines.groupby("match_id", as_index=False)["run_id"].nunique().rename(columns={"run_id": "snapshot_count"})
+    return merged.merge(counts, on="match_id")
+
+
+def by_match(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_values("match_id").reset_index(drop=True).sort_index(axis=1)
+
+
+class TestLineOpenClose(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.payloads = list(bench_history_db.synthetic_payloads(16, 30))
+        # a scrape after every kickoff must not become the close
+        late = copy.deepcopy(self.payloads[-1])
+        late["last_updated"] = "2026-02-01T00:00:00+00:00"
+        self.payloads.append(late)
+
+    def build(self, name, payloads):
+        path = os.path.join(self.tmp.name, name)
+        for payload in payloads:
+            arb_lab.append_snapshot_to_history_db(payload, path)
+        return path
+
+    def table(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(TABLE).fetchall()
+        finally:
+            conn.close()
+
+    def test_matches_best_lines(self):
+        db = self.build("odds_history.db", self.payloads)
+        window = {"run_start": self.payloads[4]["last_updated"], "run_end": self.payloads[10]["last_updated"]}
+        read = arb_lab.load_line_open_close(db, **window)
+        lines = arb_lab.load_best_lines(db)
+        seen = arb_lab.load_best_lines(db, **window)["match_id"].unique()
+        expected = expected_open_close(lines[lines["match_id"].isin(seen)])
+        self.assertEqual(set(read.columns), set(expected.columns))
+        pd.testing.assert_frame_equal(by_match(read), by_match(expected), check_dtype=False)
+
+        some = seen[:4]
+        narrowed = arb_lab.load_line_open_close(db, keys=pd.DataFrame({"match_id": some}), **window)
+        self.assertEqual(sorted(narrowed["match_id"]), sorted(some))
+
+    def test_incremental_equals_rebuild(self):
+        shuffled = self.payloads[:]
+        random.Random(5).shuffle(shuffled)
+        db = self.build("shuffled.db", shuffled)
+        incremental = self.table(db)
+        ordered = self.build("ordered.db", self.payloads)
+        pd.testing.assert_frame_equal(
+            by_match(arb_lab.load_line_open_close(db)), by_match(arb_lab.load_line_open_close(ordered))
+        )
+
+        conn = sqlite3.connect(db)
+        history_db.rebuild_open_close(conn)
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.table(db), incremental)
+
+        # storing a run again (same run_id) replaces its lines
+        arb_lab.append_snapshot_to_history_db(self.payloads[-1], db)
+        self.assertEqual(self.table(db), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import scrape_odds_github as scraper
+from backend.scrapers.deadline import pop_truncation
+from backend.scrapers.pagination import ProbeFailed, pages_for_total, pagination_report, probe_last_page
+
+
+def _betway_page(index, events_total=2600, page_size=1200):
+    start = index * page_size
+    count = max(0, min(page_size, events_total - start))
+    if not count:
+        return {"events": [], "isFinalPage": False}
+    return {
+        "events": [{"eventId": start + i} for i in range(count)],
+        "markets": [],
+        "outcomes": [],
+        "prices": [],
+        "isFinalPage": start + count >= events_total,
+    }
+
+
+class TestPagination(unittest.TestCase):
+    def test_pages_for_total(self):
+        self.assertEqual(pages_for_total(1688, 100, 45), 17)
+        self.assertEqual(pages_for_total(99999, 100, 45), 45)
+        self.assertEqual(pages_for_total(0, 100, 45), 1)
+
+    def test_probe_finds_last_page_in_log_requests(self):
+        fetched = []
+
+        def fetch(page):
+            fetched.append(page)
+            return page <= 13
+
+        last, cache = probe_last_page(fetch, bool, 1, 45)
+        self.assertEqual(last, 13)
+        self.assertLessEqual(len(fetched), 8)
+        self.assertEqual(set(cache), set(fetched))
+
+    def test_probe_stops_at_final_page(self):
+        last, cache = probe_last_page(lambda p: {"final": p == 1}, bool, 0, 16, is_final=lambda d: d["final"])
+        self.assertEqual(last, 1)
+        self.assertEqual(sorted(cache), [0, 1])
+
+    def test_probe_retries_then_gives_up_on_failed_pages(self):
+        attempts = []
+
+        def fetch(page):
+            attempts.append(page)
+            if page == 2 and attempts.count(2) == 1:
+                return None  # transient failure
+            return page <= 13
+
+        last, cache = probe_last_page(fetch, bool, 1, 45, failed=lambda d: d is None)
+        self.assertEqual(last, 13)
+        self.assertEqual(attempts.count(2), 2)
+        with self.assertRaises(ProbeFailed) as raised:
+            probe_last_page(lambda p: None if p == 4 else p <= 13, bool, 1, 45, failed=lambda d: d is None)
+        self.assertEqual(raised.exception.page, 4)
+
+    def test_betway_only_requests_existing_pages(self):
+        calls = []
+
+        def fake_fetch(session, headers, skip, page_size):
+            calls.append(skip)
+            return _betway_page(skip // page_size, page_size=page_size)
+
+        with mock.patch.object(scraper, "fetch_betway_page", fake_fetch), \
+                mock.patch.object(scraper, "BETWAY_PAGE_SIZE", 1200), \
+                mock.patch.object(scraper, "BETWAY_MAX_SKIP", 20000), \
+                contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_betway()
+        # Three real pages plus at most one overshooting probe, not 17 blind requests
+        self.assertLessEqual({0, 1200, 2400}, set(calls))
+        self.assertLessEqual(len(calls), 4)
+
+    def test_betway_falls_back_when_first_page_fails(self):
+        calls = []
+
+        def fake_fetch(session, headers, skip, page_size):
+            calls.append(skip)
+            if len(calls) == 1:
+                return {}  # transient failure
+            return _betway_page(skip // page_size, page_size=page_size)
+
+        with mock.patch.object(scraper, "fetch_betway_page", fake_fetch), \
+                mock.patch.object(scraper, "BETWAY_PAGE_SIZE", 1200), \
+                mock.patch.object(scraper, "BETWAY_MAX_SKIP", 20000), \
+                contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_betway()
+        self.assertEqual(sorted(calls), [0] + list(range(0, 20000, 1200)))
+        self.assertEqual(pagination_report()["Betway Ghana"]["requests"], 18)
+
+    def _betway_with_failures(self, failures):
+        """Five real pages; failures maps a skip to how many times it fails."""
+        calls = []
+
+        def fake_fetch(session, headers, skip, page_size):
+            calls.append(skip)
+            if failures.get(skip):
+                failures[skip] -= 1
+                return {}
+            return _betway_page(skip // page_size, events_total=5 * 1200, page_size=page_size)
+
+        pop_truncation("Betway Ghana")
+        with mock.patch.object(scraper, "fetch_betway_page", fake_fetch), \
+                mock.patch.object(scraper, "BETWAY_PAGE_SIZE", 1200), \
+                mock.patch.object(scraper, "BETWAY_MAX_SKIP", 20000), \
+                contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_betway()
+        return calls
+
+    def test_betway_retries_a_failed_probe(self):
+        calls = self._betway_with_failures({3600: 1})
+        self.assertEqual(calls.count(3600), 2)
+        self.assertLessEqual({0, 1200, 2400, 3600, 4800}, set(calls))
+        self.assertEqual(pagination_report()["Betway Ghana"]["requests"], len(calls))
+        self.assertIsNone(pop_truncation("Betway Ghana"))
+
+    def test_betway_failed_probe_falls_back_to_all_pages(self):
+        # the probe of page 3 fails twice: the end is unknown, so fetch the whole range
+        calls = self._betway_with_failures({3600: 3})
+        self.assertEqual(calls.count(3600), 3)
+        self.assertEqual(set(calls), set(range(0, 20000, 1200)))
+        self.assertEqual(pagination_report()["Betway Ghana"]["requests"], len(calls))
+        self.assertEqual(pop_truncation("Betway Ghana"), "1 pages failed")
+
+    def test_sportybet_counts_discovery_requests(self):
+        calls = []
+
+        def fake_fetch(session, headers, page, page_size=100, tournament_id=None):
+            calls.append((page, page_size, tournament_id))
+            if tournament_id or page > 3:
+                return {"totalNum": 250, "tournaments": []}
+            return {"totalNum": 250, "tournaments": [{"name": "Somewhere", "events": []}]}
+
+        with mock.patch.object(scraper, "fetch_sportybet_data", fake_fetch), \
+                mock.patch.object(scraper, "SPORTYBET_TOURNAMENT_PAGE_SIZE", 50), \
+                mock.patch.object(scraper.requests.Session, "get", side_effect=OSError), \
+                mock.patch.object(scraper, "FAST_MODE", True), \
+                contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_sportybet()
+        listing = [call for call in calls if call[1] == scraper.SPORTYBET_PAGE_SIZE]
+        discovery = [call for call in calls if call[1] == 50]
+        self.assertEqual(len(listing), 3)
+        self.assertEqual(len(discovery), 4)  # pages 1-3, then the empty page 4 ends the walk
+        self.assertEqual(pagination_report()["SportyBet Ghana"]["requests"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import contextlib
+import io
+import unittest
+from collections import Counter
+
+import scrape_odds_github as scraper
+from backend.scrapers.records import FixtureOdds
+
+KICKOFF = 1767225600
+BOOKIES = ["Betway Ghana", "SportyBet Ghana", "1xBet Ghana"]
+
+
+def fixture(bookmaker, home, away, league, home_odds=2.1):
+    return FixtureOdds(
+        bookmaker=bookmaker, event_id=f"{bookmaker}:{home}", league_id=league, home_team=home,
+        away_team=away, teams=f"{home} vs {away}", league=league, start_time=KICKOFF,
+        home_odds=home_odds, draw_odds=3.3, away_odds=3.6,
+    )
+
+
+def groups():
+    """Matched groups covering each branch of the payload builders."""
+    return [
+        # top league, full coverage
+        [fixture(b, "Newcastle", "Everton", "England. Premier League", 2.0 + i / 10) for i, b in enumerate(BOOKIES)],
+        # top league, one bookmaker short (dropped by the coverage filter)
+        [fixture(b, "Real Madrid", "Sevilla", "Spain. LaLiga") for b in BOOKIES[:2]],
+        # top-league label whose teams are not in it (dropped by teams_in_league)
+        [fixture(b, "Alpha FC", "Beta United", "La Liga") for b in BOOKIES],
+        # not a top league: kept whatever the coverage
+        [fixture("Betway Ghana", "Asante Kotoko", "Hearts of Oak", "Ghana. Division One")],
+        # two leagues in one payload group, and a label needing the majority vote
+        [fixture("Betway Ghana", "Arsenal", "Chelsea", "Premier League"),
+         fixture("1xBet Ghana", "Arsenal", "Chelsea", "England. Premier League"),
+         fixture("SportyBet Ghana", "Arsenal FC", "Chelsea FC", "Premier League")],
+        [],
+    ]
+
+
+# The dict-based builders as they were before MatchedEvent
+def old_filter_top_league_full_coverage(matched_events, required_bookies):
+    required_set = set(required_bookies)
+    kept = []
+    for group in matched_events:
+        if not group:
+            continue
+        league = scraper.pick_league_for_group(group)
+        if not (league in scraper.LEAGUE_TEAMS or scraper.is_major_league_name(league)):
+            kept.append(group)
+            continue
+        if required_set.issubset({m.get('bookmaker') for m in group if m.get('bookmaker')}):
+            kept.append(group)
+    return kept
+
+
+def old_cloudflare_payload(matched_events):
+    league_groups = {}
+    for event_group in matched_events[:1500]:
+        if not event_group:
+            continue
+        first = event_group[0]
+        league = scraper.pick_league_for_group(event_group)
+        if league in scraper.LEAGUE_TEAMS:
+            if not (scraper.is_team_in_league(first.get('home_team', ''), league)
+                    or scraper.is_team_in_league(first.get('away_team', ''), league)):
+                continue
+        league_groups.setdefault(league, {'league': league, 'matches': []})['matches'].append({
+            'id': f"{first['home_team']}-{first['away_team']}-{first.get('start_time', 0)}".replace(' ', '-').lower(),
+            'home_team': first['home_team'],
+            'away_team': first['away_team'],
+            'league': league,
+            'start_time': first.get('start_time', 0),
+            'odds': [
+                {'bookmaker': m['bookmaker'], 'home_odds': m['home_odds'],
+                 'draw_odds': m['draw_odds'], 'away_odds': m['away_odds']}
+                for m in event_group
+            ],
+        })
+    return list(league_groups.values())
+
+
+def old_d1_fixtures(matched_events):
+    fixtures = []
+    for e in matched_events:
+        first = e[0]
+        fixtures.append({
+            'fixture_id': f"{first['home_team']}-{first['away_team']}-{first.get('start_time', 0)}".replace(' ', '-').lower(),
+            'league_id': None,
+            'provider': 'github-scraper',
+            'provider_fixture_id': f"{first.get('start_time', 0)}-{first['home_team']}-{first['away_team']}",
+            'home_team': first['home_team'],
+            'away_team': first['away_team'],
+            'kickoff_time': first.get('start_time', 0),
+            'country_code': None,
+            'sport': 'soccer',
+            'raw_league_name': first.get('league', ''),
+            'raw_league_id': first.get('league', ''),
+            'confidence': None,
+        })
+    return fixtures
+
+
+class TestPayloadBuilders(unittest.TestCase):
+    def setUp(self):
+        self.groups = groups()
+        self.events = scraper.enrich_matched_events(self.groups)
+
+    def build(self, func, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+
+    def test_fixtures_cover_each_branch(self):
+        by_home = {e.first['home_team']: e for e in self.events}
+        self.assertEqual(len(self.events), 5)
+        self.assertTrue(by_home['Newcastle'].is_top_league and by_home['Newcastle'].covers(BOOKIES))
+        self.assertFalse(by_home['Real Madrid'].covers(BOOKIES))
+        self.assertFalse(by_home['Alpha FC'].teams_in_league)
+        self.assertFalse(by_home['Asante Kotoko'].is_top_league)
+        self.assertEqual(Counter(e.league for e in self.events)['Premier League'], 2)
+
+    def test_coverage_filter_matches_dict_version(self):
+        kept = self.build(scraper.filter_top_league_full_coverage, self.events, BOOKIES)
+        expected = old_filter_top_league_full_coverage(self.groups, BOOKIES)
+        self.assertEqual([e.group for e in kept], expected)
+        self.assertNotIn('Real Madrid', [e.first['home_team'] for e in kept])
+
+    def test_cloudflare_payload_matches_dict_version(self):
+        for matched in (self.events, self.groups):
+            payload = self.build(scraper.build_cloudflare_payload, matched)
+            self.assertEqual(payload, old_cloudflare_payload(self.groups))
+        homes = [m['home_team'] for league in payload for m in league['matches']]
+        self.assertNotIn('Alpha FC', homes)
+
+        kept = self.build(scraper.filter_top_league_full_coverage, self.events, BOOKIES)
+        self.assertEqual(
+            self.build(scraper.build_cloudflare_payload, kept),
+            old_cloudflare_payload(old_filter_top_league_full_coverage(self.groups, BOOKIES)),
+        )
+
+    def test_d1_fixtures_match_dict_version(self):
+        groups = [g for g in self.groups if g]
+        self.assertEqual(scraper.build_d1_fixtures(self.events), old_d1_fixtures(groups))
+        self.assertEqual(scraper.build_d1_fixtures(groups), old_d1_fixtures(groups))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from backend.scrapers import deadline
+from backend.scrapers.ratelimit import (
+    HostRateLimiter,
+    mount_rate_limited,
+    parse_host_rates,
+    parse_retry_after,
+    split_curl_status,
+)
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(time.monotonic())
+        if len(self.hits) == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.3")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class _UnavailableHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def _unavailable(self):
+        self.hits.append(self.command)
+        self.send_response(503)
+        self.send_header("Retry-After", "30")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = _unavailable
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHostRateLimiter(unittest.TestCase):
+    def test_token_bucket_spaces_requests(self):
+        limiter = HostRateLimiter(default_rate=20)
+        started = time.monotonic()
+        for _ in range(30):
+            limiter.acquire("example.com")
+        # 20 burst tokens, then 10 more at 20/s
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+        self.assertEqual(limiter.stats()["example.com"]["requests"], 30)
+
+    def test_backoff_and_recovery(self):
+        limiter = HostRateLimiter(default_rate=10)
+        limiter.record("example.com", 503)
+        self.assertEqual(limiter.stats()["example.com"]["rate"], 5)
+        for _ in range(10):
+            limiter.record("example.com", 200)
+        self.assertEqual(limiter.stats()["example.com"]["rate"], 10)
+
+    def test_parsers(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_host_rates("a.com=5, b.com=x,c.com=2.5"), {"a.com": 5.0, "c.com": 2.5})
+        self.assertEqual(split_curl_status(b'{"a": 1}\n429'), (b'{"a": 1}', 429))
+        self.assertEqual(split_curl_status(b"\n000"), (b"", 0))
+        self.assertEqual(split_curl_status(b"garbage"), (b"garbage", 0))
+
+    def test_adapter_retries_after_retry_after(self):
+        _ThrottlingHandler.hits = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottlingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            limiter = HostRateLimiter(default_rate=50)
+            url = f"http://127.0.0.1:{server.server_port}/"
+            first = mount_rate_limited(requests.Session(), limiter=limiter)
+            self.assertEqual(first.get(url, timeout=5).status_code, 200)
+            self.assertGreaterEqual(_ThrottlingHandler.hits[1] - _ThrottlingHandler.hits[0], 0.25)
+            stats = limiter.stats()["127.0.0.1"]
+            self.assertEqual(stats["throttled"], 1)
+            self.assertEqual(stats["requests"], 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_adapter_skips_unsafe_retries_and_respects_deadline(self):
+        _UnavailableHandler.hits = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _UnavailableHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(deadline.clear_deadline, "Test Bookie")
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/"
+            session = mount_rate_limited(requests.Session(), limiter=HostRateLimiter(default_rate=50))
+            self.assertEqual(session.post(url, timeout=5).status_code, 503)
+            self.assertEqual(_UnavailableHandler.hits, ["POST"])
+
+            # Retry-After: 30 would hold the retry far past the bookmaker's deadline
+            _UnavailableHandler.hits = []
+            deadline.set_deadline("Test Bookie", time.time() + 0.5)
+            session = mount_rate_limited(
+                requests.Session(), limiter=HostRateLimiter(default_rate=50), bookmaker="Test Bookie",
+            )
+            started = time.monotonic()
+            self.assertEqual(session.get(url, timeout=5).status_code, 503)
+            self.assertLess(time.monotonic() - started, 5)
+            self.assertEqual(_UnavailableHandler.hits[0], "GET")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
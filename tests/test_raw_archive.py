@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import scrape_odds_github as scraper
+from backend.core import jsoncodec, raw_archive
+from backend.core.raw_archive import RawArchive, import_jsonl
+from backend.scrapers.records import FixtureOdds
+from tools import raw_archive as raw_archive_tool
+
+
+def make_run(step: int, fixtures: int = 30):
+    """Two bookmakers; a few prices move each step and one fixture rotates in."""
+    matches = {}
+    for b, bookmaker in enumerate(("Betway Ghana", "SportyBet Ghana")):
+        rows = []
+        for i in range(step, step + fixtures):
+            moved = 0.05 * step if i % 7 == 0 else 0.0
+            rows.append({
+                "bookmaker": bookmaker, "event_id": f"{b}-{i}", "home_team": f"Home {i}", "away_team": f"Away {i}",
+                "home_odds": round(1.8 + moved, 2), "draw_odds": 3.3, "away_odds": 4.2,
+                "league": "Ghana Premier League", "start_time": 1_900_000_000 + i * 3600,
+            })
+        matches[bookmaker] = rows
+    return matches
+
+
+def run_id(step: int) -> str:
+    return f"2026-10-0{1 + step // 10}T{step % 10:02d}:00:00"
+
+
+class TestRawArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "raw_archive")
+
+    def test_round_trip_with_keyframes_and_deltas(self):
+        archive = RawArchive(self.root, keyframe_every=4)
+        runs = {run_id(step): make_run(step) for step in range(12)}
+        for rid, matches in runs.items():
+            archive.append_run(rid, matches, {"total": 60})
+
+        self.assertEqual(archive.runs(), list(runs))
+        self.assertEqual(archive.latest_run(), run_id(11))
+        for rid, matches in runs.items():
+            self.assertEqual(archive.load_run(rid), matches)
+        self.assertEqual(archive.load_run_record(run_id(3))["stats"], {"total": 60})
+
+        frames = [e for e in archive._index("2026-10-01") if e["type"] == "frame" and e["bookmaker"] == "Betway Ghana"]
+        self.assertEqual([e["keyframe"] for e in frames], [True, False, False, False] * 2 + [True, False])
+        self.assertLess(frames[1]["changed"], frames[1]["fixtures"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "2026-10-01", "betway-ghana.seg")))
+        with self.assertRaises(KeyError):
+            archive.load_run("2026-10-05T00:00:00")
+
+    def test_reopened_archive_continues_deltas(self):
+        first = RawArchive(self.root, keyframe_every=10)
+        first.append_run(run_id(0), make_run(0))
+        first.append_run(run_id(1), make_run(1))
+        second = RawArchive(self.root, keyframe_every=10)
+        second.append_run(run_id(2), make_run(2))
+
+        entry = [e for e in second._index("2026-10-01") if e["type"] == "frame" and e["run_id"] == run_id(2)][0]
+        self.assertFalse(entry["keyframe"])
+        self.assertEqual(RawArchive(self.root).load_run(run_id(2)), make_run(2))
+        self.assertEqual(RawArchive(self.root).load_run(), make_run(2))
+
+    def test_new_day_starts_with_keyframe_and_report(self):
+        archive = RawArchive(self.root, keyframe_every=30)
+        for step in range(12):
+            archive.append_run(run_id(step), make_run(step))
+        first_on_day_two = [e for e in archive._index("2026-10-02") if e["type"] == "frame"][0]
+        self.assertTrue(first_on_day_two["keyframe"])
+
+        report = archive.day_report()
+        self.assertEqual([row["day"] for row in report], ["2026-10-01", "2026-10-02"])
+        self.assertEqual([row["runs"] for row in report], [10, 2])
+        self.assertLess(report[0]["archive_bytes"], report[0]["jsonl_bytes"])
+        self.assertGreater(report[0]["saved_pct"], 50)
+
+    def test_import_jsonl_and_tool(self):
+        jsonl = os.path.join(self.tmp.name, "raw_scraped_history.jsonl")
+        for step in range(3):
+            jsoncodec.append_jsonl(jsonl, {"run_id": run_id(step), "stats": {}, "matches": make_run(step)})
+        archive = RawArchive(self.root)
+        self.assertEqual(import_jsonl(archive, jsonl), 3)
+        self.assertEqual(import_jsonl(archive, jsonl), 0)
+
+        out = os.path.join(self.tmp.name, "export.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(raw_archive_tool.main(["--root", self.root, "export", run_id(1), "--output", out]), 0)
+            self.assertEqual(raw_archive_tool.main(["--root", self.root, "report"]), 0)
+        self.assertEqual(jsoncodec.load(out), make_run(1))
+
+    def test_zlib_fallback_when_zstandard_missing(self):
+        with mock.patch.object(raw_archive, "zstandard", None):
+            archive = RawArchive(self.root)
+            self.assertEqual(archive.codec, "zlib")
+            archive.append_run(run_id(0), make_run(0))
+            self.assertEqual(archive.load_run(run_id(0)), make_run(0))
+
+    def test_scraper_archives_fixtures_and_replays_run(self):
+        all_matches = {b: [FixtureOdds.from_dict(row) for row in rows] for b, rows in make_run(0).items()}
+        output = {"last_updated": run_id(0), "stats": {"total": 60}, "matches": []}
+        with mock.patch.object(scraper, "HISTORY_DIR", self.tmp.name), \
+                mock.patch.object(scraper, "SAVE_RAW_HISTORY", True), \
+                mock.patch.object(scraper, "RAW_HISTORY_FORMAT", "archive"), \
+                mock.patch.object(scraper, "SAVE_HISTORY_DB", False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            scraper.save_history_snapshot(output, all_matches)
+        archive = scraper.RawArchive(self.root)
+        self.assertEqual(archive.runs(), [run_id(0)])
+        self.assertEqual(archive.load_run(run_id(0)), make_run(0))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, scraper.HISTORY_RAW_FILE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from backend.scrapers import deadline
+import scrape_odds_github as scraper
+
+
+class TestScrapeDeadline(unittest.TestCase):
+    def tearDown(self):
+        deadline.clear_deadline("Test Bookie")
+        deadline.pop_truncation("Test Bookie")
+
+    def test_unbounded_without_deadline(self):
+        self.assertIsNone(deadline.time_left("Test Bookie"))
+        self.assertFalse(deadline.deadline_passed("Test Bookie"))
+
+    def test_deadline_and_truncation(self):
+        deadline.set_deadline("Test Bookie", time.time() - 1)
+        self.assertTrue(deadline.deadline_passed("Test Bookie"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            deadline.mark_truncated("Test Bookie", "first")
+            deadline.mark_truncated("Test Bookie", "second")
+        self.assertEqual(deadline.pop_truncation("Test Bookie"), "first")
+        self.assertIsNone(deadline.pop_truncation("Test Bookie"))
+
+    def test_daemon_futures(self):
+        slots = threading.BoundedSemaphore(1)
+        release = threading.Event()
+        first = deadline.submit_daemon(release.wait, 5, slots=slots)
+        queued = deadline.submit_daemon(lambda: "late", slots=slots)
+        failing = deadline.submit_daemon(lambda: 1 / 0)
+        self.assertIsInstance(failing.exception(timeout=5), ZeroDivisionError)
+        self.assertTrue(queued.cancel())
+        release.set()
+        self.assertTrue(first.result(timeout=5))
+        self.assertTrue(queued.cancelled())
+
+    def test_stuck_daemon_does_not_hold_exit(self):
+        code = (
+            "import time; from backend.scrapers.deadline import submit_daemon; "
+            "submit_daemon(time.sleep, 60); time.sleep(0.1)"
+        )
+        started = time.monotonic()
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", code], cwd=root, check=True, timeout=30)
+        self.assertLess(time.monotonic() - started, 15)
+
+    def test_budget_overrides(self):
+        original = scraper.SCRAPER_BUDGETS
+        try:
+            scraper.SCRAPER_BUDGETS = "Betway Ghana=120, 22Bet Ghana=bad"
+            self.assertEqual(scraper.scraper_budget("Betway Ghana"), 120)
+            self.assertEqual(scraper.scraper_budget("22Bet Ghana"), scraper.SCRAPER_BUDGET_SECONDS)
+            self.assertEqual(scraper.scraper_budget("Pinnacle"), scraper.SCRAPER_BUDGET_SECONDS)
+        finally:
+            scraper.SCRAPER_BUDGETS = original
+
+
+if __name__ == "__main__":
+    unittest.main()
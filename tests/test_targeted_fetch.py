@@ -0,0 +1,176 @@
+import contextlib
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import scrape_odds_github as scraper
+from backend.scrapers import twentytwobet_ghana as twentytwo
+from backend.scrapers import deadline
+from backend.scrapers.deadline import pop_truncation
+
+
+def _event(event_id, league_id):
+    return {"id": event_id, "leagueId": league_id, "team1": f"Home {event_id}", "team2": f"Away {event_id}"}
+
+
+def _odds():
+    return [{
+        "vendorMarketId": 1,
+        "outcomes": [
+            {"vendorOutcomeId": 1, "odds": "2.1"},
+            {"vendorOutcomeId": 2, "odds": "3.3"},
+            {"vendorOutcomeId": 3, "odds": "3.6"},
+        ],
+    }]
+
+
+class FakeTwentyTwoBet:
+    """Main listing of 450 events; league 7 holds events 1..250 (also in the main listing)."""
+
+    def __init__(self, main_total=450, league_total=250, limit=100, priced=lambda event_id: True):
+        self.main_total = main_total
+        self.priced = priced
+        self.league_total = league_total
+        self.limit = limit
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _page(self, ids, league_id, page, limit):
+        chunk = ids[(page - 1) * limit: page * limit]
+        return {
+            "items": [_event(i, league_id) for i in chunk],
+            "relations": {"odds": {str(i): _odds() for i in chunk if self.priced(i)}, "league": [{"id": 7, "name": "England. Premier League"}]},
+            "totalCount": len(ids),
+            "limit": limit,
+        }
+
+    def fetch_page(self, page, limit):
+        with self.lock:
+            self.calls.append(("main", page))
+        return self._page(list(range(1, self.main_total + 1)), 9, page, limit)
+
+    def fetch_league_page(self, league_id, page, limit):
+        with self.lock:
+            self.calls.append((league_id, page))
+        return self._page(list(range(1, self.league_total + 1)), league_id, page, limit)
+
+
+class TestTwentyTwoBetParallel(unittest.TestCase):
+    def _run(self, fake, max_matches):
+        with mock.patch.object(twentytwo, "_fetch_page", fake.fetch_page), \
+                mock.patch.object(twentytwo, "_fetch_league_page", fake.fetch_league_page), \
+                mock.patch.object(twentytwo, "_fetch_league_list", lambda: [{"id": 7, "name": "Premier League"}]), \
+                mock.patch.object(twentytwo, "PAGE_SIZE", 100), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return twentytwo.scrape_22bet_ghana(max_matches=max_matches)
+
+    def test_all_pages_fetched_once_and_deduplicated(self):
+        fake = FakeTwentyTwoBet()
+        matches = self._run(fake, max_matches=1200)
+        self.assertEqual(len(matches), 450)
+        self.assertEqual(len({m["event_id"] for m in matches}), 450)
+        self.assertEqual(sorted(c for c in fake.calls if c[0] == 7), [(7, 1), (7, 2), (7, 3)])
+        self.assertEqual(sorted(c[1] for c in fake.calls if c[0] == "main"), [1, 2, 3, 4, 5])
+
+    def test_tops_up_main_listing_when_pages_come_up_short(self):
+        # Only odd events carry a 1X2 market, so each main page yields 50
+        fake = FakeTwentyTwoBet(main_total=1000, league_total=0, priced=lambda event_id: event_id % 2)
+        matches = self._run(fake, max_matches=300)
+        self.assertEqual(len(matches), 300)
+        self.assertEqual(sorted(c[1] for c in fake.calls if c[0] == "main"), [1, 2, 3, 4, 5, 6])
+
+    def _failing(self, fake, failures):
+        fetch_page = fake.fetch_page
+
+        def flaky(page, limit):
+            if page == 2 and failures:
+                failures.pop()
+                fetch_page(page, limit)
+                raise requests.ConnectionError("reset")
+            return fetch_page(page, limit)
+
+        return flaky
+
+    def test_failed_page_is_retried(self):
+        fake = FakeTwentyTwoBet(league_total=0)
+        fake.fetch_page = self._failing(fake, [1])
+        matches = self._run(fake, max_matches=1200)
+        self.assertEqual(len(matches), 450)
+        self.assertEqual(sorted(c[1] for c in fake.calls if c[0] == "main"), [1, 2, 2, 3, 4, 5])
+        self.assertIsNone(pop_truncation(twentytwo.BOOKMAKER))
+
+    def test_failed_page_is_skipped_and_recorded(self):
+        fake = FakeTwentyTwoBet(league_total=0)
+        fake.fetch_page = self._failing(fake, [1, 1])
+        matches = self._run(fake, max_matches=1200)
+        # the pages after the lost one are still parsed
+        self.assertEqual(len(matches), 350)
+        self.assertNotIn(150, {m["event_id"] for m in matches})
+        self.assertEqual(pop_truncation(twentytwo.BOOKMAKER), "main page 2 failed")
+
+
+class TestSportyBetTargetedFetch(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(deadline.clear_deadline, "SportyBet Ghana")
+        self.addCleanup(deadline.pop_truncation, "SportyBet Ghana")
+
+    def _run(self, on_fetch=lambda tournament_id, page: None):
+        calls = []
+        lock = threading.Lock()
+
+        def fake(session, headers, page, page_size=100, tournament_id=None):
+            with lock:
+                calls.append((tournament_id, page))
+            on_fetch(tournament_id, page)
+            if tournament_id is None:
+                if page > 1:
+                    return {}
+                return {"totalNum": 1, "tournaments": [{"name": "England. Premier League", "id": "sr:tournament:17", "events": []}]}
+            start = (page - 1) * page_size
+            ids = range(start, min(start + page_size, 230))
+            events = [{
+                "eventId": f"sr:match:{i}",
+                "homeTeamName": f"Home {i}",
+                "awayTeamName": f"Away {i}",
+                "markets": [{"id": "1", "outcomes": [
+                    {"desc": "1", "odds": "2.0"}, {"desc": "X", "odds": "3.0"}, {"desc": "2", "odds": "4.0"},
+                ]}],
+            } for i in ids]
+            return {"totalNum": 230, "tournaments": [{"name": "Premier League", "events": events}] if events else []}
+
+        with mock.patch.object(scraper, "fetch_sportybet_data", fake), \
+                mock.patch.object(scraper.requests.Session, "get", lambda *a, **k: None), \
+                mock.patch.object(scraper, "FAST_MODE", True), \
+                contextlib.redirect_stdout(io.StringIO()):
+            return calls, scraper.scrape_sportybet()
+
+    def test_tournament_pages_planned_from_total(self):
+        calls, matches = self._run()
+        self.assertEqual(len(matches), 230)
+        self.assertIsNone(deadline.pop_truncation("SportyBet Ghana"))
+        targeted = sorted(c for c in calls if c[0])
+        self.assertEqual(targeted, [("sr:tournament:17", 1), ("sr:tournament:17", 2), ("sr:tournament:17", 3)])
+
+    def test_skipped_discovery_is_recorded(self):
+        deadline.set_deadline("SportyBet Ghana", time.time() - 1)
+        calls, _ = self._run()
+        self.assertFalse([c for c in calls if c[0]])
+        self.assertEqual(deadline.pop_truncation("SportyBet Ghana"), "major-league tournament discovery skipped")
+
+    def test_skipped_league_pages_are_recorded(self):
+        def expire(tournament_id, page):
+            if tournament_id:
+                deadline.set_deadline("SportyBet Ghana", time.time() - 1)
+
+        calls, matches = self._run(expire)
+        self.assertEqual([c for c in calls if c[0]], [("sr:tournament:17", 1)])
+        self.assertEqual(len(matches), 100)
+        self.assertEqual(deadline.pop_truncation("SportyBet Ghana"), "2 major-league pages skipped")
+
+
+if __name__ == "__main__":
+    unittest.main()
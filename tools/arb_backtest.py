@@ -1,20 +1,46 @@
 import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+import pandas as pd
+
 from tools.arb_lab import (
+    add_slippage_adjustment,
     compute_arbitrage_opportunities,
     compute_consensus_edges,
+    concat_rows,
+    list_history_runs,
+    list_history_runs_from_jsonl,
+    load_arbitrage_opportunities,
     load_snapshot_rows,
     load_snapshot_rows_from_jsonl,
     resolve_db_path,
     resolve_history_jsonl,
     summarize_arbitrage,
+    sweep_daily_compounding,
 )
+from tools.frame_cache import DEFAULT_CACHE_DIR, load_prepared_rows
+
+GRID_COLUMNS = ("bookmakers", "leagues", "slippage", "threshold")
+METRICS = ("count", "matches", "avg_return", "max_return", "profit")
+COMPOUND_METRICS = ("final_bankroll", "total_return", "max_drawdown")
+# Simulator settings behind the compound_* columns of arb sweeps (the terminal's defaults)
+COMPOUNDING = {
+    "reserve_pct": 0.1,
+    "max_daily_exposure_pct": 0.7,
+    "per_event_cap_pct": 0.1,
+    "per_bookie_cap_pct": 0.25,
+    "max_arbs_per_day": 20,
+}
+# Prepared history of the running grid, set once per worker process
+_ROWS: Optional[pd.DataFrame] = None
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -32,21 +58,359 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--strategy", choices=["arb", "edge"], default="arb", help="Strategy type")
     parser.add_argument("--leagues", nargs="*", default=None, help="Filter leagues")
     parser.add_argument("--bookmakers", nargs="*", default=None, help="Filter bookmakers")
-    parser.add_argument("--max-rows", type=int, default=None, help="Max rows to load")
+    parser.add_argument("--max-rows", type=int, default=None, help="Max rows to load (not with --walk-forward)")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Load history as compact frames (categorical strings, float32 odds, epoch times)",
+    )
     parser.add_argument("--output-csv", default=None, help="Export results to CSV")
     parser.add_argument("--output-json", default=None, help="Export results to JSON")
+
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--sweep", action="store_true", help="Evaluate the grid below over the whole range, ranked")
+    modes.add_argument(
+        "--walk-forward",
+        action="store_true",
+        help="Pick the best grid point on each training window and score it on the days that follow",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Grid: minimum ROI (arb) or edge (edge) after slippage (default: --min-roi/--min-edge)",
+    )
+    parser.add_argument("--slippage", type=float, nargs="+", default=[0.0], help="Grid: odds slippage, e.g. 0 0.01")
+    parser.add_argument(
+        "--bookmaker-sets",
+        nargs="+",
+        default=None,
+        help="Grid: comma-separated bookmaker sets, 'all' for every bookmaker (default: --bookmakers)",
+    )
+    parser.add_argument(
+        "--league-sets",
+        nargs="+",
+        default=None,
+        help="Grid: comma-separated league sets, 'all' for every league (default: --leagues)",
+    )
+    parser.add_argument("--train-days", type=int, default=7, help="Walk-forward training window in days")
+    parser.add_argument("--test-days", type=int, default=1, help="Walk-forward test window (and step) in days")
+    parser.add_argument(
+        "--rank-by",
+        choices=METRICS + tuple(f"compound_{name}" for name in COMPOUND_METRICS),
+        default="profit",
+        help="Metric that ranks grid points (compound_* for arbs only)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Prepared frame cache for --sweep/--walk-forward (empty string to disable)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Grid points to print")
     return parser
 
 
-def main() -> int:
-    parser = build_parser()
-    args = parser.parse_args()
+def _name_set(value: str) -> Optional[List[str]]:
+    """Names of a comma-separated set, or None for 'all'."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    return None if not names or names == ["all"] else names
+
+
+def _set_label(names: Optional[List[str]]) -> str:
+    return ",".join(names) if names else "all"
+
+
+def _picks(frame: pd.DataFrame, returns: Optional[pd.Series] = None) -> pd.DataFrame:
+    """match_id and return of each candidate (an empty frame when there are none)."""
+    if frame.empty:
+        return pd.DataFrame({"match_id": pd.Series(dtype=object), "return": pd.Series(dtype=float)})
+    return pd.DataFrame({"match_id": frame["match_id"], "return": returns})
+
+
+def _metrics(picks: pd.DataFrame, bankroll: float) -> Dict:
+    returns = picks["return"]
+    return {
+        "count": int(len(picks)),
+        "matches": int(picks["match_id"].nunique()),
+        "avg_return": float(returns.mean()) if len(picks) else 0.0,
+        "max_return": float(returns.max()) if len(picks) else 0.0,
+        "profit": float(bankroll * returns.sum()),
+    }
+
+
+def _in_window(found: pd.DataFrame, window: Optional[Tuple]) -> Tuple[Dict, pd.DataFrame]:
+    if window is None:
+        return {}, found
+    labels, start, end = window
+    if found.empty:
+        return labels, found
+    # naive run times are UTC (arb_lab._run_times), like the window bounds
+    times = pd.to_datetime(found["run_time"], utc=True)
+    return labels, found[(times >= start) & (times < end)]
+
+
+def _evaluate(task: Tuple) -> List[Dict]:
+    """
+    Grid rows of one (bookmaker set, league set). Arbs and edges work run by
+    run, so they are computed once over all the rows and then sliced per
+    window before each slippage and threshold is applied.
+    """
+    strategy, bankroll, thresholds, slippages, windows, bookmakers, leagues = task
+    # slippage only lowers returns, so the lowest threshold keeps every candidate
+    floor = min(thresholds)
+    if strategy == "arb":
+        found, _ = compute_arbitrage_opportunities(
+            _ROWS, bankroll=bankroll, min_roi=floor, include_bookmakers=bookmakers, include_leagues=leagues
+        )
+    else:
+        found = compute_consensus_edges(
+            _ROWS, bankroll=bankroll, min_edge=floor, include_bookmakers=bookmakers, include_leagues=leagues
+        )
+
+    results = []
+    for window in windows or [None]:
+        labels, candidates = _in_window(found, window)
+        labels = dict(labels, bookmakers=_set_label(bookmakers), leagues=_set_label(leagues))
+        for slippage in slippages:
+            if strategy == "arb":
+                adjusted = add_slippage_adjustment(candidates, slippage)
+                picks = _picks(adjusted, adjusted.get("arb_roi_adj"))
+                compound = sweep_daily_compounding(
+                    adjusted, {"min_roi": list(thresholds)}, bankroll, workers=1, **COMPOUNDING
+                ).to_dict("records")
+            else:
+                # the same factor on every best price keeps the pick and scales its payout
+                factor = max(0.0, 1.0 - slippage)
+                returns = (candidates["pick_edge"] + 1) * factor - 1 if not candidates.empty else None
+                picks = _picks(candidates, returns)
+                compound = [{} for _ in thresholds]
+            for threshold, compounded in zip(thresholds, compound):
+                row = dict(labels, slippage=slippage, threshold=threshold)
+                row.update(_metrics(picks[picks["return"] >= threshold], bankroll))
+                row.update({f"compound_{name}": compounded[name] for name in COMPOUND_METRICS if compounded})
+                results.append(row)
+    return results
 
+
+def _init_worker(rows: Optional[pd.DataFrame]) -> None:
+    global _ROWS
+    _ROWS = rows
+
+
+def evaluate_grid(
+    rows: pd.DataFrame,
+    strategy: str,
+    bankroll: float,
+    thresholds: List[float],
+    slippages: List[float],
+    bookmaker_sets: List[Optional[List[str]]],
+    league_sets: List[Optional[List[str]]],
+    windows: Optional[List[Tuple[Dict, pd.Timestamp, pd.Timestamp]]] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    One row per grid point (and window): the prepared rows go to each worker
+    process once, and every (bookmaker set, league set) is one task.
+    windows are (labels, start, end) run-time slices; their labels become
+    columns. workers=1 runs in this process.
+    """
+    tasks = [
+        (strategy, bankroll, tuple(thresholds), tuple(slippages), windows, bookmakers, leagues)
+        for bookmakers in bookmaker_sets
+        for leagues in league_sets
+    ]
+    workers = min(len(tasks), int(workers or os.cpu_count() or 1))
+    if workers <= 1:
+        _init_worker(rows)
+        try:
+            results = [_evaluate(task) for task in tasks]
+        finally:
+            _init_worker(None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rows,)) as pool:
+            results = list(pool.map(_evaluate, tasks))
+    return pd.DataFrame([row for task_rows in results for row in task_rows])
+
+
+def rank_grid(results: pd.DataFrame, rank_by: str) -> pd.DataFrame:
+    ranked = results.sort_values(rank_by, ascending=False, kind="stable", ignore_index=True)
+    ranked.insert(0, "rank", range(1, len(ranked) + 1))
+    return ranked
+
+
+def walk_forward(
+    rows: pd.DataFrame,
+    strategy: str,
+    bankroll: float,
+    thresholds: List[float],
+    slippages: List[float],
+    bookmaker_sets: List[Optional[List[str]]],
+    league_sets: List[Optional[List[str]]],
+    train_days: int = 7,
+    test_days: int = 1,
+    rank_by: str = "profit",
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling folds over the run days: the best grid point by rank_by on
+    train_days of history, scored on the test_days after it; the window
+    then moves on by test_days. One row per fold with the chosen point, its
+    training score and its test_* metrics. All folds go through one
+    evaluate_grid call.
+    """
+    days = sorted(pd.to_datetime(rows["run_time"], utc=True).dt.date.unique()) if not rows.empty else []
+    if not days:
+        return pd.DataFrame()
+    folds = []
+    test_start = days[0] + timedelta(days=train_days)
+    while test_start <= days[-1]:
+        folds.append((test_start - timedelta(days=train_days), test_start, test_start + timedelta(days=test_days)))
+        test_start += timedelta(days=test_days)
+    if not folds:
+        return pd.DataFrame()
+
+    def stamp(day):
+        return pd.Timestamp(day, tz="UTC")
+
+    windows = []
+    for fold, (train_start, test_start, test_end) in enumerate(folds):
+        windows.append(({"fold": fold, "phase": "train"}, stamp(train_start), stamp(test_start)))
+        windows.append(({"fold": fold, "phase": "test"}, stamp(test_start), stamp(test_end)))
+    grid = evaluate_grid(
+        rows, strategy, bankroll, thresholds, slippages, bookmaker_sets, league_sets, windows, workers
+    )
+
+    metrics = [col for col in grid.columns if col not in GRID_COLUMNS + ("fold", "phase")]
+    results = []
+    for fold, (train_start, test_start, test_end) in enumerate(folds):
+        train = rank_grid(grid[(grid["fold"] == fold) & (grid["phase"] == "train")], rank_by)
+        best = train.iloc[0]
+        test = grid[(grid["fold"] == fold) & (grid["phase"] == "test")]
+        for col in GRID_COLUMNS:
+            test = test[test[col] == best[col]]
+        row = {
+            "fold": fold,
+            "train_start": train_start.isoformat(),
+            "train_end": (test_start - timedelta(days=1)).isoformat(),
+            "test_start": test_start.isoformat(),
+            "test_end": min(test_end - timedelta(days=1), days[-1]).isoformat(),
+        }
+        row.update({col: best[col] for col in GRID_COLUMNS})
+        row[f"train_{rank_by}"] = best[rank_by]
+        row.update({f"test_{col}": test.iloc[0][col] for col in metrics})
+        results.append(row)
+    return pd.DataFrame(results)
+
+
+def _load_prepared(args, run_start=None, run_end=None) -> pd.DataFrame:
+    return load_prepared_rows(
+        args.jsonl if args.use_jsonl else args.db,
+        run_start=run_start or args.run_start,
+        run_end=run_end or args.run_end,
+        match_start=args.match_start,
+        match_end=args.match_end,
+        max_rows=args.max_rows,
+        jsonl=args.use_jsonl,
+        compact=args.compact,
+        cache_dir=args.cache_dir,
+    )
+
+
+def load_fold_rows(args) -> pd.DataFrame:
+    """
+    Prepared history for walk-forward, one frame cache entry per run day:
+    folds share the days they overlap on, and reruns read them back (only
+    the latest day picks up new runs).
+    """
     if args.use_jsonl:
+        runs = list_history_runs_from_jsonl(args.jsonl, args.run_start, args.run_end)
+    else:
+        runs = list_history_runs(args.db, args.run_start, args.run_end)
+    days = sorted(pd.to_datetime(runs["run_ts"], unit="s", utc=True).dt.date.unique())
+    frames = [frame for frame in (_load_prepared(args, day, day) for day in days) if not frame.empty]
+    return concat_rows(frames) if frames else pd.DataFrame()
+
+
+def _write_results(args, results: pd.DataFrame) -> None:
+    if args.output_csv and not results.empty:
+        results.to_csv(args.output_csv, index=False)
+        print(f"Wrote {args.output_csv}")
+    if args.output_json and not results.empty:
+        results.to_json(args.output_json, orient="records")
+        print(f"Wrote {args.output_json}")
+
+
+def run_grid(args) -> int:
+    """--sweep and --walk-forward: history loaded and prepared once, then the grid."""
+    if args.strategy != "arb" and args.rank_by.startswith("compound_"):
+        print("compound_* metrics are only computed for --strategy arb.")
+        return 1
+    rows = load_fold_rows(args) if args.walk_forward else _load_prepared(args)
+    if rows.empty:
+        print("No data found for the requested range.")
+        return 1
+    default_threshold = args.min_roi if args.strategy == "arb" else args.min_edge
+    grid = {
+        "strategy": args.strategy,
+        "bankroll": args.bankroll,
+        "thresholds": args.thresholds or [default_threshold],
+        "slippages": args.slippage,
+        "bookmaker_sets": [_name_set(s) for s in args.bookmaker_sets] if args.bookmaker_sets else [args.bookmakers],
+        "league_sets": [_name_set(s) for s in args.league_sets] if args.league_sets else [args.leagues],
+        "workers": args.workers,
+    }
+    if args.walk_forward:
+        results = walk_forward(
+            rows, train_days=args.train_days, test_days=args.test_days, rank_by=args.rank_by, **grid
+        )
+        if results.empty:
+            print(f"Not enough run days for a {args.train_days}-day training window.")
+            return 1
+        test_col = f"test_{args.rank_by}"
+        print(f"Folds: {len(results)}")
+        print(f"Test {args.rank_by}: total {results[test_col].sum():,.4f}, mean {results[test_col].mean():,.4f}")
+    else:
+        results = rank_grid(evaluate_grid(rows, **grid), args.rank_by)
+        print(f"Grid points: {len(results)}")
+    if args.top > 0:
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(results.head(args.top).to_string(index=False))
+    _write_results(args, results)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.walk_forward and args.max_rows:
+        parser.error("--max-rows cannot be combined with --walk-forward (folds need whole days)")
+    if args.sweep or args.walk_forward:
+        return run_grid(args)
+
+    # Arbs over all bookmakers come straight from the tables written at ingest
+    materialized = None
+    if args.strategy == "arb" and not args.use_jsonl and not args.bookmakers and not args.max_rows:
+        materialized = load_arbitrage_opportunities(
+            db_path=args.db,
+            run_start=args.run_start,
+            run_end=args.run_end,
+            match_start=args.match_start,
+            match_end=args.match_end,
+            bankroll=args.bankroll,
+            min_roi=args.min_roi,
+            include_leagues=args.leagues,
+        )
+
+    if materialized is not None:
+        rows = materialized[1]
+    elif args.use_jsonl:
         rows = load_snapshot_rows_from_jsonl(
             jsonl_path=args.jsonl,
             run_start=args.run_start,
             run_end=args.run_end,
+            compact=args.compact,
         )
     else:
         rows = load_snapshot_rows(
@@ -56,6 +420,7 @@ def main() -> int:
             match_start=args.match_start,
             match_end=args.match_end,
             limit=args.max_rows,
+            compact=args.compact,
         )
 
     if rows.empty:
@@ -63,7 +428,7 @@ def main() -> int:
         return 1
 
     if args.strategy == "arb":
-        arbs, matches = compute_arbitrage_opportunities(
+        arbs, matches = materialized or compute_arbitrage_opportunities(
             rows,
             bankroll=args.bankroll,
             min_roi=args.min_roi,
@@ -93,12 +458,7 @@ def main() -> int:
             print(f"Avg edge: {results['pick_edge'].mean()*100:.2f}%")
             print(f"Max edge: {results['pick_edge'].max()*100:.2f}%")
 
-    if args.output_csv and not results.empty:
-        results.to_csv(args.output_csv, index=False)
-        print(f"Wrote {args.output_csv}")
-    if args.output_json and not results.empty:
-        results.to_json(args.output_json, orient="records")
-        print(f"Wrote {args.output_json}")
+    _write_results(args, results)
     return 0
 
 
@@ -1,9 +1,27 @@
-import json
 import os
 import re
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timezone
-from typing import Dict, Iterable, Optional, Tuple
+from itertools import product
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from backend.core import jsonl_index
+from backend.core.history_db import (
+    LIVE_LINE_SECONDS,
+    MATCH_INFO_COLUMNS,
+    best_lines_query,
+    compacted_runs_query,
+    fixture_lines_query,
+    init_history_db,
+    iso_to_epoch,
+    open_close_query,
+    run_ts_for,
+    runs_query,
+    snapshot_query,
+    stale_best_lines_query,
+    write_snapshot,
+)
 
 try:
     import numpy as np
@@ -50,60 +68,6 @@ def resolve_results_db_path(path: Optional[str] = None) -> str:
     return os.path.abspath(candidate) if candidate else ""
 
 
-def init_history_db(conn: sqlite3.Connection) -> None:
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS runs (
-            run_id TEXT PRIMARY KEY,
-            last_updated TEXT,
-            total_scraped INTEGER,
-            matched_events INTEGER,
-            scrape_time_seconds REAL,
-            fast_mode INTEGER,
-            created_at TEXT
-        )
-        """
-    )
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS matches (
-            run_id TEXT,
-            match_id TEXT,
-            league TEXT,
-            start_time INTEGER,
-            home_team TEXT,
-            away_team TEXT,
-            PRIMARY KEY (run_id, match_id)
-        )
-        """
-    )
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS odds (
-            run_id TEXT,
-            match_id TEXT,
-            bookmaker TEXT,
-            home_odds REAL,
-            draw_odds REAL,
-            away_odds REAL,
-            event_id TEXT,
-            event_league_id TEXT,
-            PRIMARY KEY (run_id, match_id, bookmaker)
-        )
-        """
-    )
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_league ON matches(league)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_start ON matches(start_time)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_odds_bookie ON odds(bookmaker)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_updated ON runs(last_updated)")
-
-    cols = {row[1] for row in conn.execute("PRAGMA table_info(odds)").fetchall()}
-    if "event_id" not in cols:
-        conn.execute("ALTER TABLE odds ADD COLUMN event_id TEXT")
-    if "event_league_id" not in cols:
-        conn.execute("ALTER TABLE odds ADD COLUMN event_league_id TEXT")
-
-
 def rows_from_odds_payload(payload: Dict) -> pd.DataFrame:
     if not payload:
         return pd.DataFrame()
@@ -195,8 +159,7 @@ def append_snapshot_to_history_jsonl(payload: Dict, path: Optional[str] = None)
     record = dict(payload)
     if not record.get("run_id"):
         record["run_id"] = record.get("last_updated") or datetime.now(timezone.utc).isoformat()
-    with open(target, "a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+    jsonl_index.append_indexed(target, record)
 
 
 def append_snapshot_to_history_db(payload: Dict, db_path: Optional[str] = None) -> None:
@@ -207,68 +170,13 @@ def append_snapshot_to_history_db(payload: Dict, db_path: Optional[str] = None)
         return
     os.makedirs(os.path.dirname(path), exist_ok=True)
     run_id = payload.get("run_id") or payload.get("last_updated") or datetime.now(timezone.utc).isoformat()
-    stats = payload.get("stats", {}) or {}
 
     conn = sqlite3.connect(path)
     try:
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
         init_history_db(conn)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO runs (
-                run_id, last_updated, total_scraped, matched_events, scrape_time_seconds,
-                fast_mode, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                run_id,
-                payload.get("last_updated"),
-                stats.get("total_scraped"),
-                stats.get("matched_events"),
-                stats.get("scrape_time_seconds"),
-                0,
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
-
-        match_rows = []
-        odds_rows = []
-        for match in payload.get("matches", []) or []:
-            match_id = match.get("match_id") or _build_fixture_id(match)
-            match_rows.append((
-                run_id,
-                match_id,
-                match.get("league", ""),
-                int(match.get("start_time") or 0),
-                match.get("home_team", ""),
-                match.get("away_team", ""),
-            ))
-            for odds in match.get("odds", []) or []:
-                odds_rows.append((
-                    run_id,
-                    match_id,
-                    odds.get("bookmaker", ""),
-                    odds.get("home_odds"),
-                    odds.get("draw_odds"),
-                    odds.get("away_odds"),
-                    odds.get("event_id"),
-                    odds.get("event_league_id") or odds.get("league_id"),
-                ))
-
-        if match_rows:
-            conn.executemany(
-                "INSERT OR REPLACE INTO matches (run_id, match_id, league, start_time, home_team, away_team)"
-                " VALUES (?, ?, ?, ?, ?, ?)",
-                match_rows,
-            )
-        if odds_rows:
-            conn.executemany(
-                "INSERT OR REPLACE INTO odds "
-                "(run_id, match_id, bookmaker, home_odds, draw_odds, away_odds, event_id, event_league_id)"
-                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                odds_rows,
-            )
+        write_snapshot(conn, run_id, payload, lambda match: match.get("match_id") or _build_fixture_id(match))
         conn.commit()
     finally:
         conn.close()
@@ -293,22 +201,8 @@ def last_jsonl_run_id(path: Optional[str]) -> Optional[str]:
     target = os.path.abspath(path or DEFAULT_HISTORY_JSONL)
     if not target or not os.path.exists(target):
         return None
-    last_line = None
-    with open(target, "rb") as handle:
-        try:
-            handle.seek(-2, os.SEEK_END)
-            while handle.read(1) != b"\n":
-                handle.seek(-2, os.SEEK_CUR)
-        except OSError:
-            handle.seek(0)
-        last_line = handle.readline().decode("utf-8", errors="ignore").strip()
-    if not last_line:
-        return None
-    try:
-        record = json.loads(last_line)
-    except json.JSONDecodeError:
-        return None
-    return record.get("run_id") or record.get("last_updated")
+    entries = jsonl_index.ensure_index(target)
+    return entries[-1]["run_id"] if entries else None
 
 
 def _to_iso(value: Optional[object], end_of_day: bool = False) -> Optional[str]:
@@ -354,6 +248,81 @@ def _to_epoch(value: Optional[object], end_of_day: bool = False) -> Optional[int
     return int(dt.timestamp())
 
 
+def _history_window(
+    run_start: Optional[object],
+    run_end: Optional[object],
+    match_start: Optional[object],
+    match_end: Optional[object],
+) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+    """Epoch bounds for history DB queries (dates cover the whole day)."""
+    run_start_iso = _to_iso(run_start, end_of_day=False)
+    run_end_iso = _to_iso(run_end, end_of_day=True)
+    return (
+        iso_to_epoch(run_start_iso) if run_start_iso else None,
+        iso_to_epoch(run_end_iso) if run_end_iso else None,
+        _to_epoch(match_start, end_of_day=False),
+        _to_epoch(match_end, end_of_day=True),
+    )
+
+
+# Repeated strings kept as categories in compact frames (see compact_rows)
+COMPACT_CATEGORIES = ("run_id", "match_id", "league", "home_team", "away_team", "bookmaker")
+ODDS_COLUMNS = ("home_odds", "draw_odds", "away_odds")
+
+
+def compact_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    rows with COMPACT_CATEGORIES as categoricals, float32 odds and integer
+    epoch seconds for last_updated and start_time. The arb_lab functions take
+    compact and regular frames alike; results keep float64 money columns.
+    """
+    if rows is None or rows.empty:
+        return rows
+    df = rows.copy(deep=False)
+    for col in COMPACT_CATEGORIES:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col in ODDS_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    if "last_updated" in df.columns and not pd.api.types.is_integer_dtype(df["last_updated"]):
+        epochs = {value: iso_to_epoch(value) for value in df["last_updated"].dropna().unique()}
+        df["last_updated"] = df["last_updated"].map(epochs).fillna(0).astype("int64")
+    if "start_time" in df.columns:
+        start = pd.to_numeric(df["start_time"], errors="coerce")
+        df["start_time"] = start.astype("int64") if start.notna().all() else start.astype("Int64")
+    return df
+
+
+def concat_rows(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat(frames, ignore_index=True), keeping categorical columns categorical."""
+    frames = list(frames)
+    if len(frames) > 1:
+        for col in frames[0].columns:
+            if not all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+                continue
+            categories = frames[0][col].cat.categories.append([frame[col].cat.categories for frame in frames[1:]]).unique()
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _run_times(last_updated: pd.Series) -> pd.Series:
+    """
+    UTC run times from last_updated, ISO strings or (compact) epoch seconds.
+    Naive ISO stamps (the scraper writes datetime.now()) are taken as UTC,
+    like iso_to_epoch, so both modes give the same tz-aware column.
+    """
+    if pd.api.types.is_numeric_dtype(last_updated):
+        return pd.to_datetime(last_updated, unit="s", errors="coerce", utc=True)
+    return pd.to_datetime(last_updated, errors="coerce", utc=True, format="ISO8601")
+
+
+def _run_epoch(run_id: str, last_updated) -> int:
+    if isinstance(last_updated, (int, np.integer)):
+        return int(last_updated)
+    return iso_to_epoch(last_updated or run_id)
+
+
 def load_snapshot_rows(
     db_path: Optional[str] = None,
     run_start: Optional[object] = None,
@@ -361,121 +330,323 @@ def load_snapshot_rows(
     match_start: Optional[object] = None,
     match_end: Optional[object] = None,
     limit: Optional[int] = None,
+    since: Optional[str] = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """
+    One row per (run, fixture, bookmaker). Compacted runs get their unchanged
+    lines carried forward (fill_compacted_lines) unless limit is set, which
+    returns the latest stored rows only. since (a run_id) keeps only the runs
+    after it, for topping up rows already loaded (see HistoryTail). compact
+    returns compact_rows() of the result.
+    """
+    rows = _snapshot_rows(db_path, run_start, run_end, match_start, match_end, limit, since)
+    return compact_rows(rows) if compact else rows
+
+
+def _snapshot_rows(
+    db_path: Optional[str],
+    run_start: Optional[object],
+    run_end: Optional[object],
+    match_start: Optional[object],
+    match_end: Optional[object],
+    limit: Optional[int],
+    since: Optional[str],
 ) -> pd.DataFrame:
     path = resolve_db_path(db_path)
     if not path or not os.path.exists(path):
         raise FileNotFoundError(f"History DB not found: {path or '<empty>'}")
 
-    run_start_iso = _to_iso(run_start, end_of_day=False)
-    run_end_iso = _to_iso(run_end, end_of_day=True)
-    match_start_ts = _to_epoch(match_start, end_of_day=False)
-    match_end_ts = _to_epoch(match_end, end_of_day=True)
-
-    clauses = []
-    params = []
-    if run_start_iso:
-        clauses.append("r.last_updated >= ?")
-        params.append(run_start_iso)
-    if run_end_iso:
-        clauses.append("r.last_updated <= ?")
-        params.append(run_end_iso)
-    if match_start_ts is not None:
-        clauses.append("m.start_time >= ?")
-        params.append(match_start_ts)
-    if match_end_ts is not None:
-        clauses.append("m.start_time <= ?")
-        params.append(match_end_ts)
-
-    query = """
-        SELECT
-            r.run_id,
-            r.last_updated,
-            m.match_id,
-            m.league,
-            m.start_time,
-            m.home_team,
-            m.away_team,
-            o.bookmaker,
-            o.home_odds,
-            o.draw_odds,
-            o.away_odds,
-            o.event_id,
-            o.event_league_id
-        FROM odds o
-        JOIN matches m ON o.run_id = m.run_id AND o.match_id = m.match_id
-        JOIN runs r ON o.run_id = r.run_id
-    """
-    if clauses:
-        query += " WHERE " + " AND ".join(clauses)
-    query += " ORDER BY r.last_updated DESC, m.start_time DESC"
-    if limit:
-        query += " LIMIT ?"
-        params.append(int(limit))
+    run_start_ts, run_end_ts, match_start_ts, match_end_ts = _history_window(
+        run_start, run_end, match_start, match_end
+    )
 
     conn = sqlite3.connect(path)
     try:
         init_history_db(conn)
-        return pd.read_sql_query(query, conn, params=params)
+        if since:
+            run_start_ts = max(run_start_ts or 0, run_ts_for(conn, since) + 1)
+        query, params = snapshot_query(
+            run_start_ts=run_start_ts,
+            run_end_ts=run_end_ts,
+            match_start_ts=match_start_ts,
+            match_end_ts=match_end_ts,
+            limit=limit,
+        )
+        rows = pd.read_sql_query(query, conn, params=params)
+        if limit:
+            return rows
+        query, params = compacted_runs_query(run_start_ts, run_end_ts)
+        runs = pd.read_sql_query(query, conn, params=params)
+        if runs.empty:
+            return rows
+        query, params = fixture_lines_query(
+            int(runs["run_ts"].min()), int(runs["run_ts"].max()), match_start_ts, match_end_ts
+        )
+        lines = pd.read_sql_query(query, conn, params=params)
     finally:
         conn.close()
+    filled = fill_compacted_lines(rows, runs, lines)
+    if len(filled) == len(rows):
+        return rows
+    return filled.sort_values(["last_updated", "start_time"], ascending=False, kind="stable", ignore_index=True)
+
+
+def fill_compacted_lines(rows: pd.DataFrame, runs: pd.DataFrame, lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    Carry unchanged lines forward into compacted runs.
+
+    runs holds run_id, last_updated and run_ts of the compacted runs to fill;
+    lines holds every stored line (with run_ts) of the fixtures they may
+    contain. A (match, bookmaker) line missing from such a run, but seen both
+    at or before it and at or after it, gets its latest earlier price.
+    """
+    if runs.empty or lines.empty:
+        return rows
+    columns = list(rows.columns) if len(rows.columns) else [c for c in lines.columns if c != "run_ts"]
+    lines = lines.sort_values("run_ts", kind="stable")
+    spans = lines.groupby(["match_id", "bookmaker"], sort=False)["run_ts"].agg(["min", "max"]).reset_index()
+    runs = runs.sort_values("run_ts", kind="stable").reset_index(drop=True)
+    run_ts = runs["run_ts"].to_numpy(dtype=np.int64)
+    lo = np.searchsorted(run_ts, spans["min"].to_numpy(dtype=np.int64), side="left")
+    hi = np.searchsorted(run_ts, spans["max"].to_numpy(dtype=np.int64), side="right")
+    counts = hi - lo
+    total = int(counts.sum())
+    if total == 0:
+        return rows
+    span_idx = np.repeat(np.arange(len(spans)), counts)
+    run_idx = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+
+    wanted = pd.DataFrame({
+        "run_id": runs["run_id"].to_numpy()[run_idx],
+        "last_updated": runs["last_updated"].to_numpy()[run_idx],
+        "run_ts": run_ts[run_idx],
+        "match_id": spans["match_id"].to_numpy()[span_idx],
+        "bookmaker": spans["bookmaker"].to_numpy()[span_idx],
+    })
+    if not rows.empty:
+        present = rows[["run_id", "match_id", "bookmaker"]].drop_duplicates()
+        wanted = wanted.merge(present, on=["run_id", "match_id", "bookmaker"], how="left", indicator=True)
+        wanted = wanted[wanted["_merge"] == "left_only"].drop(columns="_merge")
+    if wanted.empty:
+        return rows
+    filled = pd.merge_asof(
+        wanted.sort_values("run_ts", kind="stable"),
+        lines.drop(columns=["run_id", "last_updated"]),
+        on="run_ts",
+        by=["match_id", "bookmaker"],
+        direction="backward",
+    )
+    return pd.concat([rows, filled[columns]], ignore_index=True) if not rows.empty else filled[columns].reset_index(drop=True)
+
+
+JSONL_ROW_COLUMNS = (
+    "run_id", "last_updated", "match_id", "league", "start_time", "home_team", "away_team",
+    "bookmaker", "event_id", "event_league_id", "home_odds", "draw_odds", "away_odds",
+)
+
+
+def _append_jsonl_record_columns(columns: Dict[str, list], record: Dict) -> None:
+    """Flatten one snapshot into per-column lists (much cheaper than a dict per row)."""
+    run_id = record.get("run_id") or record.get("last_updated")
+    last_updated = record.get("last_updated")
+    (run_ids, updated, match_ids, leagues, starts, homes, aways,
+     bookmakers, event_ids, event_league_ids, home_odds, draw_odds, away_odds) = (
+        columns[name] for name in JSONL_ROW_COLUMNS
+    )
+    for match in record.get("matches", []) or []:
+        home_team = match.get("home_team") or ""
+        away_team = match.get("away_team") or ""
+        start_time = match.get("start_time") or 0
+        match_id = match.get("match_id") or f"{home_team}-{away_team}-{start_time}"
+        league = match.get("league")
+        for odds in match.get("odds", []) or []:
+            run_ids.append(run_id)
+            updated.append(last_updated)
+            match_ids.append(match_id)
+            leagues.append(league)
+            starts.append(start_time)
+            homes.append(home_team)
+            aways.append(away_team)
+            bookmakers.append(odds.get("bookmaker"))
+            event_ids.append(odds.get("event_id"))
+            event_league_ids.append(odds.get("event_league_id") or odds.get("league_id"))
+            home_odds.append(odds.get("home_odds"))
+            draw_odds.append(odds.get("draw_odds"))
+            away_odds.append(odds.get("away_odds"))
+
+
+def _jsonl_columns_frame(columns: Dict[str, list]) -> pd.DataFrame:
+    if not columns["run_id"]:
+        return pd.DataFrame()
+    return pd.DataFrame(columns, columns=list(JSONL_ROW_COLUMNS))
+
+
+def _jsonl_window(
+    jsonl_path: Optional[str],
+    run_start: Optional[object],
+    run_end: Optional[object],
+    since: Optional[str] = None,
+) -> Tuple[str, list, list]:
+    """History path, all index entries, and the entries in the run window (after run since)."""
+    path = resolve_history_jsonl(jsonl_path)
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"History JSONL not found: {path or '<empty>'}")
+    entries = jsonl_index.ensure_index(path)
+    window = jsonl_index.select(
+        entries,
+        _to_iso(run_start, end_of_day=False),
+        _to_iso(run_end, end_of_day=True),
+    )
+    if since:
+        known = next((e for e in reversed(entries) if e["run_id"] == since), None)
+        since_ts = _jsonl_run_ts(known) if known else iso_to_epoch(since)
+        window = [e for e in window if _jsonl_run_ts(e) > since_ts]
+    return path, entries, window
+
+
+def _jsonl_run_ts(entry: Dict) -> int:
+    return iso_to_epoch(entry.get("last_updated") or entry.get("run_id"))
+
+
+def _jsonl_compacted_runs(entries: Iterable[Dict]) -> pd.DataFrame:
+    compacted = [e for e in entries if e.get("compacted")]
+    return pd.DataFrame({
+        "run_id": [e["run_id"] for e in compacted],
+        "last_updated": [e.get("last_updated") for e in compacted],
+        "run_ts": [_jsonl_run_ts(e) for e in compacted],
+    })
+
+
+def _jsonl_compacted_lines(path: str, entries: Iterable[Dict], window: list) -> pd.DataFrame:
+    """
+    Lines of the compacted records, with run_ts (compaction keeps each line's
+    last one), for the fixtures that can be open in the window's compacted
+    runs: like fixture_lines_query, kicking off no earlier than
+    LIVE_LINE_SECONDS before the first of them. Records whose index entry
+    says every fixture kicked off before that are not decoded.
+    """
+    first_ts = min(_jsonl_run_ts(e) for e in window if e.get("compacted"))
+    min_start = first_ts - LIVE_LINE_SECONDS
+    compacted = [
+        e for e in entries
+        if e.get("compacted") and e.get("start_max", min_start) >= min_start
+    ]
+    columns = {name: [] for name in JSONL_ROW_COLUMNS}
+    run_ts = []
+    for entry, record in zip(compacted, jsonl_index.read_records(path, compacted)):
+        before = len(columns["run_id"])
+        _append_jsonl_record_columns(columns, record)
+        run_ts.extend([_jsonl_run_ts(entry)] * (len(columns["run_id"]) - before))
+    lines = _jsonl_columns_frame(columns)
+    if lines.empty:
+        return lines
+    lines["run_ts"] = run_ts
+    starts = pd.to_numeric(lines["start_time"], errors="coerce")
+    return lines[starts >= min_start].reset_index(drop=True)
+
+
+def _fill_jsonl_frame(rows: pd.DataFrame, window: list, lines: pd.DataFrame) -> pd.DataFrame:
+    runs = _jsonl_compacted_runs(window)
+    filled = fill_compacted_lines(rows, runs, lines)
+    if len(filled) == len(rows):
+        return rows
+    return filled.sort_values("last_updated", kind="stable", ignore_index=True)
 
 
 def load_snapshot_rows_from_jsonl(
     jsonl_path: Optional[str] = None,
     run_start: Optional[object] = None,
     run_end: Optional[object] = None,
+    since: Optional[str] = None,
+    compact: bool = False,
 ) -> pd.DataFrame:
-    path = resolve_history_jsonl(jsonl_path)
+    """load_snapshot_rows() for odds_history.jsonl, decoding only the runs in the window."""
+    path, entries, window = _jsonl_window(jsonl_path, run_start, run_end, since)
+    columns = {name: [] for name in JSONL_ROW_COLUMNS}
+    for record in jsonl_index.read_records(path, window):
+        _append_jsonl_record_columns(columns, record)
+    rows = _jsonl_columns_frame(columns)
+    if any(e.get("compacted") for e in window):
+        rows = _fill_jsonl_frame(rows, window, _jsonl_compacted_lines(path, entries, window))
+    return compact_rows(rows) if compact else rows
+
+
+def iter_snapshot_frames_from_jsonl(
+    jsonl_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+    chunk_runs: int = 50,
+    compact: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Like load_snapshot_rows_from_jsonl, one DataFrame per chunk_runs runs."""
+    path, entries, window = _jsonl_window(jsonl_path, run_start, run_end)
+    lines = None
+    size = max(1, chunk_runs)
+    for start in range(0, len(window), size):
+        chunk = window[start:start + size]
+        columns = {name: [] for name in JSONL_ROW_COLUMNS}
+        for record in jsonl_index.read_records(path, chunk):
+            _append_jsonl_record_columns(columns, record)
+        frame = _jsonl_columns_frame(columns)
+        if any(e.get("compacted") for e in chunk):
+            if lines is None:
+                lines = _jsonl_compacted_lines(path, entries, window)
+            frame = _fill_jsonl_frame(frame, chunk, lines)
+        if not frame.empty:
+            yield compact_rows(frame) if compact else frame
+
+
+def list_history_runs(
+    db_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+) -> pd.DataFrame:
+    """run_id, last_updated, run_ts and compacted of the stored runs in a window, oldest first."""
+    path = resolve_db_path(db_path)
     if not path or not os.path.exists(path):
-        raise FileNotFoundError(f"History JSONL not found: {path or '<empty>'}")
-
-    run_start_iso = _to_iso(run_start, end_of_day=False)
-    run_end_iso = _to_iso(run_end, end_of_day=True)
+        raise FileNotFoundError(f"History DB not found: {path or '<empty>'}")
+    window = _history_window(run_start, run_end, None, None)
+    conn = sqlite3.connect(path)
+    try:
+        init_history_db(conn)
+        query, params = runs_query(window[0], window[1])
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
 
-    rows = []
-    with open(path, "r", encoding="utf-8") as handle:
-        for line in handle:
-            if not line.strip():
-                continue
-            record = json.loads(line)
-            run_id = record.get("run_id") or record.get("last_updated")
-            last_updated = record.get("last_updated")
-            if run_start_iso and last_updated and last_updated < run_start_iso:
-                continue
-            if run_end_iso and last_updated and last_updated > run_end_iso:
-                continue
-            for match in record.get("matches", []) or []:
-                home_team = match.get("home_team") or ""
-                away_team = match.get("away_team") or ""
-                start_time = match.get("start_time") or 0
-                match_id = match.get("match_id") or f"{home_team}-{away_team}-{start_time}"
-                for odds in match.get("odds", []) or []:
-                    rows.append({
-                        "run_id": run_id,
-                        "last_updated": last_updated,
-                        "match_id": match_id,
-                        "league": match.get("league"),
-                        "start_time": start_time,
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "bookmaker": odds.get("bookmaker"),
-                        "event_id": odds.get("event_id"),
-                        "event_league_id": odds.get("event_league_id") or odds.get("league_id"),
-                        "home_odds": odds.get("home_odds"),
-                        "draw_odds": odds.get("draw_odds"),
-                        "away_odds": odds.get("away_odds"),
-                    })
 
-    return pd.DataFrame(rows)
+def list_history_runs_from_jsonl(
+    jsonl_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+) -> pd.DataFrame:
+    """list_history_runs() for odds_history.jsonl, read from its index."""
+    _, _, window = _jsonl_window(jsonl_path, run_start, run_end)
+    runs = pd.DataFrame({
+        "run_id": [e["run_id"] for e in window],
+        "last_updated": [e.get("last_updated") for e in window],
+        "run_ts": [_jsonl_run_ts(e) for e in window],
+        "compacted": [int(bool(e.get("compacted"))) for e in window],
+    })
+    return runs.sort_values("run_ts", kind="stable", ignore_index=True)
 
 
-def _prepare_odds_frame(rows: pd.DataFrame) -> pd.DataFrame:
+def prepare_odds_frame(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Numeric odds, run_time/match_start/implied_sum columns, one line per
+    bookmaker and home/away aligned with the match consensus. Every step
+    works per run, so frames prepared run by run concatenate to the same
+    result. Prepared frames (those with implied_sum) pass through as copies.
+    """
+    if "implied_sum" in rows.columns:
+        return rows.copy()
     df = rows.copy()
-    odds_cols = ["home_odds", "draw_odds", "away_odds"]
+    odds_cols = list(ODDS_COLUMNS)
     for col in odds_cols:
         df[col] = pd.to_numeric(df[col], errors="coerce")
     df[odds_cols] = df[odds_cols].replace({0: np.nan})
-    df["run_time"] = pd.to_datetime(df["last_updated"], errors="coerce")
+    df["run_time"] = _run_times(df["last_updated"])
     df["match_start"] = pd.to_datetime(df["start_time"], unit="s", errors="coerce")
     df["implied_sum"] = (
         1 / df["home_odds"] + 1 / df["draw_odds"] + 1 / df["away_odds"]
@@ -522,7 +693,7 @@ def _align_home_away_to_consensus(df: pd.DataFrame) -> pd.DataFrame:
         return df
 
     medians = (
-        df.groupby(group_cols, as_index=False)
+        df.groupby(group_cols, as_index=False, observed=True)
         .agg(med_home=("home_odds", "median"), med_away=("away_odds", "median"))
     )
     df = df.merge(medians, on=group_cols, how="left")
@@ -554,6 +725,11 @@ def _align_home_away_to_consensus(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop(columns=["med_home", "med_away"])
 
 
+def _sort_text(values: pd.Series) -> pd.Series:
+    """Sort categoricals by label rather than category code."""
+    return values.astype(str) if isinstance(values.dtype, pd.CategoricalDtype) else values
+
+
 def _best_by_outcome(
     df: pd.DataFrame,
     outcome_col: str,
@@ -563,10 +739,14 @@ def _best_by_outcome(
     extra_labels: Optional[dict] = None,
 ) -> pd.DataFrame:
     keys = ["run_id", "match_id"]
-    eligible = df[df[outcome_col].notna() & (df[outcome_col] > 0)].copy()
+    eligible = df[df[outcome_col].notna() & (df[outcome_col] > 0)]
     if eligible.empty:
         return pd.DataFrame(columns=keys + [bookie_label, odds_label])
-    idx = eligible.groupby(keys)[outcome_col].idxmax()
+    # idxmax keeps the first of tied prices: order lines the way
+    # history_db.best_lines_for_run does (lowest overround, then bookmaker name)
+    order = [col for col in ("implied_sum", "bookmaker") if col in eligible.columns]
+    eligible = eligible.sort_values(order, na_position="last", kind="stable", key=_sort_text)
+    idx = eligible.groupby(keys, observed=True)[outcome_col].idxmax()
     cols = ["bookmaker", outcome_col]
     rename_map = {"bookmaker": bookie_label, outcome_col: odds_label}
     if event_label and "event_id" in eligible.columns:
@@ -578,6 +758,7 @@ def _best_by_outcome(
                 cols.append(src)
                 rename_map[src] = dest
     best = eligible.loc[idx, keys + cols]
+    best[outcome_col] = best[outcome_col].astype(float)  # float32 in compact frames
     return best.rename(columns=rename_map)
 
 
@@ -589,7 +770,7 @@ def build_best_lines(
     if rows is None or rows.empty:
         return pd.DataFrame()
 
-    df = _prepare_odds_frame(rows)
+    df = prepare_odds_frame(rows)
     if include_bookmakers:
         df = df[df["bookmaker"].isin(list(include_bookmakers))]
     if include_leagues:
@@ -598,14 +779,14 @@ def build_best_lines(
         return pd.DataFrame()
 
     keys = ["run_id", "match_id"]
-    match_info = df.groupby(keys, as_index=False).agg({
+    match_info = df.groupby(keys, as_index=False, observed=True).agg({
         "league": "first",
         "start_time": "first",
         "home_team": "first",
         "away_team": "first",
         "last_updated": "first",
     })
-    match_info["run_time"] = pd.to_datetime(match_info["last_updated"], errors="coerce")
+    match_info["run_time"] = _run_times(match_info["last_updated"])
     match_info["match_start"] = pd.to_datetime(match_info["start_time"], unit="s", errors="coerce")
 
     best_home = _best_by_outcome(
@@ -637,7 +818,7 @@ def build_best_lines(
     merged = merged.merge(best_draw, on=keys, how="left")
     merged = merged.merge(best_away, on=keys, how="left")
 
-    bookie_counts = df.groupby(keys, as_index=False)["bookmaker"].nunique().rename(columns={"bookmaker": "bookie_count"})
+    bookie_counts = df.groupby(keys, as_index=False, observed=True)["bookmaker"].nunique().rename(columns={"bookmaker": "bookie_count"})
     merged = merged.merge(bookie_counts, on=keys, how="left")
 
     merged = merged.dropna(subset=["best_home_odds", "best_draw_odds", "best_away_odds"])
@@ -654,7 +835,7 @@ def compute_arbitrage_opportunities(
     if rows is None or rows.empty:
         return pd.DataFrame(), pd.DataFrame()
 
-    df = _prepare_odds_frame(rows)
+    df = prepare_odds_frame(rows)
     if include_bookmakers:
         df = df[df["bookmaker"].isin(list(include_bookmakers))]
     if include_leagues:
@@ -663,14 +844,14 @@ def compute_arbitrage_opportunities(
         return pd.DataFrame(), pd.DataFrame()
 
     keys = ["run_id", "match_id"]
-    match_info = df.groupby(keys, as_index=False).agg({
+    match_info = df.groupby(keys, as_index=False, observed=True).agg({
         "league": "first",
         "start_time": "first",
         "home_team": "first",
         "away_team": "first",
         "last_updated": "first",
     })
-    match_info["run_time"] = pd.to_datetime(match_info["last_updated"], errors="coerce")
+    match_info["run_time"] = _run_times(match_info["last_updated"])
     match_info["match_start"] = pd.to_datetime(match_info["start_time"], unit="s", errors="coerce")
 
     best_home = _best_by_outcome(
@@ -702,15 +883,19 @@ def compute_arbitrage_opportunities(
     merged = merged.merge(best_draw, on=keys, how="left")
     merged = merged.merge(best_away, on=keys, how="left")
     bookie_counts = (
-        df.groupby(keys, as_index=False)["bookmaker"]
+        df.groupby(keys, as_index=False, observed=True)["bookmaker"]
         .nunique()
         .rename(columns={"bookmaker": "bookie_count"})
     )
     merged = merged.merge(bookie_counts, on=keys, how="left")
     merged = merged.dropna(subset=["best_home_odds", "best_draw_odds", "best_away_odds"])
-    if merged.empty:
-        return pd.DataFrame(), match_info
+    return _arbs_from_best_lines(merged, bankroll, min_roi), match_info
+
 
+def _arbs_from_best_lines(merged: pd.DataFrame, bankroll: float, min_roi: Optional[float]) -> pd.DataFrame:
+    if merged.empty:
+        return pd.DataFrame()
+    merged = merged.copy()
     merged["implied_sum"] = (
         1 / merged["best_home_odds"]
         + 1 / merged["best_draw_odds"]
@@ -721,14 +906,143 @@ def compute_arbitrage_opportunities(
     if min_roi is not None:
         merged = merged[merged["arb_roi"] >= min_roi]
     if merged.empty:
-        return pd.DataFrame(), match_info
+        return pd.DataFrame()
 
     merged["stake_home"] = bankroll / (merged["implied_sum"] * merged["best_home_odds"])
     merged["stake_draw"] = bankroll / (merged["implied_sum"] * merged["best_draw_odds"])
     merged["stake_away"] = bankroll / (merged["implied_sum"] * merged["best_away_odds"])
     merged["arb_profit"] = bankroll * merged["arb_roi"]
     merged["arb_roi_pct"] = merged["arb_roi"] * 100
-    return merged.sort_values("arb_roi", ascending=False), match_info
+    return merged.sort_values("arb_roi", ascending=False)
+
+
+def _read_materialized(
+    db_path: Optional[str],
+    window: Tuple[Optional[int], Optional[int], Optional[int], Optional[int]],
+    queries: Iterable[Tuple[str, list]],
+) -> Optional[list]:
+    """One frame per (query, params), or None if a run in the window isn't materialized."""
+    path = resolve_db_path(db_path)
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"History DB not found: {path or '<empty>'}")
+    conn = sqlite3.connect(path)
+    try:
+        init_history_db(conn)
+        query, params = stale_best_lines_query(window[0], window[1])
+        if conn.execute(query + " LIMIT 1", params).fetchone():
+            return None
+        return [pd.read_sql_query(query, conn, params=params) for query, params in queries]
+    finally:
+        conn.close()
+
+
+def _restrict_materialized(
+    frame: pd.DataFrame,
+    include_leagues: Optional[Iterable[str]],
+    keys: Optional[pd.DataFrame],
+) -> pd.DataFrame:
+    if include_leagues:
+        frame = frame[frame["league"].isin(list(include_leagues))]
+    if keys is not None:
+        frame = frame.merge(keys[["run_id", "match_id"]].drop_duplicates(), on=["run_id", "match_id"])
+    frame = frame.reset_index(drop=True)
+    position = frame.columns.get_loc("last_updated") + 1
+    frame.insert(position, "run_time", _run_times(frame["last_updated"]))
+    frame.insert(position + 1, "match_start", pd.to_datetime(frame["start_time"], unit="s", errors="coerce"))
+    return frame
+
+
+def load_best_lines(
+    db_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+    match_start: Optional[object] = None,
+    match_end: Optional[object] = None,
+    include_leagues: Optional[Iterable[str]] = None,
+    keys: Optional[pd.DataFrame] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    build_best_lines() over all bookmakers, read from the best_lines table
+    written at ingest. keys (any frame with run_id and match_id, such as the
+    loaded rows) limits it to those matches. None when a run in the window
+    has not been materialized (tools/backfill_best_lines.py).
+    """
+    window = _history_window(run_start, run_end, match_start, match_end)
+    frames = _read_materialized(db_path, window, [best_lines_query(*window)])
+    if frames is None:
+        return None
+    lines = _restrict_materialized(frames[0], include_leagues, keys)
+    return lines.dropna(subset=["best_home_odds", "best_draw_odds", "best_away_odds"]).reset_index(drop=True)
+
+
+def load_line_open_close(
+    db_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+    match_start: Optional[object] = None,
+    match_end: Optional[object] = None,
+    include_leagues: Optional[Iterable[str]] = None,
+    keys: Optional[pd.DataFrame] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Opening and closing best line of every match seen in the run window, one
+    row per match with _open/_close columns and snapshot_count, read from the
+    line_open_close table. Open and close span the match's whole stored
+    history, not just the window. keys limits it to their match_ids. None
+    when a run in the window has not been materialized.
+    """
+    window = _history_window(run_start, run_end, match_start, match_end)
+    frames = _read_materialized(db_path, window, [open_close_query(*window)])
+    if frames is None:
+        return None
+    frame = frames[0]
+    if keys is not None:
+        frame = frame[frame["match_id"].isin(keys["match_id"].unique())]
+    frame = _restrict_materialized(frame, include_leagues, None)
+    flags = frame[["is_open", "is_close"]].astype(bool)
+    counts = frame[["match_id", "snapshot_count"]].drop_duplicates("match_id")
+    frame = frame.drop(columns=["is_open", "is_close", "snapshot_count"])
+    merged = frame[flags["is_open"]].merge(frame[flags["is_close"]], on="match_id", suffixes=("_open", "_close"))
+    return merged.merge(counts, on="match_id").reset_index(drop=True)
+
+
+def load_arbitrage_opportunities(
+    db_path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+    match_start: Optional[object] = None,
+    match_end: Optional[object] = None,
+    bankroll: float = 1000.0,
+    min_roi: float = 0.0,
+    include_leagues: Optional[Iterable[str]] = None,
+    keys: Optional[pd.DataFrame] = None,
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    compute_arbitrage_opportunities() over all bookmakers, read from the
+    arbs and best_lines tables (see load_best_lines). A negative min_roi
+    reads every best line instead of the arbs table.
+    """
+    window = _history_window(run_start, run_end, match_start, match_end)
+    if min_roi is not None and min_roi >= 0:
+        frames = _read_materialized(
+            db_path,
+            window,
+            [best_lines_query(*window, columns=MATCH_INFO_COLUMNS), best_lines_query(*window, min_roi=min_roi)],
+        )
+        if frames is None:
+            return None
+        match_info = _restrict_materialized(frames[0], include_leagues, keys)
+        lines = _restrict_materialized(frames[1].drop(columns=["implied_sum", "arb_roi"]), include_leagues, keys)
+    else:
+        frames = _read_materialized(db_path, window, [best_lines_query(*window)])
+        if frames is None:
+            return None
+        lines = _restrict_materialized(frames[0], include_leagues, keys)
+        match_info = lines[[col for col in lines.columns if not col.startswith(("best_", "bookie_"))]]
+    if match_info.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    lines = lines.dropna(subset=["best_home_odds", "best_draw_odds", "best_away_odds"])
+    return _arbs_from_best_lines(lines, bankroll, min_roi), match_info
 
 
 def compute_consensus_edges(
@@ -741,7 +1055,7 @@ def compute_consensus_edges(
     if rows is None or rows.empty:
         return pd.DataFrame()
 
-    df = _prepare_odds_frame(rows)
+    df = prepare_odds_frame(rows)
     if include_bookmakers:
         df = df[df["bookmaker"].isin(list(include_bookmakers))]
     if include_leagues:
@@ -750,7 +1064,7 @@ def compute_consensus_edges(
         return pd.DataFrame()
 
     keys = ["run_id", "match_id"]
-    avg_odds = df.groupby(keys, as_index=False).agg({
+    avg_odds = df.groupby(keys, as_index=False, observed=True).agg({
         "league": "first",
         "start_time": "first",
         "home_team": "first",
@@ -763,8 +1077,9 @@ def compute_consensus_edges(
     avg_odds = avg_odds.dropna(subset=["home_odds", "draw_odds", "away_odds"])
     if avg_odds.empty:
         return pd.DataFrame()
+    avg_odds[list(ODDS_COLUMNS)] = avg_odds[list(ODDS_COLUMNS)].astype(float)
 
-    avg_odds["run_time"] = pd.to_datetime(avg_odds["last_updated"], errors="coerce")
+    avg_odds["run_time"] = _run_times(avg_odds["last_updated"])
     avg_odds["match_start"] = pd.to_datetime(avg_odds["start_time"], unit="s", errors="coerce")
 
     best_home = _best_by_outcome(df, "home_odds", "best_home_odds", "best_home_bookie")
@@ -842,6 +1157,135 @@ def compute_consensus_edges(
     return merged.sort_values("pick_edge", ascending=False)
 
 
+def keep_latest_runs(rows: pd.DataFrame, max_rows: Optional[int]) -> pd.DataFrame:
+    """rows without their oldest whole runs, leaving at most max_rows rows (the latest run always stays)."""
+    if not max_rows or len(rows) <= max_rows:
+        return rows
+    runs = rows.drop_duplicates("run_id")
+    run_ts = pd.Series(
+        [_run_epoch(run_id, updated) for run_id, updated in zip(runs["run_id"], runs["last_updated"])],
+        index=runs["run_id"].to_numpy(),
+    ).sort_values(ascending=False, kind="stable")
+    total = rows["run_id"].value_counts().reindex(run_ts.index).cumsum()
+    keep = total.index[(total <= max_rows) | (total.index == total.index[0])]
+    return rows[rows["run_id"].isin(keep)].reset_index(drop=True)
+
+
+# Per-run analytics: every (run, match) result depends on that run's rows
+# only. Values are the column their full result is sorted by, descending.
+PER_RUN_RESULTS = {
+    build_best_lines: None,
+    compute_arbitrage_opportunities: "arb_roi",
+    compute_consensus_edges: "pick_edge",
+}
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(value)
+    return value
+
+
+def _append_result(old, new, sort_by: Optional[str]):
+    if isinstance(old, tuple):
+        return tuple(_append_result(o, n, sort_by) for o, n in zip(old, new))
+    if new is None or new.empty:
+        return old
+    if old is None or old.empty:
+        return new
+    merged = concat_rows([old, new])
+    if sort_by and sort_by in merged.columns:
+        merged = merged.sort_values(sort_by, ascending=False, kind="stable")
+    return merged
+
+
+class HistoryTail:
+    """
+    A loaded history window kept up to date by loading only new runs.
+
+    rows holds the prepared rows. refresh(fetch) calls fetch(last_run_id),
+    e.g. load_snapshot_rows(..., since=...), and extend() appends the runs
+    not seen yet. The PER_RUN_RESULTS asked for through result() are kept
+    and extended by computing them for the new runs only.
+    """
+
+    max_results = 16
+
+    def __init__(self, rows: Optional[pd.DataFrame]):
+        self.rows = prepare_odds_frame(rows) if rows is not None and not rows.empty else pd.DataFrame()
+        self._results: Dict[tuple, object] = {}
+        self._latest = self._latest_run(self.rows)
+
+    @staticmethod
+    def _latest_run(rows: pd.DataFrame) -> Optional[Tuple[int, str]]:
+        if rows.empty:
+            return None
+        runs = rows.drop_duplicates("run_id")
+        return max(
+            (_run_epoch(run_id, updated), run_id)
+            for run_id, updated in zip(runs["run_id"], runs["last_updated"])
+        )
+
+    @property
+    def last_run_id(self) -> Optional[str]:
+        return self._latest[1] if self._latest else None
+
+    def result(self, func: Callable, seed: Optional[Callable[[], object]] = None, **kwargs):
+        """
+        func(rows, **kwargs) for a PER_RUN_RESULTS function, computed once and
+        then extended run by run. seed, when given, may return the same
+        result from elsewhere (such as the materialized tables) or None.
+        """
+        if func not in PER_RUN_RESULTS:
+            raise ValueError(f"{func.__name__} is not a per-run result")
+        key = (func, tuple(sorted((name, _freeze(value)) for name, value in kwargs.items())))
+        if key in self._results:
+            self._results[key] = self._results.pop(key)  # most recently used last
+        else:
+            value = seed() if seed else None
+            self._results[key] = value if value is not None else func(self.rows, **kwargs)
+            while len(self._results) > self.max_results:
+                self._results.pop(next(iter(self._results)))
+        return self._results[key]
+
+    def extend(self, new_rows: Optional[pd.DataFrame]) -> int:
+        """Append the runs of new_rows not loaded yet and update the kept results; returns how many runs."""
+        if new_rows is None or new_rows.empty:
+            return 0
+        if not self.rows.empty:
+            new_rows = new_rows[~new_rows["run_id"].isin(self.rows["run_id"].unique())]
+            if new_rows.empty:
+                return 0
+        prepared = prepare_odds_frame(new_rows)
+        self.rows = concat_rows([self.rows, prepared]) if not self.rows.empty else prepared
+        for (func, frozen), value in list(self._results.items()):
+            self._results[(func, frozen)] = _append_result(value, func(prepared, **dict(frozen)), PER_RUN_RESULTS[func])
+        self._latest = max(filter(None, (self._latest, self._latest_run(prepared))))
+        return int(prepared["run_id"].nunique())
+
+    def refresh(self, fetch: Callable[[Optional[str]], Optional[pd.DataFrame]]) -> int:
+        """extend(fetch(last_run_id))."""
+        return self.extend(fetch(self.last_run_id))
+
+    def trim(self, max_rows: Optional[int]) -> int:
+        """Drop the oldest whole runs (rows and results) until at most max_rows rows are left; returns how many."""
+        if not max_rows or len(self.rows) <= max_rows:
+            return 0
+        before = self.rows["run_id"].nunique()
+        self.rows = keep_latest_runs(self.rows, max_rows)
+        keep = self.rows["run_id"].unique()
+
+        def restrict(value):
+            if isinstance(value, tuple):
+                return tuple(restrict(v) for v in value)
+            if value is None or value.empty or "run_id" not in value.columns:
+                return value
+            return value[value["run_id"].isin(keep)]
+
+        self._results = {key: restrict(value) for key, value in self._results.items()}
+        return before - len(keep)
+
+
 def summarize_arbitrage(arbs: pd.DataFrame, matches: Optional[pd.DataFrame] = None) -> dict:
     summary = {
         "matches": int(matches["match_id"].nunique()) if matches is not None and not matches.empty else 0,
@@ -944,8 +1388,8 @@ def attach_results(
         return pd.DataFrame()
 
     frame = matches.copy().reset_index(drop=False).rename(columns={"index": "_row_id"})
-    frame["home_norm"] = frame["home_team"].map(_normalize_team_value)
-    frame["away_norm"] = frame["away_team"].map(_normalize_team_value)
+    frame["home_norm"] = frame["home_team"].astype(object).map(_normalize_team_value)
+    frame["away_norm"] = frame["away_team"].astype(object).map(_normalize_team_value)
 
     if "start_time" in frame.columns and frame["start_time"].notna().any():
         frame["match_epoch"] = pd.to_numeric(frame["start_time"], errors="coerce")
@@ -1045,7 +1489,7 @@ def add_slippage_adjustment(arbs: pd.DataFrame, slippage_pct: float = 0.0) -> pd
         return pd.DataFrame()
     df = arbs.copy()
     for col in ("best_home_odds", "best_draw_odds", "best_away_odds"):
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
     slippage_pct = max(0.0, float(slippage_pct or 0.0))
     factor = max(0.0, 1.0 - slippage_pct)
     df["home_odds_adj"] = df["best_home_odds"] * factor
@@ -1064,8 +1508,136 @@ def add_slippage_adjustment(arbs: pd.DataFrame, slippage_pct: float = 0.0) -> pd
     return df
 
 
-def simulate_daily_compounding(
-    arbs: pd.DataFrame,
+COMPOUNDING_PARAMS = (
+    "reserve_pct",
+    "max_daily_exposure",
+    "max_daily_exposure_pct",
+    "per_event_cap",
+    "per_event_cap_pct",
+    "per_bookie_cap",
+    "per_bookie_cap_pct",
+    "max_arbs_per_day",
+    "min_roi",
+)
+DAILY_COLUMNS = ("run_date", "bankroll_start", "bankroll_end", "profit", "exposure", "roi_day", "picks", "reserve")
+PICK_COLUMNS = (
+    "run_time",
+    "league",
+    "home_team",
+    "away_team",
+    "match_start",
+    "snapshot_age_min",
+    "kickoff_minutes",
+    "best_home_bookie",
+    "best_draw_bookie",
+    "best_away_bookie",
+    "home_odds_adj",
+    "draw_odds_adj",
+    "away_odds_adj",
+    "arb_roi_adj",
+)
+_LEG_BOOKIES = ["best_home_bookie", "best_draw_bookie", "best_away_bookie"]
+_LEG_WEIGHTS = ["w_home", "w_draw", "w_away"]
+# Prepared arrays of the running sweep, set once per worker process
+_SWEEP_ARRAYS: Optional[Dict] = None
+
+
+def _compounding_candidates(arbs: pd.DataFrame, min_roi: float) -> pd.DataFrame:
+    """Best arb per (day, match) at or above min_roi, each day in the order picks are taken."""
+    df = arbs.copy()
+    df["run_date"] = pd.to_datetime(df["run_time"], errors="coerce").dt.date
+    df = df.dropna(subset=["run_date", "arb_roi_adj"])
+    df = df[df["arb_roi_adj"] >= min_roi]
+    df = df.sort_values(["run_date", "arb_roi_adj"], ascending=[True, False])
+    return df.drop_duplicates(subset=["run_date", "match_id"], keep="first").reset_index(drop=True)
+
+
+def _compounding_arrays(candidates: pd.DataFrame) -> Dict:
+    """What the engine reads of the candidates, as arrays: day bounds, ROI, leg weights, bookie codes."""
+    days, first = np.unique(candidates["run_date"].to_numpy(), return_index=True)
+    bookies = candidates[_LEG_BOOKIES].to_numpy(dtype=object).ravel()
+    codes, names = pd.factorize(bookies)
+    codes[bookies == ""] = -1
+    return {
+        "days": days,
+        "bounds": np.append(first, len(candidates)),
+        "roi": candidates["arb_roi_adj"].to_numpy(dtype=float),
+        "weights": candidates[_LEG_WEIGHTS].to_numpy(dtype=float),
+        "bookies": codes.reshape(-1, 3),
+        "bookie_count": len(names),
+    }
+
+
+def _flat_stakes(count: int, day_cap: float, event_cap: Optional[float]) -> np.ndarray:
+    """Stakes of the first count picks of a day without a bookmaker cap."""
+    if not count or day_cap <= 0 or (event_cap is not None and event_cap <= 0):
+        return np.zeros(0)
+    if event_cap is None:
+        return np.array([day_cap])
+    # Full event caps while they fit; add.accumulate sums in order like the loop does
+    used = np.add.accumulate(np.full(count, event_cap))
+    fits = day_cap - np.concatenate(([0.0], used[:-1])) >= event_cap
+    full = count if fits.all() else int(np.argmin(fits))
+    stakes = [event_cap] * full
+    exposure = float(used[full - 1]) if full else 0.0
+    while len(stakes) < count:
+        remaining = day_cap - exposure
+        if remaining <= 0:
+            break
+        stake = min(remaining, event_cap)
+        exposure += stake
+        stakes.append(stake)
+    return np.asarray(stakes, dtype=float)
+
+
+def _capped_stakes(
+    arrays: Dict,
+    rows: np.ndarray,
+    limit: Optional[int],
+    day_cap: float,
+    event_cap: Optional[float],
+    bookie_cap: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows taken on a day under a per-bookmaker cap, and their total stakes."""
+    used = [0.0] * arrays["bookie_count"]
+    weights = arrays["weights"][rows].tolist()
+    taken = []
+    stakes = []
+    exposure = 0.0
+    for index, legs in enumerate(arrays["bookies"][rows].tolist()):
+        if limit and len(stakes) >= limit:
+            break
+        remaining = day_cap - exposure
+        if remaining <= 0:
+            break
+        stake_total = remaining if event_cap is None else min(remaining, event_cap)
+        if stake_total <= 0:
+            continue
+        factor = 1.0
+        for bookie, weight in zip(legs, weights[index]):
+            if bookie < 0:
+                continue
+            stake = stake_total * weight
+            cap_left = bookie_cap - used[bookie]
+            if cap_left <= 0 or stake <= 0:
+                factor = 0.0
+                break
+            factor = min(factor, cap_left / stake)
+        if factor <= 0:
+            continue
+        if factor < 1.0:
+            stake_total *= factor
+        exposure += stake_total
+        for bookie, weight in zip(legs, weights[index]):
+            if bookie >= 0:
+                used[bookie] += stake_total * weight
+        taken.append(index)
+        stakes.append(stake_total)
+    return rows[taken], np.asarray(stakes, dtype=float)
+
+
+def _compound(
+    arrays: Dict,
     initial_bankroll: float,
     reserve_pct: float = 0.1,
     max_daily_exposure: Optional[float] = None,
@@ -1076,33 +1648,30 @@ def simulate_daily_compounding(
     per_bookie_cap_pct: Optional[float] = None,
     max_arbs_per_day: Optional[int] = None,
     min_roi: float = 0.0,
-    selection: str = "roi",
-) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    if arbs is None or arbs.empty:
-        return pd.DataFrame(), pd.DataFrame()
-
-    df = arbs.copy()
-    df["run_date"] = pd.to_datetime(df["run_time"], errors="coerce").dt.date
-    df = df.dropna(subset=["run_date", "arb_roi_adj"])
-    df = df[df["arb_roi_adj"] >= float(min_roi or 0.0)]
-    if df.empty:
-        return pd.DataFrame(), pd.DataFrame()
-
-    sort_col = "arb_roi_adj" if selection == "roi" else "arb_roi_adj"
-    df = df.sort_values(["run_date", sort_col], ascending=[True, False])
-    df = df.drop_duplicates(subset=["run_date", "match_id"], keep="first")
-
+) -> Tuple[Dict[str, list], np.ndarray, np.ndarray]:
+    """
+    The compounding engine over prepared arrays: the daily columns, and the
+    candidate positions and total stakes of the picks taken. Days run in
+    order (each starts from the previous bankroll); within a day stakes are
+    computed on arrays, with a loop only while bookmaker caps are tracked.
+    """
+    roi = arrays["roi"]
+    bounds = arrays["bounds"]
+    eligible = roi >= float(min_roi or 0.0)
+    reserve_pct = max(0.0, min(0.95, float(reserve_pct or 0.0)))
+    limit = int(max_arbs_per_day) if max_arbs_per_day else None
+    daily = {col: [] for col in DAILY_COLUMNS}
+    positions = []
+    stakes = []
     bankroll = float(initial_bankroll)
-    daily_rows = []
-    pick_rows = []
 
-    for run_date, group in df.groupby("run_date"):
+    for day in range(len(bounds) - 1):
+        rows = np.flatnonzero(eligible[bounds[day]:bounds[day + 1]]) + bounds[day]
+        if not len(rows):
+            continue
         day_start = bankroll
-        reserve_pct = max(0.0, min(0.95, float(reserve_pct or 0.0)))
         reserve = day_start * reserve_pct
-        available = max(day_start - reserve, 0.0)
-
-        day_cap = available
+        day_cap = max(day_start - reserve, 0.0)
         if max_daily_exposure is not None:
             day_cap = min(day_cap, float(max_daily_exposure))
         if max_daily_exposure_pct is not None:
@@ -1118,100 +1687,188 @@ def simulate_daily_compounding(
             pct_cap = day_start * float(per_bookie_cap_pct)
             bookie_cap = pct_cap if bookie_cap is None else min(bookie_cap, pct_cap)
 
-        exposure_used = 0.0
-        profit_total = 0.0
-        picks_count = 0
-        bookie_exposure = {}
+        if bookie_cap is None:
+            day_stakes = _flat_stakes(min(len(rows), limit or len(rows)), day_cap, event_cap)
+            rows = rows[: len(day_stakes)]
+        else:
+            rows, day_stakes = _capped_stakes(arrays, rows, limit, day_cap, event_cap, bookie_cap)
+
+        exposure = float(np.add.accumulate(day_stakes)[-1]) if len(day_stakes) else 0.0
+        profit = float(np.add.accumulate(day_stakes * roi[rows])[-1]) if len(day_stakes) else 0.0
+        bankroll = day_start + profit
+        positions.append(rows)
+        stakes.append(day_stakes)
+        for col, value in zip(DAILY_COLUMNS, (
+            arrays["days"][day],
+            day_start,
+            bankroll,
+            profit,
+            exposure,
+            (profit / exposure) if exposure > 0 else 0.0,
+            len(day_stakes),
+            reserve,
+        )):
+            daily[col].append(value)
+
+    if not positions:
+        return daily, np.zeros(0, dtype=int), np.zeros(0)
+    return daily, np.concatenate(positions), np.concatenate(stakes)
 
-        for _, row in group.iterrows():
-            if max_arbs_per_day and picks_count >= int(max_arbs_per_day):
-                break
 
-            remaining = day_cap - exposure_used
-            if remaining <= 0:
-                break
+def simulate_daily_compounding(
+    arbs: pd.DataFrame,
+    initial_bankroll: float,
+    reserve_pct: float = 0.1,
+    max_daily_exposure: Optional[float] = None,
+    max_daily_exposure_pct: Optional[float] = None,
+    per_event_cap: Optional[float] = None,
+    per_event_cap_pct: Optional[float] = None,
+    per_bookie_cap: Optional[float] = None,
+    per_bookie_cap_pct: Optional[float] = None,
+    max_arbs_per_day: Optional[int] = None,
+    min_roi: float = 0.0,
+    selection: str = "roi",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Stake the best arb per match each day, highest arb_roi_adj first (the
+    only selection), within the reserve and the daily, event and bookmaker
+    caps; profits compound into the next day's bankroll. Returns the daily
+    and pick frames.
+    """
+    if arbs is None or arbs.empty:
+        return pd.DataFrame(), pd.DataFrame()
 
-            stake_total = remaining
-            if event_cap is not None:
-                stake_total = min(stake_total, event_cap)
-            if stake_total <= 0:
-                continue
+    candidates = _compounding_candidates(arbs, float(min_roi or 0.0))
+    if candidates.empty:
+        return pd.DataFrame(), pd.DataFrame()
 
-            stake_home = stake_total * row["w_home"]
-            stake_draw = stake_total * row["w_draw"]
-            stake_away = stake_total * row["w_away"]
-
-            if bookie_cap is not None:
-                factor = 1.0
-                for bookie, stake in (
-                    (row["best_home_bookie"], stake_home),
-                    (row["best_draw_bookie"], stake_draw),
-                    (row["best_away_bookie"], stake_away),
-                ):
-                    if not bookie:
-                        continue
-                    cap_left = bookie_cap - bookie_exposure.get(bookie, 0.0)
-                    if cap_left <= 0 or stake <= 0:
-                        factor = 0.0
-                        break
-                    factor = min(factor, cap_left / stake)
-
-                if factor <= 0:
-                    continue
-                if factor < 1.0:
-                    stake_total *= factor
-                    stake_home = stake_total * row["w_home"]
-                    stake_draw = stake_total * row["w_draw"]
-                    stake_away = stake_total * row["w_away"]
-
-            exposure_used += stake_total
-            profit = stake_total * row["arb_roi_adj"]
-            profit_total += profit
-            picks_count += 1
-
-            for bookie, stake in (
-                (row["best_home_bookie"], stake_home),
-                (row["best_draw_bookie"], stake_draw),
-                (row["best_away_bookie"], stake_away),
-            ):
-                if not bookie:
-                    continue
-                bookie_exposure[bookie] = bookie_exposure.get(bookie, 0.0) + stake
-
-            pick_rows.append({
-                "run_date": run_date,
-                "run_time": row.get("run_time"),
-                "league": row.get("league"),
-                "home_team": row.get("home_team"),
-                "away_team": row.get("away_team"),
-                "match_start": row.get("match_start"),
-                "snapshot_age_min": row.get("snapshot_age_min"),
-                "kickoff_minutes": row.get("kickoff_minutes"),
-                "best_home_bookie": row.get("best_home_bookie"),
-                "best_draw_bookie": row.get("best_draw_bookie"),
-                "best_away_bookie": row.get("best_away_bookie"),
-                "home_odds_adj": row.get("home_odds_adj"),
-                "draw_odds_adj": row.get("draw_odds_adj"),
-                "away_odds_adj": row.get("away_odds_adj"),
-                "arb_roi_adj": row.get("arb_roi_adj"),
-                "stake_total": stake_total,
-                "stake_home": stake_home,
-                "stake_draw": stake_draw,
-                "stake_away": stake_away,
-                "profit": profit,
-            })
+    daily, positions, stakes = _compound(
+        _compounding_arrays(candidates),
+        initial_bankroll,
+        reserve_pct=reserve_pct,
+        max_daily_exposure=max_daily_exposure,
+        max_daily_exposure_pct=max_daily_exposure_pct,
+        per_event_cap=per_event_cap,
+        per_event_cap_pct=per_event_cap_pct,
+        per_bookie_cap=per_bookie_cap,
+        per_bookie_cap_pct=per_bookie_cap_pct,
+        max_arbs_per_day=max_arbs_per_day,
+        min_roi=min_roi,
+    )
+    if not len(positions):
+        return pd.DataFrame(daily), pd.DataFrame()
+
+    taken = candidates.iloc[positions].reset_index(drop=True)
+    picks = pd.DataFrame({"run_date": taken["run_date"]})
+    for col in PICK_COLUMNS:
+        picks[col] = taken[col] if col in taken.columns else None
+    weights = taken[_LEG_WEIGHTS].to_numpy(dtype=float)
+    picks["stake_total"] = stakes
+    picks["stake_home"] = stakes * weights[:, 0]
+    picks["stake_draw"] = stakes * weights[:, 1]
+    picks["stake_away"] = stakes * weights[:, 2]
+    picks["profit"] = stakes * taken["arb_roi_adj"].to_numpy(dtype=float)
+    return pd.DataFrame(daily), picks
+
+
+def _compounding_summary(daily: Dict[str, list], initial_bankroll: float) -> Dict[str, float]:
+    initial_bankroll = float(initial_bankroll)
+    curve = np.array([initial_bankroll] + list(daily["bankroll_end"]), dtype=float)
+    peaks = np.maximum.accumulate(curve)
+    drawdowns = np.where(peaks > 0, 1 - curve / np.where(peaks > 0, peaks, 1.0), 0.0)
+    days = len(daily["run_date"])
+    exposure = float(sum(daily["exposure"]))
+    profit = float(curve[-1] - initial_bankroll)
+    return {
+        "days": days,
+        "picks": int(sum(daily["picks"])),
+        "final_bankroll": float(curve[-1]),
+        "profit": profit,
+        "total_return": profit / initial_bankroll if initial_bankroll > 0 else 0.0,
+        "exposure": exposure,
+        "roi_on_exposure": profit / exposure if exposure > 0 else 0.0,
+        "avg_daily_profit": profit / days if days else 0.0,
+        "max_drawdown": float(drawdowns.max()),
+    }
+
+
+def compounding_grid(grid) -> list:
+    """
+    The parameter sets of a sweep: every combination of a {param: values}
+    mapping (a scalar is a single value), or a list of param dicts as given.
+    Keys must be simulate_daily_compounding parameters (COMPOUNDING_PARAMS).
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        values = [
+            list(grid[name]) if isinstance(grid[name], (list, tuple, range, np.ndarray)) else [grid[name]]
+            for name in names
+        ]
+        points = [dict(zip(names, combo)) for combo in product(*values)]
+    else:
+        points = [dict(point) for point in grid]
+    for point in points:
+        unknown = sorted(set(point) - set(COMPOUNDING_PARAMS))
+        if unknown:
+            raise ValueError(f"Unknown compounding parameters: {', '.join(unknown)}")
+    return points
+
+
+def _init_sweep_worker(arrays: Optional[Dict]) -> None:
+    global _SWEEP_ARRAYS
+    _SWEEP_ARRAYS = arrays
+
+
+def _sweep_point(task: Tuple[float, Dict]) -> Dict[str, float]:
+    initial_bankroll, params = task
+    if _SWEEP_ARRAYS is None:
+        daily = {col: [] for col in DAILY_COLUMNS}
+    else:
+        daily, _, _ = _compound(_SWEEP_ARRAYS, initial_bankroll, **params)
+    return _compounding_summary(daily, initial_bankroll)
+
+
+def sweep_daily_compounding(
+    arbs: pd.DataFrame,
+    grid,
+    initial_bankroll: float,
+    workers: Optional[int] = None,
+    **fixed,
+) -> pd.DataFrame:
+    """
+    simulate_daily_compounding for every parameter set of compounding_grid(grid),
+    with fixed applying to all of them. The arbs are sorted, deduplicated and
+    turned into arrays once (at the lowest min_roi of the grid, which the
+    engine then filters per point) and handed to each worker process once;
+    workers=1 runs in this process. Returns one row per parameter set, in
+    grid order: its parameters, then days, picks, final_bankroll, profit,
+    total_return, exposure, roi_on_exposure, avg_daily_profit, max_drawdown.
+    """
+    compounding_grid([fixed])  # same parameter names as the grid
+    points = [dict(fixed, **point) for point in compounding_grid(grid)]
+    if not points:
+        return pd.DataFrame()
+
+    arrays = None
+    if arbs is not None and not arbs.empty:
+        floor = min(float(point.get("min_roi") or 0.0) for point in points)
+        candidates = _compounding_candidates(arbs, floor)
+        if not candidates.empty:
+            arrays = _compounding_arrays(candidates)
+
+    tasks = [(float(initial_bankroll), point) for point in points]
+    workers = min(len(tasks), int(workers or os.cpu_count() or 1))
+    if workers <= 1:
+        _init_sweep_worker(arrays)
+        try:
+            results = [_sweep_point(task) for task in tasks]
+        finally:
+            _init_sweep_worker(None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=(arrays,)) as pool:
+            results = list(pool.map(_sweep_point, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
 
-        day_end = day_start + profit_total
-        bankroll = day_end
-        daily_rows.append({
-            "run_date": run_date,
-            "bankroll_start": day_start,
-            "bankroll_end": day_end,
-            "profit": profit_total,
-            "exposure": exposure_used,
-            "roi_day": (profit_total / exposure_used) if exposure_used > 0 else 0.0,
-            "picks": picks_count,
-            "reserve": reserve,
-        })
-
-    return pd.DataFrame(daily_rows), pd.DataFrame(pick_rows)
+    names = [name for name in COMPOUNDING_PARAMS if any(name in point for point in points)]
+    return pd.DataFrame([
+        dict({name: point.get(name) for name in names}, **result) for point, result in zip(points, results)
+    ])
@@ -28,12 +28,18 @@ except ImportError as exc:
         "pip install -r requirements.analytics.txt"
     ) from exc
 
+from backend.core import jsoncodec
 from tools.arb_lab import (
     add_slippage_adjustment,
     attach_results,
     build_best_lines,
     compute_arbitrage_opportunities,
+    compact_rows,
     compute_consensus_edges,
+    HistoryTail,
+    load_arbitrage_opportunities,
+    load_best_lines,
+    load_line_open_close,
     load_snapshot_rows,
     load_snapshot_rows_from_jsonl,
     load_results_rows,
@@ -44,9 +50,11 @@ from tools.arb_lab import (
     append_snapshot_to_history_db,
     append_snapshot_to_history_jsonl,
     simulate_daily_compounding,
+    sweep_daily_compounding,
     summarize_arbitrage,
     outcome_from_scores,
 )
+from tools.frame_cache import load_prepared_rows
 
 
 st.set_page_config(page_title="Arbitrage Strategy Terminal", layout="wide")
@@ -158,7 +166,7 @@ def _fetch_22bet_league_map() -> dict:
                 },
             )
             with urllib.request.urlopen(req, timeout=10) as handle:
-                payload = json.load(handle)
+                payload = jsoncodec.load(handle)
             items = payload.get("data", {}).get("leagues", [])
             if not items:
                 break
@@ -335,7 +343,7 @@ def _filter_low_liquidity_local_leagues(
         return df[~local_mask].drop(columns=["league_norm"])
 
     counts = (
-        df.groupby(group_cols, as_index=False)["bookmaker"]
+        df.groupby(group_cols, as_index=False, observed=True)["bookmaker"]
         .nunique()
         .rename(columns={"bookmaker": "bookie_count"})
     )
@@ -344,14 +352,19 @@ def _filter_low_liquidity_local_leagues(
     return df.drop(columns=["league_norm", "bookie_count"])
 
 
-def _compute_clv_table(lines: pd.DataFrame) -> pd.DataFrame:
-    if lines is None or lines.empty:
-        return pd.DataFrame()
-    clv_base = _build_open_close(lines)
-    if clv_base.empty:
+def _compute_clv_table(lines: pd.DataFrame, open_close: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    if open_close is not None:
+        clv = open_close.copy()
+    else:
+        if lines is None or lines.empty:
+            return pd.DataFrame()
+        clv_base = _build_open_close(lines)
+        if clv_base.empty:
+            return pd.DataFrame()
+        snap_counts = lines.groupby("match_id", as_index=False, observed=True)["run_time"].nunique().rename(columns={"run_time": "snapshot_count"})
+        clv = clv_base.merge(snap_counts, on="match_id", how="left")
+    if clv.empty:
         return pd.DataFrame()
-    snap_counts = lines.groupby("match_id", as_index=False)["run_time"].nunique().rename(columns={"run_time": "snapshot_count"})
-    clv = clv_base.merge(snap_counts, on="match_id", how="left")
     clv = clv[clv["snapshot_count"] >= 2]
     if clv.empty:
         return pd.DataFrame()
@@ -392,7 +405,7 @@ def _compute_clv_league_stats(clv: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
     league_col = "league_open" if "league_open" in clv.columns else "league"
     stats = (
-        clv.groupby(league_col, dropna=True)
+        clv.groupby(league_col, dropna=True, observed=True)
         .agg(
             clv_matches=("match_id", "count"),
             clv_pos_rate=("clv_best", lambda x: (x > 0).mean()),
@@ -907,6 +920,7 @@ with st.sidebar:
         st.session_state["last_refresh_ts"] = datetime.utcnow().isoformat()
         st.session_state["effective_refresh_seconds"] = int(effective_refresh) if effective_refresh else None
         if refresh_clicked:
+            st.session_state["history_tail_refresh"] = True
             rerun = getattr(st, "rerun", None) or getattr(st, "experimental_rerun", None)
             if rerun:
                 rerun()
@@ -1026,6 +1040,11 @@ with st.sidebar:
     cancel_on_incomplete = st.checkbox("Cancel if any leg fails", value=False)
     stake_per_pick = st.number_input("Stake per pick (edge results)", min_value=1.0, value=bankroll, step=10.0)
     max_rows = st.number_input("Max rows to load", min_value=5000, value=200000, step=5000)
+    compact_frames = st.checkbox(
+        "Compact frames",
+        value=True,
+        help="Keep loaded history as categorical strings, float32 odds and epoch times (a fraction of the memory).",
+    )
 
     st.subheader("Compounding Simulator")
     initial_bankroll = st.number_input("Initial bankroll", min_value=10.0, value=200.0, step=10.0)
@@ -1108,7 +1127,7 @@ def _load_remote_heartbeat(url: str, timeout_seconds: int):
         },
     )
     with urllib.request.urlopen(request, timeout=timeout_seconds) as handle:
-        payload = json.load(handle)
+        payload = jsoncodec.load(handle)
     return payload
 
 
@@ -1117,7 +1136,7 @@ def _load_local_heartbeat(path: str) -> Optional[dict]:
         return None
     try:
         with open(path, "r", encoding="utf-8") as handle:
-            return json.load(handle)
+            return jsoncodec.load(handle)
     except Exception:
         return None
 
@@ -1135,7 +1154,7 @@ def _load_remote_rows(url: str, timeout_seconds: int):
     for attempt in range(3):
         try:
             with urllib.request.urlopen(request, timeout=timeout_seconds) as handle:
-                payload = json.load(handle)
+                payload = jsoncodec.load(handle)
             rows = rows_from_odds_payload(payload)
             return rows, payload
         except Exception as exc:
@@ -1162,13 +1181,35 @@ def _load_remote_history_rows(base_url: str, params: dict, timeout_seconds: int,
     request = urllib.request.Request(url, headers=headers)
     try:
         with urllib.request.urlopen(request, timeout=timeout_seconds) as handle:
-            payload = json.load(handle)
+            payload = jsoncodec.load(handle)
     except urllib.error.HTTPError as exc:
         raise RuntimeError(f"{exc.code} {exc.reason} for {url}") from exc
     rows = payload.get("data") or []
     return pd.DataFrame(rows), payload
 
 
+# Largest page /api/history/odds returns
+REMOTE_HISTORY_PAGE = 25000
+
+
+def _load_remote_history_since(base_url: str, params: dict, since: str, timeout_seconds: int, api_key: Optional[str]):
+    """Every row of the runs after since, paged through /api/history/odds however long the gap."""
+    query = dict(params, since=since, limit=REMOTE_HISTORY_PAGE)
+    pages = []
+    offset = 0
+    while True:
+        page = _load_remote_history_rows(base_url, dict(query, offset=offset), timeout_seconds, api_key)[0]
+        pages.append(page)
+        if len(page) < REMOTE_HISTORY_PAGE:
+            break
+        offset += len(page)
+    rows = pd.concat(pages, ignore_index=True)
+    if rows.empty:
+        return rows
+    # a run landing mid-paging shifts later pages down by its rows
+    return rows.drop_duplicates(subset=["run_id", "match_id", "bookmaker"], ignore_index=True)
+
+
 def _check_history_api(base_url: str, timeout_seconds: int, api_key: Optional[str]) -> dict:
     base = (base_url or "").rstrip("/")
     endpoints = {
@@ -1186,7 +1227,7 @@ def _check_history_api(base_url: str, timeout_seconds: int, api_key: Optional[st
         req = urllib.request.Request(url, headers=headers)
         try:
             with urllib.request.urlopen(req, timeout=timeout_seconds) as handle:
-                payload = json.load(handle)
+                payload = jsoncodec.load(handle)
             results[name] = {
                 "ok": True,
                 "status": 200,
@@ -1197,12 +1238,32 @@ def _check_history_api(base_url: str, timeout_seconds: int, api_key: Optional[st
     return results
 
 
+def _per_run_result(history: Optional[HistoryTail], rows: pd.DataFrame, func, seed=None, **kwargs):
+    """func(rows, **kwargs), kept up to date run by run on the session's HistoryTail when there is one."""
+    if history is not None:
+        result = history.result(func, seed=seed, **kwargs)
+        if isinstance(result, tuple):
+            return tuple(part.copy() for part in result)
+        return result.copy()
+    result = seed() if seed else None
+    return result if result is not None else func(rows, **kwargs)
+
+
 def _build_best_lines(
     rows: pd.DataFrame,
     include_bookmakers: Optional[Iterable[str]] = None,
     include_leagues: Optional[Iterable[str]] = None,
+    materialized: Optional[dict] = None,
+    history: Optional[HistoryTail] = None,
 ) -> pd.DataFrame:
-    lines = build_best_lines(rows, include_bookmakers=include_bookmakers, include_leagues=include_leagues)
+    lines = _per_run_result(
+        history,
+        rows,
+        build_best_lines,
+        seed=(lambda: load_best_lines(include_leagues=include_leagues, **materialized)) if materialized else None,
+        include_bookmakers=include_bookmakers,
+        include_leagues=include_leagues,
+    )
     if lines is None or lines.empty:
         return pd.DataFrame()
     lines["run_time"] = pd.to_datetime(lines["run_time"], errors="coerce", utc=True)
@@ -1210,6 +1271,18 @@ def _build_best_lines(
     return lines
 
 
+def _load_open_close(materialized: Optional[dict], include_leagues: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
+    """_build_open_close() plus snapshot_count from the line_open_close table, or None to compute it."""
+    if not materialized:
+        return None
+    open_close = load_line_open_close(include_leagues=include_leagues, **materialized)
+    if open_close is None:
+        return None
+    for col in ("run_time_open", "run_time_close", "match_start_open", "match_start_close"):
+        open_close[col] = pd.to_datetime(open_close[col], errors="coerce", utc=True)
+    return open_close
+
+
 def _build_open_close(lines: pd.DataFrame) -> pd.DataFrame:
     if lines is None or lines.empty:
         return pd.DataFrame()
@@ -1220,7 +1293,7 @@ def _build_open_close(lines: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     df = df.sort_values("run_time")
-    open_df = df.groupby("match_id", as_index=False).first()
+    open_df = df.groupby("match_id", as_index=False, observed=True).first()
 
     def pick_close(group: pd.DataFrame) -> pd.Series:
         cutoff = group["match_start"].iloc[0]
@@ -1230,7 +1303,7 @@ def _build_open_close(lines: pd.DataFrame) -> pd.DataFrame:
                 return pre.iloc[-1]
         return group.iloc[-1]
 
-    close_df = df.groupby("match_id", group_keys=False).apply(pick_close).reset_index(drop=True)
+    close_df = df.groupby("match_id", group_keys=False, observed=True).apply(pick_close).reset_index(drop=True)
     merged = open_df.merge(close_df, on="match_id", suffixes=("_open", "_close"))
     return merged
 
@@ -1245,23 +1318,28 @@ def _load_rows_cached(
     match_end_value,
     max_rows_value,
     allow_jsonl,
+    compact_value=False,
 ):
+    # Windows come prepared from the disk cache (tools/frame_cache.py), extended run by run
     try:
-        return load_snapshot_rows(
-            db_path=db_path_value,
+        return load_prepared_rows(
+            db_path_value,
             run_start=run_start_value,
             run_end=run_end_value,
             match_start=match_start_value,
             match_end=match_end_value,
-            limit=int(max_rows_value) if max_rows_value else None,
+            max_rows=int(max_rows_value) if max_rows_value else None,
+            compact=compact_value,
         )
     except FileNotFoundError:
         if not allow_jsonl:
             raise
-        return load_snapshot_rows_from_jsonl(
-            jsonl_path=jsonl_path_value,
+        return load_prepared_rows(
+            jsonl_path_value,
             run_start=run_start_value,
             run_end=run_end_value,
+            jsonl=True,
+            compact=compact_value,
         )
 
 
@@ -1271,7 +1349,41 @@ log_start, log_end = _unpack_range(log_range)
 
 append_snapshot_now = False
 payload_snapshot = None
+keyword_list = [kw.strip() for kw in (local_league_keywords or "").split(",") if kw.strip()] if filter_local_leagues else []
+history_tail_refresh = st.session_state.pop("history_tail_refresh", False) or force_refresh
+
 
+def _liquid(frame: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if frame is None or not keyword_list:
+        return frame
+    return _filter_low_liquidity_local_leagues(frame, keyword_list, int(local_min_bookies))
+
+
+def _history_tail(source: tuple, load, fetch) -> HistoryTail:
+    """
+    The session's HistoryTail for source and the current filters: built from
+    load() the first time, then topped up with fetch(since) on refresh so
+    only runs newer than the loaded ones are fetched and analysed.
+    """
+    key = source + (
+        run_start, run_end, match_start, match_end, int(max_rows), compact_frames, tuple(keyword_list), int(local_min_bookies)
+    )
+    history = st.session_state.get("history_tail")
+    if history is not None and st.session_state.get("history_tail_key") == key:
+        if history_tail_refresh:
+            try:
+                history.refresh(lambda since: _liquid(fetch(since)))
+                history.trim(int(max_rows))
+            except Exception as exc:
+                st.warning(f"Refreshing history failed, showing the rows already loaded: {exc}")
+        return history
+    history = HistoryTail(_liquid(load()))
+    st.session_state["history_tail_key"] = key
+    st.session_state["history_tail"] = history
+    return history
+
+
+history = None
 with st.spinner("Loading history..."):
     rows = None
     if use_remote_history:
@@ -1290,13 +1402,22 @@ with st.spinner("Loading history..."):
             )
         if max_rows:
             params["limit"] = int(max_rows)
+        history_api_key = remote_history_api_key.strip() or None
+
+        def _fetch_remote_history(since=None):
+            # a refresh takes every new run (the tail then trims to max rows); a row limit
+            # would cut off the oldest new runs and last_run_id would move past them
+            if since:
+                rows = _load_remote_history_since(
+                    remote_history_url, params, since, int(remote_history_timeout), history_api_key
+                )
+            else:
+                rows = _load_remote_history_rows(remote_history_url, params, int(remote_history_timeout), history_api_key)[0]
+            return compact_rows(rows) if compact_frames else rows
+
         try:
-            rows, payload_snapshot = _load_remote_history_rows(
-                remote_history_url,
-                params,
-                int(remote_history_timeout),
-                remote_history_api_key.strip() or None,
-            )
+            history = _history_tail(("remote_history", remote_history_url), _fetch_remote_history, _fetch_remote_history)
+            rows = history.rows
         except Exception as exc:
             st.warning(f"Remote history failed: {exc}")
             rows = None
@@ -1307,31 +1428,53 @@ with st.spinner("Loading history..."):
             rows = _filter_rows(rows, run_start, run_end, match_start, match_end)
             if max_rows and rows is not None:
                 rows = rows.head(int(max_rows))
+            rows = _liquid(rows)
         except Exception as exc:
             st.warning(f"Remote snapshot failed: {exc}")
             rows = None
 
+rows_from_db = False
 if rows is None:
+        def _fetch_local(since):
+            try:
+                return load_snapshot_rows(
+                    db_path=db_path,
+                    run_start=run_start,
+                    run_end=run_end,
+                    match_start=match_start,
+                    match_end=match_end,
+                    since=since,
+                    compact=compact_frames,
+                )
+            except FileNotFoundError:
+                if not allow_jsonl_fallback:
+                    raise
+                return load_snapshot_rows_from_jsonl(
+                    jsonl_path=jsonl_path, run_start=run_start, run_end=run_end, since=since, compact=compact_frames
+                )
+
         try:
-            rows = _load_rows_cached(
-                db_path,
-                jsonl_path,
-                run_start,
-                run_end,
-                match_start,
-                match_end,
-                max_rows,
-                allow_jsonl_fallback,
+            rows_from_db = os.path.exists(resolve_db_path(db_path))
+            history = _history_tail(
+                ("local", db_path, jsonl_path, allow_jsonl_fallback),
+                lambda: _load_rows_cached(
+                    db_path,
+                    jsonl_path,
+                    run_start,
+                    run_end,
+                    match_start,
+                    match_end,
+                    max_rows,
+                    allow_jsonl_fallback,
+                    compact_frames,
+                ),
+                _fetch_local,
             )
+            rows = history.rows
         except FileNotFoundError as exc:
             st.error(str(exc))
             st.stop()
 
-if rows is not None and filter_local_leagues:
-    keyword_list = [kw.strip() for kw in (local_league_keywords or "").split(",") if kw.strip()]
-    if keyword_list:
-        rows = _filter_low_liquidity_local_leagues(rows, keyword_list, int(local_min_bookies))
-
 if payload_snapshot and persist_remote and isinstance(payload_snapshot, dict) and payload_snapshot.get("matches"):
     run_id = payload_snapshot.get("run_id") or payload_snapshot.get("last_updated")
     key = f"snapshot_appended_{run_id}"
@@ -1374,7 +1517,7 @@ if rows.empty:
     st.stop()
 
 st.subheader("Snapshot Summary")
-last_updated = pd.to_datetime(rows["last_updated"], errors="coerce", utc=True)
+last_updated = pd.to_datetime(rows["run_time"] if "run_time" in rows else rows["last_updated"], errors="coerce", utc=True)
 latest_ts = last_updated.max() if not last_updated.empty else None
 latest_label = latest_ts.strftime("%Y-%m-%d %H:%M UTC") if pd.notna(latest_ts) else "Unknown"
 snapshot_age = None
@@ -1447,12 +1590,32 @@ with st.sidebar:
     selected_leagues = st.multiselect("Leagues", available_leagues, default=available_leagues)
     selected_bookies = st.multiselect("Bookmakers", available_bookies, default=available_bookies)
 
+# With every bookmaker selected, best lines and arbs come from the tables written at ingest
+materialized = None
+if rows_from_db and set(selected_bookies) >= set(available_bookies):
+    materialized = {
+        "db_path": db_path,
+        "run_start": run_start,
+        "run_end": run_end,
+        "match_start": match_start,
+        "match_end": match_end,
+        "keys": rows,
+    }
+
 clv_table_cached = None
 clv_league_stats = pd.DataFrame()
 if use_clv_filter:
     with st.spinner("Computing CLV filter..."):
-        lines_for_clv = _build_best_lines(rows, include_bookmakers=selected_bookies, include_leagues=selected_leagues)
-        clv_table_cached = _compute_clv_table(lines_for_clv)
+        clv_open_close = _load_open_close(materialized, selected_leagues)
+        lines_for_clv = None
+        if clv_open_close is None:
+            lines_for_clv = _build_best_lines(
+                rows,
+                include_bookmakers=selected_bookies,
+                include_leagues=selected_leagues,
+                history=history,
+            )
+        clv_table_cached = _compute_clv_table(lines_for_clv, open_close=clv_open_close)
         clv_league_stats = _compute_clv_league_stats(clv_table_cached)
     if clv_league_stats.empty:
         st.info("CLV filter enabled, but not enough history to compute CLV stats.")
@@ -1488,8 +1651,16 @@ if target_start > 0 and target_goal > 0 and target_days > 0:
 
 if strategy.startswith("Arbitrage"):
     st.info("Market coverage: 1X2 odds only. Add totals/BTTS to the scraper to expand.")
-    arbs, matches = compute_arbitrage_opportunities(
+    arb_seed = None
+    if materialized:
+        arb_seed = lambda: load_arbitrage_opportunities(
+            bankroll=bankroll, min_roi=min_roi, include_leagues=selected_leagues, **materialized
+        )
+    arbs, matches = _per_run_result(
+        history,
         rows,
+        compute_arbitrage_opportunities,
+        seed=arb_seed,
         bankroll=bankroll,
         min_roi=min_roi,
         include_bookmakers=selected_bookies,
@@ -1799,11 +1970,11 @@ if strategy.startswith("Arbitrage"):
             if col not in ("match_id", "snapshot_age_min", "kickoff_minutes", "bookie_count")
         ]
         allocator_table["pick_label"] = (
-            allocator_table["home_team"].fillna("")
+            allocator_table["home_team"].astype(object).fillna("")
             + " vs "
-            + allocator_table["away_team"].fillna("")
+            + allocator_table["away_team"].astype(object).fillna("")
             + " - "
-            + allocator_table["league"].fillna("")
+            + allocator_table["league"].astype(object).fillna("")
         )
         selected_idx = None
         try:
@@ -1998,6 +2169,36 @@ if strategy.startswith("Arbitrage"):
             else:
                 st.dataframe(picks_sim[available_cols].head(300), use_container_width=True)
 
+            with st.expander("Parameter Sweep", expanded=False):
+                st.caption(
+                    "Runs the simulator for every combination below, other settings as in the sidebar. "
+                    "Best end bankroll first."
+                )
+                sweep_event_caps = st.multiselect(
+                    "Max exposure % per event", [0.02, 0.05, 0.1, 0.2, 0.3], default=[0.05, 0.1, 0.2]
+                )
+                sweep_bookie_caps = st.multiselect(
+                    "Max exposure % per bookmaker", [0.1, 0.25, 0.5, 1.0], default=[0.25, 0.5, 1.0]
+                )
+                sweep_reserves = st.multiselect("Reserve %", [0.0, 0.1, 0.2, 0.3], default=[0.1])
+                if st.button("Run sweep", key="run_compounding_sweep"):
+                    sweep = sweep_daily_compounding(
+                        arbs_filtered,
+                        {
+                            "per_event_cap_pct": sweep_event_caps or [per_event_cap_pct],
+                            "per_bookie_cap_pct": sweep_bookie_caps or [per_bookie_cap_pct],
+                            "reserve_pct": sweep_reserves or [reserve_pct],
+                        },
+                        initial_bankroll,
+                        max_daily_exposure_pct=max_daily_exposure_pct,
+                        max_arbs_per_day=max_arbs_per_day,
+                        min_roi=min_roi_adj,
+                    )
+                    st.dataframe(
+                        sweep.sort_values("final_bankroll", ascending=False, kind="stable"),
+                        use_container_width=True,
+                    )
+
         st.subheader("Results Backtest (Arb Execution Risk)")
         if not enable_results:
             st.info("Enable results backtest in the sidebar to see settlement performance.")
@@ -2105,8 +2306,10 @@ if strategy.startswith("Arbitrage"):
                     ]
                     st.dataframe(settled[settled_cols].head(300), use_container_width=True)
 elif strategy.startswith("Consensus"):
-    edges = compute_consensus_edges(
+    edges = _per_run_result(
+        history,
         rows,
+        compute_consensus_edges,
         bankroll=bankroll,
         min_edge=min_edge,
         include_bookmakers=selected_bookies,
@@ -2165,9 +2368,9 @@ elif strategy.startswith("Consensus"):
     st.subheader("Log Consensus Pick (Research)")
     log_candidates = edges.head(300).copy()
     log_candidates["pick_label"] = (
-        log_candidates["home_team"].fillna("")
+        log_candidates["home_team"].astype(object).fillna("")
         + " vs "
-        + log_candidates["away_team"].fillna("")
+        + log_candidates["away_team"].astype(object).fillna("")
         + " - "
         + log_candidates["pick_outcome"].fillna("")
         + " @ "
@@ -2305,14 +2508,26 @@ elif strategy.startswith("Closing Line Value"):
         "CLV compares early prices to the last pre-kickoff snapshot. "
         "Positive CLV means the early price was better than the close. Analysis only."
     )
-    lines = _build_best_lines(rows, include_bookmakers=selected_bookies, include_leagues=selected_leagues)
-    if lines.empty:
+    clv_open_close = _load_open_close(materialized, selected_leagues)
+    lines = None
+    if clv_open_close is None:
+        lines = _build_best_lines(
+            rows,
+            include_bookmakers=selected_bookies,
+            include_leagues=selected_leagues,
+            history=history,
+        )
+    if (lines is not None and lines.empty) or (clv_open_close is not None and clv_open_close.empty):
         st.warning("Not enough data to compute CLV for this slice.")
         st.stop()
 
     run_clv = st.button("Run CLV backtest")
     if run_clv or "clv_table" not in st.session_state:
-        clv_data = clv_table_cached if clv_table_cached is not None and not clv_table_cached.empty else _compute_clv_table(lines)
+        clv_data = (
+            clv_table_cached
+            if clv_table_cached is not None and not clv_table_cached.empty
+            else _compute_clv_table(lines, open_close=clv_open_close)
+        )
         st.session_state["clv_table"] = clv_data
     clv_table = st.session_state.get("clv_table")
 
@@ -2333,7 +2548,7 @@ elif strategy.startswith("Closing Line Value"):
         st.plotly_chart(fig, use_container_width=True)
     with chart_col2:
         top_leagues = (
-            clv_table.groupby("league_open")["match_id"].count().sort_values(ascending=False).head(12).reset_index()
+            clv_table.groupby("league_open", observed=True)["match_id"].count().sort_values(ascending=False).head(12).reset_index()
         )
         fig = px.bar(top_leagues, x="league_open", y="match_id", title="Top Leagues by CLV Coverage")
         st.plotly_chart(fig, use_container_width=True)
@@ -2391,7 +2606,7 @@ elif strategy.startswith("Closing Line Value"):
         )
         bookie_stats = (
             clv_table.dropna(subset=["clv_bookie_open"])
-            .groupby("clv_bookie_open", dropna=True)
+            .groupby("clv_bookie_open", dropna=True, observed=True)
             .agg(
                 matches=("match_id", "count"),
                 pos_rate=("clv_best", lambda x: (x > 0).mean()),
@@ -2433,20 +2648,30 @@ elif strategy.startswith("Price Movement"):
     st.caption(
         "Price movement tracks line drift between the opening snapshot and the last pre-kickoff snapshot."
     )
-    lines = _build_best_lines(rows, include_bookmakers=selected_bookies, include_leagues=selected_leagues)
-    if lines.empty:
-        st.warning("Not enough data to compute price movement for this slice.")
-        st.stop()
+    movement = _load_open_close(materialized, selected_leagues)
+    if movement is None:
+        lines = _build_best_lines(
+            rows,
+            include_bookmakers=selected_bookies,
+            include_leagues=selected_leagues,
+            history=history,
+        )
+        if lines.empty:
+            st.warning("Not enough data to compute price movement for this slice.")
+            st.stop()
+
+        movement_base = _build_open_close(lines)
+        if movement_base.empty:
+            st.warning("No open/close snapshots found for this slice.")
+            st.stop()
 
-    movement_base = _build_open_close(lines)
-    if movement_base.empty:
+        snap_counts = lines.groupby("match_id", as_index=False, observed=True)["run_id"].nunique().rename(
+            columns={"run_id": "snapshot_count"}
+        )
+        movement = movement_base.merge(snap_counts, on="match_id", how="left")
+    elif movement.empty:
         st.warning("No open/close snapshots found for this slice.")
         st.stop()
-
-    snap_counts = lines.groupby("match_id", as_index=False)["run_id"].nunique().rename(
-        columns={"run_id": "snapshot_count"}
-    )
-    movement = movement_base.merge(snap_counts, on="match_id", how="left")
     movement = movement[movement["snapshot_count"] >= 2]
     if movement.empty:
         st.warning("Price movement requires at least 2 snapshots per match.")
@@ -2480,7 +2705,7 @@ elif strategy.startswith("Price Movement"):
         st.plotly_chart(fig, use_container_width=True)
     with chart_col2:
         top_leagues = (
-            movement_table.groupby("league_open")["match_id"].count().sort_values(ascending=False).head(12).reset_index()
+            movement_table.groupby("league_open", observed=True)["match_id"].count().sort_values(ascending=False).head(12).reset_index()
         )
         fig = px.bar(top_leagues, x="league_open", y="match_id", title="Top Leagues by Movement Coverage")
         st.plotly_chart(fig, use_container_width=True)
@@ -2508,12 +2733,18 @@ elif strategy.startswith("Price Movement"):
     st.download_button("Download CSV", csv_data, file_name="price_movement_signals.csv")
 elif strategy.startswith("Liquidity"):
     st.caption("Liquidity and age filters help you focus on matches with more bookies and fresher snapshots.")
-    lines = _build_best_lines(rows, include_bookmakers=selected_bookies, include_leagues=selected_leagues)
+    lines = _build_best_lines(
+        rows,
+        include_bookmakers=selected_bookies,
+        include_leagues=selected_leagues,
+        materialized=materialized,
+        history=history,
+    )
     if lines.empty:
         st.warning("Not enough data to compute liquidity for this slice.")
         st.stop()
 
-    latest = lines.sort_values("run_time").groupby("match_id", as_index=False).tail(1)
+    latest = lines.sort_values("run_time").groupby("match_id", as_index=False, observed=True).tail(1)
     now_utc = datetime.now(timezone.utc)
     latest["snapshot_age_min"] = (now_utc - latest["run_time"]).dt.total_seconds() / 60.0
     latest["kickoff_minutes"] = (latest["match_start"] - now_utc).dt.total_seconds() / 60.0
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Fill the best_lines and arbs tables of odds_history.db for existing runs.
+
+New runs are materialized when the scraper or arb_lab stores them; this
+covers history written before that (or by older best-line rules, see
+history_db.BEST_LINES_VERSION) so arb_lab.load_best_lines and
+load_arbitrage_opportunities can read the whole history.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import history_db  # noqa: E402
+
+DEFAULT_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join("data", "odds_history.db"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Materialize best lines and arbs for stored runs.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--run-start", default=None, help="Only runs from this ISO time")
+    parser.add_argument("--run-end", default=None, help="Only runs up to this ISO time")
+    parser.add_argument("--rebuild", action="store_true", help="Redo runs that are already materialized")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"History DB not found: {args.db}")
+        return 1
+    conn = sqlite3.connect(args.db)
+    try:
+        history_db.init_history_db(conn)
+        started = time.perf_counter()
+        counts = history_db.materialize_stale_runs(
+            conn,
+            run_start_ts=history_db.iso_to_epoch(args.run_start) if args.run_start else None,
+            run_end_ts=history_db.iso_to_epoch(args.run_end) if args.run_end else None,
+            rebuild=args.rebuild,
+        )
+    finally:
+        conn.close()
+    print(f"Materialized {counts['runs']} runs ({counts['arbs']} arbs) in {time.perf_counter() - started:.1f}s")
+    if counts["skipped_compacted"]:
+        print(
+            f"Skipped {counts['skipped_compacted']} compacted runs without best lines; "
+            "arb_lab recomputes those from the carried-forward odds"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Benchmark the version 1 and version 2 odds_history.db schemas side by side.
+
+Builds a version 1 database (TEXT run_id / slug match_id keys, the old
+indexes) from synthetic runs, or copies --db, migrates a copy to version 2
+with backend/core/history_db.py, then times the loader queries on both:
+ - last_day: runs in the last 24 hours (the terminal's default window)
+ - kickoff_window: fixtures kicking off in a 24 hour window, every run
+ - both: last day of runs restricted to the next day's kickoffs
+ - latest_limit: newest 5000 rows, no filters
+and reports rows returned, best-of-N milliseconds, file sizes and the
+migration time. Row counts must agree between schemas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import history_db, jsoncodec  # noqa: E402
+
+V1_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        last_updated TEXT,
+        total_scraped INTEGER,
+        matched_events INTEGER,
+        scrape_time_seconds REAL,
+        fast_mode INTEGER,
+        created_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+        run_id TEXT,
+        match_id TEXT,
+        league TEXT,
+        start_time INTEGER,
+        home_team TEXT,
+        away_team TEXT,
+        PRIMARY KEY (run_id, match_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS odds (
+        run_id TEXT,
+        match_id TEXT,
+        bookmaker TEXT,
+        home_odds REAL,
+        draw_odds REAL,
+        away_odds REAL,
+        event_id TEXT,
+        event_league_id TEXT,
+        PRIMARY KEY (run_id, match_id, bookmaker)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_matches_league ON matches(league)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_start ON matches(start_time)",
+    "CREATE INDEX IF NOT EXISTS idx_odds_bookie ON odds(bookmaker)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_updated ON runs(last_updated)",
+]
+
+V1_SNAPSHOT_QUERY = """
+    SELECT r.run_id, r.last_updated, m.match_id, m.league, m.start_time, m.home_team, m.away_team,
+           o.bookmaker, o.home_odds, o.draw_odds, o.away_odds, o.event_id, o.event_league_id
+    FROM odds o
+    JOIN matches m ON o.run_id = m.run_id AND o.match_id = m.match_id
+    JOIN runs r ON o.run_id = r.run_id
+"""
+
+BOOKMAKERS = ["Betway Ghana", "SportyBet Ghana", "1xBet Ghana", "22Bet Ghana", "SoccaBet Ghana", "Betfox Ghana", "Betfair Exchange"]
+
+
+def fixture_id(match: Dict) -> str:
+    return f"{match['home_team'].lower().replace(' ', '-')}-vs-{match['away_team'].lower().replace(' ', '-')}-{match['start_time']}"
+
+
+def synthetic_payloads(runs: int, fixtures: int, interval_minutes: int = 30, seed: int = 7) -> Iterator[Dict]:
+    """Matched snapshots: a rolling slate of fixtures over the next three days, prices drifting per run."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    horizon = 3 * 24 * 3600
+    slate_step = horizon // fixtures
+    for n in range(runs):
+        now = start + timedelta(minutes=interval_minutes * n)
+        now_ts = int(now.timestamp())
+        first = now_ts // slate_step + 1
+        matches = []
+        for k in range(first, first + fixtures):
+            kickoff = k * slate_step
+            home, away = f"Club {k % 997} FC", f"Athletic {(k * 7) % 991}"
+            odds = []
+            for b, bookmaker in enumerate(BOOKMAKERS):
+                if (k + b) % 3 == 0:
+                    continue
+                odds.append({
+                    "bookmaker": bookmaker,
+                    "home_odds": round(1.6 + rng.random(), 2),
+                    "draw_odds": round(3.0 + rng.random(), 2),
+                    "away_odds": round(3.5 + 2 * rng.random(), 2),
+                    "event_id": f"{b}-{k}",
+                })
+            matches.append({
+                "home_team": home, "away_team": away, "league": f"League {k % 60}",
+                "start_time": kickoff, "odds": odds,
+            })
+        yield {
+            "last_updated": now.isoformat(),
+            "stats": {"total_scraped": len(matches) * len(BOOKMAKERS), "matched_events": len(matches)},
+            "matches": matches,
+        }
+
+
+def write_v1(conn: sqlite3.Connection, payload: Dict) -> None:
+    run_id = payload["last_updated"]
+    stats = payload.get("stats", {})
+    conn.execute(
+        "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (run_id, payload["last_updated"], stats.get("total_scraped"), stats.get("matched_events"), None, 0, run_id),
+    )
+    match_rows, odds_rows = [], []
+    for match in payload["matches"]:
+        match_id = fixture_id(match)
+        match_rows.append((run_id, match_id, match["league"], match["start_time"], match["home_team"], match["away_team"]))
+        for odds in match["odds"]:
+            odds_rows.append((run_id, match_id, odds["bookmaker"], odds["home_odds"], odds["draw_odds"],
+                              odds["away_odds"], odds.get("event_id"), None))
+    conn.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?)", match_rows)
+    conn.executemany("INSERT OR REPLACE INTO odds VALUES (?, ?, ?, ?, ?, ?, ?, ?)", odds_rows)
+
+
+def build_v1_db(path: str, runs: int, fixtures: int) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        for statement in V1_SCHEMA:
+            conn.execute(statement)
+        for payload in synthetic_payloads(runs, fixtures):
+            write_v1(conn, payload)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def v1_query(run_start: Optional[str], run_end: Optional[str], match_start: Optional[int], match_end: Optional[int],
+             limit: Optional[int]) -> Tuple[str, List]:
+    clauses, params = [], []
+    for clause, value in (("r.last_updated >= ?", run_start), ("r.last_updated <= ?", run_end),
+                          ("m.start_time >= ?", match_start), ("m.start_time <= ?", match_end)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    query = V1_SNAPSHOT_QUERY
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY r.last_updated DESC, m.start_time DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+
+def scenarios(v1_path: str) -> Dict[str, Dict]:
+    conn = sqlite3.connect(v1_path)
+    try:
+        last = conn.execute("SELECT MAX(last_updated) FROM runs").fetchone()[0]
+    finally:
+        conn.close()
+    last_ts = history_db.iso_to_epoch(last)
+    day_ago = datetime.fromtimestamp(last_ts - 86400, tz=timezone.utc).isoformat()
+    window = (last_ts + 3600, last_ts + 86400)
+    return {
+        "last_day": {"run_start": day_ago, "run_end": last},
+        "kickoff_window": {"match_start": window[0], "match_end": window[1]},
+        "both": {"run_start": day_ago, "run_end": last, "match_start": window[0], "match_end": window[1]},
+        "latest_limit": {"limit": 5000},
+    }
+
+
+def _time_query(path: str, query: str, params: List, repeat: int) -> Tuple[int, float]:
+    conn = sqlite3.connect(path)
+    try:
+        best = float("inf")
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(conn.execute(query, params).fetchall())
+            best = min(best, time.perf_counter() - started)
+        return rows, best
+    finally:
+        conn.close()
+
+
+def bench(v1_path: str, v2_path: str, repeat: int) -> List[Dict]:
+    rows = []
+    for name, args in scenarios(v1_path).items():
+        q1, p1 = v1_query(args.get("run_start"), args.get("run_end"), args.get("match_start"), args.get("match_end"),
+                          args.get("limit"))
+        q2, p2 = history_db.snapshot_query(
+            run_start_ts=history_db.iso_to_epoch(args["run_start"]) if args.get("run_start") else None,
+            run_end_ts=history_db.iso_to_epoch(args["run_end"]) if args.get("run_end") else None,
+            match_start_ts=args.get("match_start"),
+            match_end_ts=args.get("match_end"),
+            limit=args.get("limit"),
+        )
+        n1, t1 = _time_query(v1_path, q1, p1, repeat)
+        n2, t2 = _time_query(v2_path, q2, p2, repeat)
+        rows.append({"query": name, "rows_v1": n1, "rows_v2": n2,
+                     "ms_v1": round(t1 * 1000, 1), "ms_v2": round(t2 * 1000, 1),
+                     "speedup": round(t1 / t2, 1) if t2 else None})
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare v1 and v2 odds_history.db query times.")
+    parser.add_argument("--db", default=None, help="Existing version 1 database to copy (default: synthetic)")
+    parser.add_argument("--runs", type=int, default=480, help="Synthetic runs (every 30 minutes)")
+    parser.add_argument("--fixtures", type=int, default=300, help="Synthetic fixtures per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output-json", default=None)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        v1_path = os.path.join(tmp, "v1.db")
+        v2_path = os.path.join(tmp, "v2.db")
+        if args.db:
+            shutil.copyfile(args.db, v1_path)
+        else:
+            print(f"Building synthetic v1 history: {args.runs} runs x {args.fixtures} fixtures ...")
+            build_v1_db(v1_path, args.runs, args.fixtures)
+        shutil.copyfile(v1_path, v2_path)
+
+        conn = sqlite3.connect(v2_path)
+        try:
+            started = time.perf_counter()
+            counts = history_db.migrate_v1(conn)
+            migrate_seconds = time.perf_counter() - started
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        sizes = {"v1_mb": round(os.path.getsize(v1_path) / 1e6, 2), "v2_mb": round(os.path.getsize(v2_path) / 1e6, 2)}
+        rows = bench(v1_path, v2_path, args.repeat)
+
+    print(f"migration: {migrate_seconds:.2f}s  {counts}")
+    print(f"size: v1 {sizes['v1_mb']} MB  v2 {sizes['v2_mb']} MB")
+    print(f"{'query':<16} {'rows v1':>9} {'rows v2':>9} {'ms v1':>9} {'ms v2':>9} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['query']:<16} {row['rows_v1']:>9} {row['rows_v2']:>9} {row['ms_v1']:>9} {row['ms_v2']:>9} {row['speedup']:>7}x")
+
+    if args.output_json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output_json)), exist_ok=True)
+        jsoncodec.dump({"migration_seconds": round(migrate_seconds, 2), "counts": counts, **sizes, "queries": rows},
+                       args.output_json, pretty=True)
+    return 0 if all(row["rows_v1"] == row["rows_v2"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
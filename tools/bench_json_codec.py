@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the snapshot/history JSON codec against the stdlib json module.
+
+For each input document (odds_data.json and raw_scraped_data.json by
+default) reports the best-of-N time for:
+ - load: stdlib json.load vs jsoncodec.load
+ - dump: the old json.dump(indent=2) vs jsoncodec.dump (compact, and pretty)
+ - jsonl: appending the document as history lines and reading them back
+and the bytes written in each format.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import jsoncodec  # noqa: E402
+
+DEFAULT_INPUTS = [os.path.join(ROOT_DIR, "odds_data.json"), os.path.join(ROOT_DIR, "raw_scraped_data.json")]
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_document(path: str, repeat: int, jsonl_lines: int) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as handle:
+        doc = json.load(handle)
+    rows = []
+
+    def row(op: str, codec: str, seconds: float, size: Optional[int] = None) -> None:
+        rows.append({
+            "document": os.path.basename(path),
+            "op": op,
+            "codec": codec,
+            "ms": round(seconds * 1000, 2),
+            "bytes": size,
+        })
+
+    def stdlib_load():
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    row("load", "json", best_of(stdlib_load, repeat))
+    row("load", jsoncodec.BACKEND, best_of(lambda: jsoncodec.load(path), repeat))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.json")
+
+        def stdlib_dump():
+            with open(out, "w", encoding="utf-8") as handle:
+                json.dump(doc, handle, indent=2, ensure_ascii=False)
+
+        row("dump", "json indent=2", best_of(stdlib_dump, repeat), os.path.getsize(out))
+        row("dump", f"{jsoncodec.BACKEND} compact", best_of(lambda: jsoncodec.dump(doc, out, pretty=False), repeat),
+            os.path.getsize(out))
+        row("dump", f"{jsoncodec.BACKEND} pretty", best_of(lambda: jsoncodec.dump(doc, out, pretty=True), repeat),
+            os.path.getsize(out))
+
+        history = os.path.join(tmp, "history.jsonl")
+
+        def stdlib_append():
+            with open(history, "w", encoding="utf-8") as handle:
+                for _ in range(jsonl_lines):
+                    handle.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+        def stdlib_read():
+            with open(history, "r", encoding="utf-8") as handle:
+                return [json.loads(line) for line in handle if line.strip()]
+
+        def codec_append():
+            if os.path.exists(history):
+                os.remove(history)
+            jsoncodec.append_jsonl(history, [doc] * jsonl_lines)
+
+        row("jsonl append", "json", best_of(stdlib_append, repeat))
+        row("jsonl read", "json", best_of(stdlib_read, repeat))
+        row("jsonl append", jsoncodec.BACKEND, best_of(codec_append, repeat), os.path.getsize(history))
+        row("jsonl read", jsoncodec.BACKEND, best_of(lambda: list(jsoncodec.iter_jsonl(history)), repeat))
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark jsoncodec against stdlib json on snapshot files.")
+    parser.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS, help="JSON documents to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs per operation")
+    parser.add_argument("--jsonl-lines", type=int, default=5, help="Snapshots per JSONL round trip")
+    parser.add_argument("--output-json", default=None)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    rows = []
+    for path in args.inputs:
+        if not os.path.exists(path):
+            print(f"Skipping missing {path}")
+            continue
+        rows.extend(bench_document(path, args.repeat, args.jsonl_lines))
+
+    print(f"codec backend: {jsoncodec.BACKEND}")
+    print(f"{'document':<24} {'op':<13} {'codec':<16} {'ms':>9} {'bytes':>10}")
+    for row in rows:
+        size = "" if row["bytes"] is None else row["bytes"]
+        print(f"{row['document']:<24} {row['op']:<13} {row['codec']:<16} {row['ms']:>9} {size:>10}")
+
+    if args.output_json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output_json)), exist_ok=True)
+        jsoncodec.dump(rows, args.output_json, pretty=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming vs whole-document JSON parsing of large bookmaker payloads.
+
+Replays recorded Betway pages and SoccaBet odds documents through the
+production parsers (read_betway_page, scrape_soccabet) twice: once with
+resp.json() and once with the streaming reader (STREAM_JSON), and reports
+parse time, peak Python memory (tracemalloc) and fixtures found per payload.
+
+Responses are read from disk in chunks, so the whole-document path pays for
+holding the body the way requests does. Use --record to save live responses;
+without payload files a synthetic Betway page and SoccaBet document are used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+from unittest import mock
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import scrape_odds_github as scraper  # noqa: E402
+
+
+class RecordedResponse:
+    """Minimal requests.Response replaying a body from disk."""
+
+    status_code = 200
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def json(self):
+        with open(self.path, "rb") as handle:
+            return json.loads(handle.read().decode("utf-8"))
+
+    def iter_content(self, chunk_size: int = 1):
+        with open(self.path, "rb") as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordedSession:
+    """Session stand-in whose every GET returns the same recorded body."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def get(self, url, **kwargs):
+        return RecordedResponse(self.path)
+
+
+def synthetic_betway_page(events: int = 1200, markets_per_event: int = 12, seed: int = 7) -> Dict:
+    """A Betway Upcoming page: every event has a 1X2 market plus filler markets."""
+    rng = random.Random(seed)
+    page = {"events": [], "markets": [], "outcomes": [], "prices": [], "isFinalPage": False}
+    outcome_id = 0
+    for i in range(events):
+        event_id = 10_000_000 + i
+        home, away = f"Home Club {i}", f"Away Club {i}"
+        page["events"].append({
+            "eventId": event_id, "homeTeam": home, "awayTeam": away, "league": f"League {i % 40}",
+            "expectedStartEpoch": 1_900_000_000 + i * 60, "sportId": "soccer", "isLive": False,
+            "regionName": "Europe", "competition": {"name": f"League {i % 40}", "id": i % 40},
+        })
+        for m in range(markets_per_event):
+            market_id = event_id * 100 + m
+            names = ("[Win/Draw/Win]", "1X2") if m == 0 else (f"[Market {m}]", f"Market {m}")
+            page["markets"].append({"marketId": market_id, "eventId": event_id, "name": names[0], "displayName": names[1],
+                                    "isSuspended": False, "columns": 3})
+            for name in ((home, "Draw", away) if m == 0 else ("Over", "Under", "Exactly")):
+                outcome_id += 1
+                page["outcomes"].append({"outcomeId": outcome_id, "marketId": market_id, "eventId": event_id,
+                                         "name": name, "isActive": True})
+                page["prices"].append({"outcomeId": outcome_id, "marketId": market_id,
+                                       "priceDecimal": round(rng.uniform(1.2, 6.0), 2), "priceFraction": "1/1"})
+    return page
+
+
+def synthetic_soccabet(categories: int = 40, tournaments: int = 6, matches: int = 25, markets: int = 15, seed: int = 7) -> Dict:
+    """A SoccaBet odds document: soccer plus another sport, many markets per match."""
+    rng = random.Random(seed)
+
+    def sport(sport_id: int, name: str, cats: int) -> Dict:
+        body = {"id": sport_id, "name": name, "categories": {}}
+        for c in range(cats):
+            category = {"name": f"Country {c}", "tournaments": {}}
+            for t in range(tournaments):
+                tournament = {"id": c * 100 + t, "name": f"Division {t}", "matches": {}}
+                for m in range(matches):
+                    match_id = (c * 100 + t) * 1000 + m
+                    odds = {}
+                    for k in range(markets):
+                        type_id = "4102" if k == 0 else str(5000 + k)
+                        odds[str(k)] = {"typeid": type_id, "name": "1X2" if k == 0 else f"Market {k}", "selections": [
+                            {"n": n, "o": f"{rng.uniform(1.2, 6.0):.2f}"} for n in ("1", "X", "2")
+                        ]}
+                    tournament["matches"][str(match_id)] = {
+                        "id": match_id, "name": f"Team {match_id}A v Team {match_id}B",
+                        "ts": 1_900_000_000 + m * 60, "live": False, "markets": odds,
+                    }
+                category["tournaments"][str(t)] = tournament
+            body["categories"][str(c)] = category
+        return body
+
+    return {"sports": {"12": sport(12, "Basketball", categories // 2), "77": sport(77, "Soccer", categories)}}
+
+
+def _measure(fn):
+    """Time a clean run, then repeat it under tracemalloc for the memory peak."""
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_payload(kind: str, path: str) -> List[Dict]:
+    rows = []
+    for streaming in (False, True):
+        with mock.patch.object(scraper, "STREAM_JSON", streaming):
+            if kind == "betway":
+                page, elapsed, peak = _measure(lambda: scraper.read_betway_page(RecordedResponse(path)))
+                found = sum(1 for e in page["events"] if e.get("eventId") in page["market_by_event"])
+            else:
+                with mock.patch.object(scraper, "mount_rate_limited", lambda session: RecordedSession(path)), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    matches, elapsed, peak = _measure(scraper.scrape_soccabet)
+                found = len(matches)
+        rows.append({
+            "payload": os.path.basename(path),
+            "kind": kind,
+            "mb": round(os.path.getsize(path) / 1e6, 2),
+            "mode": "stream" if streaming else "resp.json()",
+            "seconds": round(elapsed, 3),
+            "peak_mb": round(peak / 1e6, 2),
+            "fixtures": found,
+        })
+    return rows
+
+
+def record(directory: str) -> Dict[str, List[str]]:
+    """Save one live Betway page and the SoccaBet odds document."""
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d%H%M%S")
+    betway_url = (
+        f"{scraper.BETWAY_API}?countryCode=GH&sportId=soccer&cultureCode=en-US"
+        f"&marketTypes=%5BWin%2FDraw%2FWin%5D&isEsport=false&Skip=0&Take={scraper.BETWAY_PAGE_SIZE}"
+    )
+    saved = {"betway": [], "soccabet": []}
+    for kind, url, referer in (
+        ("betway", betway_url, "https://www.betway.com.gh/sport/soccer/upcoming"),
+        ("soccabet", scraper.SOCCABET_API, "https://www.soccabet.com/"),
+    ):
+        resp = requests.get(url, headers={**scraper.HEADERS, "Referer": referer}, timeout=30)
+        resp.raise_for_status()
+        path = os.path.join(directory, f"{kind}_{stamp}.json")
+        with open(path, "wb") as handle:
+            handle.write(resp.content)
+        saved[kind].append(path)
+        print(f"Recorded {kind}: {path} ({len(resp.content) / 1e6:.2f} MB)")
+    return saved
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark streaming JSON parsing of Betway/SoccaBet payloads.")
+    parser.add_argument("--betway", nargs="*", default=[], help="Recorded Betway Upcoming page(s)")
+    parser.add_argument("--soccabet", nargs="*", default=[], help="Recorded SoccaBet odds.js document(s)")
+    parser.add_argument("--record", default=None, help="Save live responses into this directory first")
+    parser.add_argument("--output-json", default=None)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    payloads = [("betway", p) for p in args.betway] + [("soccabet", p) for p in args.soccabet]
+    if args.record:
+        saved = record(args.record)
+        payloads += [(kind, p) for kind, paths in saved.items() for p in paths]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not payloads:
+            print("No recorded payloads given; using synthetic ones.")
+            for kind, doc in (("betway", synthetic_betway_page()), ("soccabet", synthetic_soccabet())):
+                path = os.path.join(tmp, f"synthetic_{kind}.json")
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(doc, handle)
+                payloads.append((kind, path))
+
+        rows = [row for kind, path in payloads for row in bench_payload(kind, path)]
+
+    print(f"{'payload':<28} {'MB':>7} {'mode':<12} {'seconds':>8} {'peak MB':>8} {'fixtures':>9}")
+    for row in rows:
+        print(f"{row['payload']:<28} {row['mb']:>7} {row['mode']:<12} {row['seconds']:>8} {row['peak_mb']:>8} {row['fixtures']:>9}")
+
+    if args.output_json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output_json)), exist_ok=True)
+        with open(args.output_json, "w", encoding="utf-8") as handle:
+            json.dump(rows, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
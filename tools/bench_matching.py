@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-bookmaker event matching against a hand-labelled golden set.
+
+Runs the matchers we ship over the golden fixtures (plus an optional sample of
+unlabelled background fixtures from a raw scrape) and reports:
+ - pairwise precision / recall against the labelled groups
+ - cross-league false merges (a predicted group spanning two gold leagues,
+   e.g. the Egyptian "Premier League" merged into the English one)
+ - wall time and peak Python memory (tracemalloc) per matcher
+
+Matchers:
+ - github: scrape_odds_github.match_events (production pipeline)
+ - arbitrage: backend.core.GhanaBettingArbitrage.match_events
+ - league: backend.core.canonical_leagues.LeagueMatcher.match, scored per
+   labelled fixture (correct / wrong league / unassigned)
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import jsoncodec  # noqa: E402
+
+DEFAULT_GOLDEN = os.path.join(ROOT_DIR, "data", "benchmarks", "golden_matching.json")
+DEFAULT_RAW = os.path.join(ROOT_DIR, "raw_scraped_data.json")
+MATCHERS = ("github", "arbitrage", "league")
+
+LEAGUE_COUNTRIES = {
+    "Premier League": "eng",
+    "La Liga": "esp",
+    "Serie A": "ita",
+    "Bundesliga": "ger",
+    "Ligue 1": "fra",
+    "UEFA Champions League": "eur",
+}
+
+
+def fixture_key(fixture: Dict) -> str:
+    return f"{fixture.get('bookmaker', '')}|{fixture.get('event_id', '')}"
+
+
+def load_golden(path: str) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict]]:
+    payload = jsoncodec.load(path)
+    return payload.get("fixtures", {}), payload.get("labels", {})
+
+
+def add_background(
+    fixtures: Dict[str, List[Dict]],
+    raw_path: Optional[str],
+    sample_per_bookmaker: int,
+    seed: int = 7,
+) -> Dict[str, List[Dict]]:
+    """Mix unlabelled fixtures from a raw scrape into the golden fixtures."""
+    merged = {bookie: list(matches) for bookie, matches in fixtures.items()}
+    if not raw_path or not os.path.exists(raw_path):
+        return merged
+    raw = jsoncodec.load(raw_path)
+    rng = random.Random(seed)
+    for bookie, matches in raw.items():
+        existing = {fixture_key(m) for m in merged.get(bookie, [])}
+        extra = [m for m in matches if fixture_key(m) not in existing]
+        if sample_per_bookmaker > 0 and len(extra) > sample_per_bookmaker:
+            extra = rng.sample(extra, sample_per_bookmaker)
+        merged.setdefault(bookie, []).extend(extra)
+    return merged
+
+
+def score_groups(groups: Iterable[Iterable[Dict]], labels: Dict[str, Dict]) -> Dict:
+    """Pairwise precision/recall and cross-league merges for predicted groups."""
+    gold_members: Dict[str, set] = defaultdict(set)
+    for key, label in labels.items():
+        if label.get("group"):
+            gold_members[label["group"]].add(key)
+    gold_pairs = sum(len(m) * (len(m) - 1) // 2 for m in gold_members.values())
+
+    predicted_pairs = 0
+    true_pairs = 0
+    cross_league = 0
+    trap_merges = 0
+    exact_groups = 0
+    n_groups = 0
+    for group in groups:
+        n_groups += 1
+        keys = sorted({fixture_key(f) for f in group if fixture_key(f) in labels})
+        if not keys:
+            continue
+        leagues = {labels[k]["league"] for k in keys}
+        if len(leagues) > 1:
+            cross_league += 1
+        has_gold = any(labels[k].get("group") for k in keys)
+        has_trap = any(not labels[k].get("group") for k in keys)
+        if has_gold and has_trap:
+            trap_merges += 1
+        for a, b in combinations(keys, 2):
+            group_a = labels[a].get("group")
+            group_b = labels[b].get("group")
+            if not group_a and not group_b:
+                # Two trap fixtures: their true grouping is unlabelled.
+                continue
+            predicted_pairs += 1
+            if group_a and group_a == group_b:
+                true_pairs += 1
+        gold_ids = {labels[k].get("group") for k in keys}
+        if len(gold_ids) == 1:
+            gold_id = next(iter(gold_ids))
+            if gold_id and set(keys) == gold_members[gold_id]:
+                exact_groups += 1
+
+    precision = true_pairs / predicted_pairs if predicted_pairs else 0.0
+    recall = true_pairs / gold_pairs if gold_pairs else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "groups": n_groups,
+        "gold_groups": len(gold_members),
+        "exact_groups": exact_groups,
+        "gold_pairs": gold_pairs,
+        "predicted_pairs": predicted_pairs,
+        "true_pairs": true_pairs,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "cross_league_merges": cross_league,
+        "trap_merges": trap_merges,
+    }
+
+
+def _measure(fn: Callable[[], object]) -> Tuple[object, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_github_matcher(fixtures: Dict[str, List[Dict]]) -> List[List[Dict]]:
+    import scrape_odds_github
+
+    return scrape_odds_github.match_events({k: list(v) for k, v in fixtures.items()})
+
+
+def run_arbitrage_matcher(fixtures: Dict[str, List[Dict]]) -> List[List[Dict]]:
+    from backend.core import GhanaBettingArbitrage
+
+    finder = GhanaBettingArbitrage()
+    # GhanaBettingArbitrage keys bookmakers by their short names.
+    finder.all_matches = {k.replace(" Ghana", ""): list(v) for k, v in fixtures.items()}
+    return finder.match_events()
+
+
+def build_league_matcher():
+    from backend.core.canonical_leagues import LeagueMatcher, LeagueRecord, normalize_competition_name
+    from scrape_odds_github import RAW_LEAGUE_TEAMS
+
+    leagues = [
+        LeagueRecord(
+            league_id=name,
+            sport="soccer",
+            country_code=country,
+            tier=1,
+            gender=None,
+            season_start=None,
+            season_end=None,
+            display_name=name,
+            normalized_name=normalize_competition_name(name),
+        )
+        for name, country in LEAGUE_COUNTRIES.items()
+    ]
+    league_clubs = {
+        name: [normalize_competition_name(team) for team in RAW_LEAGUE_TEAMS.get(name, [])]
+        for name in LEAGUE_COUNTRIES
+    }
+    return LeagueMatcher(leagues, [], league_clubs=league_clubs)
+
+
+def run_league_matcher(fixtures: Dict[str, List[Dict]], labels: Dict[str, Dict]) -> Dict:
+    matcher = build_league_matcher()
+    correct = wrong = unassigned = trap_assigned = total = 0
+    for matches in fixtures.values():
+        for fixture in matches:
+            label = labels.get(fixture_key(fixture))
+            if not label:
+                continue
+            total += 1
+            league_id, _, _ = matcher.match(
+                provider=fixture.get("bookmaker", ""),
+                provider_league_id=str(fixture.get("league_id") or "") or None,
+                provider_name=fixture.get("league", ""),
+                provider_country=None,
+                provider_sport="soccer",
+                provider_season=None,
+                recent_clubs=[fixture.get("home_team", ""), fixture.get("away_team", "")],
+            )
+            expected = label["league"] if label["league"] in LEAGUE_COUNTRIES else None
+            if league_id == expected:
+                correct += 1
+            elif league_id is None:
+                unassigned += 1
+            else:
+                wrong += 1
+                if expected is None:
+                    trap_assigned += 1
+    return {
+        "labelled_fixtures": total,
+        "correct": correct,
+        "wrong_league": wrong,
+        "trap_assigned": trap_assigned,
+        "unassigned": unassigned,
+        "accuracy": round(correct / total, 4) if total else 0.0,
+    }
+
+
+def run_benchmark(
+    fixtures: Dict[str, List[Dict]],
+    labels: Dict[str, Dict],
+    matchers: Iterable[str] = MATCHERS,
+) -> Dict:
+    report: Dict[str, Dict] = {}
+    for name in matchers:
+        if name == "league":
+            metrics, elapsed, peak = _measure(lambda: run_league_matcher(fixtures, labels))
+        else:
+            runner = run_github_matcher if name == "github" else run_arbitrage_matcher
+            groups, elapsed, peak = _measure(lambda: runner(fixtures))
+            metrics = score_groups(groups, labels)
+        metrics["wall_seconds"] = round(elapsed, 3)
+        metrics["peak_memory_mb"] = round(peak / (1024 * 1024), 2)
+        report[name] = metrics
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark event matching quality and throughput.")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN, help="Path to golden matching JSON")
+    parser.add_argument("--raw", default=DEFAULT_RAW, help="Raw scrape JSON used for background fixtures")
+    parser.add_argument("--no-background", action="store_true", help="Only run on golden fixtures")
+    parser.add_argument(
+        "--sample-per-bookmaker",
+        type=int,
+        default=200,
+        help="Background fixtures sampled per bookmaker (0 = all)",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Sampling seed")
+    parser.add_argument("--matchers", nargs="*", choices=MATCHERS, default=list(MATCHERS))
+    parser.add_argument("--output-json", default=None, help="Write the report to this path")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    fixtures, labels = load_golden(args.golden)
+    if not args.no_background:
+        fixtures = add_background(fixtures, args.raw, args.sample_per_bookmaker, seed=args.seed)
+
+    report = {
+        "golden": os.path.relpath(args.golden, ROOT_DIR),
+        "fixtures": sum(len(v) for v in fixtures.values()),
+        "labelled": len(labels),
+        "matchers": run_benchmark(fixtures, labels, args.matchers),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output_json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output_json)), exist_ok=True)
+        with open(args.output_json, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Betfair identity and Betting API endpoints.
+
+Serves deterministic synthetic soccer events so the Betfair Exchange
+scraper (session caching, keepAlive, concurrent batches) can be exercised
+offline:
+ - POST /api/login, /api/keepAlive
+ - POST /exchange/betting/rest/v1.0/{listEvents,listMarketCatalogue,listMarketBook}/
+
+Optional per-request latency and a requests-per-second ceiling (answered
+with 429) make it useful for checking throughput against the free-tier
+20 rps allowance.
+
+Usage:
+  python tools/betfair_standin.py --port 8765 --events 400 --latency 0.15
+  BETFAIR_IDENTITY_URL=http://127.0.0.1:8765/api \
+  BETFAIR_API_URL=http://127.0.0.1:8765/exchange/betting/rest/v1.0 \
+  BETFAIR_USERNAME=demo BETFAIR_PASSWORD=demo BETFAIR_APP_KEY=demo \
+  python backend/scrapers/betfair_exchange.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+API_PREFIX = "/exchange/betting/rest/v1.0/"
+COMPETITIONS = ["English Premier League", "Spanish La Liga", "Italian Serie A", "German Bundesliga", "French Ligue 1"]
+
+
+class BetfairStandIn:
+    """In-memory Betfair: sessions, events, catalogues and books."""
+
+    def __init__(self, events: int = 200, latency: float = 0.0, max_rps: Optional[float] = None):
+        self.latency = latency
+        self.max_rps = max_rps
+        self.counts: Counter = Counter()
+        self.tokens = set()
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        start = datetime.now(timezone.utc) + timedelta(hours=2)
+        self.events: Dict[str, Dict] = {}
+        for i in range(events):
+            event_id = str(30000000 + i)
+            self.events[event_id] = {
+                "id": event_id,
+                "name": f"Home {i} v Away {i}",
+                "openDate": (start + timedelta(minutes=15 * i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "competition": COMPETITIONS[i % len(COMPETITIONS)],
+                "index": i,
+            }
+
+    def _count(self, name: str) -> int:
+        with self.lock:
+            self.counts[name] += 1
+            return self.counts[name]
+
+    def _over_rate(self) -> bool:
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > 1.0:
+                self.recent.popleft()
+            self.recent.append(now)
+            return len(self.recent) > self.max_rps
+
+    def handle(self, path: str, headers, body: bytes) -> Tuple[int, object]:
+        if self._over_rate():
+            self._count("throttled")
+            return 429, {"error": "TOO_MANY_REQUESTS"}
+        if path == "/api/login":
+            attempt = self._count("login")
+            form = parse_qs(body.decode("utf-8"))
+            if form.get("password", [""])[0] == "wrong":
+                return 200, {"token": "", "status": "FAIL", "error": "INVALID_USERNAME_OR_PASSWORD"}
+            with self.lock:
+                token = f"ssoid-{attempt}"
+                self.tokens.add(token)
+            return 200, {"token": token, "product": headers.get("X-Application"), "status": "SUCCESS", "error": ""}
+        if path == "/api/keepAlive":
+            self._count("keepAlive")
+            token = headers.get("X-Authentication")
+            if token in self.tokens:
+                return 200, {"token": token, "status": "SUCCESS", "error": ""}
+            return 200, {"token": "", "status": "FAIL", "error": "NO_SESSION"}
+        if not path.startswith(API_PREFIX):
+            return 404, {"error": "NOT_FOUND"}
+
+        endpoint = path[len(API_PREFIX):].strip("/")
+        self._count(endpoint)
+        if headers.get("X-Authentication") not in self.tokens:
+            return 400, {"detail": {"APINGException": {"errorCode": "INVALID_SESSION_INFORMATION"}}}
+        payload = json.loads(body or b"{}")
+        if endpoint == "listEvents":
+            return 200, [{"event": self._event(e), "marketCount": 1} for e in self.events.values()]
+        if endpoint == "listMarketCatalogue":
+            ids = payload.get("filter", {}).get("eventIds") or list(self.events)
+            return 200, [self._catalogue(self.events[i]) for i in ids if i in self.events]
+        if endpoint == "listMarketBook":
+            rows = []
+            for market_id in payload.get("marketIds", []):
+                event = self.events.get(market_id.split(".", 1)[-1])
+                if event:
+                    rows.append(self._book(market_id, event))
+            return 200, rows
+        return 404, {"error": "UNKNOWN_OPERATION"}
+
+    @staticmethod
+    def _event(event: Dict) -> Dict:
+        return {"id": event["id"], "name": event["name"], "openDate": event["openDate"]}
+
+    @staticmethod
+    def _runners(event: Dict) -> List[Tuple[int, str]]:
+        home, away = event["name"].split(" v ")
+        base = 100000 + event["index"] * 3
+        return [(base, home), (base + 1, away), (base + 2, "The Draw")]
+
+    def _catalogue(self, event: Dict) -> Dict:
+        return {
+            "marketId": f"1.{event['id']}",
+            "marketName": "Match Odds",
+            "event": self._event(event),
+            "competition": {"id": str(COMPETITIONS.index(event["competition"]) + 1), "name": event["competition"]},
+            "runners": [{"selectionId": sel, "runnerName": name} for sel, name in self._runners(event)],
+        }
+
+    def _book(self, market_id: str, event: Dict) -> Dict:
+        prices = (1.8 + (event["index"] % 7) / 10, 4.2, 3.4)
+        return {
+            "marketId": market_id,
+            "status": "OPEN",
+            "runners": [
+                {"selectionId": sel, "ex": {"availableToBack": [{"price": price, "size": 120.0}]}}
+                for (sel, _), price in zip(self._runners(event), prices)
+            ],
+        }
+
+
+def _handler_for(state: BetfairStandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            with state.lock:
+                state.in_flight += 1
+                state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+            try:
+                if state.latency:
+                    time.sleep(state.latency)
+                status, payload = state.handle(self.path.split("?", 1)[0], self.headers, body)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_standin(port: int = 0, **kwargs) -> Tuple[ThreadingHTTPServer, BetfairStandIn]:
+    """Serve a stand-in on a background thread; returns the server and its state."""
+    state = BetfairStandIn(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler_for(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Betfair Exchange API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--events", type=int, default=200, help="Synthetic soccer events to serve")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--max-rps", type=float, default=None, help="Answer 429 above this request rate")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    server, state = start_standin(args.port, events=args.events, latency=args.latency, max_rps=args.max_rps)
+    base = f"http://127.0.0.1:{server.server_port}"
+    print(f"Betfair stand-in on {base}")
+    print(f"  BETFAIR_IDENTITY_URL={base}/api")
+    print(f"  BETFAIR_API_URL={base}{API_PREFIX.rstrip('/')}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"Requests served: {dict(state.counts)}")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
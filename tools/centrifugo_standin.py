@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the 22Bet Centrifugo websocket feed.
+
+Speaks the Centrifugo JSON client protocol (connect, subscribe with
+history recovery, publication pushes, empty-object pings) on one channel,
+so the streaming 22Bet board can be exercised offline:
+ - publish(data) pushes a delta in the REST /event/list shape
+ - publish(data, skip=n) burns n offsets first to simulate missed publications
+ - drop_clients() closes every connection to exercise reconnect/recovery
+ - new_epoch() forgets history, so reconnecting clients must resync
+
+Usage:
+  python tools/centrifugo_standin.py --port 8766 --interval 1
+  TWENTYTWOBET_WS_URL=ws://127.0.0.1:8766/connection/websocket \
+  python -m backend.scrapers.twentytwobet_stream --board-file /tmp/22bet_board.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import websockets
+
+CHANNEL = "sportsbook:prematch:football"
+
+
+class CentrifugoStandIn:
+    """One-channel Centrifugo with publication history, run on its own event loop."""
+
+    def __init__(self, channel: str = CHANNEL, history_size: int = 100, ping_seconds: float = 25.0):
+        self.channel = channel
+        self.history_size = history_size
+        self.ping_seconds = ping_seconds
+        self.epoch = "e1"
+        self.offset = 0
+        self.history: List[Dict] = []
+        self.counts: Counter = Counter()
+        self.clients = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.port = 0
+        self._server = None
+        self._ready = threading.Event()
+
+    # -- control (callable from any thread) ----------------------------------
+
+    def start(self, port: int = 0) -> "CentrifugoStandIn":
+        threading.Thread(target=lambda: asyncio.run(self._serve(port)), daemon=True).start()
+        if not self._ready.wait(10):
+            raise RuntimeError("Centrifugo stand-in did not start")
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/connection/websocket"
+
+    def publish(self, data: Dict, skip: int = 0) -> int:
+        """Push one publication to subscribers; returns its offset."""
+        return self._call(self._publish(data, skip))
+
+    def drop_clients(self) -> None:
+        self._call(self._drop_clients())
+
+    def new_epoch(self) -> None:
+        self._call(self._new_epoch())
+
+    def stop(self) -> None:
+        if self.loop and self._server:
+            self.loop.call_soon_threadsafe(self._server.close)
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(10)
+
+    # -- server --------------------------------------------------------------
+
+    async def _serve(self, port: int) -> None:
+        self.loop = asyncio.get_running_loop()
+        async with websockets.serve(self._handle, "127.0.0.1", port) as server:
+            self._server = server
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await server.wait_closed()
+
+    async def _publish(self, data: Dict, skip: int) -> int:
+        self.offset += skip + 1
+        pub = {"data": data, "offset": self.offset}
+        self.history = (self.history + [pub])[-self.history_size:]
+        self.counts["publications"] += 1
+        message = json.dumps({"push": {"channel": self.channel, "pub": pub}})
+        for ws in list(self.clients):
+            try:
+                await ws.send(message)
+            except websockets.ConnectionClosed:
+                pass
+        return self.offset
+
+    async def _drop_clients(self) -> None:
+        for ws in list(self.clients):
+            await ws.close()
+
+    async def _new_epoch(self) -> None:
+        self.epoch = f"e{int(self.epoch[1:]) + 1}"
+        self.history = []
+
+    def _recover(self, request: Dict) -> Dict:
+        if request.get("epoch") != self.epoch:
+            return {"recovered": False, "publications": []}
+        since = request.get("offset") or 0
+        missed = [p for p in self.history if p["offset"] > since]
+        complete = not missed and since == self.offset or (missed and missed[0]["offset"] == since + 1)
+        return {"recovered": bool(complete), "publications": missed if complete else []}
+
+    async def _handle(self, ws) -> None:
+        self.counts["connections"] += 1
+        pinger = asyncio.create_task(self._ping(ws))
+        try:
+            async for frame in ws:
+                for line in frame.split("\n"):
+                    if not line.strip():
+                        continue
+                    msg = json.loads(line)
+                    if not msg:
+                        self.counts["pongs"] += 1
+                        continue
+                    reply = {"id": msg.get("id")}
+                    if "connect" in msg:
+                        reply["connect"] = {"client": f"c{self.counts['connections']}", "version": "standin", "ping": int(self.ping_seconds), "pong": True}
+                    elif "subscribe" in msg:
+                        request = msg["subscribe"]
+                        if request.get("channel") != self.channel:
+                            reply["error"] = {"code": 102, "message": "unknown channel"}
+                        else:
+                            self.counts["subscribes"] += 1
+                            result = {"recoverable": True, "epoch": self.epoch, "offset": self.offset}
+                            if request.get("recover"):
+                                result.update(self._recover(request))
+                                self.counts["recovered" if result["recovered"] else "unrecovered"] += 1
+                            reply["subscribe"] = result
+                            self.clients.add(ws)
+                    else:
+                        reply["error"] = {"code": 100, "message": "unsupported command"}
+                    await ws.send(json.dumps(reply))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            pinger.cancel()
+            self.clients.discard(ws)
+
+    async def _ping(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.ping_seconds)
+            await ws.send("{}")
+
+
+def event_delta(event_id: int, home: float, draw: float, away: float, league: str = "England. Premier League") -> Dict:
+    """A one-event publication in the REST /event/list shape."""
+    return {
+        "items": [{"id": event_id, "leagueId": 1, "competitor1Id": event_id * 10, "competitor2Id": event_id * 10 + 1,
+                   "time": "2030-01-01 15:00:00"}],
+        "relations": {
+            "competitors": [{"id": event_id * 10, "name": f"Home {event_id}"}, {"id": event_id * 10 + 1, "name": f"Away {event_id}"}],
+            "league": [{"id": 1, "name": league}],
+            "odds": {str(event_id): [{"vendorMarketId": 1, "outcomes": [
+                {"vendorOutcomeId": 1, "odds": home}, {"vendorOutcomeId": 2, "odds": draw}, {"vendorOutcomeId": 3, "odds": away},
+            ]}]},
+        },
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the 22Bet Centrifugo feed.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--events", type=int, default=50, help="Synthetic events to publish updates for")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between publications")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    standin = CentrifugoStandIn().start(args.port)
+    print(f"Centrifugo stand-in on {standin.url} (channel {standin.channel})")
+    print(f"  TWENTYTWOBET_WS_URL={standin.url}")
+    try:
+        while True:
+            event_id = random.randint(1, args.events)
+            standin.publish(event_delta(event_id, round(random.uniform(1.5, 3.5), 2), 3.3, round(random.uniform(2.0, 5.0), 2)))
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print(f"Stand-in counters: {dict(standin.counts)}")
+    finally:
+        standin.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
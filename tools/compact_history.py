@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Compact and downsample old odds history (odds_history.db and odds_history.jsonl).
+
+Retention tiers say what to keep once a run reaches a given age:
+
+    3d:changes   keep a line only where its price changed from the line stored before it
+    14d:1h       at most one line per hour: the hour's closing price, when it changed
+    60d:6h       at most one line per six hours, likewise
+    365d:drop    delete the whole run
+
+Younger runs are kept in full. Every match/bookmaker line always keeps its
+opening (first) and closing (last) observation. Compacted runs are marked,
+and arb_lab carries unchanged lines forward into them, so the per-run
+analytics (best lines, arbitrage, consensus edges) see the same boards.
+
+Afterwards the SQLite file is VACUUMed and ANALYZEd and the JSONL history is
+rewritten (older records shrunk, newer records copied byte for byte) with
+a fresh .idx sidecar, and the terminal's prepared-frame cache entries
+for both files are dropped. Tiers come from --tiers or HISTORY_RETENTION_TIERS.
+
+The JSONL rewrite goes to <path>.compacting and replaces the original at
+the end. Writers take no lock: snapshots appended meanwhile are copied
+over until the file stops growing, just before the replace, and indexed
+afterwards. A line still being written in that last instant ends up in
+the old file and is lost, so schedule compaction between scrape runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from backend.core import history_db, jsoncodec, jsonl_index  # noqa: E402
+from tools import frame_cache  # noqa: E402
+
+DEFAULT_TIERS = os.getenv("HISTORY_RETENTION_TIERS", "3d:changes,14d:1h,60d:6h")
+DEFAULT_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join("data", "odds_history.db"))
+DEFAULT_JSONL = os.getenv("HISTORY_MATCHED_FILE", os.path.join("data", "odds_history.jsonl"))
+FIXTURE_BATCH = 500
+PRICE_COLUMNS = ["home_odds", "draw_odds", "away_odds"]
+_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+@dataclass(frozen=True)
+class Tier:
+    age: int  # seconds
+    mode: str  # "changes", "bucket" or "drop"
+    bucket: int = 0  # seconds, for mode "bucket"
+
+
+def _seconds(text: str) -> int:
+    match = re.fullmatch(r"(\d+)\s*([mhdw])", text.strip().lower())
+    if not match:
+        raise ValueError(f"Bad duration {text!r}; use e.g. 30m, 6h, 14d, 2w")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def parse_tiers(spec: str) -> List[Tier]:
+    """'3d:changes,14d:1h,365d:drop' -> tiers sorted by age."""
+    tiers = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        age, _, mode = part.partition(":")
+        mode = mode.strip().lower()
+        if mode in ("changes", "drop"):
+            tiers.append(Tier(_seconds(age), mode))
+        else:
+            tiers.append(Tier(_seconds(age), "bucket", _seconds(mode)))
+    tiers.sort(key=lambda t: t.age)
+    if any(t.mode == "drop" for t in tiers[:-1]):
+        raise ValueError("drop must be the oldest tier")
+    return tiers
+
+
+def keep_mask(frame: pd.DataFrame, tiers: List[Tier], now: float) -> np.ndarray:
+    """
+    Which lines to keep. frame has group, run_ts and the price columns and is
+    sorted by group, then run_ts.
+    """
+    n = len(frame)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    group = frame["group"].to_numpy()
+    ts = frame["run_ts"].to_numpy(dtype=np.int64)
+    tier = np.searchsorted(np.array([t.age for t in tiers]), now - ts, side="left") - 1
+    modes = np.array([t.mode for t in tiers] + ["all"])
+    sizes = np.array([t.bucket for t in tiers] + [0], dtype=np.int64)
+    mode = modes[tier]  # tier -1 picks the trailing "all"
+    size = sizes[tier]
+
+    same_group_next = np.r_[group[1:] == group[:-1], False]
+    first = np.r_[True, group[1:] != group[:-1]]
+    last = ~same_group_next
+    bucket = np.where(size > 0, ts // np.maximum(size, 1), np.arange(n))
+    candidate = ~(same_group_next & np.r_[tier[1:] == tier[:-1], False] & np.r_[bucket[1:] == bucket[:-1], False])
+
+    prices = frame[PRICE_COLUMNS].to_numpy(dtype=float)
+    prices = np.where(np.isnan(prices), -1.0, prices)
+    idx = np.flatnonzero(candidate)
+    changed = np.zeros(n, dtype=bool)
+    if len(idx):
+        new_group = np.r_[True, group[idx[1:]] != group[idx[:-1]]]
+        moved = np.r_[True, (prices[idx[1:]] != prices[idx[:-1]]).any(axis=1)]
+        changed[idx] = new_group | moved
+
+    keep = (mode == "all") | first | last | changed
+    return keep & (mode != "drop")
+
+
+def _cutoffs(tiers: List[Tier], now: float) -> Tuple[Optional[int], Optional[int]]:
+    """(compact runs older than, drop runs older than) as epoch seconds."""
+    compact = [t for t in tiers if t.mode != "drop"]
+    drop = [t for t in tiers if t.mode == "drop"]
+    return (
+        int(now - compact[0].age) if compact else None,
+        int(now - drop[0].age) if drop else None,
+    )
+
+
+# -- SQLite ---------------------------------------------------------------
+
+
+def compact_db(path: str, tiers: List[Tier], now: float, dry_run: bool = False) -> Dict:
+    before_bytes = os.path.getsize(path)
+    compact_before, drop_before = _cutoffs(tiers, now)
+    conn = sqlite3.connect(path)
+    try:
+        history_db.init_history_db(conn)
+        conn.commit()
+        oldest = compact_before if compact_before is not None else drop_before
+        before_rows = conn.execute(
+            "SELECT COUNT(*) FROM runs r CROSS JOIN odds o ON o.run_pk = r.run_pk WHERE r.run_ts < ?", (oldest,)
+        ).fetchone()[0] if oldest is not None else 0
+        removed = 0
+        dropped_runs = 0
+        if drop_before is not None:
+            dropped_runs = conn.execute("SELECT COUNT(*) FROM runs WHERE run_ts < ?", (drop_before,)).fetchone()[0]
+            removed += conn.execute(
+                "SELECT COUNT(*) FROM runs r CROSS JOIN odds o ON o.run_pk = r.run_pk WHERE r.run_ts < ?",
+                (drop_before,),
+            ).fetchone()[0]
+            if not dry_run:
+                for table in ("odds", "best_lines", "arbs"):
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE run_pk IN (SELECT run_pk FROM runs WHERE run_ts < ?)", (drop_before,)
+                    )
+                conn.execute("DELETE FROM runs WHERE run_ts < ?", (drop_before,))
+                history_db.rebuild_open_close(conn, [row[0] for row in conn.execute(
+                    "SELECT fixture_pk FROM line_open_close WHERE open_ts < ?", (drop_before,)
+                )])
+
+        if compact_before is not None:
+            if not dry_run:
+                # best lines come from a run's full board, so take them before it is thinned
+                history_db.materialize_stale_runs(conn, run_end_ts=compact_before - 1)
+            fixtures = [row[0] for row in conn.execute(
+                "SELECT DISTINCT o.fixture_pk FROM runs r CROSS JOIN odds o ON o.run_pk = r.run_pk WHERE r.run_ts < ?",
+                (compact_before,),
+            )]
+            for i in range(0, len(fixtures), FIXTURE_BATCH):
+                batch = fixtures[i:i + FIXTURE_BATCH]
+                marks = ",".join("?" * len(batch))
+                frame = pd.read_sql_query(
+                    "SELECT o.fixture_pk, o.bookmaker_pk, o.run_pk, r.run_ts, o.home_odds, o.draw_odds, o.away_odds"
+                    f" FROM odds o JOIN runs r ON r.run_pk = o.run_pk WHERE o.fixture_pk IN ({marks})"
+                    " ORDER BY o.fixture_pk, o.bookmaker_pk, r.run_ts, o.run_pk",
+                    conn, params=batch,
+                )
+                if dry_run and drop_before is not None:
+                    # these runs were counted above and a real run deletes them first
+                    frame = frame[frame["run_ts"] >= drop_before].reset_index(drop=True)
+                frame["group"] = frame["fixture_pk"] * (1 << 20) + frame["bookmaker_pk"]
+                gone = frame.loc[~keep_mask(frame, tiers, now), ["run_pk", "fixture_pk", "bookmaker_pk"]]
+                removed += len(gone)
+                if not dry_run and len(gone):
+                    conn.executemany(
+                        "DELETE FROM odds WHERE run_pk = ? AND fixture_pk = ? AND bookmaker_pk = ?",
+                        gone.itertuples(index=False, name=None),
+                    )
+            if not dry_run:
+                conn.execute("UPDATE runs SET compacted = 1 WHERE run_ts < ?", (compact_before,))
+        if not dry_run:
+            conn.execute(
+                "DELETE FROM fixtures WHERE NOT EXISTS (SELECT 1 FROM odds o WHERE o.fixture_pk = fixtures.fixture_pk)"
+                " AND NOT EXISTS (SELECT 1 FROM best_lines bl WHERE bl.fixture_pk = fixtures.fixture_pk)"
+            )
+            conn.commit()
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+            conn.commit()
+    finally:
+        conn.close()
+    return {
+        "file": path,
+        "rows_before": before_rows,
+        "rows_after": before_rows - removed,
+        "runs_dropped": dropped_runs,
+        "bytes_before": before_bytes,
+        "bytes_after": os.path.getsize(path),
+    }
+
+
+# -- JSONL ----------------------------------------------------------------
+
+
+def _match_key(match: Dict) -> str:
+    home_team = match.get("home_team") or ""
+    away_team = match.get("away_team") or ""
+    return match.get("match_id") or f"{home_team}-{away_team}-{match.get('start_time') or 0}"
+
+
+def _entry_ts(entry: Dict) -> int:
+    return history_db.iso_to_epoch(entry.get("last_updated") or entry.get("run_id"))
+
+
+def _jsonl_keep_set(path: str, old: List[Tuple[int, Dict]], tiers: List[Tier], now: float) -> Set[Tuple[int, str, str]]:
+    """(record number, match key, bookmaker) of the lines to keep in old records."""
+    rec_nos, keys, timestamps, prices = [], [], [], []
+    for (rec_no, entry), record in zip(old, jsonl_index.read_records(path, [e for _, e in old])):
+        ts = _entry_ts(entry)
+        for match in record.get("matches", []) or []:
+            key = _match_key(match)
+            for odds in match.get("odds", []) or []:
+                rec_nos.append(rec_no)
+                keys.append(f"{key}\x00{odds.get('bookmaker')}")
+                timestamps.append(ts)
+                prices.append([odds.get(col) for col in PRICE_COLUMNS])
+    if not rec_nos:
+        return set()
+    frame = pd.DataFrame(prices, columns=PRICE_COLUMNS, dtype=float)
+    frame["rec_no"] = rec_nos
+    frame["key"] = keys
+    frame["run_ts"] = timestamps
+    frame["group"] = pd.factorize(frame["key"])[0]
+    frame = frame.sort_values(["group", "run_ts", "rec_no"], kind="stable")
+    kept = frame[keep_mask(frame, tiers, now)]
+    return {(rec_no, *key.split("\x00", 1)) for rec_no, key in zip(kept["rec_no"], kept["key"])}
+
+
+def _copy_tail(path: str, tmp_path: str, start: int) -> None:
+    """Append what was written to path past start to tmp_path, until path stops growing."""
+    while True:
+        size = os.path.getsize(path)
+        if size <= start:
+            return
+        with open(path, "rb") as src, open(tmp_path, "ab") as dst:
+            src.seek(start)
+            dst.write(src.read(size - start))
+        start = size
+
+
+def compact_jsonl(path: str, tiers: List[Tier], now: float, dry_run: bool = False) -> Dict:
+    before_bytes = os.path.getsize(path)
+    compact_before, drop_before = _cutoffs(tiers, now)
+    entries = jsonl_index.ensure_index(path)
+    old = [(i, e) for i, e in enumerate(entries) if compact_before is not None and _entry_ts(e) < compact_before]
+    dropped = {i for i, e in old if drop_before is not None and _entry_ts(e) < drop_before}
+    keep = _jsonl_keep_set(path, [(i, e) for i, e in old if i not in dropped], tiers, now)
+    old_nos = {i for i, _ in old}
+
+    lines_before = lines_after = 0
+    tmp_path = f"{path}.compacting"
+    new_entries = []
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        for rec_no, entry in enumerate(entries):
+            src.seek(entry["offset"])
+            raw = src.read(entry["length"])
+            if rec_no in dropped:
+                continue
+            if rec_no not in old_nos:
+                new_entries.append({**entry, "offset": dst.tell()})
+                dst.write(raw)
+                continue
+            record = jsoncodec.loads(raw)
+            matches = []
+            for match in record.get("matches", []) or []:
+                key = _match_key(match)
+                odds = match.get("odds", []) or []
+                lines_before += len(odds)
+                odds = [o for o in odds if (rec_no, key, o.get("bookmaker")) in keep]
+                lines_after += len(odds)
+                if odds:
+                    matches.append({**match, "odds": odds})
+            # an emptied record is kept so the run stays listed for carry-forward
+            record = {**record, "matches": matches, "compacted": True}
+            payload = jsoncodec.dumps(record, pretty=False) + b"\n"
+            new_entries.append(jsonl_index.entry_for(record, dst.tell(), len(payload)))
+            dst.write(payload)
+    if dry_run:
+        after_bytes = os.path.getsize(tmp_path)
+        os.remove(tmp_path)
+    else:
+        end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+        _copy_tail(path, tmp_path, end)
+        after_bytes = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        jsonl_index.write_index(path, new_entries)
+        jsonl_index.ensure_index(path)  # indexes the copied tail
+    return {
+        "file": path,
+        "rows_before": lines_before,
+        "rows_after": lines_after,
+        "runs_dropped": len(dropped),
+        "bytes_before": before_bytes,
+        "bytes_after": after_bytes,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compact and downsample old odds history.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="odds_history.db ('' to skip)")
+    parser.add_argument("--jsonl", default=DEFAULT_JSONL, help="odds_history.jsonl ('' to skip)")
+    parser.add_argument("--tiers", default=DEFAULT_TIERS, help="e.g. 3d:changes,14d:1h,60d:6h,365d:drop")
+    parser.add_argument("--now", default=None, help="Reference time (ISO, default: now)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+    parser.add_argument(
+        "--frame-cache", default=frame_cache.DEFAULT_CACHE_DIR, help="Terminal frame cache to invalidate"
+    )
+    parser.add_argument("--output-json", default=None)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    tiers = parse_tiers(args.tiers)
+    if not tiers:
+        print("No retention tiers given; nothing to do.")
+        return 0
+    now = history_db.iso_to_epoch(args.now) if args.now else time.time()
+
+    reports = []
+    for path, compact in ((args.db, compact_db), (args.jsonl, compact_jsonl)):
+        if not path:
+            continue
+        if not os.path.exists(path):
+            print(f"Skipping missing {path}")
+            continue
+        started = time.perf_counter()
+        report = compact(path, tiers, now, dry_run=args.dry_run)
+        if not args.dry_run:
+            frame_cache.invalidate(path, args.frame_cache)
+        report["seconds"] = round(time.perf_counter() - started, 2)
+        reports.append(report)
+        print(
+            f"{'[dry run] ' if args.dry_run else ''}{path}: lines {report['rows_before']:,} -> {report['rows_after']:,} "
+            f"in older runs, {report['runs_dropped']} runs dropped, "
+            f"{report['bytes_before'] / 1e6:.1f} MB -> {report['bytes_after'] / 1e6:.1f} MB ({report['seconds']}s)"
+        )
+
+    if args.output_json:
+        jsoncodec.dump(reports, args.output_json, pretty=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
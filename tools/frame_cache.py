@@ -0,0 +1,281 @@
+"""
+On-disk cache of prepared odds frames (arb_lab.prepare_odds_frame over a
+history window) for the terminal.
+
+st.cache_data lives inside one Streamlit process and is cleared wholesale
+on refresh, so every restart, refresh or new date range used to reload and
+re-prepare the whole window. Here each (source file, run window, kickoff
+window) gets a directory of Parquet parts under FRAME_CACHE_DIR:
+
+    <key>/meta.json           source, filters and the runs the parts cover
+    <key>/part-00000.parquet  prepared rows, one part per load
+
+A read first lists the runs now in the window (one small query on the runs
+table or the JSONL index). Same runs: the parts are returned as they are.
+Only newer runs added: just those are loaded, prepared and written as a new
+part (prepare_odds_frame works per run, so the parts concatenate to the
+full result). Anything else (older runs backfilled, runs dropped, more runs
+compacted) rebuilds the entry; tools/compact_history.py invalidates the
+entries of the files it rewrites. Entries loaded with max_rows only track
+the runs from their oldest one on and drop whole runs from the old end to
+stay under the cap.
+
+Parquet needs pyarrow (requirements.analytics.txt). Without it, or with
+FRAME_CACHE_DIR set to an empty string, frames are prepared on every call.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from tools.arb_lab import (
+    concat_rows,
+    keep_latest_runs,
+    list_history_runs,
+    list_history_runs_from_jsonl,
+    load_snapshot_rows,
+    load_snapshot_rows_from_jsonl,
+    prepare_odds_frame,
+    resolve_db_path,
+    resolve_history_jsonl,
+)
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # optional: no disk cache without it
+    pyarrow = None
+
+DEFAULT_CACHE_DIR = os.getenv("FRAME_CACHE_DIR", os.path.join("data", "frame_cache"))
+# Bump when prepare_odds_frame changes what it produces
+CACHE_VERSION = 2
+# Merge the parts of an entry back into one after this many incremental loads
+MAX_PARTS = 32
+META_FILE = "meta.json"
+
+
+def available() -> bool:
+    return pyarrow is not None
+
+
+def _entry_dir(cache_dir: str, filters: Dict) -> str:
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest[:20])
+
+
+def _read_meta(entry: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(entry, META_FILE), "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if meta.get("cache_version") != CACHE_VERSION:
+        return None
+    if not all(os.path.exists(os.path.join(entry, part)) for part in meta.get("parts", [])):
+        return None
+    return meta
+
+
+def _write_meta(entry: str, meta: Dict) -> None:
+    tmp = os.path.join(entry, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(meta, handle, default=str)
+    os.replace(tmp, os.path.join(entry, META_FILE))
+
+
+def _covered(runs: pd.DataFrame) -> Dict:
+    if runs.empty:
+        return {"runs": 0}
+    return {
+        "runs": int(len(runs)),
+        "first_run_ts": int(runs["run_ts"].min()),
+        "last_run_ts": int(runs["run_ts"].max()),
+        "last_run_id": str(runs.loc[runs["run_ts"].idxmax(), "run_id"]),
+        "compacted": int(runs["compacted"].sum()),
+    }
+
+
+def _scope(meta: Dict, runs: pd.DataFrame) -> pd.DataFrame:
+    """The listed runs an entry must match: all, or from its first run on for max_rows entries."""
+    if meta["filters"].get("max_rows"):
+        return runs[runs["run_ts"] >= meta["covered"]["first_run_ts"]]
+    return runs
+
+
+def _new_runs(meta: Dict, runs: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Runs newer than the entry covers, or None when its older runs changed."""
+    covered = meta["covered"]
+    runs = _scope(meta, runs)
+    older = runs[runs["run_ts"] <= covered["last_run_ts"]]
+    if _covered(older) != covered:
+        return None
+    return runs[runs["run_ts"] > covered["last_run_ts"]]
+
+
+def _arrow_safe(frame: pd.DataFrame) -> pd.DataFrame:
+    """Stringify object columns that mix types (event ids from JSONL can be ints or strings)."""
+    for col in frame.columns:
+        if frame[col].dtype == object and pd.api.types.infer_dtype(frame[col], skipna=True).startswith("mixed"):
+            frame[col] = frame[col].map(lambda value: value if value is None or pd.isna(value) else str(value))
+    return frame
+
+
+def _write_part(entry: str, frame: pd.DataFrame, index: int) -> str:
+    name = f"part-{index:05d}.parquet"
+    tmp = os.path.join(entry, name + ".tmp")
+    _arrow_safe(frame).to_parquet(tmp, engine="pyarrow", index=False)
+    os.replace(tmp, os.path.join(entry, name))
+    return name
+
+
+def _read_parts(entry: str, parts: List[str]) -> pd.DataFrame:
+    frames = [pd.read_parquet(os.path.join(entry, part), engine="pyarrow") for part in parts]
+    return concat_rows(frames) if len(frames) > 1 else frames[0]
+
+
+def _read_cached(entry: str, meta: Dict) -> Optional[pd.DataFrame]:
+    """The entry's frame, or None when another session folded or rebuilt it since meta was read."""
+    try:
+        return _read_parts(entry, meta["parts"])
+    except OSError:
+        return None
+
+
+def _next_part(parts: List[str]) -> int:
+    return int(parts[-1][len("part-"):-len(".parquet")]) + 1 if parts else 0
+
+
+def _rebuild(entry: str, filters: Dict, frame: pd.DataFrame, runs: pd.DataFrame) -> None:
+    if os.path.isdir(entry):
+        shutil.rmtree(entry)
+    os.makedirs(entry)
+    parts = [_write_part(entry, frame, 0)]
+    _write_meta(entry, {"cache_version": CACHE_VERSION, "filters": filters, "covered": _covered(runs), "parts": parts})
+
+
+def _append(entry: str, meta: Dict, frame: pd.DataFrame, new: pd.DataFrame, runs: pd.DataFrame, fold: bool) -> None:
+    """Add the prepared new rows as a part, or rewrite frame as the only part when fold is set."""
+    parts = meta["parts"]
+    stale = []
+    if fold or len(parts) >= MAX_PARTS:
+        stale, parts = parts, [_write_part(entry, frame, _next_part(parts))]
+    else:
+        parts = parts + [_write_part(entry, new, _next_part(parts))]
+    _write_meta(entry, dict(meta, covered=_covered(runs), parts=parts))
+    for part in stale:
+        os.remove(os.path.join(entry, part))
+
+
+def load_prepared_rows(
+    path: Optional[str] = None,
+    run_start: Optional[object] = None,
+    run_end: Optional[object] = None,
+    match_start: Optional[object] = None,
+    match_end: Optional[object] = None,
+    max_rows: Optional[int] = None,
+    jsonl: bool = False,
+    compact: bool = False,
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    prepare_odds_frame(load_snapshot_rows(...)) for odds_history.db, or of
+    load_snapshot_rows_from_jsonl(...) with jsonl=True (which has no kickoff
+    filter or max_rows), served from and kept in the disk cache. max_rows
+    loads the latest rows like load_snapshot_rows(limit=...); as new runs
+    arrive the entry then drops its oldest whole runs to stay under it.
+    compact frames (arb_lab.compact_rows) are cached as their own entries.
+    """
+    if jsonl:
+        path = resolve_history_jsonl(path)
+        max_rows = None
+        filters = {"source": "jsonl", "path": os.path.abspath(path), "run_start": run_start, "run_end": run_end}
+
+        def load(since=None):
+            return load_snapshot_rows_from_jsonl(
+                jsonl_path=path, run_start=run_start, run_end=run_end, since=since, compact=compact
+            )
+
+        list_runs = list_history_runs_from_jsonl
+    else:
+        path = resolve_db_path(path)
+        filters = {
+            "source": "db",
+            "path": os.path.abspath(path),
+            "run_start": run_start,
+            "run_end": run_end,
+            "match_start": match_start,
+            "match_end": match_end,
+            "max_rows": int(max_rows) if max_rows else None,
+        }
+
+        def load(since=None):
+            return load_snapshot_rows(
+                db_path=path,
+                run_start=run_start,
+                run_end=run_end,
+                match_start=match_start,
+                match_end=match_end,
+                limit=None if since else filters["max_rows"],
+                since=since,
+                compact=compact,
+            )
+
+        list_runs = list_history_runs
+    if compact:
+        filters["compact"] = True
+    if not cache_dir or not available():
+        return prepare_odds_frame(load())
+
+    runs = list_runs(path, run_start, run_end)
+    entry = _entry_dir(cache_dir, filters)
+    meta = _read_meta(entry)
+    if meta and meta["covered"] == _covered(_scope(meta, runs)):
+        cached = _read_cached(entry, meta)
+        if cached is not None:
+            return cached
+        meta = None
+    new = _new_runs(meta, runs) if meta else None
+    cached = _read_cached(entry, meta) if new is not None else None
+    if cached is None:
+        new = None  # nothing to extend: rebuild the entry
+    if new is not None:
+        prepared = _arrow_safe(prepare_odds_frame(load(since=meta["covered"]["last_run_id"])))
+        frame = concat_rows([cached, prepared])
+        trimmed = keep_latest_runs(frame, max_rows)
+        fold, frame = len(trimmed) < len(frame), trimmed
+    else:
+        frame = _arrow_safe(prepare_odds_frame(load()))
+    if frame.empty:
+        return frame
+    if max_rows:
+        runs = runs[runs["run_ts"] >= runs.loc[runs["run_id"].isin(frame["run_id"].unique()), "run_ts"].min()]
+    try:
+        if new is not None:
+            _append(entry, meta, frame, prepared, runs, fold)
+        else:
+            _rebuild(entry, filters, frame, runs)
+    except OSError:
+        pass  # read-only data dir: serve the frame uncached
+    return frame
+
+
+def invalidate(path: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> int:
+    """Drop the cache entries built from path (after it is rewritten in place); returns how many."""
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return 0
+    target = os.path.abspath(path)
+    dropped = 0
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        try:
+            with open(os.path.join(entry, META_FILE), "r", encoding="utf-8") as handle:
+                source = json.load(handle).get("filters", {}).get("path")
+        except (OSError, ValueError):
+            continue
+        if source == target:
+            shutil.rmtree(entry, ignore_errors=True)
+            dropped += 1
+    return dropped
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migrate odds_history.db to the integer-keyed version 2 schema.
+
+The scraper and arb_lab migrate on first open anyway; this runs it ahead of
+time with a backup copy and a VACUUM so the file shrinks on disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import history_db  # noqa: E402
+
+DEFAULT_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join("data", "odds_history.db"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Migrate odds_history.db to the version 2 schema.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--no-backup", action="store_true", help="Skip writing <db>.v1.bak first")
+    parser.add_argument("--no-vacuum", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"History DB not found: {args.db}")
+        return 1
+    conn = sqlite3.connect(args.db)
+    try:
+        version = history_db.schema_version(conn)
+        if version != 1:
+            print(f"{args.db} is already schema version {version}; nothing to do")
+            return 0
+        before = os.path.getsize(args.db)
+        if not args.no_backup:
+            backup = f"{args.db}.v1.bak"
+            conn.execute("VACUUM INTO ?", (backup,))
+            print(f"Backup written to {backup}")
+        started = time.perf_counter()
+        counts = history_db.migrate_v1(conn)
+        print(f"Migrated in {time.perf_counter() - started:.1f}s: {counts}")
+        if not args.no_vacuum:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    print(f"Size: {before / 1e6:.1f} MB -> {os.path.getsize(args.db) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
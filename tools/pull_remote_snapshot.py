@@ -6,7 +6,6 @@ Fetch the latest odds_data.json from a remote URL and append to local history.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 import urllib.request
@@ -16,6 +15,7 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+from backend.core import jsoncodec
 from tools.arb_lab import (
     append_snapshot_to_history_db,
     append_snapshot_to_history_jsonl,
@@ -29,7 +29,7 @@ DEFAULT_REMOTE_URL = "https://raw.githubusercontent.com/kwamenasworld-cloud/odds
 
 def fetch_payload(url: str, timeout: int) -> dict:
     with urllib.request.urlopen(url, timeout=timeout) as handle:
-        return json.load(handle)
+        return jsoncodec.load(handle)
 
 
 def main() -> int:
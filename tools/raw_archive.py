@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Inspect and maintain the compressed raw-scrape archive (data/raw_archive).
+
+Commands:
+ - report: per-day runs, bytes the old raw_scraped_history.jsonl format
+   would have used, bytes on disk and the saving
+ - runs: list archived run ids (optionally for one day)
+ - export: write one run as a raw_scraped_data.json-style file
+ - import: move an existing raw_scraped_history.jsonl into the archive
+ - train: retrain the compression dictionary from one archived run
+
+A run can also be replayed directly:
+  python scrape_odds_github.py --from-file data/raw_archive --run-id <run_id> --no-push
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import jsoncodec  # noqa: E402
+from backend.core.raw_archive import RawArchive, import_jsonl  # noqa: E402
+
+DEFAULT_ROOT = os.path.join(os.getenv("HISTORY_DIR", "data"), os.getenv("RAW_ARCHIVE_DIR", "raw_archive"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Inspect and maintain the raw-scrape archive.")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Archive directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    report = sub.add_parser("report", help="Disk savings per day")
+    report.add_argument("--output-json", default=None)
+
+    runs = sub.add_parser("runs", help="List archived run ids")
+    runs.add_argument("--day", default=None, help="YYYY-MM-DD")
+
+    export = sub.add_parser("export", help="Write one run as raw_scraped_data.json")
+    export.add_argument("run_id", nargs="?", default=None, help="Run id (default: latest)")
+    export.add_argument("--output", default="raw_scraped_data.json")
+    export.add_argument("--pretty", action="store_true")
+
+    importer = sub.add_parser("import", help="Import raw_scraped_history.jsonl")
+    importer.add_argument("jsonl")
+
+    train = sub.add_parser("train", help="Retrain the dictionary from an archived run")
+    train.add_argument("run_id", nargs="?", default=None, help="Run id (default: latest)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    archive = RawArchive(args.root)
+
+    if args.command == "report":
+        rows = archive.day_report()
+        print(f"{'day':<12} {'runs':>6} {'jsonl MB':>10} {'archive MB':>11} {'saved':>7}")
+        for row in rows:
+            print(
+                f"{row['day']:<12} {row['runs']:>6} {row['jsonl_bytes'] / 1e6:>10.2f} "
+                f"{row['archive_bytes'] / 1e6:>11.2f} {row['saved_pct']:>6.1f}%"
+            )
+        if args.output_json:
+            jsoncodec.dump(rows, args.output_json, pretty=True)
+        return 0
+
+    if args.command == "runs":
+        for run_id in archive.runs(args.day):
+            print(run_id)
+        return 0
+
+    if args.command == "export":
+        matches = archive.load_run(args.run_id)
+        jsoncodec.dump(matches, args.output, pretty=args.pretty)
+        total = sum(len(items) for items in matches.values())
+        print(f"Wrote {total} fixtures from {len(matches)} bookmakers to {args.output}")
+        return 0
+
+    if args.command == "import":
+        imported = import_jsonl(archive, args.jsonl)
+        print(f"Imported {imported} runs into {args.root}")
+        return 0
+
+    if args.command == "train":
+        dictionary = archive.train_dictionary(archive.load_run(args.run_id))
+        print(f"Trained {dictionary.codec} dictionary {dictionary.id} ({len(dictionary.data)} bytes)")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
-import json
+import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import jsoncodec
+
 
 def main() -> int:
     path = Path("odds_data.json")
     if not path.exists():
         raise SystemExit("odds_data.json missing after scrape")
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = jsoncodec.load(str(path))
     last_updated = payload.get("last_updated")
     if not last_updated:
         raise SystemExit("odds_data.json missing last_updated")
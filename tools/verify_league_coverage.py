@@ -9,8 +9,9 @@ reports missing matches. Uses ESPN scoreboard as the baseline.
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import re
+import sys
 import unicodedata
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
@@ -18,6 +19,12 @@ from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core import jsoncodec  # noqa: E402
+
 
 ESPN_SCOREBOARD_BASE = "https://site.api.espn.com/apis/site/v2/sports/soccer"
 DEFAULT_DAYS = 7
@@ -172,8 +179,7 @@ def fetch_espn_fixtures(league_id: str, days: int) -> List[Dict]:
 
 
 def load_odds_matches(path: str) -> List[Dict]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = jsoncodec.load(path)
     matches = data.get("matches")
     if isinstance(matches, list):
         return matches
@@ -181,8 +187,7 @@ def load_odds_matches(path: str) -> List[Dict]:
 
 
 def load_raw_matches(path: str) -> List[Dict]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = jsoncodec.load(path)
     if not isinstance(data, dict):
         return []
     matches = []
@@ -247,8 +252,7 @@ def main() -> None:
         missing_total += len(missing)
 
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2)
+        jsoncodec.dump(report, args.output, pretty=True)
 
     print("Coverage report (next {} days):".format(args.days))
     for league_key, data in report["leagues"].items():
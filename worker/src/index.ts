@@ -1232,11 +1232,6 @@ async function storeOddsHistory(env: Env, oddsResponse: OddsResponse, runId: str
   const totalMatches = oddsResponse.meta?.total_matches ?? 0;
   const totalLeagues = oddsResponse.data.length;
 
-  await env.D1.prepare(
-    `INSERT OR REPLACE INTO odds_runs (run_id, last_updated, total_matches, total_leagues, created_at)
-     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)`
-  ).bind(runId, lastUpdated, totalMatches, totalLeagues).run();
-
   const matchStmt = env.D1.prepare(
     `INSERT OR REPLACE INTO odds_matches
      (run_id, match_id, league, start_time, home_team, away_team)
@@ -1284,6 +1279,13 @@ async function storeOddsHistory(env: Env, oddsResponse: OddsResponse, runId: str
 
   await batchStatements(env, matchStatements, 100);
   await batchStatements(env, oddsStatements, 100);
+
+  // History reads join odds_runs, so the run only becomes visible (to a
+  // since= refresh in particular) once all of its lines are stored
+  await env.D1.prepare(
+    `INSERT OR REPLACE INTO odds_runs (run_id, last_updated, total_matches, total_leagues, created_at)
+     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)`
+  ).bind(runId, lastUpdated, totalMatches, totalLeagues).run();
 }
 
 /**
@@ -1923,6 +1925,7 @@ async function listHistoryOdds(request: Request, env: Env): Promise<Response> {
   const offset = parseInt(url.searchParams.get('offset') || '0', 10);
   const runStart = url.searchParams.get('run_start');
   const runEnd = url.searchParams.get('run_end');
+  const since = url.searchParams.get('since');
   const matchStart = parseEpochSeconds(url.searchParams.get('match_start'));
   const matchEnd = parseEpochSeconds(url.searchParams.get('match_end'));
   const league = url.searchParams.get('league');
@@ -1932,6 +1935,11 @@ async function listHistoryOdds(request: Request, env: Env): Promise<Response> {
   const params: any[] = [];
   if (runStart) { filters.push('r.last_updated >= ?'); params.push(runStart); }
   if (runEnd) { filters.push('r.last_updated <= ?'); params.push(runEnd); }
+  // since: a run_id the client already has; only later runs are returned
+  if (since) {
+    filters.push('r.last_updated > COALESCE((SELECT last_updated FROM odds_runs WHERE run_id = ?), ?)');
+    params.push(since, since);
+  }
   if (Number.isFinite(matchStart)) { filters.push('m.start_time >= ?'); params.push(matchStart); }
   if (Number.isFinite(matchEnd)) { filters.push('m.start_time <= ?'); params.push(matchEnd); }
   if (league) { filters.push('m.league = ?'); params.push(league); }
@@ -1957,7 +1965,7 @@ async function listHistoryOdds(request: Request, env: Env): Promise<Response> {
     JOIN odds_matches m ON o.run_id = m.run_id AND o.match_id = m.match_id
     JOIN odds_runs r ON o.run_id = r.run_id
     ${where}
-    ORDER BY r.last_updated DESC, m.start_time ASC
+    ORDER BY r.last_updated DESC, m.start_time ASC, m.match_id ASC, o.bookmaker ASC
     LIMIT ? OFFSET ?
   `;
   params.push(limit, offset);